@@ -5,53 +5,102 @@ Ein vollständiger AI Desktop-Assistent mit lokaler und Cloud-KI
 import sys
 import os
 import asyncio
+import argparse
 from pathlib import Path
 
 # Add toobix to path
 sys.path.append(str(Path(__file__).parent))
 
-from toobix.core.ai_handler import AIHandler
-from toobix.core.speech_engine import SpeechEngine
-from toobix.core.desktop_integration import DesktopIntegration
-from toobix.config.settings import Settings
+
+def parse_args(argv=None):
+    """Kommandozeilen-Optionen"""
+    parser = argparse.ArgumentParser(description="Toobix AI Assistant")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="Import- und Initialisierungszeiten messen und als Bericht speichern")
+    parser.add_argument('--startup-budget-ms', type=float,
+                        default=float(os.environ['TOOBIX_STARTUP_BUDGET_MS']) if os.environ.get('TOOBIX_STARTUP_BUDGET_MS') else None,
+                        help="Budget für die Zeit bis zum interaktiven Fenster (Exit-Code 1 bei Überschreitung)")
+    parser.add_argument('--exit-after-startup', action='store_true',
+                        help="Nach dem ersten interaktiven Fenster beenden (für Regressionstests)")
+    return parser.parse_known_args(argv)[0]
+
+
+ARGS = parse_args()
+
+# Trace und (optional) Import-Profiler so früh wie möglich starten
+from toobix.core.startup_trace import get_startup_trace
+startup_trace = get_startup_trace()
+import_profiler = None
+if ARGS.profile_startup:
+    from toobix.core.startup_profiler import ImportProfiler
+    import_profiler = ImportProfiler(startup_trace).install()
+
+with startup_trace.span('imports.core'):
+    from toobix.core.ai_handler import AIHandler
+    from toobix.core.speech_engine import SpeechEngine
+    from toobix.core.desktop_integration import DesktopIntegration
+    from toobix.config.settings import Settings
 
 class ToobixAssistant:
     """Hauptklasse für den Toobix AI-Assistenten"""
     
-    def __init__(self):
+    def __init__(self, args=None):
         print("🚀 Toobix AI Assistant wird gestartet...")
+        self.args = args or parse_args([])
+        self.startup_within_budget = True
+        if self.args.profile_startup or self.args.startup_budget_ms is not None or self.args.exit_after_startup:
+            startup_trace.on_interactive(self._on_startup_complete)
         
         # Konfiguration laden
-        self.settings = Settings()
+        with startup_trace.span('settings'):
+            self.settings = Settings()
         
         # Komponenten initialisieren
-        self.ai_handler = AIHandler(self.settings)
-        self.speech_engine = SpeechEngine(self.settings)
-        self.desktop = DesktopIntegration()
+        with startup_trace.span('ai_handler'):
+            self.ai_handler = AIHandler(self.settings)
+        with startup_trace.span('speech_engine'):
+            self.speech_engine = SpeechEngine(self.settings)
+        with startup_trace.span('desktop_integration'):
+            self.desktop = DesktopIntegration()
         
         # GUI erstellen - NEUE MODERNE VERSION
         try:
-            from toobix.gui.modern_gui import create_modern_gui
-            self.gui = create_modern_gui(
-                ai_handler=self.ai_handler,
-                speech_engine=self.speech_engine,
-                desktop=self.desktop,
-                settings=self.settings
-            )
+            with startup_trace.span('gui.modern'):
+                from toobix.gui.modern_gui import create_modern_gui
+                self.gui = create_modern_gui(
+                    ai_handler=self.ai_handler,
+                    speech_engine=self.speech_engine,
+                    desktop=self.desktop,
+                    settings=self.settings
+                )
             print("🌟 Moderne GUI aktiviert!")
         except Exception as e:
             print(f"⚠️ Fallback zur klassischen GUI: {e}")
             # Fallback zur alten GUI
-            from toobix.gui.main_window import ToobixGUI
-            self.gui = ToobixGUI(
-                ai_handler=self.ai_handler,
-                speech_engine=self.speech_engine,
-                desktop=self.desktop,
-                settings=self.settings
-            )
+            with startup_trace.span('gui.classic'):
+                from toobix.gui.main_window import ToobixGUI
+                self.gui = ToobixGUI(
+                    ai_handler=self.ai_handler,
+                    speech_engine=self.speech_engine,
+                    desktop=self.desktop,
+                    settings=self.settings
+                )
         
         print("✅ Toobix ist bereit!")
     
+    def _on_startup_complete(self, interactive_ms: float):
+        """Erstes interaktives Fenster: Startup-Bericht und Budget-Prüfung"""
+        from toobix.core.startup_profiler import build_startup_report, format_startup_report, write_startup_report
+        
+        report = build_startup_report(startup_trace, import_profiler, self.args.startup_budget_ms)
+        print(format_startup_report(report))
+        if self.args.profile_startup:
+            print(f"📄 Startup-Bericht gespeichert: {write_startup_report(report)}")
+        self.startup_within_budget = report['within_budget'] is not False
+        
+        if self.args.exit_after_startup and getattr(self.gui, 'root', None):
+            self.gui.root.after(0, self.gui.root.quit)
+    
     def run(self):
         """Startet die Hauptanwendung"""
         try:
@@ -91,12 +140,18 @@ def main():
         # Prüfe ob Ollama läuft
         print("🔍 Prüfe Systemvoraussetzungen...")
         
-        toobix = ToobixAssistant()
+        toobix = ToobixAssistant(ARGS)
         toobix.run()
         
+        if not toobix.startup_within_budget:
+            print(f"❌ Startup über Budget ({ARGS.startup_budget_ms:.0f} ms)")
+            sys.exit(1)
+        
     except Exception as e:
         print(f"❌ Kritischer Fehler: {e}")
-        input("Drücke Enter zum Beenden...")
+        if not ARGS.exit_after_startup:
+            input("Drücke Enter zum Beenden...")
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
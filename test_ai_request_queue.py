@@ -0,0 +1,81 @@
+"""
+Toobix AI Request Queue Tests
+Single-Flight, getrennte Sitzungen und Verdrängung von Hintergrund-Anfragen
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import time
+import asyncio
+
+import pytest
+
+from toobix.core.ai_request_queue import AIRequestQueue, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from toobix.core.conversation import ConversationSession
+
+
+def test_queue_merges_identical_requests():
+    calls = []
+
+    async def executor(prompt, context, session):
+        calls.append(prompt)
+        await asyncio.sleep(0.1)
+        return f"Antwort auf {prompt}"
+
+    queue = AIRequestQueue(executor)
+    futures = [queue.submit(prompt) for prompt in ('Wie spät ist es?', 'wie  spät ist es', 'WIE SPÄT IST ES!')]
+    results = {future.result(2) for future in futures}
+
+    assert len(results) == 1
+    assert len(calls) == 1
+    assert queue.get_stats()['deduplicated'] == 2
+
+
+def test_queue_keeps_sessions_apart():
+    calls = []
+
+    async def executor(prompt, context, session):
+        calls.append(session.id)
+        await asyncio.sleep(0.05)
+        return prompt
+
+    queue = AIRequestQueue(executor)
+    first, second = ConversationSession(), ConversationSession()
+    futures = [queue.submit('Hallo', session=first), queue.submit('Hallo', session=second)]
+    for future in futures:
+        future.result(2)
+    assert sorted(calls) == sorted([first.id, second.id])
+
+
+def test_interactive_request_preempts_background():
+    finished = []
+
+    async def executor(prompt, context, session):
+        await asyncio.sleep(0.05 if prompt == 'chat' else 0.4)
+        finished.append(prompt)
+        return prompt
+
+    queue = AIRequestQueue(executor)
+    background = queue.submit('hintergrund', priority=PRIORITY_BACKGROUND)
+    time.sleep(0.15)  # Batch-Fenster abgelaufen, Hintergrund-Anfrage läuft
+    chat = queue.submit('chat', priority=PRIORITY_INTERACTIVE)
+
+    assert chat.result(1) == 'chat'
+    assert not background.done()
+    assert background.result(2) == 'hintergrund'
+    assert finished == ['chat', 'hintergrund']
+
+    stats = queue.get_stats()
+    assert stats['preempted'] == 1
+    assert stats['upstream_calls'] == 3
+
+
+def test_queue_propagates_errors():
+    async def executor(prompt, context, session):
+        raise RuntimeError('Backend weg')
+
+    queue = AIRequestQueue(executor)
+    with pytest.raises(RuntimeError):
+        queue.submit('Hallo').result(2)
+    assert queue.get_stats()['errors'] == 1
@@ -0,0 +1,151 @@
+"""
+Toobix AI Router Tests
+Circuit Breaker und Hedging gegen den Mock-KI-Server
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import json
+import time
+import asyncio
+import urllib.error
+import urllib.request
+
+import pytest
+
+from toobix.core.mock_ai_server import MockAIServer, MockConfig
+from toobix.core.ai_router import AIRouter, CircuitBreaker
+
+
+def fast_config(**changes) -> MockConfig:
+    """Mock ohne Kaltstart und mit vernachlässigbarer Generierungszeit"""
+    config = MockConfig(latency_ms=1.0, jitter_ms=0.0, load_ms=0.0,
+                        tokens_per_s=10000.0, response_tokens=3)
+    for key, value in changes.items():
+        setattr(config, key, value)
+    return config
+
+
+@pytest.fixture
+def mock_server():
+    servers = []
+
+    def start(**changes) -> MockAIServer:
+        server = MockAIServer(fast_config(**changes))
+        server.start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def ollama_call(url: str):
+    """Backend-Aufruf wie im AIHandler, nur mit urllib statt aiohttp"""
+    async def call(prompt, context, **kwargs):
+        def post():
+            body = json.dumps({'model': 'gemma2:2b', 'prompt': prompt, 'stream': False}).encode('utf-8')
+            request = urllib.request.Request(f"{url}/api/generate", data=body,
+                                             headers={'Content-Type': 'application/json'})
+            try:
+                with urllib.request.urlopen(request, timeout=5) as response:
+                    return json.loads(response.read())['response']
+            except urllib.error.HTTPError:
+                return None
+        return await asyncio.to_thread(post)
+    return call
+
+
+def test_breaker_opens_short_circuits_and_recovers(mock_server):
+    server = mock_server(failure_rate=1.0)
+    router = AIRouter()
+    backend = router.register('ollama', ollama_call(server.url), lambda: True)
+    backend.breaker = CircuitBreaker(failure_threshold=3, cooldown_s=0.2)
+
+    for _ in range(3):
+        assert asyncio.run(router.request('Hallo', None, ['ollama'])) == (None, None)
+    assert backend.breaker.state == CircuitBreaker.OPEN
+    assert server.stats['generate'] == 3
+
+    # Offen: kein Upstream-Aufruf mehr
+    assert asyncio.run(router.request('Hallo', None, ['ollama'])) == (None, None)
+    assert router.stats['short_circuited'] == 1
+    assert server.stats['generate'] == 3
+
+    # Nach der Abkühlzeit schließt eine erfolgreiche Probe den Breaker
+    server.update(failure_rate=0.0)
+    time.sleep(0.25)
+    result, name = asyncio.run(router.request('Hallo', None, ['ollama']))
+    assert result and name == 'ollama'
+    assert backend.breaker.state == CircuitBreaker.CLOSED
+    assert backend.breaker.cooldown_s == 0.2
+
+
+def test_failed_probe_reopens_with_doubled_cooldown(mock_server):
+    server = mock_server(failure_rate=1.0)
+    router = AIRouter()
+    backend = router.register('ollama', ollama_call(server.url), lambda: True)
+    backend.breaker = CircuitBreaker(failure_threshold=1, cooldown_s=0.1)
+
+    asyncio.run(router.request('Hallo', None, ['ollama']))
+    assert backend.breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.15)
+    asyncio.run(router.request('Hallo', None, ['ollama']))
+    assert backend.breaker.state == CircuitBreaker.OPEN
+    assert backend.breaker.cooldown_s == pytest.approx(0.2)
+    assert server.stats['generate'] == 2
+
+
+def test_open_breaker_falls_back_to_next_backend(mock_server):
+    broken = mock_server(failure_rate=1.0)
+    healthy = mock_server()
+    router = AIRouter()
+    router.register('ollama', ollama_call(broken.url), lambda: True)
+    router.register('groq', ollama_call(healthy.url), lambda: True)
+
+    for _ in range(3):
+        result, name = asyncio.run(router.request('Hallo', None, ['ollama', 'groq']))
+        assert result and name == 'groq'
+    assert router.backends['ollama'].breaker.state == CircuitBreaker.OPEN
+
+    asyncio.run(router.request('Hallo', None, ['ollama', 'groq']))
+    assert broken.stats['generate'] == 3
+
+
+def test_hedge_wins_against_slow_primary(mock_server):
+    slow = mock_server(latency_ms=800.0)
+    fast = mock_server()
+    router = AIRouter(hedging=True)
+    router.DEFAULT_HEDGE_DELAY_S = 0.05
+    router.register('ollama', ollama_call(slow.url), lambda: True)
+    router.register('groq', ollama_call(fast.url), lambda: True)
+
+    async def timed():
+        start = time.perf_counter()
+        answer = await router.request('Hallo', None, ['ollama', 'groq'])
+        return answer, time.perf_counter() - start
+
+    (result, name), elapsed = asyncio.run(timed())
+    assert result and name == 'groq'
+    assert elapsed < 0.6
+    assert router.stats['hedged'] == 1
+    assert router.backends['groq'].hedge_wins == 1
+    # Der verlorene Hedge zählt nicht als Fehler
+    assert router.backends['ollama'].breaker.state == CircuitBreaker.CLOSED
+
+
+def test_no_hedge_when_primary_answers_in_time(mock_server):
+    fast = mock_server()
+    spare = mock_server()
+    router = AIRouter(hedging=True)
+    router.DEFAULT_HEDGE_DELAY_S = 0.5
+    router.register('ollama', ollama_call(fast.url), lambda: True)
+    router.register('groq', ollama_call(spare.url), lambda: True)
+
+    result, name = asyncio.run(router.request('Hallo', None, ['ollama', 'groq']))
+    assert result and name == 'ollama'
+    assert router.stats['hedged'] == 0
+    assert spare.stats['generate'] == 0
@@ -0,0 +1,154 @@
+"""
+Toobix Cleanup Executor Tests
+Transaktionen mit Journal: Commit, Trockenlauf, Fortsetzen und Rollback
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import json
+
+from toobix.core.cleanup_executor import CleanupExecutor, CleanupOperation, OP_DELETE, OP_MOVE
+
+
+def write(path, content: bytes, mtime: float = None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def test_run_deletes_and_moves_and_commits(tmp_path):
+    victim = write(tmp_path / 'temp' / 'alt.tmp', b'a' * 100)
+    download = write(tmp_path / 'downloads' / 'bericht.pdf', b'b' * 200)
+    executor = CleanupExecutor(data_dir=str(tmp_path / 'cleanup'))
+
+    report = executor.run('test', [
+        CleanupOperation(op_type=OP_DELETE, source=victim),
+        CleanupOperation(op_type=OP_MOVE, source=download,
+                         target=str(tmp_path / 'archiv' / 'bericht.pdf'))
+    ])
+
+    assert report['completed'] == 2
+    assert not os.path.exists(victim)
+    assert (tmp_path / 'archiv' / 'bericht.pdf').exists()
+    assert not (tmp_path / 'cleanup' / 'trash' / report['transaction_id']).exists()
+    assert executor.list_incomplete() == []
+
+
+def test_dry_run_changes_nothing(tmp_path):
+    victim = write(tmp_path / 'temp' / 'alt.tmp', b'a' * 100)
+    executor = CleanupExecutor(data_dir=str(tmp_path / 'cleanup'))
+
+    report = executor.run('test', [CleanupOperation(op_type=OP_DELETE, source=victim)], dry_run=True)
+
+    assert report['bytes_reclaimed'] == 100
+    assert os.path.exists(victim)
+
+
+def test_moves_to_same_target_do_not_overwrite(tmp_path):
+    first = write(tmp_path / 'a' / 'notiz.txt', b'eins')
+    second = write(tmp_path / 'b' / 'notiz.txt', b'zwei')
+    target = str(tmp_path / 'archiv' / 'notiz.txt')
+    executor = CleanupExecutor(data_dir=str(tmp_path / 'cleanup'))
+
+    executor.run('test', [CleanupOperation(op_type=OP_MOVE, source=first, target=target),
+                          CleanupOperation(op_type=OP_MOVE, source=second, target=target)])
+
+    archived = sorted(p.read_bytes() for p in (tmp_path / 'archiv').iterdir())
+    assert archived == [b'eins', b'zwei']
+    assert executor._reserved_targets == {}
+
+
+def begin_record(tx_id: str, operations):
+    return {'event': 'begin', 'tx': tx_id, 'name': 'abgebrochen', 'ts': '2026-01-01T00:00:00',
+            'ops': [{'op_type': op.op_type, 'source': op.source, 'target': op.target,
+                     'meta': {}, 'op_id': op.op_id} for op in operations]}
+
+
+def test_resume_after_crash_with_torn_journal(tmp_path):
+    first = write(tmp_path / 'temp' / 'eins.tmp', b'1' * 10)
+    second = write(tmp_path / 'temp' / 'zwei.tmp', b'2' * 10)
+    operations = [CleanupOperation(op_type=OP_DELETE, source=first, op_id='0'),
+                  CleanupOperation(op_type=OP_DELETE, source=second, op_id='1')]
+
+    # Absturz: op 0 erledigt, mitten in der nächsten Journal-Zeile abgebrochen
+    os.unlink(first)
+    journal = tmp_path / 'cleanup' / 'journal' / 'tx1.jsonl'
+    journal.parent.mkdir(parents=True)
+    lines = [json.dumps(begin_record('tx1', operations)),
+             json.dumps({'event': 'done', 'op': '0', 'staged': None, 'bytes': 10})]
+    journal.write_text('\n'.join(lines) + '\n{"event":"do', encoding='utf-8')
+
+    executor = CleanupExecutor(data_dir=str(tmp_path / 'cleanup'))
+    assert [tx['done_ops'] for tx in executor.list_incomplete()] == [1]
+
+    report = executor.resume('tx1')
+    assert report['completed'] == 1
+    assert report['resumed_ops'] == 1
+    assert not os.path.exists(second)
+
+    # Der Commit nach der reparierten Zeile ist lesbar
+    assert executor.list_incomplete() == []
+    assert executor.resume('tx1')['success'] is False
+
+
+def test_rollback_restores_moves_and_staged_deletes(tmp_path):
+    moved_source = str(tmp_path / 'downloads' / 'bild.png')
+    moved_target = write(tmp_path / 'archiv' / 'bild.png', b'bild')
+    deleted_source = str(tmp_path / 'temp' / 'weg.tmp')
+    staged = write(tmp_path / 'cleanup' / 'trash' / 'tx2' / '1', b'weg')
+    operations = [CleanupOperation(op_type=OP_MOVE, source=moved_source, target=moved_target, op_id='0'),
+                  CleanupOperation(op_type=OP_DELETE, source=deleted_source, op_id='1')]
+
+    journal = tmp_path / 'cleanup' / 'journal' / 'tx2.jsonl'
+    journal.parent.mkdir(parents=True)
+    lines = [json.dumps(begin_record('tx2', operations)),
+             json.dumps({'event': 'done', 'op': '0', 'target': moved_target, 'bytes': 4}),
+             json.dumps({'event': 'done', 'op': '1', 'staged': staged, 'bytes': 3})]
+    journal.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+    executor = CleanupExecutor(data_dir=str(tmp_path / 'cleanup'))
+    result = executor.rollback('tx2')
+
+    assert result['success'] and result['restored'] == 2
+    assert open(moved_source, 'rb').read() == b'bild'
+    assert open(deleted_source, 'rb').read() == b'weg'
+    assert executor.list_incomplete() == []
+
+
+def test_rollback_restores_staged_delete_without_done_record(tmp_path):
+    # Absturz nach dem Verschieben in den Papierkorb, bevor 'done' geschrieben wurde
+    deleted_source = str(tmp_path / 'temp' / 'weg.tmp')
+    write(tmp_path / 'cleanup' / 'trash' / 'tx3' / '0', b'weg')
+    operations = [CleanupOperation(op_type=OP_DELETE, source=deleted_source, op_id='0')]
+
+    journal = tmp_path / 'cleanup' / 'journal' / 'tx3.jsonl'
+    journal.parent.mkdir(parents=True)
+    journal.write_text(json.dumps(begin_record('tx3', operations)) + '\n', encoding='utf-8')
+
+    executor = CleanupExecutor(data_dir=str(tmp_path / 'cleanup'))
+    result = executor.rollback('tx3')
+
+    assert result['success'] and result['restored'] == 1
+    assert open(deleted_source, 'rb').read() == b'weg'
+    assert not (tmp_path / 'cleanup' / 'trash' / 'tx3').exists()
+
+
+def test_rollback_keeps_trash_when_source_is_taken(tmp_path):
+    deleted_source = write(tmp_path / 'temp' / 'weg.tmp', b'neu')
+    staged = write(tmp_path / 'cleanup' / 'trash' / 'tx4' / '0', b'alt')
+    operations = [CleanupOperation(op_type=OP_DELETE, source=deleted_source, op_id='0')]
+
+    journal = tmp_path / 'cleanup' / 'journal' / 'tx4.jsonl'
+    journal.parent.mkdir(parents=True)
+    journal.write_text(json.dumps(begin_record('tx4', operations)) + '\n', encoding='utf-8')
+
+    executor = CleanupExecutor(data_dir=str(tmp_path / 'cleanup'))
+    result = executor.rollback('tx4')
+
+    assert not result['success'] and result['errors']
+    assert open(staged, 'rb').read() == b'alt'
+    assert open(deleted_source, 'rb').read() == b'neu'
+    assert [tx['transaction_id'] for tx in executor.list_incomplete()] == ['tx4']
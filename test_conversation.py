@@ -0,0 +1,52 @@
+"""
+Toobix Conversation Session Tests
+Ollama-Kontext-Wiederverwendung und rollierende Zusammenfassung
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import time
+
+from toobix.core.conversation import ConversationSession
+from toobix.core.prompt_builder import BuiltPrompt
+
+
+def built_prompt(user: str = 'Und morgen?', prefix_hash: str = 'p1') -> BuiltPrompt:
+    return BuiltPrompt(backend='ollama', system='Du bist Toobix.', user=user,
+                       prefix_hash=prefix_hash, tokens=10, budget=1000)
+
+
+def test_conversation_reuses_and_rebuilds_ollama_context():
+    session = ConversationSession()
+    prompt = built_prompt()
+
+    assert 'context' not in session.ollama_fields(prompt, 'gemma2:2b')
+    session.store_ollama_context([1, 2, 3], prompt, 'gemma2:2b')
+    session.record_turn('Wie wird das Wetter?', 'Sonnig.', 'ollama')
+
+    fields = session.ollama_fields(prompt, 'gemma2:2b')
+    assert fields == {'prompt': prompt.user, 'context': [1, 2, 3]}
+    assert session.stats['context_reused'] == 1
+
+    # Anderes Modell: Kontext verwerfen, Verlauf als Text mitsenden
+    fields = session.ollama_fields(prompt, 'llama3')
+    assert 'context' not in fields
+    assert 'Wie wird das Wetter?' in fields['system']
+    assert session.stats['context_rebuilt'] == 1
+
+
+def test_conversation_summarizes_old_turns():
+    session = ConversationSession(summarizer=lambda prompt: 'Kurzfassung', history_budget=80, keep_recent=1)
+    for index in range(3):
+        session.record_turn(f"Frage {index} " + 'wort ' * 20, 'Antwort ' + 'wort ' * 20, 'groq')
+
+    deadline = time.time() + 2
+    while not session.summary and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert session.summary == 'Kurzfassung'
+    assert len(session.turns) <= 2
+    messages = session.chat_messages(built_prompt())
+    assert 'Kurzfassung' in messages[0]['content']
+    assert messages[-1] == {'role': 'user', 'content': 'Und morgen?'}
@@ -0,0 +1,64 @@
+"""
+Toobix Duplicate Finder Tests
+Größe, Teil-Hash, Voll-Hash und Prüfung vor dem Löschen
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from toobix.core.duplicate_finder import DuplicateFileFinder
+
+
+def write(path, content: bytes, mtime: float = None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def test_finds_duplicates_and_keeps_oldest(tmp_path):
+    files = tmp_path / 'files'
+    original = write(files / 'a' / 'foto.jpg', b'x' * 5000, mtime=1_000_000)
+    copy = write(files / 'b' / 'foto_kopie.jpg', b'x' * 5000, mtime=2_000_000)
+    write(files / 'b' / 'anders.jpg', b'y' * 5000)   # gleiche Größe, anderer Inhalt
+    write(files / 'klein.txt', b'x' * 10)
+
+    finder = DuplicateFileFinder(data_dir=str(tmp_path / 'cache'), min_size=100)
+    groups = finder.find_duplicates([files])
+
+    assert len(groups) == 1
+    assert sorted(groups[0].paths) == sorted([original, copy])
+    assert groups[0].wasted_bytes == 5000
+
+    entry = finder.to_cleanup_entries(groups)[0]
+    assert entry['keep'] == original
+    assert entry['duplicates'] == [copy]
+
+
+def test_verify_unchanged_detects_modification(tmp_path):
+    files = tmp_path / 'files'
+    first = write(files / 'eins.bin', b'z' * 4096)
+    write(files / 'zwei.bin', b'z' * 4096)
+
+    finder = DuplicateFileFinder(data_dir=str(tmp_path / 'cache'), min_size=100)
+    digest = finder.find_duplicates([files])[0].digest
+    assert finder.verify_unchanged(first, digest)
+
+    write(files / 'eins.bin', b'q' * 4096)
+    assert not finder.verify_unchanged(first, digest)
+    assert not finder.verify_unchanged(str(files / 'fehlt.bin'), digest)
+
+
+def test_hash_cache_survives_restart(tmp_path):
+    files = tmp_path / 'files'
+    write(files / 'eins.bin', b'k' * 4096)
+    write(files / 'zwei.bin', b'k' * 4096)
+
+    finder = DuplicateFileFinder(data_dir=str(tmp_path / 'cache'), min_size=100)
+    finder.find_duplicates([files])
+    finder.cache.save()
+
+    again = DuplicateFileFinder(data_dir=str(tmp_path / 'cache'), min_size=100)
+    assert len(again.find_duplicates([files])) == 1
+    assert len(again.cache) >= 2
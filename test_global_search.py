@@ -0,0 +1,66 @@
+"""
+Toobix Global Search Tests
+Ranking, Quellen-Filter, Aktualisierung und Cache
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from toobix.core.global_search import GlobalSearch, SearchDocument
+
+
+def make_search() -> GlobalSearch:
+    search = GlobalSearch()
+    search.register_source('commands', lambda: [
+        SearchDocument('commands', 'cleanup', 'Aufräumplan erstellen', 'Zeigt den sicheren Aufräumplan',
+                       keywords=['aufräumen', 'cleanup']),
+        SearchDocument('commands', 'backup', 'Backup erstellen', 'Sichert wichtige Ordner')
+    ], label='Befehle')
+    search.register_source('journal', lambda: [
+        SearchDocument('journal', 'e1', 'Dankbarkeit', content='Heute ein Backup meiner Fotos gemacht')
+    ], label='Journal', weight=0.5)
+    return search
+
+
+def test_search_prefix_ranking_and_sources():
+    search = make_search()
+
+    results = search.search('back')
+    assert [r.doc_id for r in results] == ['backup', 'e1']
+    assert results[0].label == 'Befehle'
+
+    # Teilwort innerhalb eines Worts
+    assert [r.doc_id for r in search.search('plan')] == ['cleanup']
+    assert [r.doc_id for r in search.search('backup', sources=['journal'])] == ['e1']
+
+
+def test_search_upsert_remove_and_cache():
+    search = make_search()
+    assert search.search('archiv') == []
+
+    search.upsert(SearchDocument('commands', 'archive', 'Downloads archivieren'))
+    assert [r.doc_id for r in search.search('archiv')] == ['archive']
+
+    search.search('archiv')
+    assert search.stats['cache_hits'] >= 1
+
+    search.remove('commands', 'archive')
+    assert search.search('archiv') == []
+
+
+def test_source_filter_applies_before_intersection():
+    search = GlobalSearch()
+    search.register_source('commands', lambda: [
+        SearchDocument('commands', 'backup', 'Backup erstellen'),
+        SearchDocument('commands', 'open', 'Datei öffnen')
+    ])
+    search.register_source('docs', lambda: [
+        SearchDocument('docs', 'guide', 'Backup einer Datei anlegen')
+    ])
+
+    before = [r.title for r in search.search('backup datei', sources=['commands'])]
+    assert before == ['Backup erstellen', 'Datei öffnen']
+
+    # Die geladene Doku enthält beide Wörter, darf die Befehle aber nicht verdrängen
+    assert [r.doc_id for r in search.search('backup datei')] == ['guide']
+    assert [r.title for r in search.search('backup datei', sources=['commands'])] == before
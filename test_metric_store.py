@@ -0,0 +1,47 @@
+"""
+Toobix Metric Store Tests
+Vektorisierte Gruppierung nach Stunde, Wochentag und Kontext
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime
+
+import pytest
+
+from toobix.core.metric_store import MetricStore
+
+
+def make_store() -> MetricStore:
+    store = MetricStore(initial_capacity=2)
+    store.append(datetime(2026, 5, 4, 9), 'programming', 80, 60, 70, session_duration=10)   # Montag
+    store.append(datetime(2026, 5, 4, 9, 30), 'writing', 60, 40, 50, session_duration=20)
+    store.append(datetime(2026, 5, 5, 14), 'programming', 90, 90, 80, session_duration=25)  # Dienstag
+    return store
+
+
+def test_group_by_hour_weekday_and_context():
+    store = make_store()
+    performance = store.performance()
+
+    by_hour = store.group('time_of_day', performance)
+    assert by_hour[9] == (pytest.approx(60.0), pytest.approx(14.142, abs=1e-3), 2)
+    assert by_hour[14] == (90.0, 0.0, 1)
+    assert store.group('day_of_week', performance, min_count=2) == {0: by_hour[9]}
+
+    by_context = store.group('context', performance)
+    assert by_context['programming'][0] == pytest.approx(80.0)
+    assert by_context['writing'][2] == 1
+
+
+def test_group_with_mask_and_bucket_means():
+    store = make_store()
+    performance = store.performance()
+
+    morning = store.column('time_of_day') < 12
+    assert set(store.group('context', performance, mask=morning)) == {'programming', 'writing'}
+
+    buckets = store.bucket_means(performance, store.column('session_duration'), 15)
+    assert buckets == {0: (70.0, 1), 15: (pytest.approx(70.0), 2)}
+    assert store.bucket_means(performance[:0], store.column('session_duration')[:0], 15) == {}
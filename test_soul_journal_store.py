@@ -0,0 +1,85 @@
+"""
+Toobix Soul Journal Store Tests
+Monats-Segmente, Volltext-Indizes, abgeschnittene Zeilen und Migration
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import json
+import datetime
+from dataclasses import dataclass, field, asdict
+from typing import List
+
+from toobix.core.soul_journal_store import SoulJournalStore
+
+
+@dataclass
+class JournalEntry:
+    """Minimaler Eintrag mit den Feldern, die SoulJournalStore indiziert"""
+    timestamp: datetime.datetime
+    category: str
+    prompt: str
+    user_reflection: str
+    tags: List[str] = field(default_factory=list)
+    emotional_depth: float = 0.5
+    spiritual_growth: float = 0.5
+
+    def to_dict(self):
+        data = asdict(self)
+        data['timestamp'] = self.timestamp.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        data['timestamp'] = datetime.datetime.fromisoformat(data['timestamp'])
+        return cls(**data)
+
+
+def test_journal_indexes_and_reloads(tmp_path):
+    store = SoulJournalStore(str(tmp_path), JournalEntry.from_dict)
+    store.append(JournalEntry(datetime.datetime(2026, 3, 1, 9), 'gratitude', 'Wofür dankbar?',
+                              'Für den Morgenspaziergang', ['natur']))
+    store.append(JournalEntry(datetime.datetime(2026, 4, 2, 21), 'growth', 'Was gelernt?',
+                              'Geduld mit mir selbst', ['geduld']))
+
+    assert sorted(p.name for p in (tmp_path / 'entries').iterdir()) == ['2026-03.jsonl', '2026-04.jsonl']
+
+    reloaded = SoulJournalStore(str(tmp_path), JournalEntry.from_dict)
+    assert reloaded.count() == 2
+    assert [e.category for e in reloaded.search('morgen*')] == ['gratitude']
+    assert [e.category for e in reloaded.by_tag('geduld')] == ['growth']
+    assert [e.category for e in reloaded.recent(1)] == ['growth']
+    assert len(reloaded.entries_between(datetime.datetime(2026, 3, 15), datetime.datetime(2026, 5, 1))) == 1
+
+
+def test_journal_repairs_torn_tail_before_append(tmp_path):
+    store = SoulJournalStore(str(tmp_path), JournalEntry.from_dict)
+    entry = JournalEntry(datetime.datetime(2026, 3, 1, 9), 'peace', 'Frage', 'Ruhe')
+    store.append(entry)
+    segment = tmp_path / 'entries' / '2026-03.jsonl'
+    with open(segment, 'a', encoding='utf-8') as f:
+        f.write('{"timestamp":"2026-03-0')
+
+    store = SoulJournalStore(str(tmp_path), JournalEntry.from_dict)
+    assert store.count() == 1
+    store.append(JournalEntry(datetime.datetime(2026, 3, 2, 9), 'peace', 'Frage', 'Stille'))
+
+    assert SoulJournalStore(str(tmp_path), JournalEntry.from_dict).count() == 2
+    assert all(json.loads(line) for line in segment.read_text(encoding='utf-8').splitlines())
+
+
+def test_journal_legacy_migration_is_idempotent(tmp_path):
+    entries = [JournalEntry(datetime.datetime(2025, 12, 24, 20), 'love', 'Frage', 'Familie').to_dict()]
+    (tmp_path / 'soul_entries.json').write_text(json.dumps(entries), encoding='utf-8')
+
+    # Absturz nach dem Schreiben des Segments, vor dem Umbenennen
+    (tmp_path / 'entries').mkdir()
+    (tmp_path / 'entries' / SoulJournalStore.LEGACY_SEGMENT).write_text(
+        json.dumps(entries[0]) + '\n', encoding='utf-8')
+
+    store = SoulJournalStore(str(tmp_path), JournalEntry.from_dict)
+    assert store.count() == 1
+    assert not (tmp_path / 'soul_entries.json').exists()
+    assert SoulJournalStore(str(tmp_path), JournalEntry.from_dict).count() == 1
@@ -0,0 +1,68 @@
+"""
+Toobix Suggestion Feedback Tests
+Bewertung, Zerfall und Persistenz des Online-Lernens
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from toobix.core.suggestion_feedback import SuggestionFeedbackStore, DEFAULT_HALF_LIFE_S
+
+
+NOW = 1_800_000_000.0
+
+
+def test_feedback_ranks_clicked_above_dismissed(tmp_path):
+    store = SuggestionFeedbackStore(tmp_path / 'feedback.json')
+    for _ in range(5):
+        store.record('pause', 'abend', 'clicked', ts=NOW)
+        store.record('fokus', 'abend', 'dismissed', ts=NOW)
+
+    assert store.score('pause', 'abend', now=NOW) > 0.8
+    assert store.score('fokus', 'abend', now=NOW) < 0.2
+    assert store.score('unbekannt', 'abend', now=NOW) == 0.5
+    # Neuer Kontext ohne eigene Daten nutzt den kontextfreien Zähler
+    assert store.score('pause', 'morgen', now=NOW) == pytest.approx(store.score('pause', 'abend', now=NOW))
+    # UCB bevorzugt selten gezeigte Vorschläge gegenüber gleich guten bekannten
+    assert store.score('unbekannt', 'abend', 'ucb', now=NOW) > store.score('unbekannt', 'abend', now=NOW)
+
+
+def test_feedback_decays_with_half_life(tmp_path):
+    store = SuggestionFeedbackStore(tmp_path / 'feedback.json')
+    for _ in range(8):
+        store.record('pause', 'abend', 'clicked', ts=NOW)
+
+    fresh = store.score('pause', 'abend', now=NOW)
+    later = store.score('pause', 'abend', now=NOW + 4 * DEFAULT_HALF_LIFE_S)
+    assert fresh == pytest.approx(9 / 10)
+    assert 0.5 < later < fresh
+
+
+def test_feedback_persists(tmp_path):
+    path = tmp_path / 'feedback.json'
+    store = SuggestionFeedbackStore(path)
+    store.record('pause', 'abend', 'clicked')
+    store.record('unbekannt', 'abend', 'shown')
+    store.persistence.flush(store._store_key)
+
+    reloaded = SuggestionFeedbackStore(path)
+    assert reloaded.preferences()['pause'] == pytest.approx(2 / 3, abs=0.01)
+    assert reloaded.get_stats()['entries'] == store.get_stats()['entries']
+
+
+def test_engine_records_only_displayed_suggestions(tmp_path):
+    from toobix.core.smart_suggestion_engine import SmartSuggestionEngine, SuggestionContext
+
+    store = SuggestionFeedbackStore(tmp_path / 'feedback.json')
+    engine = SmartSuggestionEngine(feedback=store)
+    groups = engine.analyze_context(SuggestionContext(
+        last_message='Wie kann ich meinen Desktop organisieren?', ai_response='Ich sortiere gern.',
+        user_history=[], current_activity='chat', time_of_day='10:00',
+        system_state={}, available_functions=[]))
+    generated = [s.id for group in groups for s in group.suggestions]
+    assert generated and store.get_stats()['entries'] == 0
+
+    engine.record_shown(generated[:1])
+    assert list(store.preferences()) == generated[:1]
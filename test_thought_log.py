@@ -0,0 +1,67 @@
+"""
+Toobix Thought Log Tests
+Tages-Segmente, Rückwärts-Lesen, abgeschnittene Zeilen und Zeiträume
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import datetime
+from dataclasses import dataclass
+
+from toobix.core.thought_log import ThoughtLog
+
+
+@dataclass
+class Thought:
+    timestamp: datetime.datetime
+    thought_type: str
+    content: str
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(datetime.datetime.fromisoformat(data['timestamp']), data['thought_type'], data['content'])
+
+
+def thought(timestamp: str, content: str, thought_type: str = 'insight'):
+    return {'timestamp': timestamp, 'thought_type': thought_type, 'content': content}
+
+
+def test_thought_log_tail_spans_segments(tmp_path):
+    log = ThoughtLog(tmp_path, Thought.from_dict)
+    log.READ_BLOCK = 64   # kleine Blöcke: Zeilen über Blockgrenzen hinweg
+    for day in (1, 2, 3):
+        for index in range(4):
+            log.append(thought(f"2026-05-0{day}T10:0{index}:00", f"Gedanke {day}.{index} äöü"))
+
+    tail = log.tail(6)
+    assert [t.content for t in tail] == [f"Gedanke {d}.{i} äöü" for d, i in
+                                         [(2, 2), (2, 3), (3, 0), (3, 1), (3, 2), (3, 3)]]
+    assert len(log.tail(100)) == 12
+    assert log.tail(0) == []
+
+
+def test_thought_log_repairs_torn_segment(tmp_path):
+    log = ThoughtLog(tmp_path, Thought.from_dict)
+    log.append(thought('2026-05-01T10:00:00', 'eins'))
+    segment = tmp_path / 'thoughts' / '2026-05-01.jsonl'
+    with open(segment, 'a', encoding='utf-8') as f:
+        f.write('{"timestamp":"2026-05-01T1')
+
+    assert [t.content for t in log.tail(5)] == ['eins']
+
+    log = ThoughtLog(tmp_path, Thought.from_dict)
+    log.append(thought('2026-05-01T11:00:00', 'zwei'))
+    assert [t.content for t in log.tail(5)] == ['eins', 'zwei']
+    assert len(segment.read_text(encoding='utf-8').splitlines()) == 2
+
+
+def test_thought_log_between_filters_range_and_type(tmp_path):
+    log = ThoughtLog(tmp_path, Thought.from_dict)
+    log.append(thought('2026-05-01T23:00:00', 'spät', 'idea'))
+    log.append(thought('2026-05-02T08:00:00', 'früh', 'warning'))
+    log.append(thought('2026-05-02T09:00:00', 'danach', 'idea'))
+
+    start, end = datetime.datetime(2026, 5, 1, 22), datetime.datetime(2026, 5, 2, 9)
+    assert [t.content for t in log.between(start, end)] == ['spät', 'früh']
+    assert [t.content for t in log.between(start, end, 'idea')] == ['spät']
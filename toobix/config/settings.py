@@ -18,19 +18,34 @@ class Settings:
         # === AI Konfiguration ===
         self.OLLAMA_MODEL = os.getenv('OLLAMA_MODEL', 'gemma2:2b')
         self.OLLAMA_URL = os.getenv('OLLAMA_URL', 'http://localhost:11434')
+        # Optional kleines Modell, das für einfache Fallback-Antworten heiß bleibt
+        self.OLLAMA_SIMPLE_MODEL = os.getenv('OLLAMA_SIMPLE_MODEL', '')
+        # Embedding-Modell für die semantische Suche (leer = nur Hashing-Embeddings)
+        self.EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'nomic-embed-text')
         
         # Groq Cloud-Backup - UPGRADED zu bestem verfügbaren Model
         self.GROQ_API_KEY = os.getenv('GROQ_API_KEY', '')
         self.GROQ_MODEL = os.getenv('GROQ_MODEL', 'llama-3.1-70b-versatile')  # Upgraded!
+        # OpenAI-kompatible Basis-URL (z.B. Mock-Server für Benchmarks)
+        self.GROQ_URL = os.getenv('GROQ_URL', 'https://api.groq.com/openai/v1')
         
         # Wann Cloud-KI verwenden (reduziert für bessere Performance)
         self.CLOUD_THRESHOLD = int(os.getenv('CLOUD_THRESHOLD', '500'))
         
+        # Token-Budget für Prompts (Ollama: num_ctx 2048 minus Antwortlänge)
+        self.PROMPT_BUDGET_OLLAMA = int(os.getenv('PROMPT_BUDGET_OLLAMA', '1400'))
+        self.PROMPT_BUDGET_GROQ = int(os.getenv('PROMPT_BUDGET_GROQ', '6000'))
+        
+        # Hedging: zweites Backend parallel anfragen, wenn das erste zu langsam ist
+        self.AI_HEDGING = os.getenv('AI_HEDGING', 'false').lower() == 'true'
+        
         # === Sprach-Konfiguration ===
         self.WAKE_WORD = os.getenv('WAKE_WORD', 'hey toobix')
         self.VOICE_LANGUAGE = os.getenv('VOICE_LANGUAGE', 'de-DE')
         self.TTS_VOICE = os.getenv('TTS_VOICE', 'de')
         self.TTS_RATE = int(os.getenv('TTS_RATE', '200'))
+        # 'auto' = Audio-Geräte bei Bedarf öffnen, 'headless' = ohne Mikrofon/Lautsprecher
+        self.SPEECH_AUDIO_MODE = os.getenv('SPEECH_AUDIO_MODE', 'auto').lower()
         
         # === GUI Konfiguration ===
         self.WINDOW_WIDTH = int(os.getenv('WINDOW_WIDTH', '800'))
@@ -55,9 +70,17 @@ class Settings:
         return {
             'ollama_model': self.OLLAMA_MODEL,
             'ollama_url': self.OLLAMA_URL,
+            'ollama_simple_model': self.OLLAMA_SIMPLE_MODEL,
+            'embedding_model': self.EMBEDDING_MODEL,
             'groq_api_key': self.GROQ_API_KEY,
             'groq_model': self.GROQ_MODEL,
-            'cloud_threshold': self.CLOUD_THRESHOLD
+            'groq_url': self.GROQ_URL,
+            'cloud_threshold': self.CLOUD_THRESHOLD,
+            'prompt_budgets': {
+                'ollama': self.PROMPT_BUDGET_OLLAMA,
+                'groq': self.PROMPT_BUDGET_GROQ
+            },
+            'hedging': self.AI_HEDGING
         }
     
     def get_speech_config(self):
@@ -66,7 +89,8 @@ class Settings:
             'wake_word': self.WAKE_WORD,
             'language': self.VOICE_LANGUAGE,
             'tts_voice': self.TTS_VOICE,
-            'tts_rate': self.TTS_RATE
+            'tts_rate': self.TTS_RATE,
+            'audio_mode': self.SPEECH_AUDIO_MODE
         }
     
     def get_gui_config(self):
@@ -9,6 +9,9 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 import psutil
+from .duplicate_finder import get_duplicate_finder
+from .cleanup_executor import get_cleanup_executor, CleanupOperation, OP_DELETE
+from .folder_size_cache import get_folder_size_cache
 
 class AdvancedSystemOrganizer:
     """Erweiterte System-Organisations-Engine für Toobix"""
@@ -21,6 +24,7 @@ class AdvancedSystemOrganizer:
             'priorities': self._get_cleanup_priorities()
         }
         self.scan_results = {}
+        self.folder_sizes = get_folder_size_cache()
         print("🏗️ Advanced System Organizer initialisiert")
     
     def _get_default_structure(self) -> Dict:
@@ -168,8 +172,9 @@ class AdvancedSystemOrganizer:
             for folder in main_folders:
                 folder_path = self.user_home / folder
                 if folder_path.exists():
-                    size = self._get_folder_size(folder_path)
-                    file_count = self._count_files(folder_path)
+                    totals = self.folder_sizes.get_totals(folder_path)
+                    size = totals['bytes']
+                    file_count = totals['files']
                     storage_info[folder] = {
                         'size_mb': size / (1024 * 1024),
                         'size_gb': size / (1024 * 1024 * 1024),
@@ -280,6 +285,18 @@ class AdvancedSystemOrganizer:
                         'priority': 3
                     })
             
+            # Inhaltsgleiche Dateien
+            duplicates = self.find_duplicate_files()
+            if duplicates['wasted_bytes'] > 10 * 1024 * 1024:  # > 10MB
+                opportunities.append({
+                    'type': 'duplicate_files',
+                    'description': f'{duplicates["group_count"]} Gruppen doppelter Dateien',
+                    'estimated_savings_mb': duplicates['wasted_bytes'] / (1024 * 1024),
+                    'safety': 'review_needed',
+                    'priority': 5,
+                    'groups': duplicates['groups'][:50]
+                })
+            
             # Desktop-Chaos
             desktop_path = self.user_home / 'Desktop'
             if desktop_path.exists():
@@ -406,7 +423,7 @@ class AdvancedSystemOrganizer:
                 'errors': errors
             }
     
-    def execute_comprehensive_organization(self) -> Dict:
+    def execute_comprehensive_organization(self, dry_run: bool = False) -> Dict:
         """Führt komplette System-Organisation durch"""
         print("🚀 Starte komplette System-Organisation...")
         
@@ -430,12 +447,15 @@ class AdvancedSystemOrganizer:
             
             # Phase 2: Master-Struktur erstellen
             print("🏗️ Phase 2: Master-Struktur erstellen...")
-            structure_result = self.create_master_structure()
+            if dry_run:
+                structure_result = {'success': True, 'dry_run': True}
+            else:
+                structure_result = self.create_master_structure()
             results['phases']['structure'] = structure_result
             
             # Phase 3: Aufräum-Opportunitäten umsetzen
             print("🧹 Phase 3: Aufräumung durchführen...")
-            cleanup_result = self._execute_safe_cleanup()
+            cleanup_result = self._execute_safe_cleanup(dry_run=dry_run)
             results['phases']['cleanup'] = cleanup_result
             
             # Phase 4: Automation einrichten
@@ -454,36 +474,59 @@ class AdvancedSystemOrganizer:
             results['error'] = f"Organisation fehlgeschlagen: {e}"
             return results
     
+    def find_duplicate_files(self, folders: Optional[List[Path]] = None) -> Dict:
+        """Findet inhaltsgleiche Dateien (Größen-Buckets, Teil- und Voll-Hash, gecacht)"""
+        if folders is None:
+            folders = [self.user_home / name for name in ('Desktop', 'Documents', 'Downloads', 'Pictures', 'Videos')]
+        
+        finder = get_duplicate_finder()
+        groups = finder.find_duplicates([str(f) for f in folders if f.exists()])
+        protected = [str(self.user_home / name) for name in ('Documents', 'Pictures', 'Videos')]
+        
+        return {
+            'group_count': len(groups),
+            'wasted_bytes': sum(g.wasted_bytes for g in groups),
+            'groups': finder.to_cleanup_entries(groups, preferred_dirs=protected),
+            'stats': finder.get_stats()
+        }
+    
     # Helper-Methoden
     def _get_folder_size(self, folder_path: Path) -> int:
-        """Berechnet Ordnergröße"""
-        total_size = 0
+        """Berechnet Ordnergröße (gecacht, nur geänderte Verzeichnisse werden neu gelesen)"""
         try:
-            for file_path in folder_path.rglob('*'):
-                if file_path.is_file():
-                    total_size += file_path.stat().st_size
-        except:
-            pass
-        return total_size
+            return self.folder_sizes.get_size(folder_path)
+        except Exception:
+            return 0
     
     def _count_files(self, folder_path: Path) -> int:
-        """Zählt Dateien in Ordner"""
+        """Zählt Dateien in Ordner (gecacht)"""
         try:
-            return len([f for f in folder_path.rglob('*') if f.is_file()])
-        except:
+            return self.folder_sizes.get_file_count(folder_path)
+        except Exception:
             return 0
     
+    def get_storage_breakdown(self, folder_path: Optional[Path] = None, max_depth: int = 2) -> Dict:
+        """Treemap-fähige Speicher-Aufschlüsselung (Standard: Home-Ordner)"""
+        try:
+            breakdown = self.folder_sizes.get_breakdown(folder_path or self.user_home, max_depth=max_depth)
+            breakdown['scan_stats'] = self.folder_sizes.last_stats
+            return breakdown
+        except Exception as e:
+            return {'error': f"Speicher-Aufschlüsselung fehlgeschlagen: {e}"}
+    
+    def _get_temp_paths(self) -> List[Path]:
+        """Bekannte Temp-Verzeichnisse"""
+        return [
+            Path.home() / "AppData" / "Local" / "Temp",
+            Path("C:/Windows/Temp"),
+            Path("C:/Temp")
+        ]
+    
     def _estimate_temp_files(self) -> int:
         """Schätzt Größe temporärer Dateien"""
         try:
-            temp_paths = [
-                Path.home() / "AppData" / "Local" / "Temp",
-                Path("C:/Windows/Temp"),
-                Path("C:/Temp")
-            ]
-            
             total_size = 0
-            for path in temp_paths:
+            for path in self._get_temp_paths():
                 if path.exists():
                     total_size += self._get_folder_size(path)
             
@@ -543,14 +586,46 @@ Diese Struktur unterstützt Toobix Automation für:
 Erstellt von: Toobix AI Assistant
 """
     
-    def _execute_safe_cleanup(self) -> Dict:
-        """Führt sichere Aufräumung durch"""
-        # Placeholder für sichere Cleanup-Operationen
+    def _execute_safe_cleanup(self, dry_run: bool = False) -> Dict:
+        """Führt sichere Aufräumung durch (nur als 'safe' markierte Prioritäten)"""
+        executor = get_cleanup_executor()
+        
+        # Unterbrochene Läufe zuerst abschließen
+        resumed = executor.resume_all() if not dry_run else []
+        
+        safe_types = {p['name'] for p in self.organization_config['priorities'] if p['safe']}
+        opportunities = self.scan_results.get('cleanup_opportunities', [])
+        actions_performed = []
+        space_freed = 0
+        
+        if 'temp_files' in safe_types and any(o.get('type') == 'temp_files' for o in opportunities):
+            operations = []
+            for path in self._get_temp_paths():
+                if path.exists():
+                    try:
+                        operations.extend(
+                            CleanupOperation(op_type=OP_DELETE, source=str(item)) for item in path.iterdir()
+                        )
+                    except OSError:
+                        continue
+            
+            report = executor.run('advanced_temp_cleanup', operations, dry_run=dry_run)
+            space_freed += report['bytes_reclaimed']
+            actions_performed.append({
+                'type': 'temp_files',
+                'deleted': report['completed'],
+                'failed': report['failed'],
+                'transaction_id': report.get('transaction_id'),
+                'duration_s': report['duration_s'],
+                'mb_per_s': report['mb_per_s']
+            })
+        
         return {
             'success': True,
-            'actions_performed': [],
-            'space_freed_mb': 0,
-            'message': 'Sichere Aufräumung bereit für Implementierung'
+            'dry_run': dry_run,
+            'actions_performed': actions_performed,
+            'resumed_transactions': len(resumed),
+            'space_freed_mb': space_freed / (1024 * 1024)
         }
     
     def _setup_organization_automation(self) -> Dict:
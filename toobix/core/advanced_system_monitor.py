@@ -11,6 +11,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 import logging
+from .process_table import get_process_table
 
 class AdvancedSystemMonitor:
     """Erweiterte System-Überwachung mit intelligenten Alerts"""
@@ -254,32 +255,26 @@ class AdvancedSystemMonitor:
         suspicious = []
         
         try:
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent', 'create_time']):
-                try:
-                    proc_info = proc.info
-                    
-                    # Hoher CPU-Verbrauch ohne bekannten Grund
-                    if proc_info['cpu_percent'] > 50.0:
-                        suspicious.append({
-                            'type': 'HIGH_CPU',
-                            'pid': proc_info['pid'],
-                            'name': proc_info['name'],
-                            'cpu_percent': proc_info['cpu_percent'],
-                            'memory_percent': proc_info['memory_percent']
-                        })
-                    
-                    # Hoher Speicherverbrauch
-                    if proc_info['memory_percent'] > 20.0:
-                        suspicious.append({
-                            'type': 'HIGH_MEMORY',
-                            'pid': proc_info['pid'],
-                            'name': proc_info['name'],
-                            'cpu_percent': proc_info['cpu_percent'],
-                            'memory_percent': proc_info['memory_percent']
-                        })
-                        
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
+            for proc_info in get_process_table().snapshot():
+                # Hoher CPU-Verbrauch ohne bekannten Grund
+                if proc_info.cpu_percent > 50.0:
+                    suspicious.append({
+                        'type': 'HIGH_CPU',
+                        'pid': proc_info.pid,
+                        'name': proc_info.name,
+                        'cpu_percent': proc_info.cpu_percent,
+                        'memory_percent': proc_info.memory_percent
+                    })
+                
+                # Hoher Speicherverbrauch
+                if proc_info.memory_percent > 20.0:
+                    suspicious.append({
+                        'type': 'HIGH_MEMORY',
+                        'pid': proc_info.pid,
+                        'name': proc_info.name,
+                        'cpu_percent': proc_info.cpu_percent,
+                        'memory_percent': proc_info.memory_percent
+                    })
             
             self.suspicious_processes = suspicious
             return suspicious
@@ -391,26 +386,22 @@ class AdvancedSystemMonitor:
         """Ermittelt aktive Netzwerk-Verbindungen"""
         try:
             connections = []
+            process_table = get_process_table()
             
             for conn in psutil.net_connections(kind='inet'):
                 if conn.status == psutil.CONN_ESTABLISHED:
-                    try:
-                        proc = psutil.Process(conn.pid) if conn.pid else None
-                        connections.append({
-                            'local_address': f"{conn.laddr.ip}:{conn.laddr.port}" if conn.laddr else None,
-                            'remote_address': f"{conn.raddr.ip}:{conn.raddr.port}" if conn.raddr else None,
-                            'status': conn.status,
-                            'pid': conn.pid,
-                            'process_name': proc.name() if proc else 'Unknown'
-                        })
-                    except (psutil.NoSuchProcess, psutil.AccessDenied):
-                        connections.append({
-                            'local_address': f"{conn.laddr.ip}:{conn.laddr.port}" if conn.laddr else None,
-                            'remote_address': f"{conn.raddr.ip}:{conn.raddr.port}" if conn.raddr else None,
-                            'status': conn.status,
-                            'pid': conn.pid,
-                            'process_name': 'Access Denied'
-                        })
+                    if conn.pid:
+                        proc_info = process_table.get(conn.pid)
+                        process_name = (proc_info.name or 'Access Denied') if proc_info else 'Unknown'
+                    else:
+                        process_name = 'Unknown'
+                    connections.append({
+                        'local_address': f"{conn.laddr.ip}:{conn.laddr.port}" if conn.laddr else None,
+                        'remote_address': f"{conn.raddr.ip}:{conn.raddr.port}" if conn.raddr else None,
+                        'status': conn.status,
+                        'pid': conn.pid,
+                        'process_name': process_name
+                    })
             
             return connections
             
@@ -0,0 +1,296 @@
+"""
+Toobix AI Benchmark
+Misst Latenz (TTFT, p50/p95/p99) und Durchsatz der Chat-Pipeline gegen Mock- oder echte Backends
+
+    python -m toobix.core.ai_benchmark --mode handler --requests 40 --concurrency 4
+    python -m toobix.core.ai_benchmark --mode stream --tokens-per-s 30
+"""
+import os
+import json
+import time
+import tempfile
+import asyncio
+import argparse
+import logging
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .mock_ai_server import MockAIServer, MockConfig
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROMPTS = [
+    "Hallo, wie geht es dir?",
+    "Was kannst du alles?",
+    "Erkläre mir kurz, was ein Git-Branch ist.",
+    "Wie spät ist es?",
+    "Gib mir einen Tipp für mehr Fokus bei der Arbeit.",
+    "Was ist der Unterschied zwischen RAM und Festplatte?",
+]
+
+FAILED_PREFIX = "Entschuldigung, ich kann momentan nicht antworten"
+
+
+@dataclass
+class RequestSample:
+    """Messung einer einzelnen Anfrage"""
+    ok: bool
+    latency_ms: float
+    ttft_ms: Optional[float] = None     # nur bei Streaming messbar
+    tokens: int = 0
+
+
+def _percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {'p50': None, 'p95': None, 'p99': None}
+    ordered = sorted(values)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 1)
+    return {'p50': pick(0.50), 'p95': pick(0.95), 'p99': pick(0.99)}
+
+
+def summarize(samples: List[RequestSample], wall_s: float) -> Dict:
+    """Kennzahlen eines Laufs"""
+    ok = [s for s in samples if s.ok]
+    tokens = sum(s.tokens for s in ok)
+    return {
+        'requests': len(samples),
+        'errors': len(samples) - len(ok),
+        'error_rate': round((len(samples) - len(ok)) / max(1, len(samples)), 3),
+        'latency_ms': _percentiles([s.latency_ms for s in ok]),
+        'ttft_ms': _percentiles([s.ttft_ms for s in ok if s.ttft_ms is not None]),
+        'wall_s': round(wall_s, 2),
+        'throughput_rps': round(len(ok) / wall_s, 2) if wall_s else None,
+        'tokens_per_s': round(tokens / wall_s, 1) if wall_s else None
+    }
+
+
+def _prompts(count: int, same_prompt: bool) -> List[str]:
+    # Nummerierung verhindert, dass die Single-Flight-Schicht Anfragen zusammenlegt
+    if same_prompt:
+        return [DEFAULT_PROMPTS[0]] * count
+    return [f"{DEFAULT_PROMPTS[i % len(DEFAULT_PROMPTS)]} (#{i})" for i in range(count)]
+
+
+async def _run_concurrent(prompts: List[str], concurrency: int, worker) -> List[RequestSample]:
+    queue: asyncio.Queue = asyncio.Queue()
+    for prompt in prompts:
+        queue.put_nowait(prompt)
+    samples: List[RequestSample] = []
+
+    async def run(slot: int):
+        while not queue.empty():
+            samples.append(await worker(slot, queue.get_nowait()))
+
+    await asyncio.gather(*(run(slot) for slot in range(concurrency)))
+    return samples
+
+
+# === MODI ===
+
+async def bench_stream(ollama_url: str, model: str, prompts: List[str], concurrency: int) -> List[RequestSample]:
+    """Direkt gegen /api/generate mit stream=True (misst TTFT des Backends)"""
+    import aiohttp
+
+    async with aiohttp.ClientSession() as session:
+        async def worker(slot: int, prompt: str) -> RequestSample:
+            start = time.perf_counter()
+            ttft, tokens = None, 0
+            try:
+                async with session.post(f"{ollama_url}/api/generate",
+                                        json={'model': model, 'prompt': prompt, 'stream': True},
+                                        timeout=aiohttp.ClientTimeout(total=120)) as response:
+                    if response.status != 200:
+                        return RequestSample(False, (time.perf_counter() - start) * 1000)
+                    async for line in response.content:
+                        if not line.strip():
+                            continue
+                        chunk = json.loads(line)
+                        if chunk.get('response'):
+                            tokens += 1
+                            if ttft is None:
+                                ttft = (time.perf_counter() - start) * 1000
+            except Exception as e:
+                logger.debug(f"Stream-Anfrage fehlgeschlagen: {e}")
+                return RequestSample(False, (time.perf_counter() - start) * 1000)
+            return RequestSample(True, (time.perf_counter() - start) * 1000, ttft, tokens)
+
+        return await _run_concurrent(prompts, concurrency, worker)
+
+
+async def bench_handler(handler, prompts: List[str], concurrency: int,
+                        pipeline: bool = False) -> List[RequestSample]:
+    """
+    Über AIHandler.get_response (Queue, Router, Prompt-Builder). Mit
+    pipeline=True wie ToobixGUI._process_message ohne Widgets: eine
+    Gesprächssitzung pro Slot und Logging in die Knowledge Base.
+    Antworten werden nicht gestreamt - TTFT entspricht hier der Latenz.
+    Der Handler sollte in einer Sandbox laufen (siehe _isolate_storage),
+    sonst landen die Benchmark-Prompts im echten Gedächtnis.
+    """
+    sessions = {slot: handler.create_session() for slot in range(concurrency)} if pipeline else {}
+
+    async def worker(slot: int, prompt: str) -> RequestSample:
+        start = time.perf_counter()
+        try:
+            response = await handler.get_response(prompt, session=sessions.get(slot))
+            if pipeline:
+                handler.knowledge_base.log_interaction(prompt, response, {'type': 'benchmark'})
+        except Exception as e:
+            logger.debug(f"Handler-Anfrage fehlgeschlagen: {e}")
+            return RequestSample(False, (time.perf_counter() - start) * 1000)
+        ok = bool(response) and not response.startswith(FAILED_PREFIX)
+        return RequestSample(ok, (time.perf_counter() - start) * 1000, tokens=len(response.split()))
+
+    return await _run_concurrent(prompts, concurrency, worker)
+
+
+# === ERGEBNISSE ===
+
+def scenario_key(report: Dict) -> str:
+    """Läufe sind nur mit gleichem Szenario vergleichbar"""
+    mock = report.get('mock')
+    backend = 'external' if mock is None else f"mock-{mock['latency_ms']:g}ms-{mock['tokens_per_s']:g}tps-{mock['failure_rate']:g}f"
+    return f"{report['label']}|{report['mode']}|c{report['concurrency']}|n{report['requests']}|{backend}"
+
+
+def load_history(path: Path) -> List[Dict]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except (OSError, ValueError):
+        return []
+
+
+def compare(report: Dict, previous: Optional[Dict], max_regression: float) -> List[str]:
+    """Vergleicht p95-Latenz und Durchsatz mit dem letzten Lauf desselben Szenarios"""
+    if previous is None:
+        return []
+    regressions = []
+    old_p95 = previous['results']['latency_ms']['p95']
+    new_p95 = report['results']['latency_ms']['p95']
+    if old_p95 and new_p95 and new_p95 > old_p95 * (1 + max_regression):
+        regressions.append(f"p95-Latenz {old_p95:.0f} -> {new_p95:.0f} ms")
+    old_rps = previous['results']['throughput_rps']
+    new_rps = report['results']['throughput_rps']
+    if old_rps and new_rps is not None and new_rps < old_rps * (1 - max_regression):
+        regressions.append(f"Durchsatz {old_rps:.2f} -> {new_rps:.2f} req/s")
+    return regressions
+
+
+def format_report(report: Dict, previous: Optional[Dict], regressions: List[str]) -> str:
+    results = report['results']
+    lines = ["=" * 60, f"🏁 TOOBIX AI BENCHMARK ({report['mode']}, {report['concurrency']} parallel)", "=" * 60]
+    lines.append(f"Anfragen: {results['requests']}  Fehler: {results['errors']} ({results['error_rate']:.0%})")
+    for metric in ('latency_ms', 'ttft_ms'):
+        values = results[metric]
+        if values['p50'] is not None:
+            name = 'Latenz' if metric == 'latency_ms' else 'TTFT'
+            lines.append(f"{name}: p50 {values['p50']:.0f} ms | p95 {values['p95']:.0f} ms | p99 {values['p99']:.0f} ms")
+    lines.append(f"Durchsatz: {results['throughput_rps']} req/s, {results['tokens_per_s']} Tokens/s ({results['wall_s']} s)")
+    if previous:
+        old = previous['results']
+        lines.append(f"\nVorheriger Lauf ({previous['timestamp']}): p95 {old['latency_ms']['p95']} ms, {old['throughput_rps']} req/s")
+    if regressions:
+        lines.append("❌ REGRESSION: " + "; ".join(regressions))
+    elif previous:
+        lines.append("✅ Keine Regression")
+    return "\n".join(lines)
+
+
+# === CLI ===
+
+def _isolate_storage() -> Path:
+    """
+    Leitet Knowledge Base (~/.toobix_knowledge.json, ~/.toobix_interactions.json)
+    und Erinnerungs-Index in ein leeres Temp-Verzeichnis um, damit Benchmark-
+    Prompts nicht im echten Gedächtnis landen. Muss vor dem AIHandler laufen;
+    das Verzeichnis bleibt stehen, weil der Index beim Beenden noch speichert.
+    """
+    sandbox = Path(tempfile.mkdtemp(prefix='toobix_benchmark_'))
+    os.environ['HOME'] = os.environ['USERPROFILE'] = str(sandbox)
+    os.environ['TOOBIX_VECTOR_DIR'] = str(sandbox / 'toobix_vectors')
+    return sandbox
+
+
+async def _run(args, mock: Optional[MockAIServer]):
+    """Führt den Lauf aus; die Wandzeit zählt ohne Initialisierung des Handlers"""
+    prompts = _prompts(args.requests, args.same_prompt)
+    if args.mode == 'stream':
+        ollama_url = mock.url if mock else os.getenv('OLLAMA_URL', 'http://localhost:11434')
+        model = os.getenv('OLLAMA_MODEL', 'gemma2:2b')
+        start = time.perf_counter()
+        samples = await bench_stream(ollama_url, model, prompts, args.concurrency)
+        return samples, time.perf_counter() - start
+
+    sandbox = _isolate_storage()
+    print(f"🧪 Knowledge Base und Erinnerungs-Index in: {sandbox}")
+
+    from ..config.settings import Settings
+    from .ai_handler import AIHandler
+    handler = AIHandler(Settings())
+    start = time.perf_counter()
+    samples = await bench_handler(handler, prompts, args.concurrency, pipeline=args.mode == 'pipeline')
+    return samples, time.perf_counter() - start
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Toobix AI Benchmark")
+    parser.add_argument('--mode', choices=['handler', 'pipeline', 'stream'], default='handler')
+    parser.add_argument('--requests', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--same-prompt', action='store_true', help="identische Anfragen (testet Single-Flight)")
+    parser.add_argument('--external', action='store_true', help="konfigurierte Backends statt Mock-Server nutzen")
+    parser.add_argument('--latency-ms', type=float, default=MockConfig.latency_ms)
+    parser.add_argument('--tokens-per-s', type=float, default=MockConfig.tokens_per_s)
+    parser.add_argument('--failure-rate', type=float, default=MockConfig.failure_rate)
+    parser.add_argument('--label', default='default')
+    parser.add_argument('--history', type=Path, default=Path('toobix_metrics') / 'ai_benchmark_history.jsonl')
+    parser.add_argument('--max-regression', type=float, default=0.2)
+    parser.add_argument('--no-store', action='store_true')
+    args = parser.parse_args(argv)
+
+    mock = None
+    if not args.external:
+        mock = MockAIServer(MockConfig(latency_ms=args.latency_ms, tokens_per_s=args.tokens_per_s,
+                                       failure_rate=args.failure_rate))
+        url = mock.start()
+        # Vor Settings(): Handler spricht mit dem Mock statt mit echten Diensten
+        os.environ['OLLAMA_URL'] = url
+        os.environ['GROQ_URL'] = f"{url}/openai/v1"
+        os.environ.setdefault('GROQ_API_KEY', 'mock')
+        print(f"🧪 Mock-KI-Server: {url}")
+
+    try:
+        samples, wall_s = asyncio.run(_run(args, mock))
+    finally:
+        if mock:
+            mock.stop()
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'label': args.label,
+        'mode': args.mode,
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'mock': asdict(mock.config) if mock else None,
+        'results': summarize(samples, wall_s)
+    }
+    report['scenario'] = scenario_key(report)
+    same = [r for r in load_history(args.history) if r.get('scenario') == report['scenario']]
+    previous = same[-1] if same else None
+    regressions = compare(report, previous, args.max_regression)
+    print(format_report(report, previous, regressions))
+
+    if not args.no_store:
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.history, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(report, ensure_ascii=False) + '\n')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
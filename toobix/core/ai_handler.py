@@ -3,23 +3,34 @@ Toobix AI Handler
 Verwaltet lokale (Ollama) und Cloud-KI (Groq) intelligent
 """
 import json
-import requests
 import asyncio
-import aiohttp
 import time
-from typing import Optional, Dict, Any
+from concurrent.futures import Future
+from typing import Optional, Dict, Any, Union
 from .project_analyzer import ProjectAnalyzer
 from .knowledge_base import KnowledgeBase
 from .system_monitor import SystemMonitor
 from .git_integration import GitManager
 from .task_scheduler import TaskScheduler
 from .advanced_organizer import AdvancedSystemOrganizer
+from .ui_bus import get_ui_bus
+from .prompt_builder import PromptBuilder, BuiltPrompt
+from .ai_request_queue import AIRequestQueue, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from .ai_router import AIRouter
+from .ollama_models import OllamaModelManager
+from .conversation import ConversationSession
+from .memory_index import get_memory_index
+from .startup_profiler import lazy_import
 from .real_system_manager import RealSystemManager
 from .advanced_system_monitor import AdvancedSystemMonitor
 from .git_integration_manager import GitIntegrationManager
 from .intelligent_task_scheduler import IntelligentTaskScheduler
 from .advanced_organizer import AdvancedSystemOrganizer
 
+# HTTP-Bibliotheken erst beim ersten Request laden
+requests = lazy_import('requests')
+aiohttp = lazy_import('aiohttp')
+
 class AIHandler:
     """Intelligente KI-Verwaltung mit lokaler und Cloud-Fallback"""
     
@@ -38,6 +49,30 @@ class AIHandler:
         self.advanced_monitor = AdvancedSystemMonitor(settings)
         self.git_integration = GitIntegrationManager(settings)
         self.intelligent_scheduler = IntelligentTaskScheduler(settings)
+        self.prompt_builder = PromptBuilder(self.knowledge_base, self.ai_config.get('prompt_budgets'))
+        self.request_queue = AIRequestQueue(self._generate)
+        self.memory_index = get_memory_index()
+        self.ollama_models = OllamaModelManager(
+            self.ai_config['ollama_url'],
+            self.ai_config['ollama_model'],
+            self.ai_config.get('ollama_simple_model')
+        )
+        self.router = AIRouter(hedging=self.ai_config.get('hedging', False))
+        self.router.register(
+            'ollama',
+            lambda prompt, context, session=None: self._query_ollama(
+                self.prompt_builder.build(prompt, 'ollama', context), session=session),
+            lambda: self.ollama_available,
+            model=self.ai_config['ollama_model'],
+            cold=lambda: not self.ollama_models.is_warm()
+        )
+        self.router.register(
+            'groq',
+            lambda prompt, context, session=None: self._query_groq(
+                self.prompt_builder.build(prompt, 'groq', context), session=session),
+            lambda: self.groq_available,
+            model=self.ai_config['groq_model']
+        )
         
         # Status-Tracking
         self.ollama_available = False
@@ -46,6 +81,7 @@ class AIHandler:
         # Performance-Tracking
         self.last_response_time = 0
         self.consecutive_failures = 0
+        self.last_prompt_eval = {}
         
         # Phase 3: KI-Enhanced Features
         try:
@@ -91,6 +127,13 @@ class AIHandler:
             if response.status_code == 200:
                 self.ollama_available = True
                 print(f"✅ Ollama verfügbar - Model: {self.ai_config['ollama_model']}")
+                installed = [m.get('name', '') for m in response.json().get('models', [])]
+                self.ollama_models.set_installed(installed)
+                embedding_model = self.ai_config.get('embedding_model')
+                if embedding_model and {embedding_model, f"{embedding_model}:latest"} & set(installed):
+                    self.memory_index.enable_ollama(self.ai_config['ollama_url'], embedding_model)
+                # Modell(e) im Hintergrund laden, damit die erste Anfrage nicht wartet
+                self.ollama_models.warm_up_async()
             else:
                 print("⚠️ Ollama nicht erreichbar")
         except Exception as e:
@@ -102,73 +145,75 @@ class AIHandler:
             print("✅ Groq Cloud-Backup verfügbar")
         else:
             print("ℹ️ Groq API Key nicht gesetzt - nur lokale KI verfügbar")
+        
+        get_ui_bus().publish('system_status', 'ai_availability')
     
-    async def get_response(self, prompt: str, context: Optional[str] = None) -> str:
+    async def get_response(self, prompt: str, context: Optional[str] = None,
+                           priority: int = PRIORITY_INTERACTIVE,
+                           session: Optional[ConversationSession] = None) -> str:
         """
         Holt intelligente Antwort von bester verfügbarer KI
         
         Args:
             prompt: Benutzer-Anfrage
             context: Zusätzlicher Kontext (optional)
+            priority: PRIORITY_INTERACTIVE (Chat) bis PRIORITY_BACKGROUND
+            session: Gesprächsverlauf (optional, siehe create_session)
             
         Returns:
             AI-Antwort als String
         """
-        # System-Kontext hinzufügen (Zeit, etc.)
-        system_context = self._get_system_context()
-        full_prompt = f"{system_context}\n\n{context}\n\n{prompt}" if context else f"{system_context}\n\n{prompt}"
-        
-        # Entscheidung: Lokal oder Cloud?
-        use_cloud = self._should_use_cloud(full_prompt)
-        
-        if not use_cloud and self.ollama_available:
-            # Versuche lokale KI zuerst
-            response = await self._query_ollama(full_prompt)
-            if response:
-                return response
-        
-        # Fallback zu Cloud-KI
-        if self.groq_available:
-            response = await self._query_groq(full_prompt)
-            if response:
-                return response
-        
-        # Letzte Option: Einfache lokale Antwort
-        if self.ollama_available:
-            return await self._query_ollama(full_prompt, simple=True)
-        
-        return "Entschuldigung, ich kann momentan nicht antworten. Bitte überprüfe die KI-Verbindungen."
+        # Über die Request-Queue: identische gleichzeitige Anfragen teilen
+        # sich einen Upstream-Aufruf, Hintergrund-Aufträge warten auf den Chat
+        future = self.request_queue.submit(prompt, context, priority, session)
+        return await asyncio.wrap_future(future)
+    
+    def ask(self, prompt: str, context: Optional[str] = None,
+            priority: int = PRIORITY_BACKGROUND, timeout: Optional[float] = None) -> str:
+        """Synchrone Variante von get_response für Engines ohne Event-Loop"""
+        return self.request_queue.submit(prompt, context, priority).result(timeout)
+    
+    def ask_async(self, prompt: str, context: Optional[str] = None,
+                  priority: int = PRIORITY_BACKGROUND) -> Future:
+        """Nicht blockierende Variante von ask: liefert das Future der Request-Queue"""
+        return self.request_queue.submit(prompt, context, priority)
     
-    def _get_system_context(self) -> str:
-        """Erstellt System-Kontext mit aktuellen Informationen"""
-        import datetime
+    def create_session(self) -> ConversationSession:
+        """Neues Gespräch; ältere Runden fasst die KI im Hintergrund zusammen"""
+        return ConversationSession(
+            summarizer=lambda text: self.ask(text, timeout=120),
+            context_limit=self.prompt_builder.budgets['ollama']
+        )
+    
+    async def _generate(self, prompt: str, context: Optional[str] = None,
+                        session: Optional[ConversationSession] = None) -> str:
+        """Eigentliche Backend-Auswahl und Abfrage (läuft in der Request-Queue)"""
+        # Entscheidung: Lokal oder Cloud? (nur anhand der Anfrage selbst)
+        use_cloud = self._should_use_cloud(f"{context}\n\n{prompt}" if context else prompt)
+        preferred = ['groq', 'ollama'] if use_cloud else ['ollama', 'groq']
         
-        now = datetime.datetime.now()
-        current_time = now.strftime("%H:%M:%S")
-        current_date = now.strftime("%d.%m.%Y")
-        weekday = now.strftime("%A")
+        # Im Gespräch: passende Fakten, Erinnerungen und Tagebuch-Einträge mitgeben
+        if session is not None:
+            recall = await asyncio.get_running_loop().run_in_executor(
+                None, self.memory_index.recall_context, prompt)
+            if recall:
+                context = f"{context}\n\n{recall}" if context else recall
         
-        # Deutsche Wochentage
-        weekdays_de = {
-            'Monday': 'Montag', 'Tuesday': 'Dienstag', 'Wednesday': 'Mittwoch',
-            'Thursday': 'Donnerstag', 'Friday': 'Freitag', 'Saturday': 'Samstag', 'Sunday': 'Sonntag'
-        }
-        weekday_de = weekdays_de.get(weekday, weekday)
+        # Router: überspringt degradierte Backends, adaptiver Timeout, ggf. Hedging
+        response, backend = await self.router.request(prompt, context, preferred, session=session)
         
-        context = f"""SYSTEM KONTEXT:
-Aktuelle Zeit: {current_time}
-Aktuelles Datum: {current_date} ({weekday_de})
-System: Windows Desktop-Assistent
-Name: Toobix
-
-VERFÜGBARE FUNKTIONEN:
-- Programm-Steuerung: "öffne [programm]", "schließe [programm]"
-- Datei-Suche: "finde [dateien]", "suche [pattern]"
-- System-Aufräumung: "analysiere system", "räume auf", "erstelle backup"
-- Zeit/Datum: Aktuelle Informationen verfügbar
-- Desktop-Organisation: Dateien sortieren und organisieren"""
+        # Letzte Option: Einfache lokale Antwort (nicht bei offenem Breaker)
+        if not response and self.ollama_available and self.router.backends['ollama'].breaker.peek():
+            response = await self._query_ollama(self.prompt_builder.build(prompt, 'ollama', context),
+                                                simple=True, session=session)
+            backend = 'ollama'
+        
+        if not response:
+            return "Entschuldigung, ich kann momentan nicht antworten. Bitte überprüfe die KI-Verbindungen."
         
-        return context
+        if session is not None:
+            session.record_turn(prompt, response, backend)
+        return response
     
     def _should_use_cloud(self, prompt: str) -> bool:
         """Intelligente Entscheidung: Lokal vs Cloud KI"""
@@ -177,11 +222,7 @@ VERFÜGBARE FUNKTIONEN:
         if not self.ollama_available:
             return self.groq_available
         
-        # REGEL 2: Bei zu vielen lokalen Fehlern → Cloud  
-        if self.consecutive_failures > 2:
-            return self.groq_available
-        
-        # REGEL 3: Einfache Fragen → Lokal (weniger Halluzination)
+        # REGEL 2: Einfache Fragen → Lokal (weniger Halluzination)
         simple_indicators = [
             'hallo', 'hi', 'was ist', 'wie spät', 'welches datum',
             'danke', 'ok', 'ja', 'nein', 'hilfe', 'was kannst du'
@@ -190,7 +231,7 @@ VERFÜGBARE FUNKTIONEN:
         if any(indicator in prompt.lower() for indicator in simple_indicators):
             return False  # Lokale KI für einfache Fragen
         
-        # REGEL 4: Komplexe Analyse → Cloud (bessere Qualität)
+        # REGEL 3: Komplexe Analyse → Cloud (bessere Qualität)
         complex_indicators = [
             'analysiere', 'erstelle', 'programmiere', 'schreibe code', 'entwickle',
             'recherche', 'vergleiche', 'berechne', 'übersetze', 'erkläre detailliert',
@@ -201,11 +242,11 @@ VERFÜGBARE FUNKTIONEN:
         if any(indicator in prompt.lower() for indicator in complex_indicators):
             return self.groq_available
         
-        # REGEL 5: Längere Texte → Cloud
+        # REGEL 4: Längere Texte → Cloud
         if len(prompt) > self.ai_config['cloud_threshold']:
             return self.groq_available
         
-        # REGEL 6: Peace Catalyst Features → Cloud (bessere spirituelle Qualität)
+        # REGEL 5: Peace Catalyst Features → Cloud (bessere spirituelle Qualität)
         peace_keywords = [
             'soul journal', 'artefakt', 'peace', 'meditation', 'wisdom',
             'spiritual', 'wellness', 'harmony', 'compassion', 'seele'
@@ -217,21 +258,22 @@ VERFÜGBARE FUNKTIONEN:
         # Standard: Lokale KI bevorzugen (weniger Halluzination)
         return False
     
-    async def _query_ollama(self, prompt: str, simple: bool = False) -> Optional[str]:
+    async def _query_ollama(self, prompt: Union[str, BuiltPrompt], simple: bool = False,
+                            session: Optional[ConversationSession] = None) -> Optional[str]:
         """Fragt lokale Ollama-KI ab mit Anti-Halluzination Optimierungen"""
         try:
             start_time = time.time()
             
-            # Anti-Halluzination System Context
-            anti_hallucination_prompt = f"""Du bist Toobix, ein zuverlässiger deutscher Desktop-Assistent. 
-WICHTIG: Antworte NUR auf Basis deines verfügbaren Wissens. Erfinde KEINE Details. 
-Wenn du etwas nicht weißt, sage ehrlich "Das weiß ich nicht" oder "Das kann ich nicht prüfen".
-
-Benutzer-Anfrage: {prompt}"""
+            # Anti-Halluzination Präfix bleibt byte-identisch -> Ollama-Prompt-Cache
+            if isinstance(prompt, str):
+                prompt = self.prompt_builder.build(prompt, 'ollama')
+            
+            model = self.ollama_models.model_for(simple)
+            self.ollama_models.note_request(model)
             
             payload = {
-                "model": self.ai_config['ollama_model'],
-                "prompt": anti_hallucination_prompt,
+                "model": model,
+                "keep_alive": self.ollama_models.keep_alive(model),
                 "stream": False,
                 "options": {
                     "temperature": 0.2 if not simple else 0.1,  # Reduziert für Konsistenz
@@ -242,13 +284,19 @@ Benutzer-Anfrage: {prompt}"""
                 }
             }
             
+            # Mit Sitzung: nur der neue Teil + Ollamas Kontext der Vorrunde
+            if session is not None:
+                payload.update(session.ollama_fields(prompt, model))
+            else:
+                payload.update({"system": prompt.system, "prompt": prompt.user})
+            
             # Einfache Anfrage für Fallback
             if simple:
                 payload["options"]["num_predict"] = 50
                 payload["options"]["temperature"] = 0.1
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
+            async with aiohttp.ClientSession() as http:
+                async with http.post(
                     f"{self.ai_config['ollama_url']}/api/generate",
                     json=payload,
                     timeout=aiohttp.ClientTimeout(total=30)
@@ -258,6 +306,17 @@ Benutzer-Anfrage: {prompt}"""
                         result = await response.json()
                         self.last_response_time = time.time() - start_time
                         self.consecutive_failures = 0
+                        self.ollama_models.record_result(model, result)
+                        if session is not None:
+                            session.store_ollama_context(result.get('context'), prompt, model)
+                        
+                        # Wie viele Prompt-Tokens Ollama wirklich neu auswerten musste
+                        self.last_prompt_eval = {
+                            'prefix_hash': prompt.prefix_hash,
+                            'estimated_tokens': prompt.tokens,
+                            'prompt_eval_count': result.get('prompt_eval_count'),
+                            'prompt_eval_ms': round(result.get('prompt_eval_duration', 0) / 1e6, 1)
+                        }
                         
                         print(f"🤖 Ollama Antwort ({self.last_response_time:.1f}s)")
                         return result.get('response', '').strip()
@@ -267,23 +326,27 @@ Benutzer-Anfrage: {prompt}"""
             print(f"❌ Ollama Fehler: {e}")
             return None
     
-    async def _query_groq(self, prompt: str) -> Optional[str]:
+    async def _query_groq(self, prompt: Union[str, BuiltPrompt],
+                          session: Optional[ConversationSession] = None) -> Optional[str]:
         """Fragt Groq Cloud-KI ab"""
         try:
+            if isinstance(prompt, str):
+                prompt = self.prompt_builder.build(prompt, 'groq')
+            
             headers = {
                 "Authorization": f"Bearer {self.ai_config['groq_api_key']}",
                 "Content-Type": "application/json"
             }
             
             payload = {
-                "messages": [
+                "messages": session.chat_messages(prompt) if session is not None else [
                     {
                         "role": "system",
-                        "content": "Du bist Toobix, ein zuverlässiger deutscher AI-Desktop-Assistent. ANTI-HALLUZINATION REGELN: 1) Antworte NUR basierend auf verfügbaren Informationen 2) Erfinde KEINE Details, Programme oder Features 3) Wenn unsicher, sage 'Das weiß ich nicht sicher' 4) Bleibe bei deinem Wissensstand 5) Keine spekulativen Antworten. Du hilfst bei Computerproblemen, beantwortest Fragen und steuerst Windows-Programme. Antworte freundlich, kurz und präzise auf Deutsch."
+                        "content": prompt.system
                     },
                     {
                         "role": "user", 
-                        "content": prompt
+                        "content": prompt.user
                     }
                 ],
                 "model": self.ai_config['groq_model'],
@@ -295,9 +358,9 @@ Benutzer-Anfrage: {prompt}"""
                 "stream": False
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://api.groq.com/openai/v1/chat/completions",
+            async with aiohttp.ClientSession() as http:
+                async with http.post(
+                    f"{self.ai_config['groq_url']}/chat/completions",
                     headers=headers,
                     json=payload,
                     timeout=aiohttp.ClientTimeout(total=30)
@@ -329,7 +392,13 @@ Benutzer-Anfrage: {prompt}"""
             'groq_available': self.groq_available,
             'last_response_time': self.last_response_time,
             'consecutive_failures': self.consecutive_failures,
-            'current_model': self.ai_config['ollama_model']
+            'current_model': self.ai_config['ollama_model'],
+            'ollama_models': self.ollama_models.get_status(),
+            'last_prompt_eval': self.last_prompt_eval,
+            'prompt_builder': self.prompt_builder.get_stats(),
+            'memory_index': self.memory_index.get_stats(),
+            'request_queue': self.request_queue.get_stats(),
+            'router': self.router.get_stats()
         }
     
     def refresh_connection(self):
@@ -21,6 +21,10 @@ from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from .persistence import get_persistence_service
+from .ui_bus import get_ui_bus
+from .memory_index import get_memory_index
+
 class AIMoodState(Enum):
     ENERGETIC = "energetic"
     FOCUSED = "focused"
@@ -282,11 +286,20 @@ class AIMemorySystem:
     
     def __init__(self, save_file: str = "ai_memories.json"):
         self.save_file = save_file
+        self.persistence = get_persistence_service()
+        self._memories_store = self.persistence.register(save_file, self._serialize_memories)
         self.personal_memories: List[AIMemory] = []
         self.relationship_timeline = []
         self.user_preferences = {}
         self.emotional_connections = {}
         self.load_memories()
+        self.memory_index = get_memory_index()
+        self.memory_index.register_source('memory', self._memory_documents)
+        
+    def _memory_documents(self):
+        """Erinnerungen für den Memory-Index (schlüssel, text, zeitstempel)"""
+        for memory in list(self.personal_memories):
+            yield memory.timestamp.isoformat(), memory.content, memory.timestamp.timestamp()
         
     def create_meaningful_memory(self, interaction: str, user_context: str = "") -> Optional[AIMemory]:
         """Erstellt eine bedeutsame Erinnerung aus Interaktion"""
@@ -304,6 +317,8 @@ class AIMemorySystem:
             
             self.personal_memories.append(memory)
             self.save_memories()
+            self.memory_index.add('memory', memory.timestamp.isoformat(), memory.content,
+                                  memory.timestamp.timestamp())
             
             return memory
         
@@ -409,19 +424,15 @@ class AIMemorySystem:
         return anniversary_messages
     
     def save_memories(self):
-        """Speichert Erinnerungen persistent"""
-        try:
-            data = {
-                'memories': [memory.to_dict() for memory in self.personal_memories],
-                'user_preferences': self.user_preferences,
-                'emotional_connections': self.emotional_connections
-            }
-            
-            with open(self.save_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                
-        except Exception as e:
-            print(f"Fehler beim Speichern der Erinnerungen: {e}")
+        """Speichert Erinnerungen persistent (asynchron über den Persistenz-Service)"""
+        self.persistence.mark_dirty(self._memories_store)
+    
+    def _serialize_memories(self) -> Dict:
+        return {
+            'memories': [memory.to_dict() for memory in self.personal_memories],
+            'user_preferences': dict(self.user_preferences),
+            'emotional_connections': dict(self.emotional_connections)
+        }
     
     def load_memories(self):
         """Lädt gespeicherte Erinnerungen"""
@@ -664,6 +675,7 @@ class AILifeFoundation:
         
         # 4. Generiere Response basierend auf aktuellem Zustand
         response = self._generate_contextual_response(interaction, cycle_info)
+        get_ui_bus().publish('ai_life', 'interaction')
         
         return {
             'response': response,
@@ -770,12 +782,15 @@ class AILifeFoundation:
         
         # Reset tägliche Memories für neuen Tag
         self.daily_memories_today = []
+        get_ui_bus().publish('ai_life', 'dream')
         
         return f"🌙 Ich hatte einen faszinierenden Traum über '{dream.theme}'. {random.choice(dream.insights_generated)}"
     
     def move_to_room(self, room: str) -> str:
         """Wechselt Raum im virtuellen Zuhause"""
-        return self.virtual_home.move_to_room(room)
+        result = self.virtual_home.move_to_room(room)
+        get_ui_bus().publish('ai_life', 'room')
+        return result
     
     def get_room_description(self, room: str = None) -> str:
         """Beschreibung des aktuellen oder angegebenen Raums"""
@@ -0,0 +1,259 @@
+"""
+Toobix AI Request Queue
+Single-Flight für gleichzeitige KI-Anfragen und priorisierte Hintergrund-Batches
+"""
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+import logging
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Prioritäten: kleiner = wichtiger
+PRIORITY_INTERACTIVE = 0   # Chat, Spracheingabe - läuft sofort
+PRIORITY_NORMAL = 1        # vom Benutzer ausgelöst, aber nicht im Dialog
+PRIORITY_BACKGROUND = 2    # Einsichten, Titel, Zusammenfassungen
+
+
+def request_key(prompt: str, context: Optional[str] = None) -> str:
+    """Schlüssel für fast identische Anfragen (Groß/klein, Leerraum, Satzzeichen am Ende)"""
+    normalized = ' '.join(prompt.lower().split()).rstrip('?!. ')
+    if context:
+        normalized += '\x00' + ' '.join(context.split())
+    return normalized
+
+
+@dataclass(order=True)
+class AIRequest:
+    """Eine eingereihte KI-Anfrage; alle Aufrufer mit gleichem Schlüssel teilen das Future"""
+    priority: int
+    seq: int
+    key: str = field(compare=False)
+    prompt: str = field(compare=False)
+    context: Optional[str] = field(compare=False, default=None)
+    session: Any = field(compare=False, default=None)         # ConversationSession oder None
+    future: Future = field(compare=False, default_factory=Future)
+    submitted: float = field(compare=False, default_factory=time.perf_counter)
+    state: str = field(compare=False, default='queued')   # queued | running | done
+    waiters: int = field(compare=False, default=1)
+    preempted: int = field(compare=False, default=0)
+
+
+class AIRequestQueue:
+    """
+    Vermittelt alle Aufrufe von AIHandler.get_response an das Backend.
+
+    - Single-Flight: gleichzeitige, (fast) identische Anfragen werden zu
+      einem Upstream-Aufruf zusammengeführt; alle Aufrufer erhalten dasselbe
+      Ergebnis
+    - Interaktive Anfragen starten sofort; Hintergrund-Anfragen werden kurz
+      gesammelt (BATCH_WINDOW_MS) und als Batch nacheinander abgearbeitet,
+      solange keine interaktive Anfrage läuft oder wartet
+    - Kommt eine interaktive Anfrage, wird die laufende Hintergrund-Anfrage
+      abgebrochen und wieder eingereiht (Ollama rechnet standardmäßig nur
+      eine Anfrage gleichzeitig)
+
+    Die Anfragen laufen in einem eigenen Thread mit eigener Event-Loop;
+    Aufrufer aus beliebigen Threads/Loops warten auf ein concurrent.futures.Future.
+    """
+
+    BATCH_WINDOW_MS = 50
+    MAX_BATCH = 8
+
+    def __init__(self, executor: Callable[[str, Optional[str], Any], Awaitable[str]]):
+        self._executor = executor
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._heap: List[AIRequest] = []
+        self._inflight: Dict[str, AIRequest] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._foreground_running = 0
+        self._batch_running = False
+        self._batch_due: Optional[float] = None
+        self._background_task: Optional[asyncio.Task] = None
+        self._background_request: Optional[AIRequest] = None
+        self.stats = {'submitted': 0, 'deduplicated': 0, 'upstream_calls': 0,
+                      'batches': 0, 'preempted': 0, 'errors': 0}
+        self._wait_ms: Dict[int, List[float]] = {}
+
+    # === ÖFFENTLICHE API ===
+
+    def submit(self, prompt: str, context: Optional[str] = None,
+               priority: int = PRIORITY_INTERACTIVE, session=None) -> Future:
+        """Reiht eine Anfrage ein oder hängt sich an eine identische laufende an"""
+        key = request_key(prompt, context)
+        if session is not None:
+            # Gesprächsrunden verschiedener Sitzungen nie zusammenlegen
+            key += f'\x00session:{session.id}'
+        with self._lock:
+            self.stats['submitted'] += 1
+            existing = self._inflight.get(key)
+            if existing is not None:
+                self.stats['deduplicated'] += 1
+                existing.waiters += 1
+                if priority < existing.priority:
+                    # Interaktiver Aufrufer wartet mit: Anfrage hochstufen
+                    existing.priority = priority
+                    if existing.state == 'queued':
+                        heapq.heapify(self._heap)
+                future = existing.future
+            else:
+                request = AIRequest(priority, next(self._seq), key, prompt, context, session)
+                self._inflight[key] = request
+                heapq.heappush(self._heap, request)
+                future = request.future
+        self._ensure_worker()
+        self._notify()
+        return future
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            waits = {}
+            for priority, values in self._wait_ms.items():
+                ordered = sorted(values)
+                waits[priority] = {
+                    'count': len(ordered),
+                    'p50_ms': round(ordered[len(ordered) // 2], 1),
+                    'max_ms': round(ordered[-1], 1)
+                }
+            return {**self.stats, 'queued': len(self._heap),
+                    'inflight': len(self._inflight), 'wait_by_priority': waits}
+
+    # === WORKER ===
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._run_loop, args=(ready,),
+                                            name='AIRequestQueue', daemon=True)
+            self._thread.start()
+        ready.wait()
+
+    def _run_loop(self, ready: threading.Event):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._wakeup = asyncio.Event()
+        ready.set()
+        self._loop.run_until_complete(self._serve())
+
+    def _notify(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _serve(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            self._dispatch()
+
+    def _dispatch(self):
+        """Startet Vordergrund-Anfragen sofort, Hintergrund nur bei freier Bahn"""
+        foreground, batch = [], []
+        now = time.perf_counter()
+        with self._lock:
+            while self._heap and self._heap[0].priority < PRIORITY_BACKGROUND:
+                foreground.append(heapq.heappop(self._heap))
+            if foreground and self._background_request is not None \
+                    and self._background_request.priority >= PRIORITY_BACKGROUND:
+                self._background_task.cancel()
+            waiting_background = bool(self._heap)
+            idle = not foreground and self._foreground_running == 0 and not self._batch_running
+            if waiting_background and idle:
+                if self._batch_due is None:
+                    # Kurz sammeln, damit zusammenhängende Aufträge einen Batch bilden
+                    self._batch_due = now + self.BATCH_WINDOW_MS / 1000
+                    self._loop.call_later(self.BATCH_WINDOW_MS / 1000, self._wakeup.set)
+                elif now >= self._batch_due:
+                    while self._heap and len(batch) < self.MAX_BATCH:
+                        batch.append(heapq.heappop(self._heap))
+                    self._batch_due = None
+                    self._batch_running = True
+                    self.stats['batches'] += 1
+                else:
+                    self._loop.call_later(self._batch_due - now, self._wakeup.set)
+
+        for request in foreground:
+            self._foreground_running += 1
+            asyncio.ensure_future(self._run_foreground(request))
+        if batch:
+            asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_foreground(self, request: AIRequest):
+        try:
+            await self._execute(request)
+        finally:
+            self._foreground_running -= 1
+            self._wakeup.set()
+
+    async def _run_batch(self, batch: List[AIRequest]):
+        try:
+            for index, request in enumerate(batch):
+                with self._lock:
+                    busy = self._foreground_running > 0 or any(
+                        r.priority < PRIORITY_BACKGROUND for r in self._heap)
+                    if busy:
+                        self._requeue(batch[index:])
+                        return
+                    task = asyncio.ensure_future(self._execute(request))
+                    self._background_task = task
+                    self._background_request = request
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    with self._lock:
+                        request.preempted += 1
+                        self.stats['preempted'] += 1
+                        self._requeue(batch[index:])
+                    logger.debug(f"Hintergrund-Anfrage verdrängt: {request.prompt[:40]}")
+                    return
+        finally:
+            with self._lock:
+                self._background_task = None
+                self._background_request = None
+                self._batch_running = False
+            self._wakeup.set()
+
+    def _requeue(self, requests: List[AIRequest]):
+        for request in requests:
+            if request.state != 'done':
+                request.state = 'queued'
+                heapq.heappush(self._heap, request)
+
+    async def _execute(self, request: AIRequest):
+        with self._lock:
+            request.state = 'running'
+            self._wait_ms.setdefault(request.priority, []).append(
+                (time.perf_counter() - request.submitted) * 1000)
+            if len(self._wait_ms[request.priority]) > 500:
+                del self._wait_ms[request.priority][:250]
+            self.stats['upstream_calls'] += 1
+        try:
+            result = await self._executor(request.prompt, request.context, request.session)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._finish(request, error=e)
+        else:
+            self._finish(request, result=result)
+
+    def _finish(self, request: AIRequest, result: Optional[str] = None,
+                error: Optional[BaseException] = None):
+        with self._lock:
+            request.state = 'done'
+            if self._inflight.get(request.key) is request:
+                del self._inflight[request.key]
+            if error is not None:
+                self.stats['errors'] += 1
+        if error is not None:
+            request.future.set_exception(error)
+        else:
+            request.future.set_result(result)
@@ -0,0 +1,292 @@
+"""
+Toobix AI Router
+Latenzbewusste Backend-Auswahl mit Circuit Breakern und Hedged Requests
+"""
+import asyncio
+import time
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# call(prompt, context, **kwargs) -> Antwort oder None
+BackendCall = Callable[..., Awaitable[Optional[str]]]
+
+
+class LatencyWindow:
+    """Rollierendes Fenster der letzten Aufrufe (Dauer, Erfolg)"""
+
+    def __init__(self, size: int = 50):
+        self.samples: Deque[Tuple[float, bool]] = deque(maxlen=size)
+
+    def add(self, duration_s: float, ok: bool):
+        self.samples.append((duration_s, ok))
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latenz-Perzentil erfolgreicher Aufrufe in Sekunden"""
+        durations = sorted(d for d, ok in self.samples if ok)
+        if not durations:
+            return None
+        index = min(len(durations) - 1, int(q * len(durations)))
+        return durations[index]
+
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+
+class CircuitBreaker:
+    """
+    closed -> open: nach failure_threshold Fehlern in Folge oder einer
+    Fehlerquote über max_error_rate im Fenster
+    open -> half_open: nach Ablauf der Abkühlzeit; genau ein Probe-Aufruf
+    half_open -> closed bei Erfolg, sonst wieder open mit verdoppelter Abkühlzeit
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 3, max_error_rate: float = 0.5,
+                 min_samples: int = 10, cooldown_s: float = 10.0, max_cooldown_s: float = 120.0):
+        self.failure_threshold = failure_threshold
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.base_cooldown_s = cooldown_s
+        self.max_cooldown_s = max_cooldown_s
+        self.cooldown_s = cooldown_s
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def peek(self) -> bool:
+        """Wäre ein Aufruf erlaubt? (ohne den Probe-Slot zu belegen)"""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            return time.monotonic() - self.opened_at >= self.cooldown_s
+        return not self._probe_in_flight
+
+    def allow(self) -> bool:
+        """Belegt ggf. den Probe-Slot im half_open-Zustand"""
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown_s:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+        return self.state == self.CLOSED
+
+    def record(self, ok: bool, window: LatencyWindow):
+        if ok:
+            self.consecutive_failures = 0
+            if self.state != self.CLOSED:
+                logger.info("🔌 Circuit Breaker geschlossen")
+            self.state = self.CLOSED
+            self.cooldown_s = self.base_cooldown_s
+            self._probe_in_flight = False
+            return
+
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN:
+            self.cooldown_s = min(self.cooldown_s * 2, self.max_cooldown_s)
+            self._open()
+        elif self.state == self.CLOSED and (
+                self.consecutive_failures >= self.failure_threshold or
+                (len(window) >= self.min_samples and window.error_rate() > self.max_error_rate)):
+            self._open()
+
+    def release_probe(self):
+        """Probe wurde abgebrochen (z.B. verlorener Hedge) - Slot freigeben"""
+        self._probe_in_flight = False
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+        logger.warning(f"⚡ Circuit Breaker offen für {self.cooldown_s:.0f}s")
+
+
+@dataclass
+class Backend:
+    """Ein registriertes KI-Backend"""
+    name: str
+    model: str
+    call: BackendCall
+    available: Callable[[], bool]
+    cold: Optional[Callable[[], bool]] = None   # Modell muss erst geladen werden
+    window: LatencyWindow = field(default_factory=LatencyWindow)
+    breaker: CircuitBreaker = field(default_factory=CircuitBreaker)
+    calls: int = 0
+    timeouts: int = 0
+    hedge_wins: int = 0
+
+
+class AIRouter:
+    """
+    Wählt pro Anfrage das Backend aus der bevorzugten Reihenfolge
+    (Heuristik aus AIHandler._should_use_cloud) und sorgt für begrenzte
+    Tail-Latenz:
+
+    - Pro Backend rollierende p50/p95 und Fehlerquote
+    - Circuit Breaker überspringen degradierte Backends sofort statt nach
+      30 s Timeout; half_open-Proben prüfen die Erholung
+    - Adaptiver Timeout pro Backend (Vielfaches der p95, begrenzt)
+    - Optionales Hedging: antwortet das erste Backend nicht innerhalb
+      seiner p95, startet parallel das zweite; die schnellere Antwort
+      gewinnt, die andere wird abgebrochen
+    """
+
+    MIN_TIMEOUT_S = 5.0
+    MAX_TIMEOUT_S = 30.0
+    TIMEOUT_FACTOR = 3.0
+    DEFAULT_HEDGE_DELAY_S = 2.0
+    MIN_HEDGE_DELAY_S = 0.3
+    MIN_SAMPLES = 5
+
+    def __init__(self, hedging: bool = False):
+        self.hedging = hedging
+        self.backends: Dict[str, Backend] = {}
+        self.stats = {'requests': 0, 'fallbacks': 0, 'hedged': 0, 'short_circuited': 0}
+
+    def register(self, name: str, call: BackendCall, available: Callable[[], bool],
+                 model: str = '', cold: Optional[Callable[[], bool]] = None) -> Backend:
+        backend = Backend(name, model, call, available, cold)
+        self.backends[name] = backend
+        return backend
+
+    # === KENNZAHLEN ===
+
+    def timeout_for(self, backend: Backend) -> float:
+        p95 = backend.window.percentile(0.95)
+        if p95 is None or len(backend.window) < self.MIN_SAMPLES:
+            return self.MAX_TIMEOUT_S
+        if backend.cold is not None and backend.cold():
+            # Ladezeit ist nicht in den Latenzen enthalten
+            return self.MAX_TIMEOUT_S
+        return min(self.MAX_TIMEOUT_S, max(self.MIN_TIMEOUT_S, p95 * self.TIMEOUT_FACTOR))
+
+    def hedge_delay_for(self, backend: Backend) -> float:
+        p95 = backend.window.percentile(0.95)
+        if p95 is None or len(backend.window) < self.MIN_SAMPLES:
+            return self.DEFAULT_HEDGE_DELAY_S
+        return max(self.MIN_HEDGE_DELAY_S, p95)
+
+    # === ANFRAGEN ===
+
+    async def request(self, prompt: str, context: Optional[str], preferred: List[str],
+                      **kwargs) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Fragt die Backends in bevorzugter Reihenfolge ab.
+
+        Returns:
+            (Antwort, Name des antwortenden Backends) oder (None, None)
+        """
+        self.stats['requests'] += 1
+        candidates = []
+        for name in preferred:
+            backend = self.backends.get(name)
+            if backend is None or not backend.available():
+                continue
+            if not backend.breaker.peek():
+                self.stats['short_circuited'] += 1
+                continue
+            candidates.append(backend)
+
+        tried = set()
+        for index, backend in enumerate(candidates):
+            if backend.name in tried:
+                continue
+            if index > 0:
+                self.stats['fallbacks'] += 1
+            if not backend.breaker.allow():
+                continue
+            tried.add(backend.name)
+
+            rest = [b for b in candidates[index + 1:] if b.name not in tried]
+            if self.hedging and rest and rest[0].breaker.peek():
+                tried.add(rest[0].name)
+                result, winner = await self._hedged(backend, rest[0], prompt, context, kwargs)
+            else:
+                result, winner = await self._attempt(backend, prompt, context, kwargs), backend
+            if result:
+                return result, winner.name
+        return None, None
+
+    async def _attempt(self, backend: Backend, prompt: str, context: Optional[str],
+                       kwargs: Dict) -> Optional[str]:
+        """Ein Aufruf mit adaptivem Timeout; misst Latenz und Erfolg"""
+        backend.calls += 1
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(backend.call(prompt, context, **kwargs), self.timeout_for(backend))
+        except asyncio.TimeoutError:
+            backend.timeouts += 1
+            result = None
+            logger.warning(f"⏱️ {backend.name} Timeout nach {self.timeout_for(backend):.0f}s")
+        except asyncio.CancelledError:
+            # Verlorener Hedge: nicht als Fehler werten
+            backend.breaker.release_probe()
+            raise
+        except Exception as e:
+            logger.error(f"❌ {backend.name} Fehler: {e}")
+            result = None
+        ok = bool(result)
+        backend.window.add(time.perf_counter() - start, ok)
+        backend.breaker.record(ok, backend.window)
+        return result
+
+    async def _hedged(self, primary: Backend, secondary: Backend, prompt: str,
+                      context: Optional[str], kwargs: Dict) -> Tuple[Optional[str], Backend]:
+        """Startet secondary, wenn primary nicht innerhalb seiner p95 antwortet"""
+        first = asyncio.ensure_future(self._attempt(primary, prompt, context, kwargs))
+        done, _ = await asyncio.wait({first}, timeout=self.hedge_delay_for(primary))
+        if done and first.result():
+            return first.result(), primary
+
+        if not secondary.breaker.allow():
+            return (await first if not done else None), primary
+        self.stats['hedged'] += 1
+        pending = {asyncio.ensure_future(self._attempt(secondary, prompt, context, kwargs))}
+        if not done:
+            pending.add(first)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if result:
+                    for loser in pending:
+                        loser.cancel()
+                    if task is first:
+                        return result, primary
+                    secondary.hedge_wins += 1
+                    return result, secondary
+        return None, primary
+
+    def get_stats(self) -> Dict:
+        backends = {}
+        for name, backend in self.backends.items():
+            p50 = backend.window.percentile(0.5)
+            p95 = backend.window.percentile(0.95)
+            backends[name] = {
+                'model': backend.model,
+                'state': backend.breaker.state,
+                'samples': len(backend.window),
+                'p50_ms': round(p50 * 1000) if p50 is not None else None,
+                'p95_ms': round(p95 * 1000) if p95 is not None else None,
+                'error_rate': round(backend.window.error_rate(), 3),
+                'timeout_s': round(self.timeout_for(backend), 1),
+                'calls': backend.calls,
+                'timeouts': backend.timeouts,
+                'hedge_wins': backend.hedge_wins
+            }
+        return {**self.stats, 'hedging': self.hedging, 'backends': backends}
@@ -20,6 +20,8 @@ import hashlib
 import base64
 from pathlib import Path
 
+from .ui_bus import get_ui_bus
+
 @dataclass
 class WisdomArtefakt:
     """Ein spirituelles Weisheits-Artefakt"""
@@ -160,8 +162,9 @@ class ArtefaktSystem:
         text_hash = hashlib.md5(wisdom_text.encode()).hexdigest()[:8]
         artefakt_id = f"{category}_{text_hash}_{int(datetime.datetime.now().timestamp())}"
         
-        # Auto-generate title if not provided
-        if not title:
+        # Auto-generate title if not provided; der KI-Titel folgt asynchron
+        title_pending = not title
+        if title_pending:
             title = self._generate_title(wisdom_text, category)
         
         # Generate image prompt
@@ -199,14 +202,14 @@ class ArtefaktSystem:
         if self.image_generation_available:
             self._generate_artefakt_image(artefakt)
         
+        if title_pending:
+            self._request_ai_title(artefakt)
+        
         print(f"🎨 Weisheits-Artefakt erstellt: {title}")
         return artefakt
     
     def _generate_title(self, wisdom_text: str, category: str) -> str:
-        """Generiert einen Titel für das Artefakt"""
-        
-        # Extract key concepts from wisdom text
-        key_words = wisdom_text.split()[:10]  # First 10 words
+        """Sofort verfügbarer Vorlagen-Titel (der KI-Titel kommt über _request_ai_title)"""
         
         title_templates = {
             "quote": [
@@ -248,20 +251,47 @@ class ArtefaktSystem:
         
         templates = title_templates.get(category, title_templates["quote"])
         
-        # Use AI to generate if available
-        if self.ai_handler:
-            try:
-                title_prompt = f"Erstelle einen spirituellen, poetischen Titel für diese Weisheit: '{wisdom_text[:100]}...' Kategorie: {category}. Nur der Titel, maximal 4 Worte:"
-                title = self.ai_handler.get_response(title_prompt)
-                if title and len(title.strip()) < 50:
-                    return title.strip().strip('"').strip("'")
-            except:
-                pass
-        
-        # Fallback to template
         import random
         return random.choice(templates)
     
+    def _request_ai_title(self, artefakt: WisdomArtefakt):
+        """
+        Fragt einen KI-Titel im Hintergrund an, ohne den Aufrufer (meist den
+        Tk-Thread) zu blockieren. Sobald das Future fertig ist, wird der
+        Vorlagen-Titel ersetzt, das Artefakt neu gespeichert und über den
+        UI-Bus ('artefakts') gemeldet.
+        """
+        if not self.ai_handler or not hasattr(self.ai_handler, 'ask_async'):
+            return
+        
+        title_prompt = f"Erstelle einen spirituellen, poetischen Titel für diese Weisheit: '{artefakt.wisdom_text[:100]}...' Kategorie: {artefakt.category}. Nur der Titel, maximal 4 Worte:"
+        try:
+            future = self.ai_handler.ask_async(title_prompt)
+        except Exception as e:
+            print(f"⚠️ KI-Titel nicht angefragt: {e}")
+            return
+        
+        artefakt.metadata["title_status"] = "pending"
+        future.add_done_callback(lambda done: self._apply_ai_title(artefakt, done))
+    
+    def _apply_ai_title(self, artefakt: WisdomArtefakt, future):
+        """Übernimmt den KI-Titel (läuft auf dem Thread der Request-Queue)"""
+        try:
+            title = future.result()
+        except Exception as e:
+            print(f"⚠️ KI-Titel fehlgeschlagen, Vorlage bleibt: {e}")
+            title = None
+        
+        title = title.strip().strip('"').strip("'") if isinstance(title, str) else ""
+        if title and len(title) < 50:
+            artefakt.title = title
+            artefakt.metadata["title_status"] = "ai"
+        else:
+            artefakt.metadata["title_status"] = "template"
+        
+        self._save_artefakt(artefakt)
+        get_ui_bus().publish('artefakts', artefakt)
+    
     def _generate_image_prompt(self, wisdom_text: str, category: str, theme: str) -> str:
         """Generiert einen Prompt für die Bildgenerierung"""
         
@@ -0,0 +1,515 @@
+"""
+Toobix Backup Engine
+Inkrementelle, deduplizierte Backups mit inhaltsdefinierten Chunks
+"""
+import os
+import json
+import zlib
+import time
+import random
+import hashlib
+import threading
+import logging
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Iterator, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Chunk-Größen (inhaltsdefiniert, Ø ~1 MB)
+MIN_CHUNK_SIZE = 256 * 1024
+AVG_CHUNK_BITS = 20
+MAX_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Gear-Hash als gleitende Summe über HASH_WINDOW Bytes (32 Bit);
+# Schnittpunkt, wenn die obersten AVG_CHUNK_BITS Bits null sind
+HASH_WINDOW = 48
+_MASK32 = (1 << 32) - 1
+_CUT_MASK = ((1 << AVG_CHUNK_BITS) - 1) << (32 - AVG_CHUNK_BITS)
+_GEAR_RNG = random.Random(0x70B1)  # fester Seed: Schnittpunkte müssen über Läufe stabil sein
+_GEAR = [_GEAR_RNG.getrandbits(32) for _ in range(256)]
+_GEAR_NP = np.array(_GEAR, dtype=np.uint32) if NUMPY_AVAILABLE else None
+READ_BLOCK_SIZE = 1024 * 1024
+
+# Codec-Präfix der gespeicherten Chunks
+CODEC_NONE = b'\x00'
+CODEC_ZLIB = b'\x01'
+CODEC_ZSTD = b'\x02'
+
+
+class ContentDefinedChunker:
+    """
+    Zerlegt Datenströme an inhaltsabhängigen Stellen (Gear-Rolling-Hash).
+    Eingefügte oder gelöschte Bytes verschieben nur die betroffenen Chunks,
+    alle anderen bleiben identisch und werden dedupliziert.
+    """
+
+    def iter_chunks(self, stream) -> Iterator[bytes]:
+        """Liefert die Chunks eines binären Streams"""
+        buffer = bytearray()
+        chunk_start = 0      # absolute Position von buffer[0]
+        position = 0         # absolute Position des nächsten gelesenen Blocks
+        context = b''        # letzte HASH_WINDOW Bytes vor dem Block
+
+        while True:
+            block = stream.read(READ_BLOCK_SIZE)
+            if not block:
+                break
+
+            if NUMPY_AVAILABLE:
+                candidates = self._candidates_numpy(context, block, position)
+            else:
+                candidates = self._candidates_python(context, block, position)
+
+            buffer += block
+            for cut in candidates:
+                length = cut - chunk_start
+                while length > MAX_CHUNK_SIZE:
+                    yield bytes(buffer[:MAX_CHUNK_SIZE])
+                    del buffer[:MAX_CHUNK_SIZE]
+                    chunk_start += MAX_CHUNK_SIZE
+                    length -= MAX_CHUNK_SIZE
+                if length < MIN_CHUNK_SIZE:
+                    continue
+                yield bytes(buffer[:length])
+                del buffer[:length]
+                chunk_start = cut
+
+            position += len(block)
+            while len(buffer) > MAX_CHUNK_SIZE:
+                yield bytes(buffer[:MAX_CHUNK_SIZE])
+                del buffer[:MAX_CHUNK_SIZE]
+                chunk_start += MAX_CHUNK_SIZE
+            context = (context + block)[-HASH_WINDOW:]
+
+        if buffer:
+            yield bytes(buffer)
+
+    @staticmethod
+    def _candidates_numpy(context: bytes, block: bytes, position: int) -> List[int]:
+        """Vektorisiert: gleitende Summe über kumulative Summe (uint32, Überlauf gewollt)"""
+        data = np.frombuffer(context + block, dtype=np.uint8)
+        sums = np.cumsum(np.take(_GEAR_NP, data), dtype=np.uint32)
+        hashes = sums.copy()
+        hashes[HASH_WINDOW:] -= sums[:-HASH_WINDOW]
+        hits = np.flatnonzero((hashes[len(context):] & np.uint32(_CUT_MASK)) == 0)
+        # Schnitt hinter dem Treffer-Byte
+        return (hits + (position + 1)).tolist()
+
+    @staticmethod
+    def _candidates_python(context: bytes, block: bytes, position: int) -> List[int]:
+        """Gleiche Schnittpunkte in reinem Python (Fallback ohne NumPy, langsamer)"""
+        candidates = []
+        gear = _GEAR
+        mask = _CUT_MASK
+        data = context + block
+        rolling = 0
+        for index in range(len(data)):
+            rolling += gear[data[index]]
+            if index >= HASH_WINDOW:
+                rolling -= gear[data[index - HASH_WINDOW]]
+            if index >= len(context) and not (rolling & _MASK32) & mask:
+                candidates.append(position + index - len(context) + 1)
+        return candidates
+
+
+class ChunkStore:
+    """Content-adressierter Chunk-Speicher (chunks/ab/abcdef...)"""
+
+    def __init__(self, root: Path, compression: Optional[str] = 'zstd'):
+        self.root = Path(root)
+        self.chunk_dir = self.root / 'chunks'
+        if compression == 'zstd' and not ZSTD_AVAILABLE:
+            compression = 'zlib'
+        self.compression = compression
+        self._local = threading.local()
+
+    def _path(self, chunk_id: str) -> Path:
+        return self.chunk_dir / chunk_id[:2] / chunk_id
+
+    def has(self, chunk_id: str) -> bool:
+        return self._path(chunk_id).exists()
+
+    def put(self, chunk_id: str, data: bytes) -> int:
+        """Speichert einen Chunk falls neu, gibt geschriebene Bytes zurück"""
+        path = self._path(chunk_id)
+        if path.exists():
+            return 0
+
+        payload = CODEC_NONE + data
+        if self.compression == 'zstd':
+            compressed = CODEC_ZSTD + self._zstd_compressor().compress(data)
+        elif self.compression == 'zlib':
+            compressed = CODEC_ZLIB + zlib.compress(data, 6)
+        else:
+            compressed = payload
+        # Bereits komprimierte Daten (Videos, Archive) unkomprimiert ablegen
+        if len(compressed) < len(payload):
+            payload = compressed
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        return len(payload)
+
+    def get(self, chunk_id: str) -> bytes:
+        """Liest und dekomprimiert einen Chunk"""
+        with open(self._path(chunk_id), 'rb') as f:
+            payload = f.read()
+        codec, body = payload[:1], payload[1:]
+        if codec == CODEC_ZLIB:
+            return zlib.decompress(body)
+        if codec == CODEC_ZSTD:
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("Chunk ist zstd-komprimiert, aber 'zstandard' ist nicht installiert")
+            return zstandard.ZstdDecompressor().decompress(body)
+        return body
+
+    def _zstd_compressor(self):
+        # ZstdCompressor ist nicht thread-sicher - eine Instanz pro Thread
+        compressor = getattr(self._local, 'compressor', None)
+        if compressor is None:
+            compressor = zstandard.ZstdCompressor(level=3)
+            self._local.compressor = compressor
+        return compressor
+
+
+class BackupEngine:
+    """
+    Inkrementelle Backups in ein Repository:
+    - repository/chunks/     deduplizierte, optional komprimierte Chunks
+    - repository/snapshots/  ein JSON-Manifest pro Snapshot
+
+    Unveränderte Dateien (gleiche Größe, mtime, inode wie im letzten Snapshot)
+    werden gar nicht gelesen; geänderte Dateien schreiben nur neue Chunks.
+    """
+
+    def __init__(self, repository: str, compression: Optional[str] = 'zstd',
+                 max_workers: Optional[int] = None):
+        self.repository = Path(repository)
+        self.snapshot_dir = self.repository / 'snapshots'
+        self.store = ChunkStore(self.repository, compression)
+        self.chunker = ContentDefinedChunker()
+        self.max_workers = max_workers or min(8, os.cpu_count() or 2)
+
+    # === BACKUP ===
+
+    def backup(self, sources: List[str], excluded_dir_names: Optional[List[str]] = None) -> Dict:
+        """Erstellt einen Snapshot der angegebenen Ordner"""
+        start_time = time.time()
+        excluded = set(excluded_dir_names or [])
+        previous = self._latest_manifest()
+        previous_files = {}
+        if previous:
+            for source in previous['sources']:
+                for rel_path, entry in source['files'].items():
+                    previous_files[(source['path'], rel_path)] = entry
+
+        stats = {
+            'files': 0,
+            'unchanged_files': 0,
+            'bytes_total': 0,
+            'bytes_read': 0,
+            'chunks_total': 0,
+            'chunks_new': 0,
+            'bytes_written': 0,
+            'errors': []
+        }
+        stats_lock = threading.Lock()
+
+        manifest_sources = []
+        jobs = []
+        for source in sources:
+            source_path = os.path.abspath(os.path.expanduser(source))
+            if not os.path.isdir(source_path):
+                continue
+            source_entry = {'path': source_path, 'name': os.path.basename(source_path), 'files': {}}
+            manifest_sources.append(source_entry)
+
+            for abs_path, rel_path, stat in self._walk(source_path, excluded, self._repository_path()):
+                stats['files'] += 1
+                stats['bytes_total'] += stat.st_size
+                signature = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'inode': stat.st_ino}
+                old = previous_files.get((source_path, rel_path))
+                if old and all(old.get(k) == v for k, v in signature.items()):
+                    source_entry['files'][rel_path] = old
+                    stats['unchanged_files'] += 1
+                    stats['chunks_total'] += len(old['chunks'])
+                else:
+                    jobs.append((source_entry, abs_path, rel_path, signature))
+
+        def process(job):
+            source_entry, abs_path, rel_path, signature = job
+            try:
+                chunk_ids = []
+                new_chunks = 0
+                written = 0
+                with open(abs_path, 'rb') as f:
+                    # Kleine Dateien können nicht geschnitten werden - Rolling-Hash sparen
+                    if signature['size'] <= MIN_CHUNK_SIZE:
+                        chunks = [f.read()]
+                    else:
+                        chunks = self.chunker.iter_chunks(f)
+                    for chunk in chunks:
+                        chunk_id = hashlib.blake2b(chunk, digest_size=20).hexdigest()
+                        stored = self.store.put(chunk_id, chunk)
+                        if stored:
+                            new_chunks += 1
+                            written += stored
+                        chunk_ids.append(chunk_id)
+                with stats_lock:
+                    source_entry['files'][rel_path] = {**signature, 'chunks': chunk_ids}
+                    stats['bytes_read'] += signature['size']
+                    stats['chunks_total'] += len(chunk_ids)
+                    stats['chunks_new'] += new_chunks
+                    stats['bytes_written'] += written
+            except OSError as e:
+                with stats_lock:
+                    stats['errors'].append(f"{abs_path}: {e}")
+
+        # Dateien parallel chunken, hashen und komprimieren
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(process, jobs))
+
+        snapshot_id = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        stats['duration_s'] = round(time.time() - start_time, 3)
+        manifest = {
+            'id': snapshot_id,
+            'created': datetime.now().isoformat(),
+            'parent': previous['id'] if previous else None,
+            'sources': manifest_sources,
+            'stats': {k: v for k, v in stats.items() if k != 'errors'}
+        }
+        self._write_manifest(manifest)
+
+        logger.info(f"💾 Snapshot {snapshot_id}: {stats['files']} Dateien, "
+                    f"{stats['bytes_written'] / (1024 * 1024):.1f} MB neu geschrieben")
+        return {
+            'snapshot_id': snapshot_id,
+            **stats,
+            'sources': [
+                {
+                    'path': source['path'],
+                    'files': len(source['files']),
+                    'bytes': sum(entry['size'] for entry in source['files'].values())
+                }
+                for source in manifest_sources
+            ]
+        }
+
+    # === SNAPSHOTS ===
+
+    def list_snapshots(self) -> List[Dict]:
+        """Listet alle Snapshots (älteste zuerst)"""
+        snapshots = []
+        if not self.snapshot_dir.exists():
+            return snapshots
+        for manifest_file in sorted(self.snapshot_dir.glob('*.json')):
+            try:
+                with open(manifest_file, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                snapshots.append({
+                    'id': manifest['id'],
+                    'created': manifest['created'],
+                    'sources': [s['path'] for s in manifest['sources']],
+                    'stats': manifest.get('stats', {})
+                })
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Snapshot {manifest_file.name} unlesbar: {e}")
+        return snapshots
+
+    def load_manifest(self, snapshot_id: Optional[str] = None) -> Optional[Dict]:
+        """Lädt ein Manifest (Standard: neuester Snapshot)"""
+        if snapshot_id is None:
+            return self._latest_manifest()
+        manifest_file = self.snapshot_dir / f"{snapshot_id}.json"
+        if not manifest_file.exists():
+            return None
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    # === RESTORE / VERIFY ===
+
+    def restore(self, target_dir: str, snapshot_id: Optional[str] = None,
+                path_filter: Optional[str] = None) -> Dict:
+        """Stellt einen Snapshot (oder Teile davon) in target_dir wieder her"""
+        manifest = self.load_manifest(snapshot_id)
+        if manifest is None:
+            return {'success': False, 'error': 'Snapshot nicht gefunden'}
+
+        start_time = time.time()
+        target_root = Path(target_dir)
+        source_dirs = self._restore_dirs(manifest['sources'])
+        jobs = []
+        for source in manifest['sources']:
+            source_root = target_root / source_dirs[source['path']]
+            for rel_path, entry in source['files'].items():
+                if path_filter and path_filter.lower() not in rel_path.lower():
+                    continue
+                jobs.append((source_root / rel_path, entry))
+
+        errors = []
+        restored_bytes = [0]
+        lock = threading.Lock()
+
+        def restore_file(job):
+            destination, entry = job
+            try:
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                with open(destination, 'wb') as f:
+                    for chunk_id in entry['chunks']:
+                        f.write(self.store.get(chunk_id))
+                os.utime(destination, ns=(entry['mtime_ns'], entry['mtime_ns']))
+                with lock:
+                    restored_bytes[0] += entry['size']
+            except (OSError, RuntimeError, zlib.error) as e:
+                with lock:
+                    errors.append(f"{destination}: {e}")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(restore_file, jobs))
+
+        return {
+            'success': not errors,
+            'snapshot_id': manifest['id'],
+            'target': str(target_root),
+            'sources': {path: str(target_root / name) for path, name in source_dirs.items()},
+            'restored_files': len(jobs) - len(errors),
+            'restored_bytes': restored_bytes[0],
+            'errors': errors,
+            'duration_s': round(time.time() - start_time, 3)
+        }
+
+    def verify(self, snapshot_id: Optional[str] = None) -> Dict:
+        """Prüft, ob alle Chunks eines Snapshots vorhanden und unbeschädigt sind"""
+        manifest = self.load_manifest(snapshot_id)
+        if manifest is None:
+            return {'success': False, 'error': 'Snapshot nicht gefunden'}
+
+        start_time = time.time()
+        chunk_ids = {
+            chunk_id
+            for source in manifest['sources']
+            for entry in source['files'].values()
+            for chunk_id in entry['chunks']
+        }
+
+        def check(chunk_id):
+            try:
+                data = self.store.get(chunk_id)
+                return hashlib.blake2b(data, digest_size=20).hexdigest() == chunk_id
+            except (OSError, RuntimeError, zlib.error):
+                return False
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = dict(zip(chunk_ids, executor.map(check, chunk_ids)))
+
+        damaged = sorted(chunk_id for chunk_id, ok in results.items() if not ok)
+        return {
+            'success': not damaged,
+            'snapshot_id': manifest['id'],
+            'checked_chunks': len(results),
+            'damaged_chunks': damaged,
+            'duration_s': round(time.time() - start_time, 3)
+        }
+
+    # === HILFSFUNKTIONEN ===
+
+    @staticmethod
+    def _restore_dirs(sources: List[Dict]) -> Dict[str, Path]:
+        """
+        Zielordner je Quelle: der Ordnername, solange er eindeutig ist -
+        sonst der vollständige Originalpfad (z.B. C/Users/a/Documents), damit
+        gleichnamige Quellen sich nicht gegenseitig überschreiben.
+        """
+        name_counts: Dict[str, int] = {}
+        for source in sources:
+            name_counts[source['name']] = name_counts.get(source['name'], 0) + 1
+
+        dirs = {}
+        for source in sources:
+            if name_counts[source['name']] == 1:
+                dirs[source['path']] = Path(source['name'])
+            else:
+                drive, rest = os.path.splitdrive(source['path'])
+                parts = [drive.strip(':\\/')] if drive else []
+                parts += [part for part in rest.replace('\\', '/').split('/') if part]
+                dirs[source['path']] = Path(*parts)
+        return dirs
+
+    def _repository_path(self) -> str:
+        return os.path.abspath(str(self.repository))
+
+    @staticmethod
+    def _walk(root: str, excluded: set, repository: str) -> Iterator[Tuple[str, str, os.stat_result]]:
+        """Liefert (absoluter Pfad, relativer Pfad, stat) aller Dateien (ohne das Repository selbst)"""
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if entry.name not in excluded and entry.path != repository:
+                                    stack.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                stat = os.stat(entry.path, follow_symlinks=False)
+                                yield entry.path, os.path.relpath(entry.path, root), stat
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+    def _latest_manifest(self) -> Optional[Dict]:
+        if not self.snapshot_dir.exists():
+            return None
+        manifests = sorted(self.snapshot_dir.glob('*.json'))
+        if not manifests:
+            return None
+        with open(manifests[-1], 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest: Dict):
+        """Schreibt ein Manifest atomar - erst danach gilt der Snapshot als vorhanden"""
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        manifest_file = self.snapshot_dir / f"{manifest['id']}.json"
+        tmp_file = manifest_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_file, manifest_file)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 3:
+        print("Verwendung: backup_engine.py <repository> backup <ordner...> | restore <ziel> [snapshot] | verify [snapshot] | list")
+        sys.exit(1)
+
+    engine = BackupEngine(sys.argv[1])
+    command = sys.argv[2]
+    if command == 'backup':
+        result = engine.backup(sys.argv[3:])
+    elif command == 'restore':
+        result = engine.restore(sys.argv[3], sys.argv[4] if len(sys.argv) > 4 else None)
+    elif command == 'verify':
+        result = engine.verify(sys.argv[3] if len(sys.argv) > 3 else None)
+    else:
+        result = engine.list_snapshots()
+    print(json.dumps(result, indent=2, ensure_ascii=False))
@@ -0,0 +1,473 @@
+"""
+Toobix Cleanup Executor
+Parallele, journalisierte Ausführung von Verschiebe- und Lösch-Aktionen
+mit Fortsetzen/Rückgängig nach Abbruch
+"""
+import os
+import json
+import time
+import uuid
+import shutil
+import threading
+import logging
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Set
+
+from .persistence import repair_torn_tail
+from .folder_size_cache import get_folder_size_cache
+
+logger = logging.getLogger(__name__)
+
+# Operationstypen
+OP_MOVE = 'move'
+OP_DELETE = 'delete'
+
+
+@dataclass
+class CleanupOperation:
+    """Einzelne Datei-Operation einer Aufräum-Transaktion"""
+    op_type: str
+    source: str
+    target: Optional[str] = None
+    meta: Dict[str, Any] = field(default_factory=dict)
+    op_id: str = ''
+
+
+class CleanupJournal:
+    """
+    Append-only Journal (JSON Lines) einer Transaktion.
+    Abgebrochene Zeilen nach einem Absturz werden beim Lesen übersprungen;
+    vor dem ersten neuen Eintrag wird ein abgeschnittenes Ende entfernt,
+    damit spätere commit-/rolled_back-Einträge lesbar bleiben.
+    """
+
+    FSYNC_EVERY = 32
+
+    def __init__(self, journal_file: Path):
+        self.journal_file = Path(journal_file)
+        self._lock = threading.Lock()
+        self._file = None
+        self._unsynced = 0
+
+    def append(self, record: Dict):
+        """Hängt einen Eintrag an und schreibt ihn sofort durch"""
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+        with self._lock:
+            if self._file is None:
+                self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+                repair_torn_tail(self.journal_file)
+                self._file = open(self.journal_file, 'a', encoding='utf-8')
+            self._file.write(line)
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.FSYNC_EVERY or record.get('event') in ('begin', 'commit', 'rolled_back'):
+                os.fsync(self._file.fileno())
+                self._unsynced = 0
+
+    def read(self) -> List[Dict]:
+        """Liest alle vollständigen Einträge (ungültige Zeilen werden übersprungen)"""
+        records = []
+        if not self.journal_file.exists():
+            return records
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"Ungültige Zeile {self.journal_file.name}:{line_number} übersprungen")
+        return records
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+
+
+class CleanupExecutor:
+    """
+    Führt Aufräum-Transaktionen auf einem begrenzten Worker-Pool aus.
+
+    Jede Transaktion schreibt ein Journal. Löschungen werden zuerst in einen
+    Papierkorb der Transaktion verschoben (falls gleiches Laufwerk) und erst
+    beim Commit endgültig entfernt - so lassen sich abgebrochene Läufe
+    fortsetzen oder vollständig rückgängig machen.
+    """
+
+    def __init__(self, data_dir: str = 'toobix_cleanup', max_workers: int = 4,
+                 stage_deletes: bool = True):
+        self.data_dir = Path(data_dir)
+        self.journal_dir = self.data_dir / 'journal'
+        self.trash_dir = self.data_dir / 'trash'
+        self.max_workers = max(1, max_workers)
+        self.stage_deletes = stage_deletes
+        self._target_lock = threading.Lock()
+        self._reserved_targets: Dict[str, Set[str]] = {}  # tx_id -> reservierte Ziele
+
+    # === ÖFFENTLICHE API ===
+
+    def run(self, name: str, operations: List[CleanupOperation], dry_run: bool = False) -> Dict:
+        """Führt eine Liste von Operationen als Transaktion aus"""
+        for index, op in enumerate(operations):
+            if not op.op_id:
+                op.op_id = str(index)
+
+        if dry_run:
+            return self._simulate(name, operations)
+
+        tx_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        journal = CleanupJournal(self.journal_dir / f"{tx_id}.jsonl")
+        journal.append({
+            'event': 'begin',
+            'tx': tx_id,
+            'name': name,
+            'ts': datetime.now().isoformat(),
+            'ops': [asdict(op) for op in operations]
+        })
+        return self._execute(tx_id, name, journal, operations, {})
+
+    def resume(self, tx_id: str) -> Dict:
+        """Setzt eine abgebrochene Transaktion fort"""
+        journal = CleanupJournal(self.journal_dir / f"{tx_id}.jsonl")
+        state = self._replay(journal)
+        if state is None:
+            return {'success': False, 'error': f'Transaktion {tx_id} nicht gefunden'}
+        if state['finished']:
+            return {'success': False, 'error': f'Transaktion {tx_id} ist bereits abgeschlossen'}
+
+        operations = [CleanupOperation(**op) for op in state['ops']]
+        return self._execute(tx_id, state['name'], journal, operations, state['done'])
+
+    def rollback(self, tx_id: str) -> Dict:
+        """Macht alle abgeschlossenen Operationen einer Transaktion rückgängig"""
+        journal = CleanupJournal(self.journal_dir / f"{tx_id}.jsonl")
+        state = self._replay(journal)
+        if state is None:
+            return {'success': False, 'error': f'Transaktion {tx_id} nicht gefunden'}
+        if state['committed']:
+            return {'success': False, 'error': 'Bereits committete Transaktionen können nicht zurückgerollt werden'}
+
+        restored = 0
+        irreversible = []
+        errors = []
+        ops = {op['op_id']: op for op in state['ops']}
+
+        # In umgekehrter Reihenfolge rückgängig machen
+        for op_id in reversed(state['done_order']):
+            if op_id in state['undone']:
+                continue
+            done = state['done'][op_id]
+            op = ops[op_id]
+            try:
+                if op['op_type'] == OP_MOVE and done.get('target') and not done.get('skipped'):
+                    if os.path.exists(done['target']) and not os.path.exists(op['source']):
+                        os.makedirs(os.path.dirname(op['source']) or '.', exist_ok=True)
+                        shutil.move(done['target'], op['source'])
+                        restored += 1
+                elif op['op_type'] == OP_DELETE:
+                    if done.get('staged') and os.path.exists(done['staged']):
+                        os.makedirs(os.path.dirname(op['source']) or '.', exist_ok=True)
+                        os.rename(done['staged'], op['source'])
+                        restored += 1
+                    elif not done.get('skipped'):
+                        irreversible.append(op['source'])
+                journal.append({'event': 'undone', 'op': op_id})
+                self._invalidate_sizes(op['source'], done.get('target'))
+            except OSError as e:
+                errors.append(f"{op['source']}: {e}")
+
+        # Verschobene Dateien ohne 'done'-Eintrag (Absturz oder ungesyncte
+        # Journal-Zeile) liegen noch im Papierkorb und werden ebenfalls
+        # zurückgelegt, bevor der Papierkorb entfernt wird
+        tx_trash = self.trash_dir / tx_id
+        if tx_trash.exists():
+            for staged in sorted(tx_trash.iterdir()):
+                op = ops.get(staged.name)
+                if op is None:
+                    errors.append(f"{staged}: keiner Operation zugeordnet")
+                    continue
+                if os.path.lexists(op['source']):
+                    errors.append(f"{op['source']}: existiert bereits, {staged} bleibt im Papierkorb")
+                    continue
+                try:
+                    os.makedirs(os.path.dirname(op['source']) or '.', exist_ok=True)
+                    os.rename(staged, op['source'])
+                    restored += 1
+                    journal.append({'event': 'undone', 'op': staged.name})
+                    self._invalidate_sizes(op['source'])
+                except OSError as e:
+                    errors.append(f"{op['source']}: {e}")
+
+        if errors:
+            # Papierkorb behalten, damit ein erneuter Rollback möglich bleibt
+            journal.close()
+            return {'success': False, 'transaction_id': tx_id, 'restored': restored,
+                    'irreversible': irreversible, 'errors': errors}
+
+        try:
+            shutil.rmtree(tx_trash)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            journal.close()
+            return {'success': False, 'transaction_id': tx_id, 'restored': restored,
+                    'irreversible': irreversible, 'errors': [f"{tx_trash}: {e}"]}
+        journal.append({'event': 'rolled_back', 'ts': datetime.now().isoformat()})
+        journal.close()
+
+        return {
+            'success': True,
+            'transaction_id': tx_id,
+            'restored': restored,
+            'irreversible': irreversible,
+            'errors': errors
+        }
+
+    def list_incomplete(self) -> List[Dict]:
+        """Listet Transaktionen, die weder committet noch zurückgerollt wurden"""
+        incomplete = []
+        if not self.journal_dir.exists():
+            return incomplete
+        for journal_file in sorted(self.journal_dir.glob('*.jsonl')):
+            state = self._replay(CleanupJournal(journal_file))
+            if state and not state['finished']:
+                incomplete.append({
+                    'transaction_id': journal_file.stem,
+                    'name': state['name'],
+                    'started': state['started'],
+                    'total_ops': len(state['ops']),
+                    'done_ops': len(state['done'])
+                })
+        return incomplete
+
+    def resume_all(self) -> List[Dict]:
+        """Setzt alle unterbrochenen Transaktionen fort"""
+        return [self.resume(tx['transaction_id']) for tx in self.list_incomplete()]
+
+    # === AUSFÜHRUNG ===
+
+    def _execute(self, tx_id: str, name: str, journal: CleanupJournal,
+                 operations: List[CleanupOperation], already_done: Dict[str, Dict]) -> Dict:
+        """Führt offene Operationen parallel aus und committet die Transaktion"""
+        start_time = time.time()
+        pending = [op for op in operations if op.op_id not in already_done]
+
+        def run_and_journal(op: CleanupOperation) -> Dict:
+            # Jeder Worker protokolliert sofort - ein Absturz verliert höchstens laufende Ops
+            outcome = self._apply(tx_id, op)
+            if outcome.get('error'):
+                journal.append({'event': 'failed', 'op': op.op_id, 'error': outcome['error']})
+            else:
+                journal.append({'event': 'done', 'op': op.op_id, **outcome})
+                self._invalidate_sizes(op.source, outcome.get('target'))
+            return outcome
+
+        results = []
+        errors = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for op, outcome in zip(pending, executor.map(run_and_journal, pending)):
+                if outcome.get('error'):
+                    errors.append(f"{op.source}: {outcome['error']}")
+                else:
+                    results.append({'op_id': op.op_id, 'op_type': op.op_type, 'source': op.source,
+                                    'meta': op.meta, **outcome})
+
+        # Commit: Papierkorb der Transaktion endgültig leeren
+        shutil.rmtree(self.trash_dir / tx_id, ignore_errors=True)
+        journal.append({'event': 'commit', 'ts': datetime.now().isoformat()})
+        journal.close()
+
+        with self._target_lock:
+            self._reserved_targets.pop(tx_id, None)
+
+        report = self._build_report(name, results, errors, time.time() - start_time, dry_run=False)
+        report['transaction_id'] = tx_id
+        report['resumed_ops'] = len(already_done)
+        logger.info(f"🧹 {name}: {report['completed']} Operationen, "
+                    f"{report['bytes_reclaimed'] / (1024 * 1024):.1f} MB frei, {report['ops_per_s']:.0f} Ops/s")
+        return report
+
+    def _apply(self, tx_id: str, op: CleanupOperation) -> Dict:
+        """Führt eine einzelne Operation idempotent aus"""
+        try:
+            if op.op_type == OP_MOVE:
+                return self._apply_move(tx_id, op)
+            if op.op_type == OP_DELETE:
+                return self._apply_delete(tx_id, op)
+            return {'error': f'Unbekannter Operationstyp: {op.op_type}'}
+        except OSError as e:
+            return {'error': str(e)}
+
+    def _apply_move(self, tx_id: str, op: CleanupOperation) -> Dict:
+        """Verschiebt eine Datei, ohne bestehende Ziele zu überschreiben"""
+        if not os.path.exists(op.source):
+            if op.target and os.path.exists(op.target):
+                return {'target': op.target, 'bytes': 0, 'skipped': True}
+            return {'error': 'Quelle existiert nicht'}
+
+        size = self._path_size(op.source)
+        os.makedirs(os.path.dirname(op.target) or '.', exist_ok=True)
+        target = self._reserve_target(tx_id, op.target)
+        shutil.move(op.source, target)
+        return {'target': target, 'bytes': size}
+
+    def _apply_delete(self, tx_id: str, op: CleanupOperation) -> Dict:
+        """Löscht eine Datei oder einen Ordner (zuerst in den Papierkorb der Transaktion)"""
+        if not os.path.lexists(op.source):
+            return {'bytes': 0, 'skipped': True}
+
+        size = self._path_size(op.source)
+
+        if self.stage_deletes:
+            staged = self.trash_dir / tx_id / op.op_id
+            try:
+                staged.parent.mkdir(parents=True, exist_ok=True)
+                os.rename(op.source, staged)
+                return {'staged': str(staged), 'bytes': size}
+            except OSError:
+                pass  # Anderes Laufwerk oder gesperrt - direkt löschen
+
+        if os.path.isdir(op.source) and not os.path.islink(op.source):
+            shutil.rmtree(op.source)
+        else:
+            os.unlink(op.source)
+        return {'staged': None, 'bytes': size}
+
+    @staticmethod
+    def _invalidate_sizes(*paths: Optional[str]):
+        """Meldet berührte Pfade an den Ordnergrößen-Cache"""
+        cache = get_folder_size_cache()
+        for path in paths:
+            if path:
+                cache.invalidate(path)
+
+    def _reserve_target(self, tx_id: str, target: str) -> str:
+        """Findet einen freien Zielnamen (thread-sicher, auch über parallele Transaktionen, z.B. datei_1.txt)"""
+        base = Path(target)
+        with self._target_lock:
+            candidate = base
+            counter = 1
+            while candidate.exists() or any(str(candidate) in reserved
+                                             for reserved in self._reserved_targets.values()):
+                candidate = base.with_name(f"{base.stem}_{counter}{base.suffix}")
+                counter += 1
+            self._reserved_targets.setdefault(tx_id, set()).add(str(candidate))
+            return str(candidate)
+
+    # === TROCKENLAUF ===
+
+    def _simulate(self, name: str, operations: List[CleanupOperation]) -> Dict:
+        """Trockenlauf: prüft jede Operation und misst die tatsächlichen Größen"""
+        start_time = time.time()
+        results = []
+        errors = []
+
+        def check(op: CleanupOperation) -> Dict:
+            if not os.path.lexists(op.source):
+                return {'error': 'Quelle existiert nicht'}
+            parent = os.path.dirname(op.source) or '.'
+            if not os.access(parent, os.W_OK):
+                return {'error': 'Keine Schreibrechte'}
+            return {'target': op.target, 'bytes': self._path_size(op.source)}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for op, outcome in zip(operations, executor.map(check, operations)):
+                if outcome.get('error'):
+                    errors.append(f"{op.source}: {outcome['error']}")
+                else:
+                    results.append({'op_id': op.op_id, 'op_type': op.op_type, 'source': op.source,
+                                    'meta': op.meta, **outcome})
+
+        return self._build_report(name, results, errors, time.time() - start_time, dry_run=True)
+
+    # === HILFSFUNKTIONEN ===
+
+    def _replay(self, journal: CleanupJournal) -> Optional[Dict]:
+        """Rekonstruiert den Zustand einer Transaktion aus dem Journal"""
+        records = journal.read()
+        if not records or records[0].get('event') != 'begin':
+            return None
+
+        begin = records[0]
+        state = {
+            'name': begin.get('name', ''),
+            'started': begin.get('ts'),
+            'ops': begin.get('ops', []),
+            'done': {},
+            'done_order': [],
+            'undone': set(),
+            'committed': False,
+            'finished': False
+        }
+        for record in records[1:]:
+            event = record.get('event')
+            if event == 'done':
+                state['done'][record['op']] = record
+                state['done_order'].append(record['op'])
+            elif event == 'undone':
+                state['undone'].add(record['op'])
+            elif event == 'commit':
+                state['committed'] = state['finished'] = True
+            elif event == 'rolled_back':
+                state['finished'] = True
+        return state
+
+    @staticmethod
+    def _path_size(path: str) -> int:
+        """Größe einer Datei oder eines Ordners in Bytes"""
+        try:
+            if os.path.isdir(path) and not os.path.islink(path):
+                total = 0
+                for root, _, files in os.walk(path):
+                    for name in files:
+                        try:
+                            total += os.lstat(os.path.join(root, name)).st_size
+                        except OSError:
+                            continue
+                return total
+            return os.lstat(path).st_size
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _build_report(name: str, results: List[Dict], errors: List[str],
+                      duration: float, dry_run: bool) -> Dict:
+        """Erstellt Ergebnisbericht mit Durchsatz-Statistiken"""
+        bytes_reclaimed = sum(r.get('bytes', 0) for r in results if r['op_type'] == OP_DELETE)
+        bytes_moved = sum(r.get('bytes', 0) for r in results if r['op_type'] == OP_MOVE)
+        duration = max(duration, 1e-6)
+        return {
+            'success': True,
+            'name': name,
+            'dry_run': dry_run,
+            'completed': len(results),
+            'failed': len(errors),
+            'skipped': sum(1 for r in results if r.get('skipped')),
+            'bytes_reclaimed': bytes_reclaimed,
+            'bytes_moved': bytes_moved,
+            'duration_s': round(duration, 3),
+            'ops_per_s': round(len(results) / duration, 1),
+            'mb_per_s': round((bytes_reclaimed + bytes_moved) / (1024 * 1024) / duration, 2),
+            'results': results,
+            'errors': errors
+        }
+
+
+_cleanup_executor: Optional[CleanupExecutor] = None
+_cleanup_executor_lock = threading.Lock()
+
+
+def get_cleanup_executor() -> CleanupExecutor:
+    """Gibt die gemeinsame Cleanup-Executor-Instanz zurück"""
+    global _cleanup_executor
+    with _cleanup_executor_lock:
+        if _cleanup_executor is None:
+            _cleanup_executor = CleanupExecutor()
+        return _cleanup_executor
@@ -2,12 +2,14 @@
 Toobix Command Reference System
 Zeigt alle verfügbaren Befehle und ihre Funktionen
 """
+from .global_search import SearchDocument, get_global_search
 
 class ToobixCommands:
     """Vollständige Referenz aller Toobix-Befehle"""
     
     def __init__(self):
         self.commands = self._initialize_commands()
+        get_global_search().register_source('command', self._search_documents, label='⌨️ Befehl', weight=1.2)
     
     def _initialize_commands(self):
         """Initialisiert alle verfügbaren Befehle"""
@@ -28,13 +30,30 @@ class ToobixCommands:
                     'backup erstellen': {
                         'description': 'Erstellt Backup wichtiger Systemdateien',
                         'example': 'backup erstellen',
-                        'aliases': ['sicherung', 'backup']
+                        'aliases': ['sicherung', 'backup'],
+                        'note': 'Inkrementell: unveränderte Dateien werden nicht erneut gespeichert'
+                    },
+                    'backups anzeigen': {
+                        'description': 'Listet alle Backup-Snapshots',
+                        'example': 'backups anzeigen',
+                        'aliases': ['backup liste', 'backups']
+                    },
+                    'backup prüfen': {
+                        'description': 'Prüft den neuesten Snapshot auf beschädigte Daten',
+                        'example': 'backup prüfen',
+                        'aliases': ['backup verifizieren']
+                    },
+                    'backup wiederherstellen': {
+                        'description': 'Stellt den neuesten Snapshot in ~/Toobix_Restore wieder her',
+                        'example': 'backup wiederherstellen',
+                        'aliases': ['wiederherstellen']
                     },
                     'aufräumen starten': {
                         'description': 'Führt System-Aufräumung durch (sichere Löschung)',
                         'example': 'aufräumen starten bestätigt',
                         'aliases': ['cleanup', 'aufräumen'],
-                        'note': 'Verwende "bestätigt" für automatische Ausführung'
+                        'note': 'Verwende "bestätigt" für automatische Ausführung, '
+                                '"bestätigt duplikate" löscht zusätzlich Duplikate (nicht rückgängig machbar)'
                     }
                 }
             },
@@ -199,25 +218,24 @@ class ToobixCommands:
         
         return result
     
-    def search_commands(self, query):
-        """Sucht Befehle nach Stichwort"""
-        query = query.lower()
-        results = []
-        
+    def _search_documents(self):
+        """Alle Befehle als Dokumente für die globale Suche"""
         for cat_name, cat_data in self.commands.items():
             for cmd, details in cat_data['commands'].items():
-                # Suche in Command-Name
-                if query in cmd.lower():
-                    results.append((cat_name, cmd, details))
-                # Suche in Beschreibung
-                elif query in details['description'].lower():
-                    results.append((cat_name, cmd, details))
-                # Suche in Aliases
-                elif 'aliases' in details:
-                    for alias in details['aliases']:
-                        if query in alias.lower():
-                            results.append((cat_name, cmd, details))
-                            break
+                yield SearchDocument(
+                    source='command',
+                    doc_id=cmd,
+                    title=cmd,
+                    description=details['description'],
+                    keywords=details.get('aliases', []) + [cat_name],
+                    content=' '.join(filter(None, [details.get('example'), details.get('note')])),
+                    payload=(cat_name, cmd, details)
+                )
+    
+    def search_commands(self, query):
+        """Sucht Befehle nach Stichwort (über den globalen Suchindex, beste Treffer zuerst)"""
+        query = query.lower()
+        results = [hit.payload for hit in get_global_search().search(query, sources=['command'], limit=50)]
         
         if not results:
             return f"❌ Keine Befehle gefunden für '{query}'"
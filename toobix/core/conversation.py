@@ -0,0 +1,182 @@
+"""
+Toobix Conversation Session
+Mehrteilige Gespräche mit Ollama-Kontext-Wiederverwendung und rollierender Zusammenfassung
+"""
+import time
+import itertools
+import threading
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from .prompt_builder import BuiltPrompt, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+_session_ids = itertools.count(1)
+
+
+@dataclass
+class ConversationTurn:
+    """Eine Frage-Antwort-Runde"""
+    user: str
+    assistant: str
+    backend: str
+    tokens: int
+    timestamp: float = field(default_factory=time.time)
+
+
+class ConversationSession:
+    """
+    Hält den Verlauf eines Chats, ohne dass die Prompts mitwachsen.
+
+    - Ollama: der von /api/generate zurückgegebene 'context' (Token-IDs)
+      wird weitergereicht; Folgefragen senden nur noch den veränderlichen
+      Teil (Uhrzeit + Anfrage). Ändert sich das Prompt-Präfix oder das
+      Modell, antwortet ein anderes Backend oder wird der Kontext zu lang,
+      wird er verworfen und aus Zusammenfassung + letzten Runden neu
+      aufgebaut.
+    - Groq: Verlauf als Chat-Nachrichten (Zusammenfassung im System-Prompt)
+    - Übersteigt der Verlauf history_budget Tokens, fasst summarizer()
+      die älteren Runden im Hintergrund zusammen; die letzten keep_recent
+      Runden bleiben wörtlich erhalten
+    """
+
+    def __init__(self, summarizer: Optional[Callable[[str], str]] = None,
+                 history_budget: int = 600, context_limit: int = 1400, keep_recent: int = 4):
+        self.id = next(_session_ids)
+        self.summarizer = summarizer
+        self.history_budget = history_budget
+        self.context_limit = context_limit
+        self.keep_recent = keep_recent
+        self.turns: List[ConversationTurn] = []
+        self.summary = ''
+        self._lock = threading.Lock()
+        self._summarizing = False
+        self._ollama_context: Optional[List[int]] = None
+        self._ollama_key = None
+        self.stats = {'turns': 0, 'context_reused': 0, 'context_rebuilt': 0,
+                      'summaries': 0, 'dropped_turns': 0, 'last_prompt_tokens': 0}
+
+    # === OLLAMA ===
+
+    def ollama_fields(self, prompt: BuiltPrompt, model: str) -> Dict:
+        """system/prompt/context für /api/generate"""
+        with self._lock:
+            key = (prompt.prefix_hash, model)
+            suffix_tokens = estimate_tokens(prompt.user)
+            if (self._ollama_context and self._ollama_key == key and
+                    len(self._ollama_context) + suffix_tokens <= self.context_limit):
+                self.stats['context_reused'] += 1
+                self.stats['last_prompt_tokens'] = suffix_tokens
+                return {'prompt': prompt.user, 'context': self._ollama_context}
+
+            self._ollama_context = None
+            if self.turns or self.summary:
+                self.stats['context_rebuilt'] += 1
+            system = prompt.system
+            history = self._history_text()
+            if history:
+                system = f"{system}\n\n{history}"
+            self.stats['last_prompt_tokens'] = estimate_tokens(system) + suffix_tokens
+            return {'system': system, 'prompt': prompt.user}
+
+    def store_ollama_context(self, context: Optional[List[int]], prompt: BuiltPrompt, model: str):
+        """Kontext einer erfolgreichen Ollama-Antwort für die nächste Runde merken"""
+        with self._lock:
+            self._ollama_context = context or None
+            self._ollama_key = (prompt.prefix_hash, model)
+
+    # === GROQ ===
+
+    def chat_messages(self, prompt: BuiltPrompt) -> List[Dict]:
+        """Nachrichtenliste für OpenAI-kompatible Chat-APIs"""
+        with self._lock:
+            system = prompt.system
+            if self.summary:
+                system += f"\n\nBISHERIGES GESPRÄCH (Zusammenfassung): {self.summary}"
+            messages = [{'role': 'system', 'content': system}]
+            for turn in self.turns:
+                messages.append({'role': 'user', 'content': turn.user})
+                messages.append({'role': 'assistant', 'content': turn.assistant})
+            messages.append({'role': 'user', 'content': prompt.user})
+            self.stats['last_prompt_tokens'] = sum(estimate_tokens(m['content']) for m in messages)
+            return messages
+
+    # === VERLAUF ===
+
+    def record_turn(self, user: str, assistant: str, backend: str):
+        """Nach jeder Antwort: Runde anhängen und ggf. Zusammenfassung anstoßen"""
+        turn = ConversationTurn(user, assistant, backend,
+                                estimate_tokens(user) + estimate_tokens(assistant))
+        with self._lock:
+            self.turns.append(turn)
+            self.stats['turns'] += 1
+            if backend != 'ollama':
+                # Ollama-Kontext kennt diese Runde nicht
+                self._ollama_context = None
+            history_tokens = self._history_tokens()
+
+            # Notbremse, falls die Zusammenfassung nicht hinterherkommt
+            while history_tokens > 2 * self.history_budget and len(self.turns) > self.keep_recent:
+                dropped = self.turns.pop(0)
+                history_tokens -= dropped.tokens
+                self.stats['dropped_turns'] += 1
+
+            start_summary = (history_tokens > self.history_budget and not self._summarizing
+                             and self.summarizer is not None and len(self.turns) > self.keep_recent)
+            if start_summary:
+                self._summarizing = True
+                old_turns = self.turns[:-self.keep_recent]
+                previous_summary = self.summary
+        if start_summary:
+            threading.Thread(target=self._summarize, args=(old_turns, previous_summary),
+                             name='ConversationSummary', daemon=True).start()
+
+    def _summarize(self, old_turns: List[ConversationTurn], previous_summary: str):
+        lines = [f"Bisherige Zusammenfassung: {previous_summary}"] if previous_summary else []
+        for turn in old_turns:
+            lines.append(f"Benutzer: {turn.user}\nToobix: {turn.assistant}")
+        prompt = ("Fasse dieses Gespräch in höchstens 5 Sätzen zusammen. Behalte Namen, "
+                  "Fakten und offene Aufgaben, lass Höflichkeiten weg:\n\n" + "\n\n".join(lines))
+        try:
+            summary = (self.summarizer(prompt) or '').strip()
+        except Exception as e:
+            logger.warning(f"Gesprächs-Zusammenfassung fehlgeschlagen: {e}")
+            summary = ''
+        with self._lock:
+            self._summarizing = False
+            if not summary:
+                return
+            # Nur die zusammengefassten Runden entfernen (neue sind evtl. dazugekommen)
+            summarized = {id(turn) for turn in old_turns}
+            self.turns = [turn for turn in self.turns if id(turn) not in summarized]
+            self.summary = summary
+            self.stats['summaries'] += 1
+        logger.info(f"📝 {len(old_turns)} Gesprächsrunden zusammengefasst")
+
+    def _history_tokens(self) -> int:
+        return estimate_tokens(self.summary) + sum(turn.tokens for turn in self.turns)
+
+    def _history_text(self) -> str:
+        if not self.turns and not self.summary:
+            return ''
+        lines = ["BISHERIGES GESPRÄCH:"]
+        if self.summary:
+            lines.append(f"Zusammenfassung: {self.summary}")
+        for turn in self.turns:
+            lines.append(f"Benutzer: {turn.user}\nToobix: {turn.assistant}")
+        return "\n".join(lines)
+
+    def reset(self):
+        """Neues Gespräch beginnen"""
+        with self._lock:
+            self.turns.clear()
+            self.summary = ''
+            self._ollama_context = None
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self.stats, 'id': self.id, 'history_turns': len(self.turns),
+                    'history_tokens': self._history_tokens(), 'has_summary': bool(self.summary),
+                    'ollama_context_tokens': len(self._ollama_context or [])}
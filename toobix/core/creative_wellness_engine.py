@@ -13,6 +13,8 @@ from dataclasses import dataclass, asdict
 from collections import defaultdict, deque
 import logging
 
+from .persistence import get_persistence_service
+
 # Konfiguriere Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -90,6 +92,9 @@ class CreativeWellnessEngine:
         # Datenverzeichnis
         self.data_dir = Path('toobix_wellness')
         self.data_dir.mkdir(exist_ok=True)
+        self.persistence = get_persistence_service()
+        self._wellness_store = self.persistence.register(
+            self.data_dir / 'wellness_data.json', self._serialize_wellness_data)
         
         # Audio-Verzeichnis
         self.audio_dir = self.data_dir / 'audio'
@@ -768,38 +773,33 @@ class CreativeWellnessEngine:
             logger.error(f"Fehler beim Laden Wellness-Daten: {e}")
     
     def _save_wellness_data(self) -> None:
-        """Speichert Wellness-Daten"""
-        try:
-            data_file = self.data_dir / 'wellness_data.json'
-            
-            # Sessions für Speicherung vorbereiten
-            sessions_data = []
-            for session in self.wellness_sessions[-50:]:  # Letzte 50 Sessions
-                sessions_data.append({
-                    'session_id': session.session_id,
-                    'type': session.type,
-                    'duration_minutes': session.duration_minutes,
-                    'start_time': session.start_time.isoformat(),
-                    'end_time': session.end_time.isoformat() if session.end_time else None,
-                    'effectiveness_rating': session.effectiveness_rating,
-                    'energy_before': session.energy_before,
-                    'energy_after': session.energy_after,
-                    'stress_before': session.stress_before,
-                    'stress_after': session.stress_after
-                })
-            
-            data = {
-                'sessions': sessions_data,
-                'streaks': dict(self.wellness_streaks),
-                'preferences': self.wellness_preferences,
-                'last_updated': datetime.now().isoformat()
-            }
-            
-            with open(data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                
-        except Exception as e:
-            logger.error(f"Fehler beim Speichern Wellness-Daten: {e}")
+        """Speichert Wellness-Daten (asynchron über den Persistenz-Service)"""
+        self.persistence.mark_dirty(self._wellness_store)
+    
+    def _serialize_wellness_data(self) -> Dict[str, Any]:
+        """Bereitet Wellness-Daten für die Speicherung vor"""
+        # Sessions für Speicherung vorbereiten
+        sessions_data = []
+        for session in self.wellness_sessions[-50:]:  # Letzte 50 Sessions
+            sessions_data.append({
+                'session_id': session.session_id,
+                'type': session.type,
+                'duration_minutes': session.duration_minutes,
+                'start_time': session.start_time.isoformat(),
+                'end_time': session.end_time.isoformat() if session.end_time else None,
+                'effectiveness_rating': session.effectiveness_rating,
+                'energy_before': session.energy_before,
+                'energy_after': session.energy_after,
+                'stress_before': session.stress_before,
+                'stress_after': session.stress_after
+            })
+        
+        return {
+            'sessions': sessions_data,
+            'streaks': dict(self.wellness_streaks),
+            'preferences': dict(self.wellness_preferences),
+            'last_updated': datetime.now().isoformat()
+        }
 
 if __name__ == "__main__":
     # Test der Wellness Engine
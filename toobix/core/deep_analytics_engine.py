@@ -4,16 +4,17 @@ Machine Learning für Produktivitäts-Patterns und Optimierung
 """
 import json
 import numpy as np
-import pandas as pd
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
-from collections import defaultdict, deque
 import logging
-import math
 import statistics
 
+from .persistence import get_persistence_service
+from .metric_store import MetricStore
+from .pattern_accumulators import PatternAccumulators, SESSION_BUCKET_MINUTES
+
 # Konfiguriere Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -62,8 +63,11 @@ class DeepAnalyticsEngine:
     
     def __init__(self):
         """Initialisiert Analytics Engine"""
-        self.behavioral_data = deque(maxlen=1000)  # Letzte 1000 Datenpunkte
+        self.metrics = MetricStore()  # Spaltenspeicher, bis 1 Mio. Datenpunkte
+        self.accumulators = PatternAccumulators()  # Streaming-Aggregate für Muster
         self.productivity_patterns = {}
+        self._patterns_version = -1
+        self._prediction_cache: Tuple[Optional[tuple], List[PredictiveInsight]] = (None, [])
         self.predictive_models = {}
         self.insights_history = []
         
@@ -78,6 +82,10 @@ class DeepAnalyticsEngine:
         # Datenverzeichnis
         self.data_dir = Path('toobix_analytics')
         self.data_dir.mkdir(exist_ok=True)
+        self.metrics_file = self.data_dir / 'metrics.npz'
+        self.persistence = get_persistence_service()
+        self._data_store = self.persistence.register(
+            self.data_dir / 'analytics_data.json', self._serialize_data)
         
         # Initialisierung
         self._load_historical_data()
@@ -87,10 +95,9 @@ class DeepAnalyticsEngine:
     def add_behavioral_data(self, context: str, focus_score: float, efficiency: float, 
                           energy_level: float, interruptions: int = 0, 
                           task_switches: int = 0, session_duration: float = 0) -> None:
-        """Fügt neue Verhaltens-Daten hinzu"""
+        """Fügt neue Verhaltens-Daten hinzu (O(1): Spalten + Streaming-Aggregate)"""
         now = datetime.now()
-        
-        metric = BehavioralMetric(
+        self.metrics.append(
             timestamp=now,
             context=context,
             focus_score=focus_score,
@@ -98,52 +105,52 @@ class DeepAnalyticsEngine:
             energy_level=energy_level,
             interruptions=interruptions,
             task_switches=task_switches,
-            session_duration=session_duration,
-            time_of_day=now.hour,
-            day_of_week=now.weekday()
+            session_duration=session_duration
+        )
+        self.accumulators.add(
+            timestamp=now,
+            context=context,
+            focus_score=focus_score,
+            efficiency=efficiency,
+            energy_level=energy_level,
+            interruptions=interruptions,
+            session_duration=session_duration
         )
         
-        self.behavioral_data.append(metric)
-        
-        # Periodische Analyse
-        if len(self.behavioral_data) % 10 == 0:
-            self._analyze_patterns()
-        
-        # Daten speichern
+        # Muster werden erst bei der nächsten Abfrage aus den Aggregaten abgeleitet
         self._save_data()
     
+    def _ensure_patterns(self) -> None:
+        """Leitet Muster neu ab, wenn seit der letzten Analyse Daten hinzukamen"""
+        if self._patterns_version != self.accumulators.version:
+            self._analyze_patterns()
+    
     def _analyze_patterns(self) -> None:
         """Analysiert Produktivitäts-Muster"""
-        if len(self.behavioral_data) < self.analysis_config['min_data_points']:
+        if len(self.metrics) < self.analysis_config['min_data_points']:
             return
         
         try:
+            self._patterns_version = self.accumulators.version
+            
             # Verschiedene Pattern-Analysen
             self._analyze_time_patterns()
             self._analyze_context_patterns()
             self._analyze_energy_patterns()
             self._analyze_efficiency_patterns()
             
-            logger.info("🔍 Pattern-Analyse abgeschlossen")
+            logger.debug("🔍 Pattern-Analyse abgeschlossen")
             
         except Exception as e:
             logger.error(f"Pattern-Analyse Fehler: {e}")
     
     def _analyze_time_patterns(self) -> None:
         """Analysiert zeitbasierte Muster"""
-        # Daten nach Stunden gruppieren
-        hourly_performance = defaultdict(list)
-        
-        for metric in self.behavioral_data:
-            hour = metric.time_of_day
-            performance = (metric.focus_score + metric.efficiency + metric.energy_level) / 3
-            hourly_performance[hour].append(performance)
-        
-        # Durchschnittliche Performance pro Stunde
-        hourly_averages = {}
-        for hour, performances in hourly_performance.items():
-            if len(performances) >= 3:  # Mindestens 3 Datenpunkte
-                hourly_averages[hour] = statistics.mean(performances)
+        # Durchschnittliche Performance pro Stunde (mindestens 3 Datenpunkte)
+        hourly_averages = {
+            hour: mean
+            for hour, (mean, _, _) in self.accumulators.summary('hour', min_count=3).items()
+        }
         
         if hourly_averages:
             # Beste Stunden identifizieren
@@ -170,21 +177,11 @@ class DeepAnalyticsEngine:
     
     def _analyze_context_patterns(self) -> None:
         """Analysiert kontext-basierte Muster"""
-        context_performance = defaultdict(list)
-        
-        for metric in self.behavioral_data:
-            performance = (metric.focus_score + metric.efficiency) / 2
-            context_performance[metric.context].append(performance)
-        
         # Durchschnittliche Performance pro Kontext
-        context_averages = {}
-        for context, performances in context_performance.items():
-            if len(performances) >= 3:
-                context_averages[context] = {
-                    'mean': statistics.mean(performances),
-                    'std': statistics.stdev(performances) if len(performances) > 1 else 0,
-                    'count': len(performances)
-                }
+        context_averages = {
+            context: {'mean': mean, 'std': std, 'count': count}
+            for context, (mean, std, count) in self.accumulators.summary('context', min_count=3).items()
+        }
         
         if context_averages:
             # Besten Kontext identifizieren
@@ -209,27 +206,22 @@ class DeepAnalyticsEngine:
     
     def _analyze_energy_patterns(self) -> None:
         """Analysiert Energy-Level Muster"""
-        # Energy vs. Performance Korrelation
-        energy_levels = [m.energy_level for m in self.behavioral_data]
-        performance_scores = [(m.focus_score + m.efficiency) / 2 for m in self.behavioral_data]
+        # Energy vs. Performance Korrelation (zeitlich gewichtet, laufend aktualisiert)
+        energy_performance = self.accumulators.energy_performance
         
-        if len(energy_levels) >= 10:
-            correlation = self._calculate_correlation(energy_levels, performance_scores)
-            
-            # Energy-Schwellen identifizieren
-            high_energy_threshold = statistics.quantile(energy_levels, 0.75)
-            low_energy_threshold = statistics.quantile(energy_levels, 0.25)
+        if energy_performance.count >= 10:
+            correlation = energy_performance.correlation
+            now = datetime.now().timestamp()
             
-            # Performance bei verschiedenen Energy-Levels
-            high_energy_performance = statistics.mean([
-                perf for energy, perf in zip(energy_levels, performance_scores)
-                if energy >= high_energy_threshold
-            ])
+            # Energy-Schwellen aus dem Bucket-Histogramm
+            high_energy_threshold = self.accumulators.energy_quantile(0.75, now)
+            low_energy_threshold = self.accumulators.energy_quantile(0.25, now)
             
-            low_energy_performance = statistics.mean([
-                perf for energy, perf in zip(energy_levels, performance_scores)
-                if energy <= low_energy_threshold
-            ])
+            # Performance bei verschiedenen Energy-Levels (Buckets ober-/unterhalb der Schwellen)
+            high_energy_performance = self.accumulators.mean_performance_where(
+                'energy', lambda bucket: bucket + 10 > high_energy_threshold, now)
+            low_energy_performance = self.accumulators.mean_performance_where(
+                'energy', lambda bucket: bucket <= low_energy_threshold, now)
             
             pattern = ProductivityPattern(
                 pattern_id="energy_performance",
@@ -241,10 +233,10 @@ class DeepAnalyticsEngine:
                     'high_energy_threshold': high_energy_threshold,
                     'low_energy_threshold': low_energy_threshold,
                     'correlation': correlation,
-                    'high_energy_performance': high_energy_performance,
-                    'low_energy_performance': low_energy_performance
+                    'high_energy_performance': high_energy_performance or 0.0,
+                    'low_energy_performance': low_energy_performance or 0.0
                 },
-                average_performance=statistics.mean(performance_scores),
+                average_performance=energy_performance.mean_y,
                 frequency="continuous"
             )
             
@@ -252,25 +244,15 @@ class DeepAnalyticsEngine:
     
     def _analyze_efficiency_patterns(self) -> None:
         """Analysiert Effizienz-Muster"""
-        # Session-Länge vs. Effizienz
-        session_durations = [m.session_duration for m in self.behavioral_data if m.session_duration > 0]
-        session_efficiencies = [m.efficiency for m in self.behavioral_data if m.session_duration > 0]
+        # Session-Länge vs. Effizienz in 15min-Buckets (0, 15, 30, 45, etc.)
+        session_buckets = self.accumulators.summary('session')
+        session_count = sum(count for _, _, count in session_buckets.values())
         
-        if len(session_durations) >= 5:
-            # Optimale Session-Länge finden
-            duration_efficiency_pairs = list(zip(session_durations, session_efficiencies))
-            
-            # In Buckets gruppieren (15min Intervalle)
-            bucket_efficiency = defaultdict(list)
-            for duration, efficiency in duration_efficiency_pairs:
-                bucket = int(duration // 15) * 15  # 0, 15, 30, 45, etc.
-                bucket_efficiency[bucket].append(efficiency)
-            
+        if session_count >= 5:
             # Durchschnittliche Effizienz pro Bucket
-            bucket_averages = {}
-            for bucket, efficiencies in bucket_efficiency.items():
-                if len(efficiencies) >= 2:
-                    bucket_averages[bucket] = statistics.mean(efficiencies)
+            bucket_averages = {
+                bucket: mean for bucket, (mean, _, count) in session_buckets.items() if count >= 2
+            }
             
             if bucket_averages:
                 optimal_duration = max(bucket_averages.items(), key=lambda x: x[1])
@@ -286,7 +268,7 @@ class DeepAnalyticsEngine:
                         'optimal_efficiency': optimal_duration[1],
                         'duration_buckets': dict(bucket_averages)
                     },
-                    average_performance=statistics.mean(session_efficiencies),
+                    average_performance=sum(mean * count for mean, _, count in session_buckets.values()) / session_count,
                     frequency="session_based"
                 )
                 
@@ -294,29 +276,22 @@ class DeepAnalyticsEngine:
     
     def _calculate_correlation(self, x: List[float], y: List[float]) -> float:
         """Berechnet Pearson-Korrelation"""
-        if len(x) != len(y) or len(x) < 2:
-            return 0.0
-        
-        mean_x = statistics.mean(x)
-        mean_y = statistics.mean(y)
-        
-        numerator = sum((xi - mean_x) * (yi - mean_y) for xi, yi in zip(x, y))
-        
-        sum_sq_x = sum((xi - mean_x) ** 2 for xi in x)
-        sum_sq_y = sum((yi - mean_y) ** 2 for yi in y)
-        
-        denominator = math.sqrt(sum_sq_x * sum_sq_y)
-        
-        return numerator / denominator if denominator != 0 else 0.0
+        return MetricStore.correlation(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64))
     
     def generate_predictions(self) -> List[PredictiveInsight]:
-        """Generiert Vorhersagen basierend auf Mustern"""
-        predictions = []
+        """Generiert Vorhersagen basierend auf Mustern (zwischengespeichert bis neue Daten kommen)"""
+        if len(self.metrics) < 5:
+            return []
         
-        if len(self.behavioral_data) < 5:
-            return predictions
+        # Vorhersagen hängen nur von den Daten und der aktuellen Stunde ab
+        cache_key = (self.accumulators.version, datetime.now().hour)
+        if self._prediction_cache[0] == cache_key:
+            return list(self._prediction_cache[1])
         
+        predictions = []
         try:
+            self._ensure_patterns()
+            
             # Performance-Vorhersage
             predictions.extend(self._predict_performance())
             
@@ -330,11 +305,12 @@ class DeepAnalyticsEngine:
             predictions.extend(self._predict_distraction_risks())
             
             self.insights_history.extend(predictions)
+            self._prediction_cache = (cache_key, predictions)
             
         except Exception as e:
             logger.error(f"Vorhersage-Fehler: {e}")
         
-        return predictions
+        return list(predictions)
     
     def _predict_performance(self) -> List[PredictiveInsight]:
         """Vorhersage der Performance"""
@@ -380,7 +356,7 @@ class DeepAnalyticsEngine:
             correlation = pattern.optimal_conditions['correlation']
             
             # Aktuelle Energy-Trend analysieren
-            recent_energy = [m.energy_level for m in list(self.behavioral_data)[-5:]]
+            recent_energy = self.metrics.column('energy_level')[-5:].tolist()
             if len(recent_energy) >= 3:
                 energy_trend = statistics.mean(recent_energy[-3:]) - statistics.mean(recent_energy[:2])
                 
@@ -424,23 +400,28 @@ class DeepAnalyticsEngine:
         """Vorhersage optimaler Arbeitszeiten"""
         predictions = []
         
-        # Basierend auf historischen Daten
-        hourly_performance = defaultdict(list)
-        for metric in self.behavioral_data:
-            performance = (metric.focus_score + metric.efficiency) / 2
-            hourly_performance[metric.time_of_day].append(performance)
+        # Basierend auf historischen Daten: Stunde der Woche, sonst dieselbe
+        # Stunde über alle Wochentage (beides (Fokus + Effizienz) / 2)
+        hourly_performance = self.accumulators.summary('hour_of_week')
         
         if len(hourly_performance) >= 3:
             # Heute noch verbleibende Stunden analysieren
-            current_hour = datetime.now().hour
-            remaining_hours = list(range(current_hour + 1, 24))
+            now = datetime.now()
+            current_hour = now.hour
+            week_offset = now.weekday() * 24
             
             # Performance-Vorhersage für verbleibende Stunden
             hour_predictions = []
-            for hour in remaining_hours:
-                if hour in hourly_performance and len(hourly_performance[hour]) >= 2:
-                    avg_performance = statistics.mean(hourly_performance[hour])
-                    hour_predictions.append((hour, avg_performance))
+            for hour in range(current_hour + 1, 24):
+                weekly = hourly_performance.get(week_offset + hour)
+                if weekly and weekly[2] >= 2:
+                    hour_predictions.append((hour, weekly[0]))
+                    continue
+                samples = sum(count for key, (_, _, count) in hourly_performance.items() if key % 24 == hour)
+                if samples >= 2:
+                    pooled = self.accumulators.mean_performance_where(
+                        'hour_of_week', lambda key, h=hour: key % 24 == h, now.timestamp())
+                    hour_predictions.append((hour, pooled))
             
             if hour_predictions:
                 # Beste verbleibende Stunde
@@ -469,21 +450,12 @@ class DeepAnalyticsEngine:
         predictions = []
         
         # Analyse der Interruption-Patterns
-        interruption_data = [(m.timestamp, m.interruptions) for m in self.behavioral_data if m.interruptions > 0]
-        
-        if len(interruption_data) >= 5:
-            # Zeitliche Muster in Interruptions
-            hourly_interruptions = defaultdict(list)
-            for timestamp, interruptions in interruption_data:
-                hourly_interruptions[timestamp.hour].append(interruptions)
-            
+        if self.accumulators.interrupted_sessions >= 5:
             # Durchschnittliche Interruptions pro Stunde
-            risky_hours = []
-            for hour, interruptions in hourly_interruptions.items():
-                if len(interruptions) >= 2:
-                    avg_interruptions = statistics.mean(interruptions)
-                    if avg_interruptions > 2:  # Threshold für "risky"
-                        risky_hours.append((hour, avg_interruptions))
+            risky_hours = [
+                (hour, mean) for hour, (mean, _, _) in self.accumulators.summary('interruptions', min_count=2).items()
+                if mean > 2  # Threshold für "risky"
+            ]
             
             if risky_hours:
                 current_hour = datetime.now().hour
@@ -514,9 +486,10 @@ class DeepAnalyticsEngine:
     def get_analytics_dashboard(self) -> Dict[str, Any]:
         """Liefert umfassendes Analytics-Dashboard"""
         try:
+            self._ensure_patterns()
             dashboard = {
                 'overview': {
-                    'data_points': len(self.behavioral_data),
+                    'data_points': len(self.metrics),
                     'patterns_identified': len(self.productivity_patterns),
                     'analysis_confidence': self._calculate_overall_confidence(),
                     'last_analysis': datetime.now().isoformat()
@@ -528,7 +501,10 @@ class DeepAnalyticsEngine:
                 'recent_insights': [
                     asdict(insight) for insight in self.insights_history[-5:]
                 ],
+                'metric_statistics': {name: stats.to_dict() for name, stats in self.metrics.stats.items()},
+                'correlations': self.metrics.correlation_matrix(),
                 'performance_trends': self._analyze_performance_trends(),
+                'performance_groups': self._performance_groups(),
                 'optimization_opportunities': self._identify_optimization_opportunities(),
                 'recommendations': self._generate_smart_recommendations()
             }
@@ -545,69 +521,98 @@ class DeepAnalyticsEngine:
             return 0.0
         
         confidences = [pattern.confidence for pattern in self.productivity_patterns.values()]
-        data_factor = min(1.0, len(self.behavioral_data) / 100)  # Mehr Daten = höhere Confidence
+        data_factor = min(1.0, len(self.metrics) / 100)  # Mehr Daten = höhere Confidence
         
         return statistics.mean(confidences) * data_factor
     
     def _analyze_performance_trends(self) -> Dict[str, Any]:
         """Analysiert Performance-Trends"""
-        if len(self.behavioral_data) < 5:
+        if len(self.metrics) < 5:
             return {}
         
-        # Letzte 7 Tage vs. vorherige 7 Tage
+        # Letzte 7 Tage vs. vorherige 7 Tage (Zeitstempel sind sortiert -> Slices)
         now = datetime.now()
-        last_week = [m for m in self.behavioral_data if (now - m.timestamp).days <= 7]
-        prev_week = [m for m in self.behavioral_data if 7 < (now - m.timestamp).days <= 14]
+        last_week = self.metrics.since(now - timedelta(days=8))
+        prev_week = self.metrics.between(now - timedelta(days=15), now - timedelta(days=8))
         
         trends = {}
         
-        if last_week and prev_week:
+        if last_week.stop > last_week.start and prev_week.stop > prev_week.start:
+            performance = self.metrics.performance()
+            energy = self.metrics.column('energy_level')
+            
             # Performance-Vergleich
-            last_week_perf = statistics.mean([(m.focus_score + m.efficiency) / 2 for m in last_week])
-            prev_week_perf = statistics.mean([(m.focus_score + m.efficiency) / 2 for m in prev_week])
+            last_week_perf = float(performance[last_week].mean())
+            prev_week_perf = float(performance[prev_week].mean())
             
             trends['performance_change'] = ((last_week_perf - prev_week_perf) / prev_week_perf) * 100
             trends['trend_direction'] = 'improving' if trends['performance_change'] > 0 else 'declining'
             
             # Energy-Trend
-            last_week_energy = statistics.mean([m.energy_level for m in last_week])
-            prev_week_energy = statistics.mean([m.energy_level for m in prev_week])
+            last_week_energy = float(energy[last_week].mean())
+            prev_week_energy = float(energy[prev_week].mean())
             
             trends['energy_change'] = ((last_week_energy - prev_week_energy) / prev_week_energy) * 100
+            
+            # Geglätteter Verlauf der letzten Woche (gleitendes Mittel über 10 Datenpunkte)
+            rolling = self.metrics.rolling_mean(performance[last_week], 10)
+            if len(rolling):
+                trends['rolling_performance'] = [round(float(v), 1) for v in rolling[-50:]]
         
         return trends
     
+    def _performance_groups(self) -> Dict[str, Any]:
+        """Ungewichtete Performance je Stunde, Wochentag, Kontext und Sitzungslänge über alle Daten"""
+        if not len(self.metrics):
+            return {}
+
+        performance = self.metrics.performance()
+        durations = self.metrics.column('session_duration')
+        timed = durations > 0
+
+        def rounded(groups):
+            return {key: {'mean': round(mean, 1), 'std': round(std, 1), 'count': count}
+                    for key, (mean, std, count) in groups.items()}
+
+        return {
+            'by_hour': rounded(self.metrics.group('time_of_day', performance)),
+            'by_weekday': rounded(self.metrics.group('day_of_week', performance)),
+            'by_context': rounded(self.metrics.group('context', performance)),
+            'by_session_minutes': {
+                minutes: {'mean': round(mean, 1), 'count': count}
+                for minutes, (mean, count) in self.metrics.bucket_means(
+                    performance[timed], durations[timed], SESSION_BUCKET_MINUTES).items()
+            }
+        }
+
     def _identify_optimization_opportunities(self) -> List[Dict[str, Any]]:
         """Identifiziert Optimierungs-Möglichkeiten"""
         opportunities = []
+        total = len(self.metrics)
         
-        if len(self.behavioral_data) < 10:
+        if total < 10:
             return opportunities
         
         # Niedrige Effizienz-Zeiten identifizieren
-        low_efficiency_sessions = [m for m in self.behavioral_data if m.efficiency < 60]
-        if len(low_efficiency_sessions) > len(self.behavioral_data) * 0.3:  # Mehr als 30% niedrige Effizienz
-            common_contexts = defaultdict(int)
-            for session in low_efficiency_sessions:
-                common_contexts[session.context] += 1
-            
-            if common_contexts:
-                worst_context = max(common_contexts.items(), key=lambda x: x[1])
-                opportunities.append({
-                    'type': 'context_optimization',
-                    'title': 'Kontext-Optimierung',
-                    'description': f'Niedrige Effizienz in "{worst_context[0]}" - {worst_context[1]} mal',
-                    'impact': 'medium',
-                    'effort': 'low'
-                })
+        low_efficiency = self.metrics.column('efficiency') < 60
+        if int(low_efficiency.sum()) > total * 0.3:  # Mehr als 30% niedrige Effizienz
+            context_counts = np.bincount(self.metrics.column('context')[low_efficiency])
+            worst_code = int(context_counts.argmax())
+            opportunities.append({
+                'type': 'context_optimization',
+                'title': 'Kontext-Optimierung',
+                'description': f'Niedrige Effizienz in "{self.metrics.contexts[worst_code]}" - {int(context_counts[worst_code])} mal',
+                'impact': 'medium',
+                'effort': 'low'
+            })
         
         # Hohe Interruption-Zeiten
-        high_interruption_sessions = [m for m in self.behavioral_data if m.interruptions > 3]
-        if len(high_interruption_sessions) > 5:
+        high_interruption_sessions = int((self.metrics.column('interruptions') > 3).sum())
+        if high_interruption_sessions > 5:
             opportunities.append({
                 'type': 'distraction_management',
                 'title': 'Distraktions-Management',
-                'description': f'{len(high_interruption_sessions)} Sessions mit hohen Unterbrechungen',
+                'description': f'{high_interruption_sessions} Sessions mit hohen Unterbrechungen',
                 'impact': 'high',
                 'effort': 'medium'
             })
@@ -617,12 +622,10 @@ class DeepAnalyticsEngine:
             pattern = self.productivity_patterns["session_efficiency"]
             optimal_duration = pattern.optimal_conditions['optimal_duration_minutes']
             
-            suboptimal_sessions = [
-                m for m in self.behavioral_data 
-                if m.session_duration > 0 and abs(m.session_duration - optimal_duration) > 15
-            ]
+            durations = self.metrics.column('session_duration')
+            suboptimal_sessions = int(((durations > 0) & (np.abs(durations - optimal_duration) > 15)).sum())
             
-            if len(suboptimal_sessions) > len(self.behavioral_data) * 0.4:
+            if suboptimal_sessions > total * 0.4:
                 opportunities.append({
                     'type': 'session_timing',
                     'title': 'Session-Timing Optimierung',
@@ -637,7 +640,7 @@ class DeepAnalyticsEngine:
         """Generiert intelligente Empfehlungen"""
         recommendations = []
         
-        if len(self.behavioral_data) < 5:
+        if len(self.metrics) < 5:
             recommendations.append("🔍 Sammle mehr Daten für präzisere Empfehlungen")
             return recommendations
         
@@ -664,7 +667,15 @@ class DeepAnalyticsEngine:
     def _load_historical_data(self) -> None:
         """Lädt historische Analytics-Daten"""
         try:
+            if self.metrics.load(self.metrics_file):
+                if not self._load_accumulators(self.data_dir / 'analytics_data.json'):
+                    self._rebuild_accumulators()
+                logger.info(f"📊 {len(self.metrics)} Analytics-Datenpunkte geladen")
+                return
+            
+            # Älteres Format: nur die letzten 100 Datenpunkte im JSON
             data_file = self.data_dir / 'analytics_data.json'
+            self._load_accumulators(data_file)
             if data_file.exists():
                 with open(data_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
@@ -673,7 +684,7 @@ class DeepAnalyticsEngine:
                     behavioral_data = data.get('behavioral_data', [])
                     for item in behavioral_data[-100:]:  # Letzte 100 Einträge
                         try:
-                            metric = BehavioralMetric(
+                            self.metrics.append(
                                 timestamp=datetime.fromisoformat(item['timestamp']),
                                 context=item['context'],
                                 focus_score=item['focus_score'],
@@ -681,51 +692,63 @@ class DeepAnalyticsEngine:
                                 energy_level=item['energy_level'],
                                 interruptions=item['interruptions'],
                                 task_switches=item['task_switches'],
-                                session_duration=item['session_duration'],
-                                time_of_day=item['time_of_day'],
-                                day_of_week=item['day_of_week']
+                                session_duration=item['session_duration']
                             )
-                            self.behavioral_data.append(metric)
                         except Exception as e:
                             logger.error(f"Fehler beim Laden Behavioral Data: {e}")
                     
-                    logger.info(f"📊 {len(self.behavioral_data)} Analytics-Datenpunkte geladen")
+                    if not self.accumulators.version:
+                        self._rebuild_accumulators()
+                    logger.info(f"📊 {len(self.metrics)} Analytics-Datenpunkte geladen")
                     
         except Exception as e:
             logger.error(f"Fehler beim Laden historischer Daten: {e}")
     
-    def _save_data(self) -> None:
-        """Speichert Analytics-Daten"""
+    def _load_accumulators(self, data_file: Path) -> bool:
+        """Lädt gespeicherte Streaming-Aggregate"""
         try:
-            data_file = self.data_dir / 'analytics_data.json'
-            
-            # Behavioral Data für Speicherung vorbereiten
-            behavioral_data = []
-            for metric in list(self.behavioral_data)[-100:]:  # Letzte 100 Einträge
-                behavioral_data.append({
-                    'timestamp': metric.timestamp.isoformat(),
-                    'context': metric.context,
-                    'focus_score': metric.focus_score,
-                    'efficiency': metric.efficiency,
-                    'energy_level': metric.energy_level,
-                    'interruptions': metric.interruptions,
-                    'task_switches': metric.task_switches,
-                    'session_duration': metric.session_duration,
-                    'time_of_day': metric.time_of_day,
-                    'day_of_week': metric.day_of_week
-                })
-            
-            data = {
-                'behavioral_data': behavioral_data,
-                'patterns': {pid: asdict(pattern) for pid, pattern in self.productivity_patterns.items()},
-                'last_updated': datetime.now().isoformat()
-            }
-            
-            with open(data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                
+            if data_file.exists():
+                with open(data_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('accumulators'):
+                    self.accumulators = PatternAccumulators.from_dict(data['accumulators'])
+                    return True
         except Exception as e:
-            logger.error(f"Fehler beim Speichern Analytics-Daten: {e}")
+            logger.error(f"Fehler beim Laden der Pattern-Aggregate: {e}")
+        return False
+    
+    def _rebuild_accumulators(self) -> None:
+        """Baut die Streaming-Aggregate einmalig aus der Historie auf (Migration)"""
+        self.accumulators = PatternAccumulators()
+        columns = {name: self.metrics.column(name).tolist() for name in (
+            'timestamp', 'focus_score', 'efficiency', 'energy_level', 'interruptions', 'session_duration')}
+        contexts = [self.metrics.contexts[code] for code in self.metrics.column('context').tolist()]
+        for i, context in enumerate(contexts):
+            self.accumulators.add(
+                timestamp=datetime.fromtimestamp(columns['timestamp'][i]),
+                context=context,
+                focus_score=columns['focus_score'][i],
+                efficiency=columns['efficiency'][i],
+                energy_level=columns['energy_level'][i],
+                interruptions=int(columns['interruptions'][i]),
+                session_duration=columns['session_duration'][i]
+            )
+    
+    def _save_data(self) -> None:
+        """Speichert Analytics-Daten (asynchron über den Persistenz-Service)"""
+        self.persistence.mark_dirty(self._data_store)
+    
+    def _serialize_data(self) -> Dict[str, Any]:
+        """Bereitet Analytics-Daten für die Speicherung vor"""
+        # Neue Datenpunkte ans Log, gelegentlich ein kompakter Snapshot (läuft auf dem Persistenz-Thread)
+        self.metrics.flush_log(self.metrics_file)
+        
+        return {
+            'behavioral_data': self.metrics.tail_records(100),  # Letzte 100 Einträge lesbar
+            'patterns': {pid: asdict(pattern) for pid, pattern in dict(self.productivity_patterns).items()},
+            'accumulators': self.accumulators.to_dict(),
+            'last_updated': datetime.now().isoformat()
+        }
 
 if __name__ == "__main__":
     # Test der Analytics Engine
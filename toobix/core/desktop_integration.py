@@ -5,14 +5,17 @@ Windows-Systemintegration, Dateiverwaltung und Automation
 import os
 import subprocess
 import psutil
-import pygetwindow as gw
-import pyautogui
-import keyboard
 import time
 import shutil
 from pathlib import Path
 from typing import List, Dict, Optional, Any
 from toobix.core.system_organizer import SystemOrganizer
+from toobix.core.process_table import get_process_table
+from toobix.core.startup_profiler import lazy_import
+
+# Fenster-/Eingabe-Automation erst bei Bedarf laden (pyautogui braucht allein mehrere 100 ms)
+gw = lazy_import('pygetwindow')
+pyautogui = lazy_import('pyautogui')
 
 class DesktopIntegration:
     """Verwaltet Windows Desktop-Integration und Automation"""
@@ -117,14 +120,15 @@ class DesktopIntegration:
             program_name = program_name.lower()
             closed_count = 0
             
-            # Alle Prozesse durchsuchen
-            for proc in psutil.process_iter(['pid', 'name']):
+            # Passende Prozesse aus der gemeinsamen Prozess-Tabelle
+            process_table = get_process_table()
+            for proc_info in process_table.find_by_name(program_name, exact=False):
                 try:
-                    if program_name in proc.info['name'].lower():
-                        proc.terminate()
-                        closed_count += 1
+                    proc_info.process.terminate()
+                    closed_count += 1
                 except (psutil.NoSuchProcess, psutil.AccessDenied):
                     continue
+            process_table.invalidate()
             
             if closed_count > 0:
                 print(f"✅ {closed_count} Instanz(en) von {program_name} geschlossen")
@@ -140,16 +144,7 @@ class DesktopIntegration:
     def get_running_programs(self) -> List[str]:
         """Gibt Liste laufender Programme zurück"""
         try:
-            programs = set()
-            for proc in psutil.process_iter(['name']):
-                try:
-                    name = proc.info['name']
-                    if name and not name.startswith('System'):
-                        programs.add(name)
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-            
-            return sorted(list(programs))
+            return [name for name in get_process_table().names() if not name.startswith('System')]
             
         except Exception as e:
             print(f"❌ Fehler beim Abrufen der Programme: {e}")
@@ -393,8 +388,8 @@ class DesktopIntegration:
         except Exception as e:
             return f"❌ Fehler beim Erstellen des Aufräumplans: {e}"
     
-    def execute_cleanup(self, confirm: bool = False) -> str:
-        """Führt sichere System-Aufräumung aus"""
+    def execute_cleanup(self, confirm: bool = False, include_duplicates: bool = False) -> str:
+        """Führt sichere System-Aufräumung aus (Duplikate nur mit include_duplicates)"""
         try:
             if not confirm:
                 return "⚠️ Sicherheitsabfrage: Füge 'bestätigt' zum Befehl hinzu um fortzufahren!\nBeispiel: 'toobix aufräumen starten bestätigt'"
@@ -403,7 +398,7 @@ class DesktopIntegration:
             plan = self.organizer.create_safe_cleanup_plan(analysis)
             
             # Erst Dry-Run
-            dry_results = self.organizer.execute_safe_cleanup(plan, dry_run=True)
+            dry_results = self.organizer.execute_safe_cleanup(plan, dry_run=True, include_review=include_duplicates)
             
             report = "🧪 AUFRÄUMUNG SIMULATION:\n\n"
             report += f"✅ {len(dry_results['completed_actions'])} Aktionen simuliert\n"
@@ -411,7 +406,7 @@ class DesktopIntegration:
             report += f"💾 Geschätzter Speichergewinn: {dry_results['space_freed_gb']:.2f} GB\n\n"
             
             # Echte Ausführung
-            real_results = self.organizer.execute_safe_cleanup(plan, dry_run=False)
+            real_results = self.organizer.execute_safe_cleanup(plan, dry_run=False, include_review=include_duplicates)
             
             report += "🔄 ECHTE AUSFÜHRUNG:\n\n"
             report += f"✅ {len(real_results['completed_actions'])} Aktionen erfolgreich\n"
@@ -434,6 +429,12 @@ class DesktopIntegration:
                 for error in real_results['failed_actions']:
                     report += f"• {error.get('action', 'Unbekannt')}: {error.get('error', 'Unbekannter Fehler')}\n"
             
+            if real_results['skipped_actions']:
+                report += "\n⏸️ ÜBERSPRUNGEN (Prüfung nötig):\n"
+                for skipped in real_results['skipped_actions']:
+                    report += f"• {skipped['action']}: {skipped['reason']}\n"
+                report += "💡 Duplikate löschen: 'toobix aufräumen starten bestätigt duplikate'\n"
+            
             report += "\n✨ Aufräumung abgeschlossen!"
             
             return report
@@ -448,12 +449,17 @@ class DesktopIntegration:
             
             report = "💾 BACKUP ERSTELLT:\n\n"
             report += f"📁 Backup-Ort: {backup_info['backup_location']}\n"
-            report += f"💾 Gesamtgröße: {backup_info['total_size_gb']:.2f} GB\n\n"
+            report += f"🆔 Snapshot: {backup_info['snapshot_id']}\n"
+            report += f"💾 Gesamtgröße: {backup_info['total_size_gb']:.2f} GB\n"
+            report += f"🆕 Neu geschrieben: {backup_info['new_data_gb']:.2f} GB "
+            report += f"({backup_info['unchanged_files']} Dateien unverändert)\n\n"
             
             report += "📋 GESICHERTE ORDNER:\n"
             for backup in backup_info['backed_up_dirs']:
                 report += f"• {backup['source']} → {backup['size_gb']:.2f} GB\n"
             
+            if backup_info['errors']:
+                report += f"\n⚠️ {backup_info['errors']} Dateien konnten nicht gesichert werden"
             report += "\n✅ Backup erfolgreich erstellt!"
             report += "\n💡 Du kannst jetzt sicher aufräumen!"
             
@@ -461,3 +467,56 @@ class DesktopIntegration:
             
         except Exception as e:
             return f"❌ Fehler beim Backup: {e}"
+    
+    def list_backups(self) -> str:
+        """Listet vorhandene Backup-Snapshots"""
+        try:
+            snapshots = self.organizer.list_backups()
+            if not snapshots:
+                return "📭 Noch keine Backups vorhanden. Tipp: 'backup erstellen'"
+            
+            report = "💾 BACKUP-SNAPSHOTS:\n\n"
+            for snapshot in snapshots[-10:]:
+                stats = snapshot['stats']
+                report += (f"• {snapshot['id']} ({snapshot['created']}) - {stats.get('files', 0)} Dateien, "
+                           f"{stats.get('bytes_total', 0) / (1024**3):.2f} GB\n")
+            return report
+            
+        except Exception as e:
+            return f"❌ Fehler beim Auflisten der Backups: {e}"
+    
+    def verify_backup(self) -> str:
+        """Prüft den neuesten Backup-Snapshot"""
+        try:
+            result = self.organizer.verify_backup()
+            if 'error' in result:
+                return f"❌ {result['error']}"
+            if result['success']:
+                return (f"✅ Backup {result['snapshot_id']} ist intakt "
+                        f"({result['checked_chunks']} Chunks geprüft)")
+            
+            report = f"❌ Backup {result['snapshot_id']} ist beschädigt:\n"
+            for chunk_id in result['damaged_chunks'][:10]:
+                report += f"• Chunk {chunk_id}\n"
+            return report
+            
+        except Exception as e:
+            return f"❌ Fehler bei der Backup-Prüfung: {e}"
+    
+    def restore_backup(self) -> str:
+        """Stellt den neuesten Backup-Snapshot in einen separaten Ordner wieder her"""
+        try:
+            result = self.organizer.restore_backup()
+            if 'error' in result:
+                return f"❌ {result['error']}"
+            report = "♻️ BACKUP WIEDERHERGESTELLT:\n\n"
+            report += f"🆔 Snapshot: {result['snapshot_id']}\n"
+            report += f"📁 Ziel: {result['target']}\n"
+            report += f"📄 Dateien: {result['restored_files']}\n"
+            report += f"💾 Größe: {result['restored_bytes'] / (1024**3):.2f} GB\n"
+            if result['errors']:
+                report += f"⚠️ {len(result['errors'])} Dateien fehlgeschlagen\n"
+            return report
+            
+        except Exception as e:
+            return f"❌ Fehler bei der Wiederherstellung: {e}"
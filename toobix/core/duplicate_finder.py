@@ -0,0 +1,375 @@
+"""
+Toobix Duplicate Finder
+Inhaltsbasierte Duplikat-Erkennung mit Größen-Buckets, Teil-Hashes und Hash-Cache
+"""
+import os
+import json
+import mmap
+import time
+import hashlib
+import threading
+import logging
+from pathlib import Path
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Größe der Teil-Hashes (Anfang + Ende der Datei)
+PARTIAL_CHUNK_SIZE = 64 * 1024
+# Blockgröße beim Hashen über mmap
+FULL_HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+@dataclass
+class DuplicateGroup:
+    """Gruppe inhaltsgleicher Dateien"""
+    digest: str
+    size: int
+    paths: List[str] = field(default_factory=list)
+
+    @property
+    def wasted_bytes(self) -> int:
+        """Speicher, der durch Entfernen der Kopien frei würde"""
+        return self.size * (len(self.paths) - 1)
+
+
+class HashCache:
+    """Persistenter Hash-Cache, gültig solange (inode, mtime, size) unverändert sind"""
+
+    def __init__(self, cache_file: Path):
+        self.cache_file = Path(cache_file)
+        self._entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._dirty = False
+
+    def _ensure_loaded(self):
+        """Lädt den Cache beim ersten Zugriff"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                if self.cache_file.exists():
+                    with open(self.cache_file, 'r', encoding='utf-8') as f:
+                        self._entries = json.load(f)
+            except Exception as e:
+                logger.error(f"Hash-Cache konnte nicht geladen werden: {e}")
+                self._entries = {}
+            self._loaded = True
+
+    def get(self, path: str, signature: Tuple[int, int, int], kind: str) -> Optional[str]:
+        """Gibt gecachten Hash zurück, falls die Datei unverändert ist"""
+        self._ensure_loaded()
+        entry = self._entries.get(path)
+        if not entry or tuple(entry.get('sig', ())) != signature:
+            return None
+        return entry.get(kind)
+
+    def put(self, path: str, signature: Tuple[int, int, int], kind: str, digest: str):
+        """Speichert einen Hash für die aktuelle Datei-Signatur"""
+        self._ensure_loaded()
+        with self._lock:
+            entry = self._entries.get(path)
+            if not entry or tuple(entry.get('sig', ())) != signature:
+                entry = {'sig': list(signature)}
+                self._entries[path] = entry
+            entry[kind] = digest
+            self._dirty = True
+
+    def prune(self, roots: Iterable[str], seen_paths: Iterable[str]):
+        """Entfernt Einträge unter gescannten Wurzeln, die nicht mehr existieren"""
+        self._ensure_loaded()
+        seen = set(seen_paths)
+        prefixes = tuple(os.path.join(os.path.abspath(r), '') for r in roots)
+        with self._lock:
+            stale = [p for p in self._entries if p.startswith(prefixes) and p not in seen]
+            for path in stale:
+                del self._entries[path]
+            if stale:
+                self._dirty = True
+
+    def save(self):
+        """Schreibt den Cache atomar (temp-Datei + rename)"""
+        if not self._dirty:
+            return
+        with self._lock:
+            try:
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.cache_file.with_suffix('.tmp')
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(self._entries, f, separators=(',', ':'))
+                os.replace(tmp_file, self.cache_file)
+                self._dirty = False
+            except Exception as e:
+                logger.error(f"Hash-Cache konnte nicht gespeichert werden: {e}")
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._entries)
+
+
+class DuplicateFileFinder:
+    """
+    Findet inhaltsgleiche Dateien in drei Stufen:
+    1. Gruppierung nach Dateigröße
+    2. Teil-Hash über die ersten und letzten 64 KB
+    3. Voll-Hash (mmap, Thread-Pool) nur für verbleibende Kandidaten
+    """
+
+    def __init__(self, data_dir: str = 'toobix_duplicates', min_size: int = 1024,
+                 max_workers: Optional[int] = None):
+        self.data_dir = Path(data_dir)
+        self.min_size = max(1, min_size)
+        self.max_workers = max_workers or min(8, (os.cpu_count() or 2) * 2)
+        self.cache = HashCache(self.data_dir / 'hash_cache.json')
+
+        # Verzeichnisse, die nie nach Duplikaten durchsucht werden
+        self.excluded_dir_names = {
+            '.git', 'node_modules', '__pycache__', '.venv', 'venv',
+            '$RECYCLE.BIN', 'System Volume Information'
+        }
+
+        self.last_stats: Dict = {}
+
+    def find_duplicates(self, paths: Iterable[str], min_size: Optional[int] = None) -> List[DuplicateGroup]:
+        """Sucht Duplikate in den angegebenen Verzeichnissen"""
+        start_time = time.time()
+        min_size = self.min_size if min_size is None else max(1, min_size)
+        roots = [os.path.abspath(os.path.expanduser(str(p))) for p in paths]
+        roots = [r for r in roots if os.path.isdir(r)]
+
+        stats = {
+            'files_scanned': 0,
+            'size_candidates': 0,
+            'partial_hashed': 0,
+            'full_hashed': 0,
+            'cache_hits': 0,
+            'bytes_read': 0
+        }
+
+        # Stufe 1: Größen-Buckets
+        size_buckets, seen_paths = self._collect_by_size(roots, min_size, stats)
+        candidates = [files for files in size_buckets.values() if len(files) > 1]
+        stats['size_candidates'] = sum(len(files) for files in candidates)
+
+        # Stufe 2: Teil-Hashes
+        partial_groups = defaultdict(list)
+        partial_jobs = [item for files in candidates for item in files]
+        for item, digest in self._hash_all(partial_jobs, 'partial', stats):
+            if digest:
+                partial_groups[(item[1][2], digest)].append(item)
+
+        # Stufe 3: Voll-Hashes - kleine Dateien sind mit dem Teil-Hash vollständig gelesen
+        full_groups = defaultdict(list)
+        full_jobs = []
+        for (size, partial_digest), items in partial_groups.items():
+            if len(items) < 2:
+                continue
+            if size <= 2 * PARTIAL_CHUNK_SIZE:
+                full_groups[(size, partial_digest)].extend(items)
+            else:
+                full_jobs.extend(items)
+
+        for item, digest in self._hash_all(full_jobs, 'full', stats):
+            if digest:
+                full_groups[(item[1][2], digest)].append(item)
+
+        groups = [
+            DuplicateGroup(digest=digest, size=size, paths=sorted(path for path, _ in items))
+            for (size, digest), items in full_groups.items()
+            if len(items) > 1
+        ]
+        groups.sort(key=lambda g: g.wasted_bytes, reverse=True)
+
+        self.cache.prune(roots, seen_paths)
+        self.cache.save()
+
+        stats['duplicate_groups'] = len(groups)
+        stats['wasted_bytes'] = sum(g.wasted_bytes for g in groups)
+        stats['duration_s'] = round(time.time() - start_time, 3)
+        self.last_stats = stats
+
+        logger.info(f"🔁 {len(groups)} Duplikat-Gruppen gefunden ({stats['duration_s']}s)")
+        return groups
+
+    def _collect_by_size(self, roots: List[str], min_size: int, stats: Dict) -> Tuple[Dict, List[str]]:
+        """Durchläuft die Verzeichnisse einmal und gruppiert Dateien nach Größe"""
+        size_buckets = defaultdict(list)
+        seen_paths = []
+        seen_inodes = set()
+        stack = list(roots)
+
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if entry.name not in self.excluded_dir_names:
+                                    stack.append(entry.path)
+                                continue
+                            if not entry.is_file(follow_symlinks=False):
+                                continue
+
+                            stat = entry.stat(follow_symlinks=False)
+                            stats['files_scanned'] += 1
+                            if stat.st_size < min_size:
+                                continue
+
+                            inode = entry.inode()
+                            # Hardlinks belegen keinen zusätzlichen Speicher
+                            if inode and (stat.st_dev, inode) in seen_inodes:
+                                continue
+                            seen_inodes.add((stat.st_dev, inode))
+
+                            signature = (inode, stat.st_mtime_ns, stat.st_size)
+                            size_buckets[stat.st_size].append((entry.path, signature))
+                            seen_paths.append(entry.path)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+        return size_buckets, seen_paths
+
+    def _hash_all(self, items: List[Tuple[str, Tuple[int, int, int]]], kind: str,
+                  stats: Dict) -> List[Tuple[Tuple[str, Tuple[int, int, int]], Optional[str]]]:
+        """Hasht Dateien parallel, unveränderte Dateien kommen aus dem Cache"""
+        results = []
+        pending = []
+
+        for item in items:
+            path, signature = item
+            cached = self.cache.get(path, signature, kind)
+            if cached:
+                stats['cache_hits'] += 1
+                results.append((item, cached))
+            else:
+                pending.append(item)
+
+        if not pending:
+            return results
+
+        hash_func = self._partial_hash if kind == 'partial' else self._full_hash
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for item, (digest, bytes_read) in zip(pending, executor.map(lambda it: hash_func(it[0]), pending)):
+                stats['bytes_read'] += bytes_read
+                if digest:
+                    stats['partial_hashed' if kind == 'partial' else 'full_hashed'] += 1
+                    self.cache.put(item[0], item[1], kind, digest)
+                results.append((item, digest))
+
+        return results
+
+    def _partial_hash(self, path: str) -> Tuple[Optional[str], int]:
+        """Hasht die ersten und letzten 64 KB einer Datei"""
+        try:
+            hasher = hashlib.blake2b(digest_size=20)
+            with open(path, 'rb') as f:
+                head = f.read(PARTIAL_CHUNK_SIZE)
+                hasher.update(head)
+                bytes_read = len(head)
+                size = os.fstat(f.fileno()).st_size
+                if size > PARTIAL_CHUNK_SIZE:
+                    f.seek(max(PARTIAL_CHUNK_SIZE, size - PARTIAL_CHUNK_SIZE))
+                    tail = f.read(PARTIAL_CHUNK_SIZE)
+                    hasher.update(tail)
+                    bytes_read += len(tail)
+            return hasher.hexdigest(), bytes_read
+        except (OSError, ValueError):
+            return None, 0
+
+    def _full_hash(self, path: str) -> Tuple[Optional[str], int]:
+        """Hasht die komplette Datei über mmap"""
+        try:
+            hasher = hashlib.blake2b(digest_size=20)
+            with open(path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    return hasher.hexdigest(), 0
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    view = memoryview(mapped)
+                    try:
+                        for offset in range(0, size, FULL_HASH_BLOCK_SIZE):
+                            hasher.update(view[offset:offset + FULL_HASH_BLOCK_SIZE])
+                    finally:
+                        view.release()
+            return hasher.hexdigest(), size
+        except (OSError, ValueError):
+            return None, 0
+
+    def verify_unchanged(self, path: str, digest: str) -> bool:
+        """Prüft vor dem Löschen, ob eine Datei noch dem gefundenen Inhalt entspricht"""
+        try:
+            stat = os.stat(path)
+            signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            cached = self.cache.get(path, signature, 'full') or self.cache.get(path, signature, 'partial')
+            if cached == digest:
+                return True
+            current, _ = self._full_hash(path) if stat.st_size > 2 * PARTIAL_CHUNK_SIZE else self._partial_hash(path)
+            return current == digest
+        except OSError:
+            return False
+
+    def to_cleanup_entries(self, groups: List[DuplicateGroup],
+                           preferred_dirs: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Wandelt Duplikat-Gruppen in Einträge für den Aufräumplan um.
+        Behalten wird bevorzugt eine Datei aus preferred_dirs, sonst die älteste.
+        """
+        prefixes = tuple(os.path.join(os.path.abspath(d), '') for d in (preferred_dirs or []))
+        entries = []
+        for group in groups:
+            ordered = sorted(
+                group.paths,
+                key=lambda p: (not (prefixes and p.startswith(prefixes)), self._mtime_or_inf(p))
+            )
+            keep = ordered[0]
+            entries.append({
+                'digest': group.digest,
+                'size_mb': round(group.size / (1024 * 1024), 2),
+                'keep': keep,
+                'duplicates': ordered[1:],
+                'wasted_mb': round(group.wasted_bytes / (1024 * 1024), 2)
+            })
+        return entries
+
+    @staticmethod
+    def _mtime_or_inf(path: str) -> float:
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return float('inf')
+
+    def get_stats(self) -> Dict:
+        """Gibt Statistiken des letzten Scans zurück"""
+        return {**self.last_stats, 'cached_files': len(self.cache)}
+
+
+_duplicate_finder: Optional[DuplicateFileFinder] = None
+_duplicate_finder_lock = threading.Lock()
+
+
+def get_duplicate_finder() -> DuplicateFileFinder:
+    """Gibt die gemeinsame Duplicate-Finder-Instanz zurück (ein Hash-Cache für alle Organizer)"""
+    global _duplicate_finder
+    with _duplicate_finder_lock:
+        if _duplicate_finder is None:
+            _duplicate_finder = DuplicateFileFinder()
+        return _duplicate_finder
+
+
+if __name__ == "__main__":
+    import sys
+
+    finder = DuplicateFileFinder()
+    scan_paths = sys.argv[1:] or [os.path.expanduser("~/Downloads")]
+    for group in finder.find_duplicates(scan_paths)[:20]:
+        print(f"{group.wasted_bytes / (1024 * 1024):8.2f} MB  {group.paths}")
+    print(json.dumps(finder.get_stats(), indent=2))
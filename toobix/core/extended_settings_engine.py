@@ -9,6 +9,8 @@ from typing import Dict, Any, List, Optional, Callable
 from dataclasses import dataclass, asdict, field
 import logging
 
+from .persistence import get_persistence_service
+
 # Konfiguriere Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -63,6 +65,14 @@ class ExtendedSettingsEngine:
         self.themes_file = Path('toobix_themes.json')
         self.layouts_file = Path('toobix_layouts.json')
         
+        # Write-Behind-Persistenz
+        self.persistence = get_persistence_service()
+        self._settings_store = self.persistence.register(self.settings_file, lambda: dict(self.settings))
+        self._themes_store = self.persistence.register(
+            self.themes_file, lambda: {name: asdict(theme) for name, theme in self.themes.items()})
+        self._layouts_store = self.persistence.register(
+            self.layouts_file, lambda: {name: asdict(layout) for name, layout in self.layouts.items()})
+        
         # Aktuelle Einstellungen
         self.settings = {}
         self.themes = {}
@@ -716,25 +726,10 @@ class ExtendedSettingsEngine:
     
     def save_settings(self) -> None:
         """Speichert alle Einstellungen"""
-        try:
-            # Speichere Haupt-Einstellungen
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(self.settings, f, indent=2, ensure_ascii=False, default=str)
-            
-            # Speichere Themes
-            themes_data = {name: asdict(theme) for name, theme in self.themes.items()}
-            with open(self.themes_file, 'w', encoding='utf-8') as f:
-                json.dump(themes_data, f, indent=2, ensure_ascii=False)
-            
-            # Speichere Layouts
-            layouts_data = {name: asdict(layout) for name, layout in self.layouts.items()}
-            with open(self.layouts_file, 'w', encoding='utf-8') as f:
-                json.dump(layouts_data, f, indent=2, ensure_ascii=False)
-            
-            logger.info("Alle Einstellungen gespeichert")
-            
-        except Exception as e:
-            logger.error(f"Fehler beim Speichern der Einstellungen: {e}")
+        # Geschrieben wird gebündelt im Hintergrund
+        for store in (self._settings_store, self._themes_store, self._layouts_store):
+            self.persistence.mark_dirty(store)
+        logger.debug("Einstellungen zum Speichern vorgemerkt")
     
     def get_setting(self, key: str) -> Any:
         """Liefert Einstellungs-Wert"""
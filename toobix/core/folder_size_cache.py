@@ -0,0 +1,317 @@
+"""
+Toobix Folder Size Cache
+Inkrementelle Ordnergrößen (du-artig) mit Aggregaten pro Verzeichnis
+"""
+import os
+import json
+import time
+import threading
+import logging
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Nach dieser Zeit wird ein Verzeichnis auch ohne mtime-Änderung neu gelesen:
+# Überschreibt ein Programm eine Datei an Ort und Stelle, ändert sich nur die
+# mtime der Datei, nicht die des Ordners
+DEFAULT_MAX_AGE_S = 3600
+
+
+@dataclass
+class DirectoryStats:
+    """Aggregat eines Verzeichnisses (nur direkte Dateien, Unterordner als Namen)"""
+    mtime_ns: int
+    own_bytes: int = 0
+    own_files: int = 0
+    children: List[str] = field(default_factory=list)
+    scanned_at: float = 0.0
+
+
+class FolderSizeCache:
+    """
+    Cache für Ordnergrößen.
+
+    Pro Verzeichnis werden nur die direkten Dateien summiert; Gesamtgrößen
+    ergeben sich durch Aufrollen der Unterordner. Ein Verzeichnis wird nur
+    neu gelesen, wenn sich seine mtime geändert hat (Datei angelegt,
+    gelöscht, umbenannt), es per invalidate() als veraltet markiert wurde
+    (z.B. vom CleanupExecutor) oder sein letzter Scan älter als max_age_s
+    ist. Ein erneuter Scan kostet damit einen stat() pro Verzeichnis statt
+    pro Datei.
+    """
+
+    def __init__(self, data_dir: str = 'toobix_folder_sizes', max_age_s: float = DEFAULT_MAX_AGE_S):
+        self.data_dir = Path(data_dir)
+        self.max_age_s = max_age_s
+        self.cache_file = self.data_dir / 'size_cache.json'
+        self._dirs: Dict[str, DirectoryStats] = {}
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._dirty = False
+        self.last_stats: Dict = {}
+
+    # === ÖFFENTLICHE API ===
+
+    def get_size(self, path: Union[str, Path]) -> int:
+        """Gesamtgröße eines Ordners in Bytes"""
+        return self.get_totals(path)['bytes']
+
+    def get_file_count(self, path: Union[str, Path]) -> int:
+        """Anzahl Dateien in einem Ordner (rekursiv)"""
+        return self.get_totals(path)['files']
+
+    def get_totals(self, path: Union[str, Path]) -> Dict:
+        """Gesamtgröße und Dateianzahl eines Ordners"""
+        root = self._normalize(path)
+        with self._lock:
+            self._refresh(root)
+            totals = self._rollup(root, {})
+            self.save()
+        return {'bytes': totals[0], 'files': totals[1]}
+
+    def get_breakdown(self, path: Union[str, Path], max_depth: int = 2,
+                      min_fraction: float = 0.01) -> Dict:
+        """
+        Treemap-fähige Aufschlüsselung: verschachtelte Knoten mit name, path,
+        size, files und children. Kleine Unterordner (< min_fraction des
+        Elternknotens) werden zu einem Knoten "(Rest)" zusammengefasst.
+        """
+        root = self._normalize(path)
+        with self._lock:
+            self._refresh(root)
+            memo = {}
+            self._rollup(root, memo)
+            breakdown = self._build_node(root, memo, max_depth, min_fraction)
+            self.save()
+        return breakdown
+
+    def invalidate(self, path: Union[str, Path]):
+        """
+        Markiert den Elternordner eines Pfads als veraltet - und den Pfad
+        selbst, falls er ein bekannter Ordner ist. Der Pfad muss nicht mehr
+        existieren (z.B. nach Löschen oder Verschieben).
+        """
+        target = self._normalize(path)
+        with self._lock:
+            self._ensure_loaded()
+            for directory in (target, os.path.dirname(target)):
+                stats = self._dirs.get(directory)
+                if stats is not None:
+                    stats.mtime_ns = -1
+                    self._dirty = True
+
+    def forget(self, path: Union[str, Path]):
+        """Entfernt einen Ordner samt Unterordnern aus dem Cache"""
+        root = self._normalize(path)
+        with self._lock:
+            self._ensure_loaded()
+            self._drop_subtree(root)
+
+    def save(self):
+        """Speichert den Cache atomar"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                self.data_dir.mkdir(parents=True, exist_ok=True)
+                data = {
+                    path: [s.mtime_ns, s.own_bytes, s.own_files, s.children, round(s.scanned_at, 1)]
+                    for path, s in self._dirs.items()
+                }
+                tmp_file = self.cache_file.with_suffix('.tmp')
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, separators=(',', ':'))
+                os.replace(tmp_file, self.cache_file)
+                self._dirty = False
+            except Exception as e:
+                logger.error(f"Ordnergrößen-Cache konnte nicht gespeichert werden: {e}")
+
+    # === INTERN ===
+
+    def _ensure_loaded(self):
+        """Lädt den persistierten Cache beim ersten Zugriff"""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            if self.cache_file.exists():
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self._dirs = {
+                    path: DirectoryStats(mtime_ns=v[0], own_bytes=v[1], own_files=v[2], children=v[3],
+                                         scanned_at=v[4] if len(v) > 4 else 0.0)
+                    for path, v in data.items()
+                }
+        except Exception as e:
+            logger.error(f"Ordnergrößen-Cache konnte nicht geladen werden: {e}")
+            self._dirs = {}
+
+    def _refresh(self, root: str):
+        """Validiert den Baum unter root und liest nur geänderte Verzeichnisse neu"""
+        self._ensure_loaded()
+        start_time = time.time()
+        expired_before = start_time - self.max_age_s
+        rescanned = 0
+        validated = 0
+        stack = [root]
+
+        while stack:
+            directory = stack.pop()
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                if directory in self._dirs:
+                    self._drop_subtree(directory)
+                continue
+
+            stats = self._dirs.get(directory)
+            if stats is None or stats.mtime_ns != mtime_ns or stats.scanned_at < expired_before:
+                stats = self._scan_directory(directory, mtime_ns, stats)
+                self._dirs[directory] = stats
+                self._dirty = True
+                rescanned += 1
+            else:
+                validated += 1
+
+            stack.extend(os.path.join(directory, child) for child in stats.children)
+
+        self.last_stats = {
+            'root': root,
+            'rescanned_dirs': rescanned,
+            'cached_dirs': validated,
+            'duration_s': round(time.time() - start_time, 3)
+        }
+
+    def _scan_directory(self, directory: str, mtime_ns: int,
+                        previous: Optional[DirectoryStats]) -> DirectoryStats:
+        """Liest die direkten Einträge eines Verzeichnisses"""
+        stats = DirectoryStats(mtime_ns=mtime_ns, scanned_at=time.time())
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stats.children.append(entry.name)
+                        elif entry.is_file(follow_symlinks=False):
+                            stats.own_bytes += entry.stat(follow_symlinks=False).st_size
+                            stats.own_files += 1
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+
+        # Entfernte Unterordner aus dem Cache werfen
+        if previous is not None:
+            for removed in set(previous.children) - set(stats.children):
+                self._drop_subtree(os.path.join(directory, removed))
+
+        return stats
+
+    def _drop_subtree(self, root: str):
+        """Entfernt einen Ordner samt Unterordnern aus dem Cache"""
+        prefix = os.path.join(root, '')
+        for key in [k for k in self._dirs if k == root or k.startswith(prefix)]:
+            del self._dirs[key]
+        self._dirty = True
+
+    def _rollup(self, directory: str, memo: Dict[str, tuple]) -> tuple:
+        """Summiert (bytes, files) eines Verzeichnisses inkl. Unterordner"""
+        if directory in memo:
+            return memo[directory]
+        stats = self._dirs.get(directory)
+        if stats is None:
+            return (0, 0)
+
+        # Iterativ statt rekursiv - tiefe Bäume sprengen sonst den Stack
+        order = []
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            order.append(current)
+            current_stats = self._dirs.get(current)
+            if current_stats:
+                stack.extend(os.path.join(current, c) for c in current_stats.children
+                             if os.path.join(current, c) not in memo)
+
+        for current in reversed(order):
+            current_stats = self._dirs.get(current)
+            if current_stats is None:
+                memo[current] = (0, 0)
+                continue
+            total_bytes = current_stats.own_bytes
+            total_files = current_stats.own_files
+            for child in current_stats.children:
+                child_bytes, child_files = memo.get(os.path.join(current, child), (0, 0))
+                total_bytes += child_bytes
+                total_files += child_files
+            memo[current] = (total_bytes, total_files)
+
+        return memo[directory]
+
+    def _build_node(self, directory: str, memo: Dict[str, tuple], depth: int,
+                    min_fraction: float) -> Dict:
+        """Erstellt einen Treemap-Knoten"""
+        size, files = memo.get(directory, (0, 0))
+        node = {
+            'name': os.path.basename(directory) or directory,
+            'path': directory,
+            'size': size,
+            'files': files,
+            'children': []
+        }
+        stats = self._dirs.get(directory)
+        if depth <= 0 or stats is None:
+            return node
+
+        rest_size = stats.own_bytes
+        rest_files = stats.own_files
+        for child in stats.children:
+            child_path = os.path.join(directory, child)
+            child_size, child_files = memo.get(child_path, (0, 0))
+            if size and child_size / size >= min_fraction:
+                node['children'].append(self._build_node(child_path, memo, depth - 1, min_fraction))
+            else:
+                rest_size += child_size
+                rest_files += child_files
+
+        node['children'].sort(key=lambda n: n['size'], reverse=True)
+        if rest_size:
+            node['children'].append({
+                'name': '(Rest)',
+                'path': directory,
+                'size': rest_size,
+                'files': rest_files,
+                'children': []
+            })
+        return node
+
+    @staticmethod
+    def _normalize(path: Union[str, Path]) -> str:
+        return os.path.abspath(os.path.expanduser(str(path)))
+
+
+_folder_size_cache: Optional[FolderSizeCache] = None
+_folder_size_cache_lock = threading.Lock()
+
+
+def get_folder_size_cache() -> FolderSizeCache:
+    """Gibt die gemeinsame Ordnergrößen-Cache-Instanz zurück"""
+    global _folder_size_cache
+    with _folder_size_cache_lock:
+        if _folder_size_cache is None:
+            _folder_size_cache = FolderSizeCache()
+        return _folder_size_cache
+
+
+if __name__ == "__main__":
+    import sys
+
+    cache = FolderSizeCache()
+    target = sys.argv[1] if len(sys.argv) > 1 else str(Path.home())
+    for _ in range(2):
+        breakdown = cache.get_breakdown(target, max_depth=1)
+        print(cache.last_stats)
+    for child in breakdown['children'][:15]:
+        print(f"{child['size'] / (1024 ** 3):8.2f} GB  {child['name']}")
@@ -10,8 +10,11 @@ from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
-import git
-from git import Repo, InvalidGitRepositoryError
+
+from .startup_profiler import lazy_import
+
+# GitPython erst beim ersten Repository-Zugriff laden
+git = lazy_import('git')
 
 class GitIntegrationManager:
     """Erweiterte Git-Integration mit intelligenter Repository-Verwaltung"""
@@ -67,7 +70,7 @@ class GitIntegrationManager:
     def _analyze_repository(self, repo_path: Path) -> Optional[Dict]:
         """Analysiert einzelnes Git-Repository"""
         try:
-            repo = Repo(str(repo_path))
+            repo = git.Repo(str(repo_path))
             
             # Basis-Informationen
             repo_info = {
@@ -145,13 +148,13 @@ class GitIntegrationManager:
             
             return repo_info
             
-        except InvalidGitRepositoryError:
+        except git.InvalidGitRepositoryError:
             return None
         except Exception as e:
             self.logger.error(f"Fehler bei Repository-Analyse {repo_path}: {e}")
             return None
     
-    def _get_ahead_behind_count(self, repo: Repo, remote) -> Dict:
+    def _get_ahead_behind_count(self, repo: 'git.Repo', remote) -> Dict:
         """Ermittelt Ahead/Behind-Count zum Remote"""
         try:
             # Fetch latest remote info
@@ -361,7 +364,7 @@ class GitIntegrationManager:
         
         for repo_path in repo_paths:
             try:
-                repo = Repo(repo_path)
+                repo = git.Repo(repo_path)
                 result = {'path': repo_path, 'name': Path(repo_path).name}
                 
                 if operation == 'status':
@@ -409,7 +412,7 @@ class GitIntegrationManager:
         
         return results
     
-    def _get_repo_status(self, repo: Repo) -> Dict:
+    def _get_repo_status(self, repo: 'git.Repo') -> Dict:
         """Ermittelt detaillierten Repository-Status"""
         try:
             return {
@@ -426,7 +429,7 @@ class GitIntegrationManager:
     def auto_commit_and_push(self, repo_path: str, commit_message: str = None) -> Dict:
         """Automatisches Commit und Push"""
         try:
-            repo = Repo(repo_path)
+            repo = git.Repo(repo_path)
             
             if not repo.is_dirty() and not repo.untracked_files:
                 return {'success': False, 'message': 'No changes to commit'}
@@ -470,7 +473,7 @@ class GitIntegrationManager:
         
         for repo_path, repo_info in self.repositories.items():
             try:
-                repo = Repo(repo_path)
+                repo = git.Repo(repo_path)
                 cleanup_actions = []
                 
                 # Git GC (Garbage Collection)
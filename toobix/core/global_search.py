@@ -0,0 +1,303 @@
+"""
+Toobix Global Search
+Gemeinsamer, inkrementeller Suchindex über Befehle, Dokumentation, Tutorials und Wissen
+"""
+import re
+import math
+import time
+import bisect
+import threading
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# Gewichte der Felder eines Dokuments
+FIELD_WEIGHTS = {'title': 3.0, 'keywords': 2.0, 'description': 1.0, 'content': 0.5}
+
+# Faktoren je Art des Treffers: ganzes Wort, Wortanfang, irgendwo im Wort
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.7
+INFIX_MATCH = 0.4
+
+DocKey = Tuple[str, str]
+
+
+def tokenize(text: str) -> List[str]:
+    """Kleingeschriebene Wörter; anders als beim Journal zählen auch einzelne Zeichen"""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+@dataclass
+class SearchDocument:
+    """Ein durchsuchbarer Eintrag einer Quelle"""
+    source: str
+    doc_id: str
+    title: str
+    description: str = ''
+    keywords: List[str] = field(default_factory=list)   # Aliase, Tags, Kategorie
+    content: str = ''
+    payload: Any = None                                   # Originalobjekt der Quelle
+
+
+@dataclass
+class SearchResult:
+    """Ein bewerteter Treffer"""
+    source: str
+    label: str
+    doc_id: str
+    title: str
+    description: str
+    score: float
+    payload: Any = None
+
+
+@dataclass
+class SearchSource:
+    """Eine registrierte Quelle; loader() liefert alle ihre Dokumente"""
+    name: str
+    label: str
+    loader: Callable[[], Iterable[SearchDocument]]
+    weight: float = 1.0
+    loaded: bool = False
+    documents: int = 0
+
+
+class GlobalSearch:
+    """
+    Ein invertierter Index für alle Suchquellen.
+
+    - Quellen melden sich mit register_source() an und werden erst bei der
+      ersten Suche geladen; einzelne Einträge ändern sich per upsert() und
+      remove(), refresh_source() lädt eine Quelle beim nächsten Zugriff neu
+    - Das Vokabular ist sortiert: jedes Suchwort wird als Wortanfang über
+      bisect aufgelöst (Suche beim Tippen); findet sich nichts, wird im
+      Vokabular auch innerhalb von Wörtern gesucht ("plan" -> "aufräumplan")
+    - Ranking: Feldgewicht x Trefferart x IDF, alle Suchwörter müssen
+      passen (sonst Teiltreffer mit Abschlag), Bonus für Titel, die mit der
+      Anfrage beginnen, Gewicht der Quelle
+    - Ergebnisse und aufgelöste Suchwörter werden gecacht, bis sich der
+      Index ändert
+    """
+
+    CACHE_SIZE = 256
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.sources: Dict[str, SearchSource] = {}
+        self._docs: Dict[DocKey, SearchDocument] = {}
+        self._doc_terms: Dict[DocKey, Dict[str, float]] = {}
+        self._postings: Dict[str, Dict[DocKey, float]] = {}
+        self._vocabulary: List[str] = []
+        self._generation = 0
+        self._result_cache: 'OrderedDict[Tuple, List[SearchResult]]' = OrderedDict()
+        self._term_cache: Dict[str, Dict[DocKey, float]] = {}
+        self._cache_generation = 0
+        self.stats = {'queries': 0, 'cache_hits': 0, 'last_query_ms': 0.0, 'indexed': 0}
+
+    # === QUELLEN ===
+
+    def register_source(self, name: str, loader: Callable[[], Iterable[SearchDocument]],
+                        label: Optional[str] = None, weight: float = 1.0):
+        """Meldet eine Quelle an (eine vorhandene gleichen Namens wird ersetzt)"""
+        with self._lock:
+            self.sources[name] = SearchSource(name, label or name, loader, weight)
+
+    def refresh_source(self, name: str):
+        """Lädt die Quelle bei der nächsten Suche neu"""
+        with self._lock:
+            if name in self.sources:
+                self.sources[name].loaded = False
+
+    def _ensure_loaded(self, names: Iterable[str]):
+        for name in names:
+            source = self.sources.get(name)
+            if source is None or source.loaded:
+                continue
+            try:
+                documents = list(source.loader())
+            except Exception as e:
+                logger.error(f"❌ Suchquelle '{name}' konnte nicht geladen werden: {e}")
+                documents = []
+            stale = {key for key in self._docs if key[0] == name}
+            for document in documents:
+                self._index(document)
+                stale.discard((name, document.doc_id))
+            for key in stale:
+                self._unindex(key)
+            source.loaded = True
+            source.documents = len(documents)
+
+    # === INDEX ===
+
+    def upsert(self, document: SearchDocument):
+        """Fügt einen Eintrag hinzu oder aktualisiert ihn"""
+        with self._lock:
+            self._index(document)
+
+    def remove(self, source: str, doc_id: str):
+        with self._lock:
+            self._unindex((source, doc_id))
+
+    def _index(self, document: SearchDocument):
+        key = (document.source, document.doc_id)
+        if key in self._docs:
+            self._unindex(key)
+        terms: Dict[str, float] = {}
+        fields = {
+            'title': document.title,
+            'keywords': ' '.join(document.keywords),
+            'description': document.description,
+            'content': document.content
+        }
+        for name, text in fields.items():
+            for term in tokenize(text):
+                # Bestes Feld zählt, Wiederholungen nicht
+                terms[term] = max(terms.get(term, 0.0), FIELD_WEIGHTS[name])
+        for term, weight in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._vocabulary, term)
+            postings[key] = weight
+        self._docs[key] = document
+        self._doc_terms[key] = terms
+        self._generation += 1
+        self.stats['indexed'] += 1
+
+    def _unindex(self, key: DocKey):
+        terms = self._doc_terms.pop(key, None)
+        if terms is None:
+            return
+        del self._docs[key]
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(key, None)
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+        self._generation += 1
+
+    # === SUCHE ===
+
+    def search(self, query: str, sources: Optional[Iterable[str]] = None, limit: int = 20) -> List[SearchResult]:
+        """Rangierte Treffer über alle (oder die angegebenen) Quellen"""
+        start = time.perf_counter()
+        normalized = ' '.join(query.lower().split())
+        with self._lock:
+            names = tuple(sorted(self.sources if sources is None else set(sources) & set(self.sources)))
+            self._ensure_loaded(names)
+            self.stats['queries'] += 1
+            if self._cache_generation != self._generation:
+                self._result_cache.clear()
+                self._term_cache.clear()
+                self._cache_generation = self._generation
+
+            cache_key = (normalized, names, limit)
+            results = self._result_cache.get(cache_key)
+            if results is not None:
+                self._result_cache.move_to_end(cache_key)
+                self.stats['cache_hits'] += 1
+            else:
+                results = self._rank(normalized, set(names), limit)
+                self._result_cache[cache_key] = results
+                if len(self._result_cache) > self.CACHE_SIZE:
+                    self._result_cache.popitem(last=False)
+        self.stats['last_query_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        return list(results)
+
+    def _rank(self, query: str, names: set, limit: int) -> List[SearchResult]:
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        # Erst auf die gewählten Quellen einschränken, sonst verdrängen Treffer
+        # aus anderen Quellen die Schnittmenge
+        matches = [{key: score for key, score in self._match_term(token).items() if key[0] in names}
+                   for token in tokens]
+
+        scores: Dict[DocKey, float] = {}
+        common = set.intersection(*(set(match) for match in matches))
+        if common:
+            for key in common:
+                scores[key] = sum(match[key] for match in matches)
+        else:
+            # Kein Eintrag passt auf alle Wörter: Teiltreffer, nach Abdeckung abgewertet
+            hits: Dict[DocKey, List[float]] = {}
+            for match in matches:
+                for key, score in match.items():
+                    hits.setdefault(key, []).append(score)
+            for key, values in hits.items():
+                scores[key] = sum(values) * len(values) / len(tokens)
+
+        results = []
+        for key, score in scores.items():
+            source = self.sources.get(key[0])
+            if source is None:
+                continue
+            document = self._docs[key]
+            title = document.title.lower()
+            if title == query:
+                score += 3.0
+            elif title.startswith(query):
+                score += 2.0
+            results.append(SearchResult(key[0], source.label, document.doc_id, document.title,
+                                        document.description, round(score * source.weight, 3),
+                                        document.payload))
+        results.sort(key=lambda result: (-result.score, result.title))
+        return results[:limit]
+
+    def _match_term(self, token: str) -> Dict[DocKey, float]:
+        """Einträge zu einem Suchwort: ganzes Wort > Wortanfang > im Wort (gecacht)"""
+        cached = self._term_cache.get(token)
+        if cached is not None:
+            return cached
+        total = max(1, len(self._docs))
+        result: Dict[DocKey, float] = {}
+
+        def collect(term: str, factor: float):
+            postings = self._postings[term]
+            idf = math.log(1 + total / len(postings))
+            for key, weight in postings.items():
+                score = weight * factor * idf
+                if score > result.get(key, 0.0):
+                    result[key] = score
+
+        index = bisect.bisect_left(self._vocabulary, token)
+        while index < len(self._vocabulary) and self._vocabulary[index].startswith(token):
+            term = self._vocabulary[index]
+            collect(term, EXACT_MATCH if term == token else PREFIX_MATCH)
+            index += 1
+        if not result and len(token) >= 3:
+            for term in self._vocabulary:
+                if token in term:
+                    collect(term, INFIX_MATCH)
+        self._term_cache[token] = result
+        return result
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self.stats,
+                'documents': len(self._docs),
+                'terms': len(self._vocabulary),
+                'sources': {name: {'label': source.label, 'loaded': source.loaded, 'documents': source.documents}
+                            for name, source in self.sources.items()}
+            }
+
+
+# Globale Instanz
+_global_search: Optional[GlobalSearch] = None
+_global_search_lock = threading.Lock()
+
+
+def get_global_search() -> GlobalSearch:
+    """Gibt den gemeinsamen Suchindex zurück"""
+    global _global_search
+    with _global_search_lock:
+        if _global_search is None:
+            _global_search = GlobalSearch()
+        return _global_search
@@ -12,6 +12,7 @@ from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 from collections import defaultdict, deque
 import logging
+from .process_table import get_process_table
 
 # Konfiguriere Logging
 logging.basicConfig(level=logging.INFO)
@@ -177,13 +178,7 @@ class IntelligentContextManager:
     def _get_active_applications(self) -> List[str]:
         """Ermittelt aktive Anwendungen"""
         try:
-            apps = []
-            for proc in psutil.process_iter(['name']):
-                try:
-                    apps.append(proc.info['name'])
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-            return list(set(apps))
+            return get_process_table().names()
         except Exception:
             return []
     
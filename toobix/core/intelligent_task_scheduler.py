@@ -3,7 +3,6 @@ Toobix Intelligent Task Scheduler & Automation Engine
 Fortgeschrittene Automatisierung mit Event-basierter Regelausführung
 """
 
-import schedule
 import time
 import threading
 import json
@@ -16,6 +15,10 @@ import logging
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from .startup_profiler import lazy_import
+
+schedule = lazy_import('schedule')
+
 class TriggerType(Enum):
     """Verfügbare Trigger-Typen"""
     TIME = "time"
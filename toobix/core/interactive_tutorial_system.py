@@ -11,6 +11,9 @@ from dataclasses import dataclass, asdict, field
 from enum import Enum
 import logging
 
+from .persistence import get_persistence_service
+from .global_search import SearchDocument, get_global_search
+
 # Konfiguriere Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -114,6 +117,8 @@ class InteractiveTutorialSystem:
         """Initialisiert Interactive Tutorial System"""
         self.tutorials_file = Path('toobix_tutorials.json')
         self.progress_file = Path('toobix_tutorial_progress.json')
+        self.persistence = get_persistence_service()
+        self._progress_store = self.persistence.register(self.progress_file, self._serialize_progress)
         
         # Tutorial-Daten
         self.tutorials = {}
@@ -131,6 +136,7 @@ class InteractiveTutorialSystem:
         # Lade gespeicherte Daten
         self._load_tutorials()
         self._load_progress()
+        get_global_search().register_source('tutorial', self._search_documents, label='🎓 Tutorial')
         
         logger.info("📚 Interactive Tutorial System initialisiert")
     
@@ -439,25 +445,21 @@ class InteractiveTutorialSystem:
                 logger.error(f"Fehler beim Laden des Fortschritts: {e}")
     
     def save_progress(self) -> None:
-        """Speichert Benutzer-Fortschritt"""
-        try:
-            # Konvertiere zu JSON-serializable Format
-            progress_data = {}
-            for user_id, user_tutorials in self.user_progress.items():
-                progress_data[user_id] = {}
-                for tutorial_id, progress in user_tutorials.items():
-                    progress_dict = asdict(progress)
-                    # Konvertiere Datetime-Objekte
-                    progress_dict['started_at'] = progress.started_at.isoformat()
-                    progress_dict['last_activity'] = progress.last_activity.isoformat()
-                    progress_data[user_id][tutorial_id] = progress_dict
-            
-            with open(self.progress_file, 'w', encoding='utf-8') as f:
-                json.dump(progress_data, f, indent=2, ensure_ascii=False)
-            
-            logger.info("Tutorial-Fortschritt gespeichert")
-        except Exception as e:
-            logger.error(f"Fehler beim Speichern des Fortschritts: {e}")
+        """Speichert Benutzer-Fortschritt (asynchron über den Persistenz-Service)"""
+        self.persistence.mark_dirty(self._progress_store)
+    
+    def _serialize_progress(self) -> Dict[str, Any]:
+        """Konvertiert den Fortschritt in ein JSON-serialisierbares Format"""
+        progress_data = {}
+        for user_id, user_tutorials in self.user_progress.items():
+            progress_data[user_id] = {}
+            for tutorial_id, progress in user_tutorials.items():
+                progress_dict = asdict(progress)
+                # Konvertiere Datetime-Objekte
+                progress_dict['started_at'] = progress.started_at.isoformat()
+                progress_dict['last_activity'] = progress.last_activity.isoformat()
+                progress_data[user_id][tutorial_id] = progress_dict
+        return progress_data
     
     def start_tutorial(self, tutorial_id: str, user_id: str = "default") -> bool:
         """Startet ein Tutorial"""
@@ -686,30 +688,36 @@ class InteractiveTutorialSystem:
             'completion_rate': (completed / len(user_tutorials) * 100) if user_tutorials else 0.0
         }
     
+    def _search_documents(self):
+        """Tutorials als Dokumente für die globale Suche"""
+        for tutorial_id, tutorial in self.tutorials.items():
+            yield SearchDocument(
+                source='tutorial',
+                doc_id=tutorial_id,
+                title=tutorial.title,
+                description=tutorial.description,
+                keywords=list(tutorial.tags) + [tutorial.tutorial_type.value],
+                content=' '.join(tutorial.learning_objectives),
+                payload=tutorial
+            )
+    
     def search_tutorials(self, query: str, tutorial_type: Optional[TutorialType] = None) -> List[Dict[str, Any]]:
-        """Sucht Tutorials nach Query"""
+        """Sucht Tutorials nach Query (globaler Suchindex, nach Relevanz sortiert)"""
         results = []
-        query_lower = query.lower()
         
-        for tutorial_id, tutorial in self.tutorials.items():
+        for hit in get_global_search().search(query, sources=['tutorial'], limit=len(self.tutorials)):
+            tutorial = hit.payload
             # Type Filter
             if tutorial_type and tutorial.tutorial_type != tutorial_type:
                 continue
             
-            # Text Search
-            search_text = f"{tutorial.title} {tutorial.description} {' '.join(tutorial.tags)} {' '.join(tutorial.learning_objectives)}".lower()
-            
-            if query_lower in search_text:
-                results.append({
-                    'id': tutorial_id,
-                    'title': tutorial.title,
-                    'description': tutorial.description,
-                    'type': tutorial.tutorial_type.value,
-                    'relevance_score': search_text.count(query_lower)
-                })
-        
-        # Sortiere nach Relevanz
-        results.sort(key=lambda x: x['relevance_score'], reverse=True)
+            results.append({
+                'id': hit.doc_id,
+                'title': tutorial.title,
+                'description': tutorial.description,
+                'type': tutorial.tutorial_type.value,
+                'relevance_score': hit.score
+            })
         
         return results
     
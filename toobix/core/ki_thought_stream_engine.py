@@ -12,8 +12,12 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional, Callable
 from dataclasses import dataclass, asdict
 from collections import deque
+from itertools import islice
 import logging
 
+from .ui_bus import get_ui_bus
+from .thought_log import ThoughtLog
+
 # Konfiguriere Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -29,6 +33,17 @@ class ThoughtEntry:
     priority: str  # low, medium, high, urgent
     actionable: bool
     related_system: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['timestamp'] = self.timestamp.isoformat()
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ThoughtEntry':
+        data = dict(data)
+        data['timestamp'] = datetime.fromisoformat(data['timestamp'])
+        return cls(**data)
 
 @dataclass
 class AutoInsight:
@@ -45,11 +60,24 @@ class AutoInsight:
 class KIThoughtStreamEngine:
     """
     KI Thought Stream Engine für kontinuierliche Insights und Ideen
+    
+    Neben dem Strom selbst gibt es Ring-Indizes pro Typ und für umsetzbare
+    Gedanken, jeweils mit fertig serialisierten Einträgen; die get_*-Sichten
+    werden gecacht, bis ein neuer Gedanke ankommt. Abfragen kosten damit
+    O(limit) statt O(Historie). Alle Gedanken landen zusätzlich im
+    append-only ThoughtLog und werden beim Start wiederhergestellt.
     """
     
+    STREAM_SIZE = 200   # Letzte 200 Gedanken (gilt auch für jeden Index-Ring)
+    
     def __init__(self):
         """Initialisiert KI Thought Stream Engine"""
-        self.thought_stream = deque(maxlen=200)  # Letzte 200 Gedanken
+        self.thought_stream = deque(maxlen=self.STREAM_SIZE)
+        self._records = deque(maxlen=self.STREAM_SIZE)       # asdict() je Gedanke, einmal berechnet
+        self._records_by_type: Dict[str, deque] = {}
+        self._actionable_records = deque(maxlen=self.STREAM_SIZE)
+        self._view_cache: Dict[tuple, List[Dict[str, Any]]] = {}
+        self._stream_lock = threading.Lock()
         self.auto_insights = deque(maxlen=50)
         self.is_active = False
         self.stream_thread = None
@@ -123,6 +151,11 @@ class KIThoughtStreamEngine:
         # Datenverzeichnis
         self.data_dir = Path('toobix_thought_stream')
         self.data_dir.mkdir(exist_ok=True)
+        self.thought_log = ThoughtLog(self.data_dir, ThoughtEntry.from_dict)
+        
+        # Gedanken der letzten Sitzung wiederherstellen
+        for thought in self.thought_log.tail(self.STREAM_SIZE):
+            self._append_thought(thought, persist=False)
         
         # Externe Datenquellen (falls verfügbar)
         self.external_systems = {}
@@ -148,7 +181,8 @@ class KIThoughtStreamEngine:
             priority="medium",
             actionable=False
         )
-        self.thought_stream.append(welcome_thought)
+        self._append_thought(welcome_thought)
+        get_ui_bus().publish('thoughts', welcome_thought)
         
         logger.info("🌊 KI Thought Stream gestartet")
     
@@ -166,7 +200,8 @@ class KIThoughtStreamEngine:
             priority="low",
             actionable=False
         )
-        self.thought_stream.append(farewell_thought)
+        self._append_thought(farewell_thought)
+        get_ui_bus().publish('thoughts', farewell_thought)
     
     def _thought_stream_loop(self) -> None:
         """Haupt-Loop für Gedankenstrom"""
@@ -177,7 +212,7 @@ class KIThoughtStreamEngine:
                 # Neuen Gedanken generieren
                 thought = self._generate_thought()
                 if thought:
-                    self.thought_stream.append(thought)
+                    self._append_thought(thought)
                     self._notify_thought_callbacks(thought)
                 
                 # Auto-Insights generieren
@@ -464,7 +499,8 @@ class KIThoughtStreamEngine:
         )
     
     def _notify_thought_callbacks(self, thought: ThoughtEntry) -> None:
-        """Benachrichtigt registrierte Callbacks über neue Gedanken"""
+        """Benachrichtigt registrierte Callbacks und die GUI über neue Gedanken"""
+        get_ui_bus().publish('thoughts', thought)
         for callback in self.insight_callbacks:
             try:
                 callback(thought)
@@ -475,28 +511,50 @@ class KIThoughtStreamEngine:
         """Registriert Callback für neue Gedanken"""
         self.insight_callbacks.append(callback)
     
+    def _append_thought(self, thought: ThoughtEntry, persist: bool = True) -> None:
+        """Einziger Weg in den Strom: Indizes pflegen, Sichten verwerfen, ins Log schreiben"""
+        record = asdict(thought)
+        with self._stream_lock:
+            self.thought_stream.append(thought)
+            self._records.append(record)
+            ring = self._records_by_type.get(thought.thought_type)
+            if ring is None:
+                ring = self._records_by_type[thought.thought_type] = deque(maxlen=self.STREAM_SIZE)
+            ring.append(record)
+            if thought.actionable:
+                self._actionable_records.append(record)
+            self._view_cache.clear()
+        if persist:
+            self.thought_log.append(thought.to_dict())
+    
+    def _cached_view(self, key: tuple, ring: deque, limit: int) -> List[Dict[str, Any]]:
+        """Die letzten limit Einträge eines Rings (O(limit), gecacht bis zum nächsten Gedanken)"""
+        with self._stream_lock:
+            view = self._view_cache.get(key)
+            if view is None:
+                view = list(islice(reversed(ring), limit))[::-1] if limit > 0 else []
+                self._view_cache[key] = view
+        return list(view)
+    
     def get_thought_stream(self, limit: int = 20) -> List[Dict[str, Any]]:
-        """Liefert aktuellen Gedankenstrom"""
-        recent_thoughts = list(self.thought_stream)[-limit:]
-        return [asdict(thought) for thought in recent_thoughts]
+        """Liefert aktuellen Gedankenstrom (Einträge nur lesen - sie werden geteilt)"""
+        return self._cached_view(('stream', limit), self._records, limit)
     
     def get_thoughts_by_type(self, thought_type: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Liefert Gedanken nach Typ"""
-        filtered_thoughts = [
-            thought for thought in self.thought_stream 
-            if thought.thought_type == thought_type
-        ][-limit:]
-        
-        return [asdict(thought) for thought in filtered_thoughts]
+        ring = self._records_by_type.get(thought_type)
+        if ring is None:
+            return []
+        return self._cached_view(('type', thought_type, limit), ring, limit)
     
     def get_actionable_thoughts(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Liefert umsetzbare Gedanken"""
-        actionable_thoughts = [
-            thought for thought in self.thought_stream 
-            if thought.actionable
-        ][-limit:]
-        
-        return [asdict(thought) for thought in actionable_thoughts]
+        return self._cached_view(('actionable', limit), self._actionable_records, limit)
+    
+    def get_thoughts_between(self, start: datetime, end: datetime,
+                             thought_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Gedanken im Zeitraum [start, end) aus dem Log - auch aus früheren Sitzungen"""
+        return [asdict(thought) for thought in self.thought_log.between(start, end, thought_type)]
     
     def get_auto_insights(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Liefert automatische Einsichten"""
@@ -513,7 +571,9 @@ class KIThoughtStreamEngine:
         priority_counts = {}
         actionable_count = 0
         
-        for thought in self.thought_stream:
+        with self._stream_lock:
+            thoughts = list(self.thought_stream)
+        for thought in thoughts:
             type_counts[thought.thought_type] = type_counts.get(thought.thought_type, 0) + 1
             priority_counts[thought.priority] = priority_counts.get(thought.priority, 0) + 1
             if thought.actionable:
@@ -526,7 +586,8 @@ class KIThoughtStreamEngine:
             'priority_distribution': priority_counts,
             'auto_insights': len(self.auto_insights),
             'stream_active': self.is_active,
-            'last_thought_time': self.thought_stream[-1].timestamp.isoformat() if self.thought_stream else None
+            'last_thought_time': self.thought_stream[-1].timestamp.isoformat() if self.thought_stream else None,
+            'thought_log': self.thought_log.get_stats()
         }
     
     def add_external_data_source(self, source_name: str, data_getter: Callable[[], Dict[str, Any]]) -> None:
@@ -545,7 +606,7 @@ class KIThoughtStreamEngine:
             actionable=self._is_actionable(content)
         )
         
-        self.thought_stream.append(thought)
+        self._append_thought(thought)
         self._notify_thought_callbacks(thought)
 
 if __name__ == "__main__":
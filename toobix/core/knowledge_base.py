@@ -9,6 +9,8 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 
+from .memory_index import get_memory_index
+
 class KnowledgeBase:
     """Intelligentes Wissens- und Erinnerungssystem für Toobix"""
     
@@ -21,6 +23,17 @@ class KnowledgeBase:
         self.knowledge = self._load_knowledge()
         self.interactions = self._load_interactions()
         
+        # Zähler für alles, was create_user_context() beeinflusst; der
+        # Prompt-Builder berechnet den Benutzer-Kontext nur bei Änderung neu
+        self.context_revision = 0
+        frequent = self.knowledge['learned_behaviors']['frequently_used_commands']
+        self._top_command = max(frequent.items(), key=lambda x: x[1])[0] if frequent else None
+        
+        # Semantischer Abruf über Interaktionen und Fakten (fehlende werden nachindiziert)
+        self.memory_index = get_memory_index()
+        self.memory_index.register_source('interaction', self._interaction_documents)
+        self.memory_index.register_source('fact', self._fact_documents)
+        
         print("🧠 Knowledge Base initialisiert")
     
     def _load_knowledge(self) -> Dict:
@@ -103,6 +116,7 @@ class KnowledgeBase:
         }
         
         self.interactions.append(interaction)
+        self.memory_index.add('interaction', f"{interaction['timestamp']:.6f}", command, interaction['timestamp'])
         
         # Begrenzt Historie auf 1000 Einträge
         if len(self.interactions) > 1000:
@@ -145,15 +159,20 @@ class KnowledgeBase:
         command = interaction['command'].lower()
         
         # Häufig verwendete Befehle
-        if command not in self.knowledge['learned_behaviors']['frequently_used_commands']:
-            self.knowledge['learned_behaviors']['frequently_used_commands'][command] = 0
-        self.knowledge['learned_behaviors']['frequently_used_commands'][command] += 1
+        frequent = self.knowledge['learned_behaviors']['frequently_used_commands']
+        if command not in frequent:
+            frequent[command] = 0
+        frequent[command] += 1
+        if command != self._top_command and frequent[command] > frequent.get(self._top_command, 0):
+            self._top_command = command
+            self.context_revision += 1
         
         # Programmiersprachen erkennen
         for lang in ['python', 'javascript', 'java', 'c++', 'c#', 'php', 'go', 'rust']:
             if lang in command:
                 if lang not in self.knowledge['user_profile']['programming_languages']:
                     self.knowledge['user_profile']['programming_languages'].append(lang)
+                    self.context_revision += 1
         
         # Tools und Programme
         programs = ['vscode', 'notepad', 'browser', 'excel', 'word', 'calculator']
@@ -167,10 +186,13 @@ class KnowledgeBase:
             self._learn_project_pattern(command, interaction)
         
         # Zeitbasierte Muster
-        hour = datetime.now().hour
-        if hour not in self.knowledge['user_profile']['work_schedule']:
-            self.knowledge['user_profile']['work_schedule'][str(hour)] = 0
-        self.knowledge['user_profile']['work_schedule'][str(hour)] += 1
+        hour = str(datetime.now().hour)
+        work_schedule = self.knowledge['user_profile']['work_schedule']
+        if hour not in work_schedule:
+            work_schedule[hour] = 0
+        work_schedule[hour] += 1
+        if work_schedule[hour] == 4:  # Schwelle aus create_user_context()
+            self.context_revision += 1
     
     def _learn_project_pattern(self, command: str, interaction: Dict):
         """Lernt Projekt-bezogene Muster"""
@@ -227,9 +249,27 @@ class KnowledgeBase:
             'datetime': datetime.now().isoformat()
         }
         
+        self.context_revision += 1
         self.save_knowledge()
+        self.memory_index.add('fact', f"{category}/{key}", self._fact_text(category, key, value, note))
         return f"✅ Gemerkt: {key} = {value}" + (f" ({note})" if note else "")
     
+    @staticmethod
+    def _fact_text(category: str, key: str, value: Any, note: str = None) -> str:
+        return f"{category} - {key}: {value}" + (f" ({note})" if note else "")
+    
+    def _fact_documents(self):
+        """Alle Fakten für den Memory-Index (schlüssel, text, zeitstempel)"""
+        for category, facts in list(self.knowledge['personal_notes'].items()):
+            for key, fact in list(facts.items()):
+                yield (f"{category}/{key}", self._fact_text(category, key, fact['value'], fact.get('note')),
+                       fact.get('learned_at', 0.0))
+    
+    def _interaction_documents(self):
+        """Alle gespeicherten Interaktionen für den Memory-Index"""
+        for interaction in list(self.interactions):
+            yield (f"{interaction['timestamp']:.6f}", interaction['command'], interaction['timestamp'])
+    
     def recall_fact(self, category: str, key: str = None) -> str:
         """Ruft gespeicherte Fakten ab"""
         if category not in self.knowledge['personal_notes']:
@@ -354,9 +394,7 @@ class KnowledgeBase:
             context.append(f"Arbeitet oft um diese Zeit ({current_hour}:00)")
         
         # Häufige Aktivitäten
-        frequent = self.knowledge['learned_behaviors']['frequently_used_commands']
-        if frequent:
-            top_activity = max(frequent.items(), key=lambda x: x[1])[0]
-            context.append(f"Häufigste Aktivität: {top_activity}")
+        if self._top_command:
+            context.append(f"Häufigste Aktivität: {self._top_command}")
         
         return " | ".join(context) if context else "Neuer Benutzer"
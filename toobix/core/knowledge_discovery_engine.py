@@ -10,6 +10,8 @@ from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 import logging
 
+from .global_search import SearchDocument, get_global_search
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -60,7 +62,6 @@ class KnowledgeDiscoveryEngine:
         self.categories = {}
         self.learning_paths = {}
         self.user_progress = {}
-        self.search_index = {}
         
         # Initialize with base knowledge
         self._initialize_knowledge_base()
@@ -489,42 +490,26 @@ Automatisiere repetitive Aufgaben intelligent:
         }
     
     def _build_search_index(self):
-        """Erstellt Suchindex für schnelle Suche"""
-        self.search_index = {}
-        
+        """Meldet die Wissensbasis beim globalen Suchindex an"""
+        get_global_search().register_source('knowledge', self._search_documents, label='💡 Wissen')
+    
+    def _search_documents(self):
+        """Wissenselemente als Dokumente für die globale Suche"""
         for item_id, item in self.knowledge_base.items():
-            # Index für Titel, Beschreibung, Tags, Content
-            searchable_text = f"{item.title} {item.description} {' '.join(item.tags)} {item.content}".lower()
-            
-            words = searchable_text.split()
-            for word in words:
-                if len(word) > 2:  # Ignoriere sehr kurze Wörter
-                    if word not in self.search_index:
-                        self.search_index[word] = []
-                    if item_id not in self.search_index[word]:
-                        self.search_index[word].append(item_id)
+            yield SearchDocument(
+                source='knowledge',
+                doc_id=item_id,
+                title=item.title,
+                description=item.description,
+                keywords=list(item.tags) + [item.category],
+                content=item.content,
+                payload=item
+            )
     
     def search(self, query: str, max_results: int = 10) -> List[KnowledgeItem]:
         """Sucht in der Wissensbasis"""
-        query_words = query.lower().split()
-        item_scores = {}
-        
-        for word in query_words:
-            if word in self.search_index:
-                for item_id in self.search_index[word]:
-                    if item_id not in item_scores:
-                        item_scores[item_id] = 0
-                    item_scores[item_id] += 1
-        
-        # Sortiere nach Relevanz
-        sorted_items = sorted(item_scores.items(), key=lambda x: x[1], reverse=True)
-        
-        results = []
-        for item_id, score in sorted_items[:max_results]:
-            item = self.knowledge_base[item_id]
-            results.append(item)
-        
-        return results
+        hits = get_global_search().search(query, sources=['knowledge'], limit=max_results)
+        return [hit.payload for hit in hits]
     
     def get_category(self, category_id: str) -> Optional[KnowledgeCategory]:
         """Gibt Kategorie zurück"""
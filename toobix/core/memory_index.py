@@ -0,0 +1,421 @@
+"""
+Toobix Memory Index
+Semantische Suche über Interaktionen, Fakten, Erinnerungen und Tagebuch-Einträge
+"""
+import os
+import re
+import time
+import queue
+import atexit
+import hashlib
+import threading
+import logging
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .startup_profiler import lazy_import
+from .soul_journal_store import tokenize
+from .vector_index import NUMPY_AVAILABLE, SearchHit, SparseVectorIndex, VectorIndex, np
+
+requests = lazy_import('requests')
+
+logger = logging.getLogger(__name__)
+
+KIND_LABELS = {
+    'interaction': 'Frühere Anfrage',
+    'fact': 'Fakt',
+    'memory': 'Erinnerung',
+    'journal': 'Tagebuch'
+}
+
+# Füllwörter tragen nichts zur Ähnlichkeit bei
+STOPWORDS = {
+    'der', 'die', 'das', 'den', 'dem', 'des', 'ein', 'eine', 'einen', 'einem', 'einer',
+    'und', 'oder', 'aber', 'ist', 'sind', 'war', 'bin', 'hat', 'habe', 'mit', 'von', 'zu',
+    'im', 'in', 'an', 'am', 'auf', 'für', 'es', 'ich', 'du', 'er', 'sie', 'wir', 'mir',
+    'mich', 'dir', 'wie', 'was', 'wo', 'wer', 'nicht', 'auch', 'noch', 'so', 'da', 'dass',
+    'the', 'and', 'is', 'to', 'of', 'a'
+}
+
+# Quelle für den Nachindex: liefert (schlüssel, text, zeitstempel)
+DocumentSource = Callable[[], Iterable[Tuple[str, str, float]]]
+
+
+@lru_cache(maxsize=65536)
+def _feature_hash(feature: str) -> int:
+    # Stabil über Prozesse hinweg (im Gegensatz zu hash())
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _normalize(vectors: 'np.ndarray') -> 'np.ndarray':
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class HashingEmbedder:
+    """
+    Deterministische Embeddings ohne Modell: Wörter und Zeichen-Trigramme
+    werden per Feature-Hashing mit Vorzeichen auf dim Dimensionen verteilt.
+    Trigramme fangen Wortformen und Komposita ab ("backup" ~ "backups").
+    Ohne NumPy liefert embed() dünn besetzte Vektoren ({Dimension: Gewicht})
+    für den SparseVectorIndex.
+    """
+
+    TRIGRAM_WEIGHT = 0.4
+    min_score = 0.2
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+        self.space = f"hash-{dim}"
+
+    def embed(self, texts: List[str]):
+        sparse = [self.sparse(text) for text in texts]
+        if not NUMPY_AVAILABLE:
+            return sparse
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, features in enumerate(sparse):
+            if features:
+                vectors[i, list(features)] = list(features.values())
+        return vectors
+
+    def embed_query(self, text: str):
+        return self.embed([text])[0]
+
+    def sparse(self, text: str) -> Dict[int, float]:
+        """L2-normierter Vektor als {Dimension: Gewicht} (reines Python)"""
+        vector: Dict[int, float] = {}
+        for token in tokenize(text):
+            if token in STOPWORDS:
+                continue
+            self._add(vector, token, 1.0)
+            padded = f"#{token}#"
+            for j in range(len(padded) - 2):
+                self._add(vector, padded[j:j + 3], self.TRIGRAM_WEIGHT)
+        norm = sum(weight * weight for weight in vector.values()) ** 0.5
+        return {dim: weight / norm for dim, weight in vector.items() if weight} if norm else {}
+
+    def _add(self, vector: Dict[int, float], feature: str, weight: float):
+        h = _feature_hash(feature)
+        dim = h % self.dim
+        vector[dim] = vector.get(dim, 0.0) + (weight if h >> 63 else -weight)
+
+
+class OllamaEmbedder:
+    """Embeddings über Ollamas /api/embed (ältere Versionen: /api/embeddings)"""
+
+    min_score = 0.55
+
+    def __init__(self, url: str, model: str, timeout: float = 30.0, query_timeout: float = 3.0):
+        self.url = url
+        self.model = model
+        self.timeout = timeout
+        self.query_timeout = query_timeout
+        self.dim: Optional[int] = None
+        self.space = "ollama-" + re.sub(r'[^\w.-]', '_', model)
+
+    def embed(self, texts: List[str], timeout: Optional[float] = None) -> 'np.ndarray':
+        timeout = timeout or self.timeout
+        response = requests.post(f"{self.url}/api/embed", json={'model': self.model, 'input': texts},
+                                 timeout=timeout)
+        if response.status_code == 404 and 'model' not in response.text.lower():
+            vectors = [self._embed_legacy(text, timeout) for text in texts]
+        else:
+            response.raise_for_status()
+            vectors = response.json()['embeddings']
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+        self.dim = vectors.shape[1]
+        return vectors
+
+    def embed_query(self, text: str) -> 'np.ndarray':
+        # Suchen warten nicht auf ein hängendes Ollama
+        return self.embed([text], self.query_timeout)[0]
+
+    def _embed_legacy(self, text: str, timeout: float) -> List[float]:
+        response = requests.post(f"{self.url}/api/embeddings", json={'model': self.model, 'prompt': text},
+                                 timeout=timeout)
+        response.raise_for_status()
+        return response.json()['embedding']
+
+
+class MemoryIndex:
+    """
+    Gemeinsamer Abruf-Index für alles, was Toobix sich merkt.
+
+    - Engines melden neue Einträge per add() - das kostet den Aufrufer nur
+      ein Queue-put; ein Hintergrund-Thread bettet in Batches ein und
+      schreibt in die Vektorindizes
+    - Der Hashing-Raum wird immer gepflegt (schnell, ohne Modell) und ist
+      der Fallback für jede Suche. Ist ein Ollama-Embedding-Modell
+      installiert, entsteht daneben ein eigener Raum; gesucht wird dort,
+      sobald er vollständig nachindiziert ist
+    - Die Indizes (und damit NumPy) werden erst bei der ersten Nutzung
+      geöffnet, im Hintergrund-Thread oder bei der ersten Suche. Ohne
+      NumPy gibt es nur den Hashing-Raum, im Speicher (SparseVectorIndex)
+    - register_source() liefert vorhandene Daten nach, die noch fehlen
+      (erste Inbetriebnahme, neues Embedding-Modell, Fehler beim Einbetten)
+    """
+
+    BATCH_SIZE = 64
+
+    def __init__(self, data_dir: str = 'toobix_vectors', dim: int = 256, mode: str = 'auto'):
+        self.data_dir = Path(data_dir)
+        self.mode = mode
+        self.hashing = HashingEmbedder(dim)
+        self.ollama: Optional[OllamaEmbedder] = None
+        self._ollama_ready = False
+        self._spaces: Dict[str, Tuple[object, VectorIndex]] = {}
+        self._sources: Dict[str, DocumentSource] = {}
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.RLock()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {'indexed': 0, 'backfilled': 0, 'embed_errors': 0, 'queries': 0,
+                      'fallback_queries': 0, 'last_query_ms': 0.0}
+
+    def _open_space(self, embedder) -> VectorIndex:
+        if NUMPY_AVAILABLE:
+            index = VectorIndex(self.data_dir / embedder.space, embedder.dim, mode=self.mode)
+        else:
+            index = SparseVectorIndex(embedder.dim)
+        with self._lock:
+            self._spaces[embedder.space] = (embedder, index)
+        return index
+
+    def _hashing_space(self) -> Tuple[object, VectorIndex]:
+        """Der Hashing-Raum; wird beim ersten Zugriff geöffnet"""
+        with self._lock:
+            entry = self._spaces.get(self.hashing.space)
+            if entry is None:
+                self._open_space(self.hashing)  # RLock: _open_space sperrt erneut
+                entry = self._spaces[self.hashing.space]
+            return entry
+
+    # === SCHREIBEN ===
+
+    def add(self, kind: str, key: str, text: str, timestamp: Optional[float] = None):
+        """Merkt einen Eintrag zum Einbetten vor (ein vorhandener Schlüssel wird ersetzt)"""
+        if text and text.strip():
+            self._submit(('add', (f"{kind}:{key}", kind, text, timestamp or time.time())))
+
+    def remove(self, kind: str, key: str):
+        self._submit(('remove', f"{kind}:{key}"))
+
+    def register_source(self, kind: str, loader: DocumentSource):
+        """Quelle für den Nachindex; fehlende Einträge werden im Hintergrund ergänzt"""
+        self._sources[kind] = loader
+        self._submit(('backfill', kind, None))
+
+    def enable_ollama(self, url: str, model: str):
+        """Ollama-Embeddings nutzen (Probe, Raum öffnen und nachindizieren im Hintergrund)"""
+        self._submit(('ollama', url, model))
+
+    def _submit(self, op: Tuple):
+        self._queue.put(op)
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='MemoryIndex', daemon=True)
+                    self._thread.start()
+
+    # === HINTERGRUND ===
+
+    def _run(self):
+        carry = None
+        while True:
+            op = carry if carry is not None else self._queue.get()
+            carry = None
+            if op is None:
+                self._queue.task_done()
+                return
+            extra = 0
+            try:
+                if op[0] == 'add':
+                    # Wartende Einträge zu einem Batch zusammenfassen
+                    batch = {op[1][0]: op[1]}
+                    while len(batch) < self.BATCH_SIZE:
+                        try:
+                            following = self._queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        if following is None or following[0] != 'add':
+                            carry = following
+                            break
+                        batch[following[1][0]] = following[1]
+                        extra += 1
+                    self._index_batch(list(batch.values()))
+                elif op[0] == 'remove':
+                    for _, index in self._space_list():
+                        index.remove(op[1])
+                elif op[0] == 'backfill':
+                    self._backfill(op[1], op[2])
+                elif op[0] == 'ollama':
+                    self._enable_ollama(op[1], op[2])
+            except Exception as e:
+                logger.error(f"❌ Memory-Index Fehler: {e}")
+            finally:
+                for _ in range(extra + 1):
+                    self._queue.task_done()
+
+    def _space_list(self) -> List[Tuple[object, VectorIndex]]:
+        self._hashing_space()
+        with self._lock:
+            return list(self._spaces.values())
+
+    def _index_batch(self, items: List[Tuple[str, str, str, float]], spaces=None) -> int:
+        texts = [text for _, _, text, _ in items]
+        for embedder, index in spaces or self._space_list():
+            try:
+                vectors = embedder.embed(texts)
+            except Exception as e:
+                self.stats['embed_errors'] += 1
+                logger.warning(f"⚠️ Einbetten mit {embedder.space} fehlgeschlagen: {e}")
+                if embedder is self.ollama:
+                    # Raum ist jetzt lückenhaft - bis zum nächsten enable_ollama() per Hashing suchen
+                    self._ollama_ready = False
+                continue
+            index.upsert(items, vectors)
+            if index.needs_training():
+                index.train_ivf()
+        self.stats['indexed'] += len(items)
+        return len(items)
+
+    def _backfill(self, kind: Optional[str], space: Optional[str]):
+        spaces = [entry for entry in self._space_list() if space is None or entry[0].space == space]
+        kinds = [kind] if kind else list(self._sources)
+        for source_kind in kinds:
+            try:
+                documents = list(self._sources[source_kind]())
+            except Exception as e:
+                logger.warning(f"⚠️ Quelle '{source_kind}' nicht lesbar: {e}")
+                continue
+            for embedder, index in spaces:
+                missing = [(f"{source_kind}:{key}", source_kind, text, timestamp)
+                           for key, text, timestamp in documents
+                           if text and text.strip() and not index.contains(f"{source_kind}:{key}")]
+                for start in range(0, len(missing), self.BATCH_SIZE):
+                    self._index_batch(missing[start:start + self.BATCH_SIZE], [(embedder, index)])
+                if missing:
+                    self.stats['backfilled'] += len(missing)
+                    logger.info(f"🧭 {len(missing)} Einträge '{source_kind}' in {embedder.space} nachindiziert")
+
+    def _enable_ollama(self, url: str, model: str):
+        if not NUMPY_AVAILABLE:
+            logger.info("ℹ️ NumPy nicht installiert - semantische Suche nur per Hashing")
+            return
+        embedder = OllamaEmbedder(url, model)
+        try:
+            embedder.embed(['Toobix'])  # Probe, bestimmt auch die Dimension
+        except Exception as e:
+            logger.info(f"ℹ️ Ollama-Embeddings mit {model} nicht verfügbar ({e}) - nutze Hashing")
+            return
+        with self._lock:
+            existing = self._spaces.get(embedder.space)
+        if existing is None or existing[1].dim != embedder.dim:
+            self._open_space(embedder)
+        else:
+            with self._lock:
+                self._spaces[embedder.space] = (embedder, existing[1])
+        self.ollama = embedder
+        self._backfill(None, embedder.space)
+        self._ollama_ready = True
+        logger.info(f"🧭 Semantische Suche mit {model} ({embedder.dim} Dimensionen)")
+
+    # === SUCHE ===
+
+    def search(self, query: str, k: int = 5, kinds: Optional[Iterable[str]] = None,
+               min_score: Optional[float] = None) -> List[SearchHit]:
+        """Die k ähnlichsten Einträge; fällt bei Ollama-Fehlern auf Hashing zurück"""
+        start = time.perf_counter()
+        self.stats['queries'] += 1
+        embedder, index = self._query_space()
+        try:
+            vector = embedder.embed_query(query)
+        except Exception as e:
+            logger.warning(f"⚠️ Query-Embedding fehlgeschlagen, nutze Hashing: {e}")
+            self.stats['fallback_queries'] += 1
+            self._ollama_ready = False  # bis zum nächsten enable_ollama()
+            embedder, index = self._hashing_space()
+            vector = embedder.embed_query(query)
+        threshold = embedder.min_score if min_score is None else min_score
+        hits = index.search(vector, k, kinds, threshold)
+        self.stats['last_query_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        return hits
+
+    def _query_space(self) -> Tuple[object, VectorIndex]:
+        with self._lock:
+            if self._ollama_ready and self.ollama and self.ollama.space in self._spaces:
+                return self._spaces[self.ollama.space]
+        return self._hashing_space()
+
+    def recall_context(self, query: str, k: int = 4, kinds: Optional[Iterable[str]] = None,
+                       max_chars: int = 800) -> str:
+        """Relevante frühere Einträge als Prompt-Kontext ('' wenn nichts passt)"""
+        try:
+            hits = self.search(query, k + 1, kinds)
+        except Exception as e:
+            logger.warning(f"⚠️ Erinnerungs-Suche fehlgeschlagen: {e}")
+            return ''
+        asked = ' '.join(query.lower().split())
+        lines, used = [], 0
+        for hit in hits:
+            text = ' '.join(hit.text.split())
+            if text.lower() == asked:
+                continue  # dieselbe Frage ist keine Erinnerung
+            label = KIND_LABELS.get(hit.kind, hit.kind)
+            if hit.timestamp:
+                label += f", {datetime.fromtimestamp(hit.timestamp):%d.%m.%Y}"
+            line = f"- [{label}] {text[:200]}"
+            if used + len(line) > max_chars:
+                break
+            lines.append(line)
+            used += len(line)
+            if len(lines) == k:
+                break
+        return "RELEVANTE ERINNERUNGEN:\n" + "\n".join(lines) if lines else ''
+
+    # === VERWALTUNG ===
+
+    def wait_idle(self, timeout: float = 10.0) -> bool:
+        """Wartet, bis alle vorgemerkten Einträge eingebettet sind"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def shutdown(self, timeout: float = 5.0):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+        with self._lock:
+            spaces = list(self._spaces.values())
+        for _, index in spaces:
+            index.save()
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            'backend': self.ollama.model if self._ollama_ready and self.ollama else 'hashing',
+            'pending': self._queue.unfinished_tasks,
+            'spaces': {name: index.get_stats() for name, (_, index) in dict(self._spaces).items()}
+        }
+
+
+# Globale Instanz
+_memory_index: Optional[MemoryIndex] = None
+_memory_index_lock = threading.Lock()
+
+
+def get_memory_index() -> MemoryIndex:
+    """
+    Gibt den gemeinsamen Erinnerungs-Index zurück (speichert automatisch beim
+    Beenden). TOOBIX_VECTOR_DIR legt das Verzeichnis fest (z.B. für Benchmarks)
+    """
+    global _memory_index
+    with _memory_index_lock:
+        if _memory_index is None:
+            _memory_index = MemoryIndex(os.getenv('TOOBIX_VECTOR_DIR', 'toobix_vectors'))
+            atexit.register(_memory_index.shutdown)
+        return _memory_index
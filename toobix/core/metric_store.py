@@ -0,0 +1,416 @@
+"""
+Toobix Metric Store
+Spaltenbasierter, NumPy-gestützter Speicher für Verhaltens-Metriken
+"""
+import os
+import json
+import math
+import threading
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .persistence import repair_torn_tail
+
+logger = logging.getLogger(__name__)
+
+# Numerische Spalten (float64) - in dieser Reihenfolge auch für Korrelationen
+VALUE_COLUMNS = ('focus_score', 'efficiency', 'energy_level', 'interruptions',
+                 'task_switches', 'session_duration')
+# Schlüssel-Spalten (int32) für Gruppierungen
+KEY_COLUMNS = ('time_of_day', 'day_of_week', 'context')
+
+
+class OnlineStats:
+    """Laufender Mittelwert/Varianz nach Welford - O(1) pro Wert"""
+
+    __slots__ = ('count', 'mean', 'm2', 'minimum', 'maximum')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'std': self.std,
+            'min': self.minimum if self.count else 0.0,
+            'max': self.maximum if self.count else 0.0
+        }
+
+    @classmethod
+    def from_array(cls, values: np.ndarray) -> 'OnlineStats':
+        """Initialisiert die Statistik vektorisiert aus vorhandenen Werten"""
+        stats = cls()
+        if len(values):
+            stats.count = int(len(values))
+            stats.mean = float(values.mean())
+            stats.m2 = float(((values - stats.mean) ** 2).sum())
+            stats.minimum = float(values.min())
+            stats.maximum = float(values.max())
+        return stats
+
+
+class MetricStore:
+    """
+    Spaltenspeicher für Verhaltens-Metriken.
+
+    Jede Spalte ist ein NumPy-Array mit Reserve-Kapazität (Verdopplung beim
+    Wachsen), ein append() kostet damit amortisiert O(1) und aktualisiert
+    die Welford-Statistiken aller Wertspalten. Gruppierungen (Stunde,
+    Wochentag, Kontext), Korrelationsmatrizen und gleitende Fenster laufen
+    vektorisiert über die Spalten statt über Python-Objekte.
+
+    Kontexte werden als Integer-Codes gespeichert (self.contexts ist das
+    Vokabular). Ab max_samples werden die ältesten 10% verworfen.
+
+    Gespeichert wird inkrementell: flush_log() hängt nur neue Datenpunkte
+    an ein Zeilen-Log an, erst ab compact_rows Log-Zeilen (oder mit
+    save()) entsteht ein neuer .npz-Snapshot. Snapshot und Log tragen eine
+    Generation - nach einem Snapshot gilt das alte Log nicht mehr, auch
+    wenn ein Absturz das Löschen verhindert hat.
+    """
+
+    COMPACT_ROWS = 50_000
+
+    def __init__(self, max_samples: int = 1_000_000, initial_capacity: int = 1024):
+        self.max_samples = max_samples
+        self._size = 0
+        self._capacity = initial_capacity
+        self._timestamps = np.empty(initial_capacity, dtype=np.float64)
+        self._values = {name: np.empty(initial_capacity, dtype=np.float64) for name in VALUE_COLUMNS}
+        self._keys = {name: np.empty(initial_capacity, dtype=np.int32) for name in KEY_COLUMNS}
+        self.contexts: List[str] = []
+        self._context_codes: Dict[str, int] = {}
+        self.stats: Dict[str, OnlineStats] = {name: OnlineStats() for name in VALUE_COLUMNS}
+        self._lock = threading.RLock()
+        # Inkrementelle Persistenz
+        self._persisted = 0     # Datenpunkte, die schon in Snapshot oder Log stehen
+        self._log_rows = 0
+        self._generation = 0
+        self._log_repaired = False
+
+    def __len__(self) -> int:
+        return self._size
+
+    # === SCHREIBEN ===
+
+    def append(self, timestamp: datetime, context: str, focus_score: float, efficiency: float,
+               energy_level: float, interruptions: int = 0, task_switches: int = 0,
+               session_duration: float = 0.0):
+        """Fügt einen Datenpunkt hinzu (amortisiert O(1))"""
+        values = {
+            'focus_score': float(focus_score),
+            'efficiency': float(efficiency),
+            'energy_level': float(energy_level),
+            'interruptions': float(interruptions),
+            'task_switches': float(task_switches),
+            'session_duration': float(session_duration)
+        }
+        with self._lock:
+            if self._size == self.max_samples:
+                self._drop_oldest(max(1, self.max_samples // 10))
+            if self._size == self._capacity:
+                self._grow(min(self._capacity * 2, self.max_samples))
+
+            i = self._size
+            self._timestamps[i] = timestamp.timestamp()
+            for name, value in values.items():
+                self._values[name][i] = value
+                self.stats[name].add(value)
+            self._keys['time_of_day'][i] = timestamp.hour
+            self._keys['day_of_week'][i] = timestamp.weekday()
+            self._keys['context'][i] = self._context_code(context)
+            self._size += 1
+
+    # === SPALTEN ===
+
+    def column(self, name: str) -> np.ndarray:
+        """Sicht (keine Kopie) auf eine Spalte: Wert-, Schlüssel- oder 'timestamp'-Spalte"""
+        if name == 'timestamp':
+            return self._timestamps[:self._size]
+        if name in self._values:
+            return self._values[name][:self._size]
+        return self._keys[name][:self._size]
+
+    def performance(self, include_energy: bool = False) -> np.ndarray:
+        """(Fokus + Effizienz [+ Energie]) / Anzahl, vektorisiert"""
+        focus = self.column('focus_score')
+        efficiency = self.column('efficiency')
+        if include_energy:
+            return (focus + efficiency + self.column('energy_level')) / 3
+        return (focus + efficiency) / 2
+
+    def since(self, timestamp: datetime) -> slice:
+        """Slice aller Datenpunkte ab timestamp (Zeitstempel sind aufsteigend)"""
+        start = int(np.searchsorted(self.column('timestamp'), timestamp.timestamp(), side='left'))
+        return slice(start, self._size)
+
+    def between(self, start: datetime, end: datetime) -> slice:
+        """Slice aller Datenpunkte in [start, end)"""
+        timestamps = self.column('timestamp')
+        low = int(np.searchsorted(timestamps, start.timestamp(), side='left'))
+        high = int(np.searchsorted(timestamps, end.timestamp(), side='left'))
+        return slice(low, high)
+
+    # === AGGREGATIONEN ===
+
+    def group(self, key: str, values: np.ndarray, min_count: int = 1,
+              mask: Optional[np.ndarray] = None) -> Dict[Union[int, str], Tuple[float, float, int]]:
+        """
+        Gruppiert values nach einer Schlüssel-Spalte ('time_of_day',
+        'day_of_week', 'context'). Liefert {schlüssel: (mittel, std, anzahl)}
+        für Gruppen mit mindestens min_count Werten; Kontexte mit Namen.
+        """
+        keys = self.column(key)
+        if mask is not None:
+            keys = keys[mask]
+            values = values[mask]
+        if not len(keys):
+            return {}
+        counts = np.bincount(keys)
+        sums = np.bincount(keys, weights=values)
+        sq_sums = np.bincount(keys, weights=values * values)
+
+        result = {}
+        for code in np.nonzero(counts >= max(1, min_count))[0]:
+            n = int(counts[code])
+            mean = sums[code] / n
+            variance = (sq_sums[code] - n * mean * mean) / (n - 1) if n > 1 else 0.0
+            label = self.contexts[code] if key == 'context' else int(code)
+            result[label] = (float(mean), math.sqrt(max(0.0, variance)), n)
+        return result
+
+    def bucket_means(self, values: np.ndarray, by: np.ndarray, width: float,
+                     min_count: int = 1) -> Dict[int, Tuple[float, int]]:
+        """Mittelwerte von values in festen Intervallen von by (z.B. 15-Minuten-Buckets)"""
+        if not len(by):
+            return {}
+        buckets = (by // width).astype(np.int64)
+        counts = np.bincount(buckets)
+        sums = np.bincount(buckets, weights=values)
+        return {
+            int(bucket * width): (float(sums[bucket] / counts[bucket]), int(counts[bucket]))
+            for bucket in np.nonzero(counts >= max(1, min_count))[0]
+        }
+
+    def correlation_matrix(self, columns: Tuple[str, ...] = VALUE_COLUMNS) -> Dict[str, Dict[str, float]]:
+        """Pearson-Korrelationsmatrix der gewählten Spalten"""
+        if self._size < 2:
+            return {}
+        matrix = np.vstack([self.column(name) for name in columns])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            coefficients = np.nan_to_num(np.corrcoef(matrix))
+        return {
+            a: {b: float(coefficients[i, j]) for j, b in enumerate(columns)}
+            for i, a in enumerate(columns)
+        }
+
+    @staticmethod
+    def correlation(x: np.ndarray, y: np.ndarray) -> float:
+        """Pearson-Korrelation zweier Arrays (0.0 bei konstanten Daten)"""
+        if len(x) != len(y) or len(x) < 2:
+            return 0.0
+        x_centered = x - x.mean()
+        y_centered = y - y.mean()
+        denominator = math.sqrt(float(np.dot(x_centered, x_centered)) * float(np.dot(y_centered, y_centered)))
+        return float(np.dot(x_centered, y_centered)) / denominator if denominator else 0.0
+
+    @staticmethod
+    def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+        """Gleitender Mittelwert über window Werte (Länge len(values) - window + 1)"""
+        if window <= 0 or len(values) < window:
+            return np.empty(0, dtype=np.float64)
+        cumulative = np.cumsum(np.concatenate(([0.0], values)))
+        return (cumulative[window:] - cumulative[:-window]) / window
+
+    # === PERSISTENZ ===
+
+    def tail_records(self, count: int) -> List[Dict]:
+        """Die letzten count Datenpunkte als Dicts (z.B. für JSON-Export)"""
+        with self._lock:
+            start = max(0, self._size - count)
+            return [
+                {
+                    'timestamp': datetime.fromtimestamp(self._timestamps[i]).isoformat(),
+                    'context': self.contexts[self._keys['context'][i]],
+                    **{name: float(self._values[name][i]) for name in VALUE_COLUMNS},
+                    'time_of_day': int(self._keys['time_of_day'][i]),
+                    'day_of_week': int(self._keys['day_of_week'][i])
+                }
+                for i in range(start, self._size)
+            ]
+
+    def flush_log(self, path: Union[str, Path], compact_rows: Optional[int] = None) -> int:
+        """
+        Hängt neue Datenpunkte an das Log neben path an; ab compact_rows
+        Log-Zeilen wird stattdessen ein vollständiger Snapshot geschrieben.
+        Gibt die Anzahl neu gespeicherter Datenpunkte zurück.
+        """
+        path = Path(path)
+        compact_rows = compact_rows or self.COMPACT_ROWS
+        with self._lock:
+            start = self._persisted
+            records = self._records(start, self._size)
+            if not records:
+                return 0
+            if self._log_rows + len(records) >= compact_rows:
+                self.save(path)
+                return len(records)
+            log_path = self._log_path(path, self._generation)
+            if not self._log_repaired:
+                repair_torn_tail(log_path)
+                self._log_repaired = True
+            with open(log_path, 'a', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+                                for record in records))
+            self._persisted = self._size
+            self._log_rows += len(records)
+            return len(records)
+
+    def save(self, path: Union[str, Path]):
+        """Speichert alle Spalten atomar als .npz (neue Generation, altes Log entfällt)"""
+        path = Path(path)
+        with self._lock:
+            generation = self._generation + 1
+            arrays = {'timestamp': self._timestamps[:self._size].copy()}
+            arrays.update({name: self._values[name][:self._size].copy() for name in VALUE_COLUMNS})
+            arrays.update({name: self._keys[name][:self._size].copy() for name in KEY_COLUMNS})
+            arrays['contexts'] = np.array(self.contexts, dtype=str)
+            arrays['generation'] = np.array(generation)
+
+            tmp_path = path.with_name(path.name + '.tmp')
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, path)
+
+            old_log = self._log_path(path, self._generation)
+            self._generation = generation
+            self._persisted = self._size
+            self._log_rows = 0
+            self._log_repaired = False
+        try:
+            old_log.unlink()
+        except FileNotFoundError:
+            pass
+
+    def load(self, path: Union[str, Path]) -> bool:
+        """Lädt Snapshot und Log; gibt False zurück, wenn keins von beiden existiert"""
+        path = Path(path)
+        found = False
+        if path.exists():
+            found = True
+            with np.load(path, allow_pickle=False) as data:
+                size = int(len(data['timestamp']))
+                with self._lock:
+                    self._capacity = max(size, 1024)
+                    self._timestamps = np.empty(self._capacity, dtype=np.float64)
+                    self._timestamps[:size] = data['timestamp']
+                    for name in VALUE_COLUMNS:
+                        self._values[name] = np.empty(self._capacity, dtype=np.float64)
+                        self._values[name][:size] = data[name]
+                    for name in KEY_COLUMNS:
+                        self._keys[name] = np.empty(self._capacity, dtype=np.int32)
+                        self._keys[name][:size] = data[name]
+                    self.contexts = [str(c) for c in data['contexts']]
+                    self._context_codes = {c: i for i, c in enumerate(self.contexts)}
+                    self._size = size
+                    self._generation = int(data['generation']) if 'generation' in data.files else 0
+                    self._rebuild_stats()
+
+        log_path = self._log_path(path, self._generation)
+        with self._lock:
+            if log_path.exists():
+                found = True
+                self._log_rows = self._replay_log(log_path)
+            self._persisted = self._size
+        # Logs älterer Generationen (Absturz direkt nach einem Snapshot)
+        for stale in path.parent.glob(f"{path.stem}.*.log"):
+            if stale != log_path:
+                stale.unlink()
+        return found
+
+    # === INTERN ===
+
+    @staticmethod
+    def _log_path(path: Path, generation: int) -> Path:
+        return path.with_name(f"{path.stem}.{generation}.log")
+
+    def _records(self, start: int, end: int) -> List[list]:
+        """Kompakte Log-Zeilen: [timestamp, kontext, *wertspalten]"""
+        return [
+            [float(self._timestamps[i]), self.contexts[self._keys['context'][i]],
+             *(float(self._values[name][i]) for name in VALUE_COLUMNS)]
+            for i in range(start, end)
+        ]
+
+    def _replay_log(self, log_path: Path) -> int:
+        """Spielt Log-Zeilen nach dem Snapshot ein; abgebrochene Zeilen werden übersprungen"""
+        rows = 0
+        with open(log_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    timestamp, context, *values = json.loads(line)
+                    self.append(datetime.fromtimestamp(timestamp), context, *values)
+                    rows += 1
+                except (ValueError, TypeError) as e:
+                    logger.warning(f"Ungültige Zeile in {log_path.name} übersprungen: {e}")
+        return rows
+
+    def _context_code(self, context: str) -> int:
+        code = self._context_codes.get(context)
+        if code is None:
+            code = len(self.contexts)
+            self.contexts.append(context)
+            self._context_codes[context] = code
+        return code
+
+    def _grow(self, capacity: int):
+        """Vergrößert alle Spalten auf capacity"""
+        def grown(array: np.ndarray) -> np.ndarray:
+            new_array = np.empty(capacity, dtype=array.dtype)
+            new_array[:self._size] = array[:self._size]
+            return new_array
+
+        self._timestamps = grown(self._timestamps)
+        self._values = {name: grown(array) for name, array in self._values.items()}
+        self._keys = {name: grown(array) for name, array in self._keys.items()}
+        self._capacity = capacity
+
+    def _drop_oldest(self, count: int):
+        """Verwirft die ältesten count Datenpunkte"""
+        keep = self._size - count
+        self._persisted = max(0, self._persisted - count)
+        self._timestamps[:keep] = self._timestamps[count:self._size]
+        for array in list(self._values.values()) + list(self._keys.values()):
+            array[:keep] = array[count:self._size]
+        self._size = keep
+        self._rebuild_stats()
+
+    def _rebuild_stats(self):
+        self.stats = {name: OnlineStats.from_array(self.column(name)) for name in VALUE_COLUMNS}
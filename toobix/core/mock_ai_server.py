@@ -0,0 +1,325 @@
+"""
+Toobix Mock AI Server
+Lokaler Ersatz für Ollama (/api/generate, /api/tags) und OpenAI-kompatible Chat-APIs (Groq)
+"""
+import json
+import time
+import random
+import argparse
+import threading
+import logging
+from dataclasses import dataclass, asdict, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MockConfig:
+    """Verhalten des Mock-Servers; zur Laufzeit über POST /_mock/config änderbar"""
+    models: List[str] = field(default_factory=lambda: ['gemma2:2b', 'llama-3.1-70b-versatile'])
+    latency_ms: float = 20.0            # fester Overhead pro Anfrage
+    jitter_ms: float = 5.0
+    tokens_per_s: float = 50.0          # Generierungsrate
+    prompt_tokens_per_s: float = 800.0  # Prompt-Auswertung (nicht gecachte Tokens)
+    response_tokens: int = 40           # Antwortlänge, sofern num_predict/max_tokens nicht kleiner
+    load_ms: float = 1500.0             # Kaltstart eines Modells
+    failure_rate: float = 0.0           # Anteil HTTP 500
+    hang_rate: float = 0.0              # Anteil Anfragen, die hang_s lang nicht antworten
+    hang_s: float = 60.0
+
+
+def _parse_keep_alive(value, default: float = 300.0) -> float:
+    """Ollama-Dauer ('300s', '5m', '1h', Zahl in Sekunden, -1 = unbegrenzt)"""
+    if value is None:
+        return default
+    if isinstance(value, (int, float)):
+        return float('inf') if value < 0 else float(value)
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    try:
+        if value[-1] in units:
+            return float(value[:-1]) * units[value[-1]]
+        return float(value)
+    except (ValueError, IndexError):
+        return default
+
+
+class MockAIServer:
+    """
+    Simuliert die Backends so weit, wie Toobix sie nutzt:
+
+    - Ollama /api/generate (mit und ohne stream), /api/tags; Kaltstart
+      (load_duration) und Entladen nach keep_alive, Prompt-Cache für
+      gemeinsame Präfixe, 'context' für Folgefragen
+    - OpenAI-kompatibel /openai/v1/chat/completions und /v1/chat/completions
+      (mit und ohne stream als Server-Sent Events)
+    - Latenz, Token-Rate, Fehler (HTTP 500) und hängende Anfragen sind
+      konfigurierbar
+
+    Beispiel: MockAIServer(MockConfig(tokens_per_s=20)).start() -> Basis-URL
+    """
+
+    def __init__(self, config: Optional[MockConfig] = None, host: str = '127.0.0.1', port: int = 0):
+        self.config = config or MockConfig()
+        self._lock = threading.Lock()
+        self._loaded: Dict[str, float] = {}          # Modell -> geladen bis (monotonic)
+        self._last_prompt: Dict[str, str] = {}
+        self.stats = {'requests': 0, 'generate': 0, 'chat': 0, 'tags': 0,
+                      'failures': 0, 'hangs': 0, 'cold_loads': 0, 'cached_prompt_tokens': 0}
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._server.serve_forever, name='MockAIServer', daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def update(self, **changes):
+        """Ändert das Verhalten zur Laufzeit (z.B. Backend degradieren)"""
+        with self._lock:
+            for key, value in changes.items():
+                if hasattr(self.config, key):
+                    setattr(self.config, key, value)
+
+    # === SIMULATION ===
+
+    def _inject_fault(self) -> Optional[str]:
+        with self._lock:
+            config = self.config
+            roll = random.random()
+            if roll < config.failure_rate:
+                self.stats['failures'] += 1
+                return 'fail'
+            if roll < config.failure_rate + config.hang_rate:
+                self.stats['hangs'] += 1
+                return 'hang'
+        return None
+
+    def _overhead_s(self) -> float:
+        config = self.config
+        return max(0.0, config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)) / 1000
+
+    def _load_model(self, model: str, keep_alive) -> float:
+        """Liefert die Ladezeit in Sekunden (0, wenn das Modell noch geladen ist)"""
+        now = time.monotonic()
+        with self._lock:
+            cold = self._loaded.get(model, 0.0) < now
+            if cold:
+                self.stats['cold_loads'] += 1
+            self._loaded[model] = now + _parse_keep_alive(keep_alive)
+            return self.config.load_ms / 1000 if cold else 0.0
+
+    def _prompt_eval(self, model: str, text: str, has_context: bool) -> int:
+        """Tokens, die neu ausgewertet werden müssen (gemeinsames Präfix ist gecacht)"""
+        total = max(1, len(text) // 4)
+        if has_context:
+            return total
+        with self._lock:
+            previous = self._last_prompt.get(model, '')
+            self._last_prompt[model] = text
+            common = 0
+            for a, b in zip(previous, text):
+                if a != b:
+                    break
+                common += 1
+            cached = min(total - 1, common // 4)
+            self.stats['cached_prompt_tokens'] += cached
+        return total - cached
+
+    def _tokens(self, prompt: str, count: int) -> List[str]:
+        words = f"Mock-Antwort auf: {prompt.strip()[-60:]}".split()
+        words += [f"wort{i}" for i in range(max(0, count - len(words)))]
+        return [w + ' ' for w in words[:count]]
+
+    # === HTTP ===
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                logger.debug("mock: " + format % args)
+
+            def _json(self, status: int, payload: Dict):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _body(self) -> Dict:
+                length = int(self.headers.get('Content-Length') or 0)
+                return json.loads(self.rfile.read(length) or b'{}')
+
+            def _start_stream(self, content_type: str):
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+
+            def _chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def _end_stream(self):
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+            def do_GET(self):
+                with server._lock:
+                    server.stats['requests'] += 1
+                if self.path == '/api/tags':
+                    with server._lock:
+                        server.stats['tags'] += 1
+                    self._json(200, {'models': [{'name': m} for m in server.config.models]})
+                elif self.path == '/_mock/stats':
+                    self._json(200, {'stats': dict(server.stats), 'config': asdict(server.config)})
+                else:
+                    self._json(404, {'error': 'not found'})
+
+            def do_POST(self):
+                with server._lock:
+                    server.stats['requests'] += 1
+                try:
+                    body = self._body()
+                except ValueError:
+                    self._json(400, {'error': 'invalid json'})
+                    return
+                if self.path == '/_mock/config':
+                    server.update(**body)
+                    self._json(200, asdict(server.config))
+                elif self.path == '/api/generate':
+                    self._generate(body)
+                elif self.path in ('/v1/chat/completions', '/openai/v1/chat/completions'):
+                    self._chat(body)
+                else:
+                    self._json(404, {'error': 'not found'})
+
+            def _fault(self) -> bool:
+                fault = server._inject_fault()
+                if fault == 'fail':
+                    self._json(500, {'error': 'injected failure'})
+                    return True
+                if fault == 'hang':
+                    time.sleep(server.config.hang_s)
+                    self._json(504, {'error': 'injected hang'})
+                    return True
+                return False
+
+            def _generate(self, body: Dict):
+                with server._lock:
+                    server.stats['generate'] += 1
+                if self._fault():
+                    return
+                start = time.perf_counter()
+                model = body.get('model', server.config.models[0])
+                load_s = server._load_model(model, body.get('keep_alive'))
+                prompt = body.get('prompt', '')
+                if not prompt:
+                    # Nur laden (Warm-up)
+                    time.sleep(load_s)
+                    self._json(200, {'model': model, 'response': '', 'done': True,
+                                     'load_duration': int(load_s * 1e9)})
+                    return
+
+                text = f"{body.get('system', '')}\n\n{prompt}"
+                context = body.get('context') or []
+                eval_tokens = server._prompt_eval(model, text, bool(context))
+                prompt_eval_s = eval_tokens / server.config.prompt_tokens_per_s
+                limit = body.get('options', {}).get('num_predict') or server.config.response_tokens
+                tokens = server._tokens(prompt, min(limit, server.config.response_tokens))
+                time.sleep(server._overhead_s() + load_s + prompt_eval_s)
+
+                final = {
+                    'model': model, 'done': True,
+                    'context': context + list(range(eval_tokens + len(tokens))),
+                    'load_duration': int(load_s * 1e9),
+                    'prompt_eval_count': eval_tokens,
+                    'prompt_eval_duration': int(prompt_eval_s * 1e9),
+                    'eval_count': len(tokens),
+                    'eval_duration': int(len(tokens) / server.config.tokens_per_s * 1e9)
+                }
+                if body.get('stream', True):
+                    self._start_stream('application/x-ndjson')
+                    for token in tokens:
+                        time.sleep(1 / server.config.tokens_per_s)
+                        self._chunk(json.dumps({'model': model, 'response': token, 'done': False}).encode() + b'\n')
+                    final['response'] = ''
+                    final['total_duration'] = int((time.perf_counter() - start) * 1e9)
+                    self._chunk(json.dumps(final).encode() + b'\n')
+                    self._end_stream()
+                else:
+                    time.sleep(len(tokens) / server.config.tokens_per_s)
+                    final['response'] = ''.join(tokens).strip()
+                    final['total_duration'] = int((time.perf_counter() - start) * 1e9)
+                    self._json(200, final)
+
+            def _chat(self, body: Dict):
+                with server._lock:
+                    server.stats['chat'] += 1
+                if self._fault():
+                    return
+                model = body.get('model', server.config.models[-1])
+                messages = body.get('messages', [])
+                prompt = messages[-1]['content'] if messages else ''
+                prompt_tokens = sum(len(m.get('content', '')) for m in messages) // 4
+                limit = body.get('max_tokens') or server.config.response_tokens
+                tokens = server._tokens(prompt, min(limit, server.config.response_tokens))
+                time.sleep(server._overhead_s() + prompt_tokens / server.config.prompt_tokens_per_s)
+
+                if body.get('stream'):
+                    self._start_stream('text/event-stream')
+                    for token in tokens:
+                        time.sleep(1 / server.config.tokens_per_s)
+                        event = {'object': 'chat.completion.chunk', 'model': model,
+                                 'choices': [{'index': 0, 'delta': {'content': token}, 'finish_reason': None}]}
+                        self._chunk(f"data: {json.dumps(event)}\n\n".encode())
+                    self._chunk(b"data: [DONE]\n\n")
+                    self._end_stream()
+                else:
+                    time.sleep(len(tokens) / server.config.tokens_per_s)
+                    self._json(200, {
+                        'object': 'chat.completion', 'model': model,
+                        'choices': [{'index': 0, 'finish_reason': 'stop',
+                                     'message': {'role': 'assistant', 'content': ''.join(tokens).strip()}}],
+                        'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': len(tokens),
+                                  'total_tokens': prompt_tokens + len(tokens)}
+                    })
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Toobix Mock-KI-Server (Ollama + OpenAI-kompatibel)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11434)
+    for name, value in asdict(MockConfig()).items():
+        if isinstance(value, (int, float)):
+            parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args(argv)
+
+    config = MockConfig(**{k: v for k, v in vars(args).items() if k in MockConfig.__dataclass_fields__})
+    server = MockAIServer(config, args.host, args.port)
+    print(f"🧪 Mock-KI-Server läuft auf {server.url} (Strg+C beendet)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
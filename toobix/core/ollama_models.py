@@ -0,0 +1,209 @@
+"""
+Toobix Ollama Model Manager
+Vorwärmen der Modelle, keep_alive nach Nutzung und Ladezeit vs. Generierungszeit
+"""
+import time
+import threading
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterable, List, Optional
+
+from .startup_profiler import lazy_import
+
+requests = lazy_import('requests')
+
+logger = logging.getLogger(__name__)
+
+# Unter dieser load_duration war das Modell schon geladen (nur Overhead)
+COLD_LOAD_THRESHOLD_MS = 100
+
+
+@dataclass
+class ModelUsage:
+    """Beobachtete Nutzung und Zeiten eines Ollama-Modells"""
+    model: str
+    role: str                                   # 'main' oder 'simple'
+    loaded_until: float = 0.0                   # monotonic; danach entlädt Ollama das Modell
+    last_used: Optional[float] = None
+    keep_alive_s: int = 600
+    gaps: Deque[float] = field(default_factory=lambda: deque(maxlen=20))
+    warmups: int = 0
+    cold_loads: int = 0
+    last_load_ms: float = 0.0
+    load_ms_total: float = 0.0
+    generations: int = 0
+    generation_ms_total: float = 0.0
+    prompt_eval_ms_total: float = 0.0
+    eval_tokens: int = 0
+
+
+class OllamaModelManager:
+    """
+    Hält die konfigurierten Ollama-Modelle warm.
+
+    - warm_up_async() lädt beim Start das Hauptmodell (und optional ein
+      kleines 'simple'-Modell für den Fallback) im Hintergrund: eine
+      /api/generate-Anfrage ohne Prompt lädt nur das Modell
+    - keep_alive() richtet sich nach den beobachteten Pausen zwischen
+      Anfragen (2x p75, 5-60 min); das simple-Modell bleibt dauerhaft heiß
+    - record_result() trennt Ollamas load_duration von der eigentlichen
+      Generierung, damit get_status() Kaltstarts sichtbar macht
+    - ensure_warm() wärmt nach längerer Pause erneut vor (z.B. wenn der
+      Benutzer das Eingabefeld fokussiert)
+    """
+
+    MIN_KEEP_ALIVE_S = 300
+    MAX_KEEP_ALIVE_S = 3600
+    DEFAULT_KEEP_ALIVE_S = 600
+    SIMPLE_KEEP_ALIVE_S = 3600
+    WARMUP_TIMEOUT_S = 120
+
+    def __init__(self, url: str, model: str, simple_model: Optional[str] = None):
+        self.url = url
+        self.model = model
+        self.simple_model = simple_model if simple_model and simple_model != model else None
+        self._lock = threading.Lock()
+        self._warming: set = set()
+        self.usage: Dict[str, ModelUsage] = {model: ModelUsage(model, 'main')}
+        if self.simple_model:
+            self.usage[self.simple_model] = ModelUsage(
+                self.simple_model, 'simple', keep_alive_s=self.SIMPLE_KEEP_ALIVE_S)
+
+    # === MODELLWAHL ===
+
+    def model_for(self, simple: bool = False) -> str:
+        return self.simple_model if simple and self.simple_model else self.model
+
+    def set_installed(self, names: Iterable[str]):
+        """Abgleich mit /api/tags: fehlt das simple-Modell, nutzt der Fallback das Hauptmodell"""
+        installed = set(names)
+        if self.simple_model and not {self.simple_model, f"{self.simple_model}:latest"} & installed:
+            logger.warning(f"⚠️ Simple-Modell {self.simple_model} nicht installiert - nutze {self.model}")
+            with self._lock:
+                self.usage.pop(self.simple_model, None)
+                self.simple_model = None
+
+    # === KEEP ALIVE ===
+
+    def keep_alive(self, model: str) -> str:
+        """keep_alive für die nächste Anfrage (Ollama-Dauerformat)"""
+        with self._lock:
+            usage = self._usage(model)
+            if usage.role == 'simple':
+                seconds = self.SIMPLE_KEEP_ALIVE_S
+            elif len(usage.gaps) >= 3:
+                gaps = sorted(usage.gaps)
+                p75 = gaps[min(len(gaps) - 1, int(0.75 * len(gaps)))]
+                seconds = int(min(self.MAX_KEEP_ALIVE_S, max(self.MIN_KEEP_ALIVE_S, 2 * p75)))
+            else:
+                seconds = self.DEFAULT_KEEP_ALIVE_S
+            usage.keep_alive_s = seconds
+        return f"{seconds}s"
+
+    def note_request(self, model: str):
+        """Vor jeder Anfrage: Pause seit der letzten Nutzung merken"""
+        now = time.monotonic()
+        with self._lock:
+            usage = self._usage(model)
+            if usage.last_used is not None:
+                usage.gaps.append(now - usage.last_used)
+            usage.last_used = now
+
+    def is_warm(self, model: Optional[str] = None) -> bool:
+        with self._lock:
+            return time.monotonic() < self._usage(model or self.model).loaded_until
+
+    # === MESSUNG ===
+
+    def record_result(self, model: str, result: Dict, warmup: bool = False):
+        """Wertet die Zeitfelder einer /api/generate-Antwort aus (Nanosekunden)"""
+        load_ms = result.get('load_duration', 0) / 1e6
+        with self._lock:
+            usage = self._usage(model)
+            if load_ms > COLD_LOAD_THRESHOLD_MS:
+                usage.cold_loads += 1
+                usage.last_load_ms = round(load_ms, 1)
+                usage.load_ms_total += load_ms
+            if warmup:
+                usage.warmups += 1
+            else:
+                usage.generations += 1
+                usage.generation_ms_total += result.get('eval_duration', 0) / 1e6
+                usage.prompt_eval_ms_total += result.get('prompt_eval_duration', 0) / 1e6
+                usage.eval_tokens += result.get('eval_count', 0)
+            usage.loaded_until = time.monotonic() + usage.keep_alive_s
+
+    # === VORWÄRMEN ===
+
+    def warm_up(self, model: str) -> bool:
+        """Lädt ein Modell ohne Prompt (blockierend)"""
+        keep_alive = self.keep_alive(model)
+        start = time.perf_counter()
+        try:
+            response = requests.post(
+                f"{self.url}/api/generate",
+                json={'model': model, 'keep_alive': keep_alive},
+                timeout=self.WARMUP_TIMEOUT_S
+            )
+            if response.status_code != 200:
+                logger.warning(f"⚠️ Vorwärmen von {model} fehlgeschlagen: HTTP {response.status_code}")
+                return False
+            self.record_result(model, response.json(), warmup=True)
+            logger.info(f"🔥 {model} vorgewärmt ({(time.perf_counter() - start) * 1000:.0f} ms)")
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Vorwärmen von {model} fehlgeschlagen: {e}")
+            return False
+        finally:
+            with self._lock:
+                self._warming.discard(model)
+
+    def warm_up_async(self, models: Optional[List[str]] = None):
+        """Wärmt Haupt- und simple-Modell in einem Hintergrund-Thread vor"""
+        models = models or [m for m in (self.model, self.simple_model) if m]
+        with self._lock:
+            models = [m for m in models if m not in self._warming]
+            self._warming.update(models)
+        if not models:
+            return
+
+        def run():
+            for model in models:
+                self.warm_up(model)
+
+        threading.Thread(target=run, name='OllamaWarmup', daemon=True).start()
+
+    def ensure_warm(self):
+        """Wärmt das Hauptmodell vor, falls es vermutlich entladen ist"""
+        if not self.is_warm(self.model):
+            self.warm_up_async([self.model])
+
+    # === STATUS ===
+
+    def _usage(self, model: str) -> ModelUsage:
+        if model not in self.usage:
+            self.usage[model] = ModelUsage(model, 'main')
+        return self.usage[model]
+
+    def get_status(self) -> Dict:
+        now = time.monotonic()
+        status = {}
+        with self._lock:
+            for model, usage in self.usage.items():
+                generations = max(1, usage.generations)
+                generation_s = usage.generation_ms_total / 1000
+                status[model] = {
+                    'role': usage.role,
+                    'warm': now < usage.loaded_until,
+                    'keep_alive_s': usage.keep_alive_s,
+                    'warmups': usage.warmups,
+                    'cold_loads': usage.cold_loads,
+                    'last_load_ms': usage.last_load_ms,
+                    'avg_load_ms': round(usage.load_ms_total / max(1, usage.cold_loads), 1),
+                    'generations': usage.generations,
+                    'avg_generation_ms': round(usage.generation_ms_total / generations, 1),
+                    'avg_prompt_eval_ms': round(usage.prompt_eval_ms_total / generations, 1),
+                    'tokens_per_s': round(usage.eval_tokens / generation_s, 1) if generation_s else None
+                }
+        return status
@@ -0,0 +1,234 @@
+"""
+Toobix Pattern Accumulators
+Streaming-Aggregate (zeitlich gewichtet) für die Muster-Erkennung der Analytics Engine
+"""
+import math
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Halbwertszeit der Gewichtung: ältere Daten zählen nach 14 Tagen nur noch halb
+DEFAULT_HALF_LIFE_S = 14 * 24 * 3600
+ENERGY_BUCKET_WIDTH = 10
+SESSION_BUCKET_MINUTES = 15
+
+
+class DecayedStats:
+    """
+    Gewichteter Mittelwert/Varianz (Welford-Variante) mit exponentiellem
+    Zerfall über die Zeit. Jedes add() ist O(1): vorhandenes Gewicht wird
+    mit 0.5 ** (Δt / Halbwertszeit) skaliert, dann der neue Wert eingerechnet.
+    count zählt ungewichtet und dient für Mindestanzahl-Prüfungen.
+    """
+
+    __slots__ = ('weight', 'mean', 'm2', 'count', 'last_ts')
+
+    def __init__(self):
+        self.weight = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.count = 0
+        self.last_ts = 0.0
+
+    def add(self, value: float, ts: float, half_life_s: float):
+        if self.count:
+            self._decay(ts, half_life_s)
+        self.weight += 1.0
+        delta = value - self.mean
+        self.mean += delta / self.weight
+        self.m2 += delta * (value - self.mean)
+        self.count += 1
+        self.last_ts = max(self.last_ts, ts)
+
+    def weight_at(self, ts: float, half_life_s: float) -> float:
+        """Aktuelles Gewicht ohne Zustand zu ändern"""
+        if not self.count:
+            return 0.0
+        return self.weight * 0.5 ** (max(0.0, ts - self.last_ts) / half_life_s)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(max(0.0, self.m2 / self.weight)) if self.weight > 1 else 0.0
+
+    def _decay(self, ts: float, half_life_s: float):
+        elapsed = ts - self.last_ts
+        if elapsed > 0:
+            factor = 0.5 ** (elapsed / half_life_s)
+            self.weight *= factor
+            self.m2 *= factor
+
+    def to_list(self) -> List[float]:
+        return [self.weight, self.mean, self.m2, self.count, self.last_ts]
+
+    @classmethod
+    def from_list(cls, values: List[float]) -> 'DecayedStats':
+        stats = cls()
+        stats.weight, stats.mean, stats.m2, count, stats.last_ts = values
+        stats.count = int(count)
+        return stats
+
+
+class DecayedCovariance:
+    """Zeitlich gewichtete Kovarianz/Korrelation zweier Größen in O(1) pro Paar"""
+
+    __slots__ = ('weight', 'mean_x', 'mean_y', 'm2_x', 'm2_y', 'c_xy', 'count', 'last_ts')
+
+    def __init__(self):
+        self.weight = 0.0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.m2_x = 0.0
+        self.m2_y = 0.0
+        self.c_xy = 0.0
+        self.count = 0
+        self.last_ts = 0.0
+
+    def add(self, x: float, y: float, ts: float, half_life_s: float):
+        if self.count and ts > self.last_ts:
+            factor = 0.5 ** ((ts - self.last_ts) / half_life_s)
+            self.weight *= factor
+            self.m2_x *= factor
+            self.m2_y *= factor
+            self.c_xy *= factor
+        self.weight += 1.0
+        dx = x - self.mean_x
+        dy = y - self.mean_y
+        self.mean_x += dx / self.weight
+        self.mean_y += dy / self.weight
+        self.m2_x += dx * (x - self.mean_x)
+        self.m2_y += dy * (y - self.mean_y)
+        self.c_xy += dx * (y - self.mean_y)
+        self.count += 1
+        self.last_ts = max(self.last_ts, ts)
+
+    @property
+    def correlation(self) -> float:
+        denominator = math.sqrt(self.m2_x * self.m2_y)
+        return self.c_xy / denominator if denominator > 0 else 0.0
+
+    def to_list(self) -> List[float]:
+        return [self.weight, self.mean_x, self.mean_y, self.m2_x, self.m2_y, self.c_xy, self.count, self.last_ts]
+
+    @classmethod
+    def from_list(cls, values: List[float]) -> 'DecayedCovariance':
+        stats = cls()
+        (stats.weight, stats.mean_x, stats.mean_y, stats.m2_x, stats.m2_y,
+         stats.c_xy, count, stats.last_ts) = values
+        stats.count = int(count)
+        return stats
+
+
+class PatternAccumulators:
+    """
+    Alle Aggregate, die die Muster-Erkennung braucht - pro Datenpunkt
+    inkrementell aktualisiert statt über die ganze Historie neu berechnet:
+
+    - Performance pro Stunde und pro Stunde der Woche (0..167)
+    - Performance pro Kontext
+    - Performance pro Energy-Bucket (10er-Schritte) + Energy/Performance-Korrelation
+    - Effizienz pro Session-Länge (15min-Buckets)
+    - Unterbrechungen pro Stunde (nur unterbrochene Sessions)
+
+    version steigt mit jedem Datenpunkt; abgeleitete Muster und
+    Vorhersagen können daran erkennen, ob sie neu berechnet werden müssen.
+    """
+
+    GROUPS = ('hour', 'hour_of_week', 'context', 'energy', 'session', 'interruptions')
+
+    def __init__(self, half_life_s: float = DEFAULT_HALF_LIFE_S):
+        self.half_life_s = half_life_s
+        self.groups: Dict[str, Dict] = {name: {} for name in self.GROUPS}
+        self.time_performance = DecayedStats()
+        self.energy_performance = DecayedCovariance()
+        self.interrupted_sessions = 0
+        self.version = 0
+
+    def add(self, timestamp: datetime, context: str, focus_score: float, efficiency: float,
+            energy_level: float, interruptions: int = 0, session_duration: float = 0.0):
+        """Aktualisiert alle Aggregate mit einem Datenpunkt (O(1))"""
+        ts = timestamp.timestamp()
+        hour = timestamp.hour
+        performance = (focus_score + efficiency) / 2
+        performance_with_energy = (focus_score + efficiency + energy_level) / 3
+
+        self._update('hour', hour, performance_with_energy, ts)
+        self._update('hour_of_week', timestamp.weekday() * 24 + hour, performance, ts)
+        self._update('context', context, performance, ts)
+        self._update('energy', int(energy_level // ENERGY_BUCKET_WIDTH) * ENERGY_BUCKET_WIDTH, performance, ts)
+        self.energy_performance.add(energy_level, performance, ts, self.half_life_s)
+        self.time_performance.add(performance, ts, self.half_life_s)
+        if session_duration > 0:
+            self._update('session', int(session_duration // SESSION_BUCKET_MINUTES) * SESSION_BUCKET_MINUTES,
+                         efficiency, ts)
+        if interruptions > 0:
+            self._update('interruptions', hour, float(interruptions), ts)
+            self.interrupted_sessions += 1
+        self.version += 1
+
+    def summary(self, group: str, min_count: int = 1) -> Dict:
+        """{schlüssel: (mittel, std, anzahl)} einer Gruppe mit Mindestanzahl"""
+        return {
+            key: (stats.mean, stats.std, stats.count)
+            for key, stats in self.groups[group].items()
+            if stats.count >= min_count
+        }
+
+    def energy_quantile(self, fraction: float, now: Optional[float] = None) -> float:
+        """Näherungsweises Energy-Quantil aus dem gewichteten Bucket-Histogramm"""
+        now = now if now is not None else datetime.now().timestamp()
+        buckets = sorted(
+            (key, stats.weight_at(now, self.half_life_s)) for key, stats in self.groups['energy'].items()
+        )
+        total = sum(weight for _, weight in buckets)
+        if not total:
+            return 0.0
+        cumulative = 0.0
+        for key, weight in buckets:
+            if cumulative + weight >= fraction * total:
+                # Linear innerhalb des Buckets interpolieren
+                inside = (fraction * total - cumulative) / weight if weight else 0.0
+                return key + inside * ENERGY_BUCKET_WIDTH
+            cumulative += weight
+        return buckets[-1][0] + ENERGY_BUCKET_WIDTH
+
+    def mean_performance_where(self, group: str, predicate, now: Optional[float] = None) -> Optional[float]:
+        """Gewichteter Mittelwert über alle Buckets einer Gruppe, deren Schlüssel predicate erfüllt"""
+        now = now if now is not None else datetime.now().timestamp()
+        total_weight = 0.0
+        total = 0.0
+        for key, stats in self.groups[group].items():
+            if predicate(key):
+                weight = stats.weight_at(now, self.half_life_s)
+                total_weight += weight
+                total += weight * stats.mean
+        return total / total_weight if total_weight else None
+
+    def to_dict(self) -> Dict:
+        return {
+            'half_life_s': self.half_life_s,
+            'groups': {
+                name: [[key, stats.to_list()] for key, stats in group.items()]
+                for name, group in self.groups.items()
+            },
+            'time_performance': self.time_performance.to_list(),
+            'energy_performance': self.energy_performance.to_list(),
+            'interrupted_sessions': self.interrupted_sessions,
+            'version': self.version
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PatternAccumulators':
+        accumulators = cls(data.get('half_life_s', DEFAULT_HALF_LIFE_S))
+        for name, entries in data.get('groups', {}).items():
+            if name in accumulators.groups:
+                accumulators.groups[name] = {key: DecayedStats.from_list(values) for key, values in entries}
+        accumulators.time_performance = DecayedStats.from_list(data['time_performance'])
+        accumulators.energy_performance = DecayedCovariance.from_list(data['energy_performance'])
+        accumulators.interrupted_sessions = data.get('interrupted_sessions', 0)
+        accumulators.version = data.get('version', 0)
+        return accumulators
+
+    def _update(self, group: str, key, value: float, ts: float):
+        stats = self.groups[group].get(key)
+        if stats is None:
+            stats = self.groups[group][key] = DecayedStats()
+        stats.add(value, ts, self.half_life_s)
@@ -0,0 +1,252 @@
+"""
+Toobix Persistence Service
+Gemeinsames Write-Behind-Speichern von JSON-Zuständen für alle Engines
+"""
+import os
+import json
+import time
+import atexit
+import threading
+import logging
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PersistentStore:
+    """Eine registrierte JSON-Datei samt Serializer und Schreibstatistik"""
+    path: Path
+    serializer: Callable[[], Any]
+    lock: Optional[Any] = None
+    dirty: bool = False
+    writes: int = 0
+    errors: int = 0
+    bytes_written: int = 0
+    last_bytes: int = 0
+    last_latency_ms: float = 0.0
+    total_latency_ms: float = 0.0
+    marked_count: int = 0
+    last_error: str = ''
+    write_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+class PersistenceService:
+    """
+    Write-Behind-Persistenz.
+
+    Engines registrieren pro Datei einen Serializer und melden Änderungen nur
+    noch per mark_dirty() - das kostet den Aufrufer ein Flag, keinen
+    Plattenzugriff. Ein Hintergrund-Thread schreibt alle flush_interval
+    Sekunden die geänderten Stores: kompakt, atomar über Temp-Datei +
+    os.replace. Viele Änderungen innerhalb eines Intervalls ergeben so einen
+    einzigen Schreibvorgang. Beim Beenden (atexit) wird alles geflusht.
+
+    Der Serializer läuft auf dem Hintergrund-Thread. Wird ein Lock mit
+    registriert, hält der Service ihn während der Serialisierung.
+    """
+
+    def __init__(self, flush_interval: float = 2.0):
+        self.flush_interval = flush_interval
+        self._stores: Dict[str, PersistentStore] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # === ÖFFENTLICHE API ===
+
+    def register(self, path: Union[str, Path], serializer: Callable[[], Any],
+                 lock: Optional[Any] = None) -> str:
+        """
+        Registriert eine JSON-Datei. Gibt den Store-Schlüssel (absoluter Pfad)
+        zurück; eine erneute Registrierung desselben Pfads ersetzt den Serializer.
+        """
+        key = os.path.abspath(str(path))
+        with self._lock:
+            previous = self._stores.get(key)
+            store = PersistentStore(path=Path(key), serializer=serializer, lock=lock)
+            if previous is not None:
+                store.dirty = previous.dirty
+            self._stores[key] = store
+        return key
+
+    def mark_dirty(self, key: str):
+        """Markiert einen Store als geändert - blockiert nie auf die Platte"""
+        store = self._stores.get(key)
+        if store is None:
+            logger.warning(f"Unbekannter Persistenz-Store: {key}")
+            return
+        store.dirty = True
+        store.marked_count += 1
+        self._ensure_worker()
+
+    def flush(self, key: Optional[str] = None) -> int:
+        """Schreibt geänderte Stores sofort (alle oder einen). Gibt die Anzahl Schreibvorgänge zurück"""
+        with self._lock:
+            stores = [self._stores[key]] if key in self._stores else (
+                [] if key else list(self._stores.values()))
+        written = 0
+        for store in stores:
+            if store.dirty and self._write(store):
+                written += 1
+        return written
+
+    def shutdown(self):
+        """Stoppt den Hintergrund-Thread und schreibt alle offenen Änderungen"""
+        self._stop.set()
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        self.flush()
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Schreiblatenz, Bytes und Koaleszenz pro Store"""
+        with self._lock:
+            stores = dict(self._stores)
+        return {
+            key: {
+                'writes': store.writes,
+                'marked': store.marked_count,
+                'coalesced': max(0, store.marked_count - store.writes),
+                'pending': store.dirty,
+                'errors': store.errors,
+                'last_error': store.last_error,
+                'last_bytes': store.last_bytes,
+                'bytes_written': store.bytes_written,
+                'last_latency_ms': round(store.last_latency_ms, 2),
+                'avg_latency_ms': round(store.total_latency_ms / store.writes, 2) if store.writes else 0.0
+            }
+            for key, store in stores.items()
+        }
+
+    # === INTERN ===
+
+    def _ensure_worker(self):
+        """Startet den Hintergrund-Thread beim ersten mark_dirty()"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._stop.is_set() or (self._thread is not None and self._thread.is_alive()):
+                return
+            self._thread = threading.Thread(target=self._worker, name='toobix-persistence', daemon=True)
+            self._thread.start()
+
+    def _worker(self):
+        """Schreibt geänderte Stores im festen Intervall"""
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Persistenz-Flush fehlgeschlagen: {e}")
+
+    def _write(self, store: PersistentStore) -> bool:
+        """Serialisiert und schreibt einen Store atomar"""
+        with store.write_lock:
+            if not store.dirty:
+                return False
+            # Flag vor dem Serialisieren zurücksetzen: Änderungen während des
+            # Schreibens markieren den Store erneut für den nächsten Tick
+            store.dirty = False
+            start_time = time.perf_counter()
+            tmp_path = store.path.with_name(store.path.name + '.tmp')
+            try:
+                if store.lock is not None:
+                    with store.lock:
+                        data = store.serializer()
+                else:
+                    data = store.serializer()
+                payload = json.dumps(data, ensure_ascii=False, separators=(',', ':'),
+                                     default=str).encode('utf-8')
+
+                store.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, 'wb') as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, store.path)
+            except Exception as e:
+                # z.B. "dictionary changed size during iteration" - beim nächsten Tick erneut
+                store.dirty = True
+                store.errors += 1
+                store.last_error = str(e)
+                logger.error(f"Speichern von {store.path.name} fehlgeschlagen: {e}")
+                try:
+                    tmp_path.unlink()
+                except OSError:
+                    pass
+                return False
+
+            latency_ms = (time.perf_counter() - start_time) * 1000
+            store.writes += 1
+            store.last_bytes = len(payload)
+            store.bytes_written += len(payload)
+            store.last_latency_ms = latency_ms
+            store.total_latency_ms += latency_ms
+            return True
+
+
+def repair_torn_tail(path: Union[str, Path]) -> bool:
+    """
+    Schneidet eine unvollständige letzte Zeile einer append-only Datei ab
+    (Absturz mitten im Schreiben), damit die nächste angehängte Zeile nicht
+    an das Bruchstück geklebt wird. Gibt True zurück, wenn etwas entfernt wurde.
+    """
+    try:
+        with open(path, 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return False
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return False
+            position = size
+            while position > 0:
+                step = min(4096, position)
+                position -= step
+                f.seek(position)
+                newline = f.read(step).rfind(b'\n')
+                if newline != -1:
+                    f.truncate(position + newline + 1)
+                    break
+            else:
+                f.truncate(0)
+        logger.warning(f"⚠️ Unvollständige letzte Zeile in {Path(path).name} entfernt")
+        return True
+    except FileNotFoundError:
+        return False
+
+
+_persistence_service: Optional[PersistenceService] = None
+_persistence_service_lock = threading.Lock()
+
+
+def get_persistence_service() -> PersistenceService:
+    """Gibt den gemeinsamen Persistenz-Service zurück (flusht automatisch beim Beenden)"""
+    global _persistence_service
+    with _persistence_service_lock:
+        if _persistence_service is None:
+            _persistence_service = PersistenceService()
+            atexit.register(_persistence_service.shutdown)
+        return _persistence_service
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    service = PersistenceService(flush_interval=0.2)
+    state = {'counter': 0}
+    key = service.register(Path(tempfile.gettempdir()) / 'toobix_persistence_demo.json', lambda: dict(state))
+    for i in range(1000):
+        state['counter'] = i
+        service.mark_dirty(key)
+    time.sleep(0.5)
+    service.shutdown()
+    print(service.get_stats()[key])
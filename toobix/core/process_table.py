@@ -0,0 +1,192 @@
+"""
+Toobix Process Table
+Gemeinsame Prozess-Tabelle für alle process_iter-Nutzer
+"""
+import time
+import heapq
+import threading
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProcessInfo:
+    """Momentaufnahme eines Prozesses"""
+    pid: int
+    name: str
+    exe: Optional[str] = None
+    cpu_percent: float = 0.0
+    memory_percent: float = 0.0
+    rss: int = 0
+    create_time: float = 0.0
+    process: Optional[psutil.Process] = field(default=None, repr=False, compare=False)
+
+    @property
+    def memory_mb(self) -> float:
+        return self.rss / (1024 * 1024)
+
+
+class ProcessTable:
+    """
+    Prozess-Tabelle, die höchstens einmal pro Tick (max_age Sekunden) neu
+    eingelesen wird, egal wie viele Module sie abfragen.
+
+    Die psutil.Process-Objekte bleiben pro PID erhalten. cpu_percent() ohne
+    Intervall liefert dadurch die Auslastung seit dem letzten Tick statt
+    0.0 - ohne dass jeder Aufrufer selbst schlafen muss. Beim allerersten
+    Tick eines Prozesses ist der Wert naturgemäß noch 0.0.
+    """
+
+    def __init__(self, max_age: float = 2.0):
+        self.max_age = max_age
+        self._processes: Dict[int, psutil.Process] = {}
+        self._by_pid: Dict[int, ProcessInfo] = {}
+        self._by_name: Dict[str, List[ProcessInfo]] = {}
+        self._last_refresh = 0.0
+        self._lock = threading.RLock()
+        self.last_stats: Dict = {}
+
+    # === ÖFFENTLICHE API ===
+
+    def refresh(self, force: bool = False):
+        """Liest die Prozessliste neu ein, falls der letzte Tick zu alt ist"""
+        with self._lock:
+            if not force and time.time() - self._last_refresh < self.max_age:
+                return
+            start_time = time.time()
+            total_memory = psutil.virtual_memory().total or 1
+
+            by_pid: Dict[int, ProcessInfo] = {}
+            processes: Dict[int, psutil.Process] = {}
+            for pid in psutil.pids():
+                proc = self._processes.get(pid)
+                try:
+                    # is_running() erkennt wiederverwendete PIDs über create_time
+                    if proc is None or not proc.is_running():
+                        proc = psutil.Process(pid)
+                    info = self._read(proc, total_memory)
+                except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                    continue
+                except psutil.AccessDenied:
+                    info = ProcessInfo(pid=pid, name='', process=proc)
+                processes[pid] = proc
+                by_pid[pid] = info
+
+            by_name: Dict[str, List[ProcessInfo]] = {}
+            for info in by_pid.values():
+                by_name.setdefault(info.name.lower(), []).append(info)
+
+            self._processes = processes
+            self._by_pid = by_pid
+            self._by_name = by_name
+            self._last_refresh = time.time()
+            self.last_stats = {
+                'processes': len(by_pid),
+                'duration_s': round(self._last_refresh - start_time, 3)
+            }
+
+    def invalidate(self):
+        """Erzwingt beim nächsten Zugriff einen neuen Tick (z.B. nach Beenden eines Prozesses)"""
+        with self._lock:
+            self._last_refresh = 0.0
+
+    def snapshot(self) -> List[ProcessInfo]:
+        """Alle Prozesse des aktuellen Ticks"""
+        with self._lock:
+            self.refresh()
+            return list(self._by_pid.values())
+
+    def get(self, pid: int) -> Optional[ProcessInfo]:
+        """Prozess nach PID"""
+        with self._lock:
+            self.refresh()
+            return self._by_pid.get(pid)
+
+    def find_by_name(self, name: str, exact: bool = True) -> List[ProcessInfo]:
+        """Prozesse nach Namen (ohne Groß-/Kleinschreibung), optional als Teilstring"""
+        name = name.lower()
+        with self._lock:
+            self.refresh()
+            if exact:
+                return list(self._by_name.get(name, []))
+            return [info for key, infos in self._by_name.items() if name in key for info in infos]
+
+    def names(self) -> List[str]:
+        """Eindeutige Prozessnamen"""
+        with self._lock:
+            self.refresh()
+            return sorted({info.name for info in self._by_pid.values() if info.name})
+
+    def top_by_cpu(self, limit: int = 10) -> List[ProcessInfo]:
+        """Top-N Prozesse nach CPU-Auslastung"""
+        with self._lock:
+            self.refresh()
+            return heapq.nlargest(limit, self._by_pid.values(), key=lambda p: p.cpu_percent)
+
+    def top_by_memory(self, limit: int = 10) -> List[ProcessInfo]:
+        """Top-N Prozesse nach Arbeitsspeicher (RSS)"""
+        with self._lock:
+            self.refresh()
+            return heapq.nlargest(limit, self._by_pid.values(), key=lambda p: p.rss)
+
+    # === INTERN ===
+
+    @staticmethod
+    def _read(proc: psutil.Process, total_memory: int) -> ProcessInfo:
+        """Liest alle benötigten Werte in einem oneshot()-Block"""
+        with proc.oneshot():
+            name = proc.name() or ''
+            try:
+                rss = proc.memory_info().rss
+            except psutil.AccessDenied:
+                rss = 0
+            try:
+                cpu_percent = proc.cpu_percent(interval=None)
+            except psutil.AccessDenied:
+                cpu_percent = 0.0
+            try:
+                exe = proc.exe() or None
+            except (psutil.AccessDenied, OSError):
+                exe = None
+            try:
+                create_time = proc.create_time()
+            except psutil.AccessDenied:
+                create_time = 0.0
+        return ProcessInfo(
+            pid=proc.pid,
+            name=name,
+            exe=exe,
+            cpu_percent=cpu_percent,
+            memory_percent=rss / total_memory * 100,
+            rss=rss,
+            create_time=create_time,
+            process=proc
+        )
+
+
+_process_table: Optional[ProcessTable] = None
+_process_table_lock = threading.Lock()
+
+
+def get_process_table() -> ProcessTable:
+    """Gibt die gemeinsame Prozess-Tabelle zurück"""
+    global _process_table
+    with _process_table_lock:
+        if _process_table is None:
+            _process_table = ProcessTable()
+        return _process_table
+
+
+if __name__ == "__main__":
+    table = ProcessTable()
+    table.refresh()
+    time.sleep(1)
+    table.refresh(force=True)
+    print(table.last_stats)
+    for info in table.top_by_cpu(5):
+        print(f"{info.cpu_percent:6.1f}% CPU  {info.memory_mb:8.1f} MB  {info.name} ({info.pid})")
@@ -12,6 +12,8 @@ from dataclasses import dataclass, asdict
 from collections import defaultdict
 import logging
 
+from .persistence import get_persistence_service
+
 # Konfiguriere Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -74,6 +76,9 @@ class ProductivityGamification:
         # Datenverzeichnis
         self.data_dir = Path('toobix_gamification')
         self.data_dir.mkdir(exist_ok=True)
+        self.persistence = get_persistence_service()
+        self._user_data_store = self.persistence.register(
+            self.data_dir / 'user_stats.json', self._serialize_user_data)
         
         # UI-Konfiguration
         self.ui_config = {
@@ -659,40 +664,35 @@ class ProductivityGamification:
             logger.error(f"Fehler beim Laden der Benutzerdaten: {e}")
     
     def _save_user_data(self) -> None:
-        """Speichert Benutzerdaten"""
-        try:
-            data_file = self.data_dir / 'user_stats.json'
-            
-            # Achievements für Speicherung vorbereiten
-            achievements_data = {}
-            for ach_id, ach in self.achievements.items():
-                achievements_data[ach_id] = {
-                    'unlocked': ach.unlocked,
-                    'progress': ach.progress,
-                    'unlock_date': ach.unlock_date.isoformat() if ach.unlock_date else None
-                }
-            
-            # Activity Log für Speicherung vorbereiten
-            activity_data = [
-                {
-                    **log,
-                    'timestamp': log['timestamp'].isoformat()
-                }
-                for log in self.activity_log[-100:]  # Nur letzte 100 Einträge
-            ]
-            
-            data = {
-                'stats': asdict(self.user_stats),
-                'achievements': achievements_data,
-                'activity_log': activity_data,
-                'last_updated': datetime.now().isoformat()
+        """Speichert Benutzerdaten (asynchron über den Persistenz-Service)"""
+        self.persistence.mark_dirty(self._user_data_store)
+    
+    def _serialize_user_data(self) -> Dict[str, Any]:
+        """Bereitet Benutzerdaten für die Speicherung vor"""
+        # Achievements für Speicherung vorbereiten
+        achievements_data = {}
+        for ach_id, ach in self.achievements.items():
+            achievements_data[ach_id] = {
+                'unlocked': ach.unlocked,
+                'progress': ach.progress,
+                'unlock_date': ach.unlock_date.isoformat() if ach.unlock_date else None
             }
-            
-            with open(data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                
-        except Exception as e:
-            logger.error(f"Fehler beim Speichern der Benutzerdaten: {e}")
+        
+        # Activity Log für Speicherung vorbereiten
+        activity_data = [
+            {
+                **log,
+                'timestamp': log['timestamp'].isoformat()
+            }
+            for log in self.activity_log[-100:]  # Nur letzte 100 Einträge
+        ]
+        
+        return {
+            'stats': asdict(self.user_stats),
+            'achievements': achievements_data,
+            'activity_log': activity_data,
+            'last_updated': datetime.now().isoformat()
+        }
 
 if __name__ == "__main__":
     # Test des Gamification-Systems
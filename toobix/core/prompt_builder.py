@@ -0,0 +1,260 @@
+"""
+Toobix Prompt Builder
+Baut KI-Prompts aus gecachten Fragmenten mit Token-Budget und stabilem Präfix
+"""
+import hashlib
+import threading
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Grobe Schätzung: ~4 Zeichen pro Token (reicht für Budget-Entscheidungen)
+CHARS_PER_TOKEN = 4
+
+WEEKDAYS_DE = {
+    'Monday': 'Montag', 'Tuesday': 'Dienstag', 'Wednesday': 'Mittwoch',
+    'Thursday': 'Donnerstag', 'Friday': 'Freitag', 'Saturday': 'Samstag', 'Sunday': 'Sonntag'
+}
+
+# Statische Fragmente pro Backend - werden genau einmal zusammengesetzt
+IDENTITY = {
+    'ollama': """Du bist Toobix, ein zuverlässiger deutscher Desktop-Assistent.
+WICHTIG: Antworte NUR auf Basis deines verfügbaren Wissens. Erfinde KEINE Details.
+Wenn du etwas nicht weißt, sage ehrlich "Das weiß ich nicht" oder "Das kann ich nicht prüfen".""",
+    'groq': "Du bist Toobix, ein zuverlässiger deutscher AI-Desktop-Assistent. ANTI-HALLUZINATION REGELN: 1) Antworte NUR basierend auf verfügbaren Informationen 2) Erfinde KEINE Details, Programme oder Features 3) Wenn unsicher, sage 'Das weiß ich nicht sicher' 4) Bleibe bei deinem Wissensstand 5) Keine spekulativen Antworten. Du hilfst bei Computerproblemen, beantwortest Fragen und steuerst Windows-Programme. Antworte freundlich, kurz und präzise auf Deutsch."
+}
+
+CAPABILITIES = """SYSTEM KONTEXT:
+System: Windows Desktop-Assistent
+Name: Toobix
+
+VERFÜGBARE FUNKTIONEN:
+- Programm-Steuerung: "öffne [programm]", "schließe [programm]"
+- Datei-Suche: "finde [dateien]", "suche [pattern]"
+- System-Aufräumung: "analysiere system", "räume auf", "erstelle backup"
+- Zeit/Datum: Aktuelle Informationen verfügbar
+- Desktop-Organisation: Dateien sortieren und organisieren"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Schätzt die Tokenanzahl eines Texts"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+@dataclass
+class PromptFragment:
+    """
+    Ein Baustein des Prompts.
+
+    Statische Fragmente haben keine Quelle und werden nie neu berechnet.
+    Dynamische Fragmente liefern über source() einen Versionsschlüssel;
+    render() läuft nur, wenn sich dieser Schlüssel geändert hat.
+    """
+    name: str
+    render: Callable[[], str]
+    source: Optional[Callable[[], Hashable]] = None
+    in_prefix: bool = True      # Teil des stabilen Präfix (sonst direkt vor der Anfrage)
+    droppable: bool = False     # darf bei Budgetüberschreitung entfallen
+    cached_key: Any = None
+    cached_text: Optional[str] = None
+    cached_tokens: int = 0
+
+
+@dataclass
+class BuiltPrompt:
+    """Ergebnis von PromptBuilder.build()"""
+    backend: str
+    system: str                 # stabiles Präfix (Identität, Funktionen, Benutzer, Datum)
+    user: str                   # veränderlicher Teil (Uhrzeit, Zusatzkontext, Anfrage)
+    prefix_hash: str
+    tokens: int
+    budget: int
+    dropped: List[str] = field(default_factory=list)
+    truncated: bool = False
+
+    @property
+    def text(self) -> str:
+        """System und Anfrage als ein Prompt (für /api/generate ohne system-Feld)"""
+        return f"{self.system}\n\n{self.user}"
+
+
+class PromptBuilder:
+    """
+    Setzt Prompts für Ollama und Groq aus Fragmenten zusammen.
+
+    - Statische Fragmente (Identität, Funktionsliste) werden einmal gebaut
+    - Dynamische Fragmente (Benutzer-Kontext, Datum, Uhrzeit) werden nur
+      neu berechnet, wenn sich ihr Versionsschlüssel ändert
+    - Reihenfolge von selten zu häufig veränderlich: das Präfix bleibt
+      über viele Anfragen byte-identisch, sodass Ollama den KV-Cache des
+      vorherigen Prompts weiterverwenden kann; die sekundengenaue Uhrzeit
+      steht deshalb hinter dem Präfix
+    - Pro Backend gilt ein Token-Budget: erst entfallen verzichtbare
+      Fragmente, dann wird der Zusatzkontext und zuletzt die Anfrage gekürzt
+    """
+
+    def __init__(self, knowledge_base=None, budgets: Optional[Dict[str, int]] = None):
+        self.knowledge_base = knowledge_base
+        self.budgets = {'ollama': 1400, 'groq': 6000}
+        if budgets:
+            self.budgets.update(budgets)
+        self._lock = threading.Lock()
+        self._prefix_cache: Dict[Tuple, Tuple[str, str, int]] = {}
+        self._last_prefix_hash: Dict[str, str] = {}
+        self.stats = {'builds': 0, 'renders': 0, 'cache_hits': 0,
+                      'prefix_changes': 0, 'dropped': 0, 'truncated': 0}
+
+        self.fragments: List[PromptFragment] = [
+            PromptFragment('capabilities', lambda: CAPABILITIES),
+            PromptFragment('user_context', self._render_user_context,
+                           source=self._user_context_key, droppable=True),
+            PromptFragment('date', self._render_date,
+                           source=lambda: datetime.now().date()),
+            PromptFragment('clock', lambda: f"Aktuelle Zeit: {datetime.now():%H:%M:%S}",
+                           source=lambda: datetime.now().replace(microsecond=0),
+                           in_prefix=False, droppable=True),
+        ]
+
+    # === FRAGMENTE ===
+
+    def _user_context_key(self) -> Hashable:
+        kb = self.knowledge_base
+        if kb is None:
+            return None
+        # create_user_context() hängt zusätzlich von der Tagesstunde ab
+        return (getattr(kb, 'context_revision', None), datetime.now().hour)
+
+    def _render_user_context(self) -> str:
+        if self.knowledge_base is None:
+            return ''
+        return f"BENUTZER-KONTEXT: {self.knowledge_base.create_user_context()}"
+
+    @staticmethod
+    def _render_date() -> str:
+        now = datetime.now()
+        weekday = now.strftime("%A")
+        return f"Aktuelles Datum: {now:%d.%m.%Y} ({WEEKDAYS_DE.get(weekday, weekday)})"
+
+    def _resolve(self, fragment: PromptFragment) -> Tuple[str, int, Any]:
+        """Liefert Text, Tokens und Schlüssel eines Fragments (gecacht)"""
+        key = fragment.source() if fragment.source else 'static'
+        if fragment.cached_text is not None and key == fragment.cached_key:
+            self.stats['cache_hits'] += 1
+        else:
+            try:
+                text = fragment.render()
+            except Exception as e:
+                logger.warning(f"Prompt-Fragment '{fragment.name}' fehlgeschlagen: {e}")
+                text = ''
+            fragment.cached_key = key
+            fragment.cached_text = text
+            fragment.cached_tokens = estimate_tokens(text)
+            self.stats['renders'] += 1
+        return fragment.cached_text, fragment.cached_tokens, fragment.cached_key
+
+    # === AUFBAU ===
+
+    def build(self, prompt: str, backend: str = 'ollama', context: Optional[str] = None) -> BuiltPrompt:
+        """Baut den Prompt für ein Backend innerhalb seines Token-Budgets"""
+        budget = self.budgets.get(backend, self.budgets['ollama'])
+        prompt = f"Benutzer-Anfrage: {prompt}"
+        with self._lock:
+            self.stats['builds'] += 1
+            resolved = [(fragment, *self._resolve(fragment)) for fragment in self.fragments]
+
+            prompt_tokens = estimate_tokens(prompt)
+            context_tokens = estimate_tokens(context) if context else 0
+            identity = IDENTITY.get(backend, IDENTITY['ollama'])
+            used = estimate_tokens(identity) + prompt_tokens + context_tokens
+            used += sum(tokens for _, text, tokens, _ in resolved if text)
+
+            # Verzichtbare Fragmente streichen, veränderliche zuerst
+            dropped = []
+            for fragment, text, tokens, _ in reversed(resolved):
+                if used <= budget:
+                    break
+                if fragment.droppable and text:
+                    dropped.append(fragment.name)
+                    used -= tokens
+            self.stats['dropped'] += len(dropped)
+            active = [(f, text, tokens, key) for f, text, tokens, key in resolved
+                      if text and f.name not in dropped]
+
+            system, prefix_hash = self._prefix(backend, identity, active)
+
+            # Danach Zusatzkontext und Anfrage kürzen (Anfang der Anfrage bleibt)
+            truncated = False
+            if used > budget and context:
+                keep = max(0, context_tokens - (used - budget))
+                used -= context_tokens - keep
+                context = context[:keep * CHARS_PER_TOKEN]
+                truncated = True
+            if used > budget:
+                keep = max(1, prompt_tokens - (used - budget))
+                used -= prompt_tokens - keep
+                prompt = prompt[:keep * CHARS_PER_TOKEN]
+                truncated = True
+            if truncated:
+                self.stats['truncated'] += 1
+                logger.info(f"✂️ Prompt für {backend} auf ~{budget} Tokens gekürzt")
+
+            tail = [text for f, text, _, _ in active if not f.in_prefix]
+            if context:
+                tail.append(context)
+            tail.append(prompt)
+
+        return BuiltPrompt(
+            backend=backend,
+            system=system,
+            user="\n\n".join(tail),
+            prefix_hash=prefix_hash,
+            tokens=used,
+            budget=budget,
+            dropped=dropped,
+            truncated=truncated
+        )
+
+    def _prefix(self, backend: str, identity: str, active) -> Tuple[str, str]:
+        """Stabiles Präfix; nur bei geänderten Fragment-Schlüsseln neu zusammengesetzt"""
+        parts = [(f.name, key) for f, _, _, key in active if f.in_prefix]
+        cache_key = (backend, tuple(parts))
+        cached = self._prefix_cache.get(cache_key)
+        if cached is None:
+            texts = [identity] + [text for f, text, _, _ in active if f.in_prefix]
+            system = "\n\n".join(texts)
+            prefix_hash = hashlib.sha1(system.encode('utf-8')).hexdigest()[:12]
+            cached = (system, prefix_hash, estimate_tokens(system))
+            # Alte Präfixe (z.B. von gestern) nicht ansammeln
+            if len(self._prefix_cache) > 16:
+                self._prefix_cache.clear()
+            self._prefix_cache[cache_key] = cached
+        system, prefix_hash, _ = cached
+        if self._last_prefix_hash.get(backend) != prefix_hash:
+            if backend in self._last_prefix_hash:
+                self.stats['prefix_changes'] += 1
+            self._last_prefix_hash[backend] = prefix_hash
+        return system, prefix_hash
+
+    def fragment_text(self, name: str) -> str:
+        """Aktueller (gecachter) Text eines Fragments, z.B. für Logs"""
+        with self._lock:
+            for fragment in self.fragments:
+                if fragment.name == name:
+                    return self._resolve(fragment)[0]
+        return ''
+
+    def invalidate(self, name: Optional[str] = None):
+        """Verwirft gecachte Fragmente (alle oder eines)"""
+        with self._lock:
+            for fragment in self.fragments:
+                if name is None or fragment.name == name:
+                    fragment.cached_text = None
+            self._prefix_cache.clear()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self.stats, 'budgets': dict(self.budgets),
+                    'prefix_hash': dict(self._last_prefix_hash)}
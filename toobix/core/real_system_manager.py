@@ -12,13 +12,16 @@ from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 import tempfile
 import json
+from .cleanup_executor import get_cleanup_executor, CleanupOperation, OP_MOVE, OP_DELETE
+from .process_table import get_process_table
 
 class RealSystemManager:
     """Echte System-Verwaltung ohne KI-Halluzinationen"""
     
     def __init__(self):
         self.last_scan_time = 0
-        self.process_cache = {}
+        self.process_table = get_process_table()
+        self.cleanup_executor = get_cleanup_executor()
         
     def get_real_ram_usage(self) -> Dict:
         """Echte RAM-Nutzung ohne Erfindungen"""
@@ -26,24 +29,15 @@ class RealSystemManager:
             memory = psutil.virtual_memory()
             processes = []
             
-            # Top 10 RAM-Verbraucher ECHT ermitteln
-            for proc in psutil.process_iter(['pid', 'name', 'memory_info']):
-                try:
-                    proc_info = proc.info
-                    if proc_info['memory_info']:
-                        memory_mb = proc_info['memory_info'].rss / (1024 * 1024)
-                        if memory_mb > 50:  # Nur >50MB anzeigen
-                            processes.append({
-                                'pid': proc_info['pid'],
-                                'name': proc_info['name'],
-                                'memory_mb': memory_mb,
-                                'memory_percent': (proc_info['memory_info'].rss / memory.total) * 100
-                            })
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-            
-            # Nach RAM-Verbrauch sortieren
-            processes.sort(key=lambda x: x['memory_mb'], reverse=True)
+            # Top 10 RAM-Verbraucher ECHT ermitteln (bereits nach RSS sortiert)
+            for proc_info in self.process_table.top_by_memory(10):
+                if proc_info.memory_mb > 50:  # Nur >50MB anzeigen
+                    processes.append({
+                        'pid': proc_info.pid,
+                        'name': proc_info.name,
+                        'memory_mb': proc_info.memory_mb,
+                        'memory_percent': (proc_info.rss / memory.total) * 100
+                    })
             
             return {
                 'total_gb': memory.total / (1024**3),
@@ -61,19 +55,21 @@ class RealSystemManager:
         errors = []
         
         try:
-            for proc in psutil.process_iter(['pid', 'name']):
+            for proc_info in self.process_table.find_by_name(process_name):
+                proc = proc_info.process
                 try:
-                    if proc.info['name'].lower() == process_name.lower():
-                        proc.terminate()
-                        killed_count += 1
-                        time.sleep(0.1)  # Kurz warten
+                    proc.terminate()
+                    killed_count += 1
+                    time.sleep(0.1)  # Kurz warten
+                    
+                    # Falls nötig: Force kill
+                    if proc.is_running():
+                        proc.kill()
                         
-                        # Falls nötig: Force kill
-                        if proc.is_running():
-                            proc.kill()
-                            
                 except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
-                    errors.append(f"Fehler bei PID {proc.info['pid']}: {e}")
+                    errors.append(f"Fehler bei PID {proc_info.pid}: {e}")
+            
+            self.process_table.invalidate()
                     
         except Exception as e:
             return {'success': False, 'error': f"Kritischer Fehler: {e}"}
@@ -127,7 +123,7 @@ class RealSystemManager:
         large_files.sort(key=lambda x: x['size_mb'], reverse=True)
         return large_files
     
-    def organize_files_real(self, source_dir: str) -> Dict:
+    def organize_files_real(self, source_dir: str, dry_run: bool = False) -> Dict:
         """Echte Datei-Organisation"""
         source_path = Path(source_dir)
         if not source_path.exists():
@@ -135,7 +131,8 @@ class RealSystemManager:
         
         # Basis-Organisationsstruktur
         org_base = Path.home() / 'TOOBIX_ORGANISATION'
-        org_base.mkdir(exist_ok=True)
+        if not dry_run:
+            org_base.mkdir(exist_ok=True)
         
         # Kategorie-Ordner
         categories = {
@@ -149,8 +146,9 @@ class RealSystemManager:
         }
         
         # Ordner erstellen
-        for cat_path in categories.values():
-            cat_path.mkdir(exist_ok=True)
+        if not dry_run:
+            for cat_path in categories.values():
+                cat_path.mkdir(exist_ok=True)
         
         # Datei-Erweiterungen zuordnen
         extensions_map = {
@@ -162,8 +160,7 @@ class RealSystemManager:
             'programs': ['.exe', '.msi', '.deb', '.rpm', '.dmg', '.app']
         }
         
-        moved_files = []
-        errors = []
+        operations = []
         
         try:
             for file_path in source_path.iterdir():
@@ -177,45 +174,44 @@ class RealSystemManager:
                             target_category = category
                             break
                     
-                    # Ziel-Pfad
-                    target_dir = categories[target_category]
-                    target_path = target_dir / file_path.name
-                    
-                    # Duplikate vermeiden
-                    counter = 1
-                    original_target = target_path
-                    while target_path.exists():
-                        stem = original_target.stem
-                        suffix = original_target.suffix
-                        target_path = target_dir / f"{stem}_{counter}{suffix}"
-                        counter += 1
-                    
-                    try:
-                        shutil.move(str(file_path), str(target_path))
-                        moved_files.append({
-                            'source': str(file_path),
-                            'target': str(target_path),
-                            'category': target_category
-                        })
-                    except Exception as e:
-                        errors.append(f"Fehler bei {file_path.name}: {e}")
+                    # Ziel-Pfad (Namenskonflikte löst der Executor: datei_1.txt, ...)
+                    operations.append(CleanupOperation(
+                        op_type=OP_MOVE,
+                        source=str(file_path),
+                        target=str(categories[target_category] / file_path.name),
+                        meta={'category': target_category}
+                    ))
+            
+            report = self.cleanup_executor.run('organize_files', operations, dry_run=dry_run)
                         
         except Exception as e:
             return {'success': False, 'error': f"Kritischer Fehler: {e}"}
         
+        moved_files = [
+            {
+                'source': result['source'],
+                'target': result['target'],
+                'category': result['meta']['category']
+            }
+            for result in report['results']
+        ]
+        
         return {
             'success': True,
             'moved_files': len(moved_files),
-            'errors': len(errors),
+            'errors': len(report['errors']),
             'details': moved_files,
-            'error_details': errors,
-            'organization_path': str(org_base)
+            'error_details': report['errors'],
+            'organization_path': str(org_base),
+            'dry_run': dry_run,
+            'transaction_id': report.get('transaction_id'),
+            'duration_s': report['duration_s'],
+            'files_per_s': report['ops_per_s']
         }
     
-    def clean_temp_files_real(self) -> Dict:
+    def clean_temp_files_real(self, dry_run: bool = False) -> Dict:
         """Echte Temp-Dateien löschen"""
-        deleted_files = 0
-        deleted_size = 0
+        operations = []
         errors = []
         
         temp_paths = [
@@ -224,51 +220,51 @@ class RealSystemManager:
             Path('C:/Windows/Temp')
         ]
         
+        seen_paths = set()
         for temp_path in temp_paths:
             if not temp_path.exists():
                 continue
+            
+            # Gleicher Ordner kann mehrfach in der Liste stehen
+            resolved = os.path.normcase(str(temp_path.resolve()))
+            if resolved in seen_paths:
+                continue
+            seen_paths.add(resolved)
                 
             try:
                 for item in temp_path.iterdir():
-                    try:
-                        if item.is_file():
-                            size = item.stat().st_size
-                            item.unlink()
-                            deleted_files += 1
-                            deleted_size += size
-                        elif item.is_dir():
-                            shutil.rmtree(item)
-                            deleted_files += 1
-                    except (PermissionError, FileNotFoundError, OSError) as e:
-                        errors.append(f"Fehler bei {item.name}: {e}")
+                    operations.append(CleanupOperation(op_type=OP_DELETE, source=str(item)))
                         
             except (PermissionError, OSError) as e:
                 errors.append(f"Fehler bei Temp-Ordner {temp_path}: {e}")
         
+        report = self.cleanup_executor.run('clean_temp_files', operations, dry_run=dry_run)
+        errors.extend(report['errors'])
+        
         return {
-            'deleted_files': deleted_files,
-            'deleted_size_mb': deleted_size / (1024 * 1024),
+            'deleted_files': report['completed'],
+            'deleted_size_mb': report['bytes_reclaimed'] / (1024 * 1024),
             'errors': len(errors),
-            'error_details': errors[:5]  # Nur erste 5 Fehler anzeigen
+            'error_details': errors[:5],  # Nur erste 5 Fehler anzeigen
+            'dry_run': dry_run,
+            'transaction_id': report.get('transaction_id'),
+            'duration_s': report['duration_s'],
+            'files_per_s': report['ops_per_s']
         }
     
     def get_running_programs_real(self) -> List[Dict]:
         """Echte laufende Programme ermitteln"""
         programs = []
         
-        for proc in psutil.process_iter(['pid', 'name', 'exe', 'memory_info', 'cpu_percent']):
-            try:
-                proc_info = proc.info
-                if proc_info['exe'] and proc_info['memory_info']:
-                    programs.append({
-                        'pid': proc_info['pid'],
-                        'name': proc_info['name'],
-                        'exe_path': proc_info['exe'],
-                        'memory_mb': proc_info['memory_info'].rss / (1024 * 1024),
-                        'cpu_percent': proc.cpu_percent()
-                    })
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
+        for proc_info in self.process_table.snapshot():
+            if proc_info.exe and proc_info.rss:
+                programs.append({
+                    'pid': proc_info.pid,
+                    'name': proc_info.name,
+                    'exe_path': proc_info.exe,
+                    'memory_mb': proc_info.memory_mb,
+                    'cpu_percent': proc_info.cpu_percent
+                })
         
         # Nach Speicherverbrauch sortieren
         programs.sort(key=lambda x: x['memory_mb'], reverse=True)
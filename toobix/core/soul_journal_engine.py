@@ -19,6 +19,10 @@ from dataclasses import dataclass, asdict
 import random
 import asyncio
 
+from .persistence import get_persistence_service
+from .soul_journal_store import SoulJournalStore
+from .memory_index import get_memory_index
+
 try:
     import customtkinter as ctk
     from tkinter import messagebox, filedialog
@@ -138,9 +142,15 @@ class SoulJournalEngine:
         self.data_dir = data_dir
         os.makedirs(data_dir, exist_ok=True)
         
-        # Journal Entries
-        self.entries: List[SoulEntry] = []
-        self.load_entries()
+        # Write-Behind-Persistenz für Tracking-Daten
+        self.persistence = get_persistence_service()
+        self._tracking_store = self.persistence.register(
+            os.path.join(data_dir, "tracking_data.json"), self._serialize_tracking_data)
+        
+        # Journal Entries (append-only, indiziert)
+        self.store = SoulJournalStore(data_dir, SoulEntry.from_dict)
+        self.memory_index = get_memory_index()
+        self.memory_index.register_source('journal', self._journal_documents)
         
         # Tracking Systems
         self.gratitude_counter = GratitudeCounter()
@@ -292,6 +302,12 @@ class SoulJournalEngine:
         if 'dankbar' in reflection.lower():
             base_insight += "\n\n🙏 DANKBARKEITS-VERSTÄRKUNG: Deine Dankbarkeit ist ein Magnet für noch größere Segnungen."
         
+        # Verbindung zu einem früheren, inhaltlich ähnlichen Eintrag
+        related = self.memory_index.search(reflection, k=1, kinds=['journal']) if reflection.strip() else []
+        if related:
+            earlier = datetime.datetime.fromtimestamp(related[0].timestamp).strftime('%d.%m.%Y')
+            base_insight += f"\n\n🔗 Am {earlier} hast du Ähnliches geschrieben: \"{related[0].text[:120]}\""
+        
         return base_insight
     
     def create_entry(self, category: str, prompt: str, user_reflection: str) -> SoulEntry:
@@ -322,8 +338,9 @@ class SoulJournalEngine:
             tags=tags
         )
         
-        self.entries.append(entry)
-        self.save_entries()
+        self.store.append(entry)
+        self.memory_index.add('journal', entry.timestamp.isoformat(), user_reflection,
+                              entry.timestamp.timestamp())
         
         # Wachstums-Tracking aktualisieren
         self.growth_tracker.update_growth(category, spiritual_growth)
@@ -374,77 +391,56 @@ class SoulJournalEngine:
         return tags
     
     def get_growth_insights(self) -> Dict[str, Any]:
-        """Gibt Einsichten über spirituelles Wachstum"""
-        if not self.entries:
+        """Gibt Einsichten über spirituelles Wachstum (aus inkrementellen Aggregaten)"""
+        aggregates = self.store.aggregates
+        if not aggregates.total_entries:
             return {"message": "Noch keine Einträge vorhanden"}
         
-        # Wachstumstrends analysieren
-        recent_entries = self.entries[-10:]  # Letzte 10 Einträge
-        avg_depth = sum(e.emotional_depth for e in recent_entries) / len(recent_entries)
-        avg_growth = sum(e.spiritual_growth for e in recent_entries) / len(recent_entries)
-        
-        # Stärkste Kategorien
-        category_growth = {}
-        for entry in recent_entries:
-            if entry.category not in category_growth:
-                category_growth[entry.category] = []
-            category_growth[entry.category].append(entry.spiritual_growth)
-        
-        strongest_area = max(category_growth.keys(), 
-                           key=lambda k: sum(category_growth[k])) if category_growth else 'general'
+        # Wachstumstrends der letzten 10 Einträge
+        recent = aggregates.recent_summary()
         
         return {
-            'total_entries': len(self.entries),
-            'recent_avg_depth': round(avg_depth, 2),
-            'recent_avg_growth': round(avg_growth, 3),
-            'strongest_growth_area': strongest_area,
+            'total_entries': aggregates.total_entries,
+            'recent_avg_depth': round(recent['avg_depth'], 2),
+            'recent_avg_growth': round(recent['avg_growth'], 3),
+            'strongest_growth_area': recent['strongest_area'],
+            'entries_per_category': dict(aggregates.category_counts),
             'gratitude_streak': self.gratitude_counter.gratitude_streak,
             'growth_levels': self.growth_tracker.categories
         }
     
-    def save_entries(self):
-        """Speichert alle Einträge"""
-        try:
-            data = [entry.to_dict() for entry in self.entries]
-            
-            with open(os.path.join(self.data_dir, "soul_entries.json"), 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"Fehler beim Speichern der Soul Entries: {e}")
+    @property
+    def entries(self) -> List[SoulEntry]:
+        """Alle Einträge in Einfügereihenfolge"""
+        return self.store.entries
     
-    def load_entries(self):
-        """Lädt gespeicherte Einträge"""
-        try:
-            file_path = os.path.join(self.data_dir, "soul_entries.json")
-            if os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                self.entries = [SoulEntry.from_dict(entry_data) for entry_data in data]
-        except Exception as e:
-            print(f"Fehler beim Laden der Soul Entries: {e}")
+    def search_entries(self, query: str, category: Optional[str] = None, limit: int = 50) -> List[SoulEntry]:
+        """Volltextsuche über Reflexionen, Prompts und Tags (neueste zuerst)"""
+        return self.store.search(query, category=category, limit=limit)
+    
+    def _journal_documents(self):
+        """Einträge für den Memory-Index (schlüssel, text, zeitstempel)"""
+        for entry in list(self.store.entries):
+            yield entry.timestamp.isoformat(), entry.user_reflection, entry.timestamp.timestamp()
     
     def save_tracking_data(self):
-        """Speichert Tracking-Daten"""
-        try:
-            data = {
-                'gratitude_counter': {
-                    'daily_goal': self.gratitude_counter.daily_goal,
-                    'current_count': self.gratitude_counter.current_count,
-                    'gratitude_streak': self.gratitude_counter.gratitude_streak,
-                    'total_gratitudes': self.gratitude_counter.total_gratitudes,
-                    'last_update': self.gratitude_counter.last_update.isoformat() if self.gratitude_counter.last_update else None
-                },
-                'growth_tracker': {
-                    'categories': self.growth_tracker.categories,
-                    'growth_history': self.growth_tracker.growth_history
-                }
+        """Speichert Tracking-Daten (asynchron über den Persistenz-Service)"""
+        self.persistence.mark_dirty(self._tracking_store)
+    
+    def _serialize_tracking_data(self) -> Dict:
+        return {
+            'gratitude_counter': {
+                'daily_goal': self.gratitude_counter.daily_goal,
+                'current_count': self.gratitude_counter.current_count,
+                'gratitude_streak': self.gratitude_counter.gratitude_streak,
+                'total_gratitudes': self.gratitude_counter.total_gratitudes,
+                'last_update': self.gratitude_counter.last_update.isoformat() if self.gratitude_counter.last_update else None
+            },
+            'growth_tracker': {
+                'categories': self.growth_tracker.categories,
+                'growth_history': self.growth_tracker.growth_history
             }
-            
-            with open(os.path.join(self.data_dir, "tracking_data.json"), 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"Fehler beim Speichern der Tracking-Daten: {e}")
+        }
     
     def load_tracking_data(self):
         """Lädt Tracking-Daten"""
@@ -0,0 +1,272 @@
+"""
+Soul Journal Store
+Append-only Ablage der Tagebuch-Einträge mit Volltext-, Datums- und Kategorie-Index
+"""
+import os
+import re
+import json
+import bisect
+import datetime
+import threading
+import logging
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Iterable
+
+from .persistence import repair_torn_tail
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Zerlegt Text in kleingeschriebene Suchbegriffe (ab 2 Zeichen)"""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if len(token) > 1]
+
+
+class GrowthAggregates:
+    """
+    Inkrementell gepflegte Kennzahlen über alle Einträge.
+
+    Jeder neue Eintrag aktualisiert Zähler und Summen in O(1); die
+    "letzten N"-Werte liegen in einer begrenzten deque. Insight-Abfragen
+    hängen dadurch nicht von der Gesamtzahl der Einträge ab.
+    """
+
+    def __init__(self, recent_window: int = 10):
+        self.total_entries = 0
+        self.category_counts: Dict[str, int] = {}
+        self.category_growth: Dict[str, float] = {}
+        self.category_depth: Dict[str, float] = {}
+        self.recent = deque(maxlen=recent_window)
+
+    def add(self, entry):
+        self.total_entries += 1
+        category = entry.category
+        self.category_counts[category] = self.category_counts.get(category, 0) + 1
+        self.category_growth[category] = self.category_growth.get(category, 0.0) + entry.spiritual_growth
+        self.category_depth[category] = self.category_depth.get(category, 0.0) + entry.emotional_depth
+        self.recent.append((category, entry.emotional_depth, entry.spiritual_growth))
+
+    def recent_summary(self) -> Dict:
+        """Durchschnitte und stärkste Kategorie der letzten Einträge"""
+        if not self.recent:
+            return {'avg_depth': 0.0, 'avg_growth': 0.0, 'strongest_area': 'general'}
+        growth_by_category: Dict[str, float] = {}
+        depth_sum = 0.0
+        growth_sum = 0.0
+        for category, depth, growth in self.recent:
+            depth_sum += depth
+            growth_sum += growth
+            growth_by_category[category] = growth_by_category.get(category, 0.0) + growth
+        return {
+            'avg_depth': depth_sum / len(self.recent),
+            'avg_growth': growth_sum / len(self.recent),
+            'strongest_area': max(growth_by_category, key=growth_by_category.get)
+        }
+
+
+class SoulJournalStore:
+    """
+    Append-only Journal in Monats-Segmenten (entries/YYYY-MM.jsonl).
+
+    Ein neuer Eintrag ist genau eine angehängte Zeile - bestehende Daten
+    werden nie neu geschrieben. Beim Laden werden die Segmente einmal
+    gelesen und daraus die Indizes aufgebaut: Volltext über Reflexion,
+    Prompt und Tags, Kategorie, Tag und Datum (sortiert, für Zeiträume).
+    Eine vorhandene soul_entries.json wird einmalig übernommen.
+
+    Vor dem ersten Anhängen an ein Segment wird eine nach einem Absturz
+    abgebrochene letzte Zeile abgeschnitten.
+    """
+
+    LEGACY_SEGMENT = '0000-legacy.jsonl'  # sortiert vor allen Monats-Segmenten
+
+    def __init__(self, data_dir: str, entry_factory):
+        self.data_dir = Path(data_dir)
+        self.segment_dir = self.data_dir / 'entries'
+        self.segment_dir.mkdir(parents=True, exist_ok=True)
+        self._entry_factory = entry_factory
+        self._lock = threading.RLock()
+        self._repaired_segments: Set[Path] = set()
+
+        self.entries: List = []
+        self._terms: Dict[str, Set[int]] = {}
+        self._by_category: Dict[str, List[int]] = {}
+        self._by_tag: Dict[str, List[int]] = {}
+        self._by_day: Dict[datetime.date, List[int]] = {}
+        self._timeline: List[tuple] = []  # (timestamp, index), sortiert
+        self.aggregates = GrowthAggregates()
+
+        self._load()
+
+    # === SCHREIBEN ===
+
+    def append(self, entry):
+        """Hängt einen Eintrag an sein Monats-Segment an und indiziert ihn"""
+        line = json.dumps(entry.to_dict(), ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            segment = self._segment_path(entry.timestamp)
+            if segment not in self._repaired_segments:
+                repair_torn_tail(segment)
+                self._repaired_segments.add(segment)
+            with open(segment, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+            self._index(entry)
+
+    # === ABFRAGEN ===
+
+    def search(self, query: str, category: Optional[str] = None,
+               start: Optional[datetime.datetime] = None, end: Optional[datetime.datetime] = None,
+               limit: int = 50) -> List:
+        """
+        Volltextsuche (alle Begriffe müssen vorkommen, "begriff*" sucht per
+        Präfix). Ergebnisse neueste zuerst, optional nach Kategorie/Zeitraum gefiltert.
+        """
+        with self._lock:
+            matches: Optional[Set[int]] = None
+            for term in query.lower().split():
+                term_matches = self._match_term(term)
+                matches = term_matches if matches is None else matches & term_matches
+                if not matches:
+                    return []
+            if matches is None:
+                return []
+
+            if category:
+                matches &= set(self._by_category.get(category, []))
+            results = [self.entries[i] for i in sorted(matches, reverse=True)]
+        if start or end:
+            results = [e for e in results
+                       if (start is None or e.timestamp >= start) and (end is None or e.timestamp < end)]
+        return results[:limit]
+
+    def recent(self, limit: int = 20, category: Optional[str] = None) -> List:
+        """Neueste Einträge, optional einer Kategorie"""
+        with self._lock:
+            if category:
+                indices = self._by_category.get(category, [])
+                return [self.entries[i] for i in reversed(indices[-limit:])]
+            return [self.entries[i] for _, i in reversed(self._timeline[-limit:])]
+
+    def count(self, category: Optional[str] = None) -> int:
+        """Anzahl Einträge (gesamt oder je Kategorie)"""
+        if category:
+            return self.aggregates.category_counts.get(category, 0)
+        return self.aggregates.total_entries
+
+    def entries_on(self, day: datetime.date, category: Optional[str] = None) -> List:
+        """Einträge eines Tages"""
+        with self._lock:
+            entries = [self.entries[i] for i in self._by_day.get(day, [])]
+        if category:
+            entries = [e for e in entries if e.category == category]
+        return entries
+
+    def entries_between(self, start: datetime.datetime, end: datetime.datetime) -> List:
+        """Einträge im Zeitraum [start, end) in zeitlicher Reihenfolge"""
+        with self._lock:
+            low = bisect.bisect_left(self._timeline, (start, -1))
+            high = bisect.bisect_left(self._timeline, (end, -1))
+            return [self.entries[i] for _, i in self._timeline[low:high]]
+
+    def by_tag(self, tag: str) -> List:
+        """Einträge mit einem Tag"""
+        with self._lock:
+            return [self.entries[i] for i in self._by_tag.get(tag, [])]
+
+    # === INTERN ===
+
+    def _segment_path(self, timestamp: datetime.datetime) -> Path:
+        return self.segment_dir / f"{timestamp:%Y-%m}.jsonl"
+
+    def _match_term(self, term: str) -> Set[int]:
+        """Treffer für einen Suchbegriff (exakt oder Präfix mit *)"""
+        if term.endswith('*'):
+            prefix = term[:-1]
+            matches: Set[int] = set()
+            for token, indices in self._terms.items():
+                if token.startswith(prefix):
+                    matches |= indices
+            return matches
+        tokens = tokenize(term)
+        if not tokens:
+            return set()
+        matches = set(self._terms.get(tokens[0], ()))
+        for token in tokens[1:]:
+            matches &= self._terms.get(token, set())
+        return matches
+
+    def _index(self, entry):
+        """Nimmt einen Eintrag in alle Indizes und Aggregate auf"""
+        index = len(self.entries)
+        self.entries.append(entry)
+
+        text = ' '.join([entry.user_reflection, entry.prompt, ' '.join(entry.tags)])
+        for token in set(tokenize(text)):
+            self._terms.setdefault(token, set()).add(index)
+        self._by_category.setdefault(entry.category, []).append(index)
+        for tag in entry.tags:
+            self._by_tag.setdefault(tag, []).append(index)
+        self._by_day.setdefault(entry.timestamp.date(), []).append(index)
+
+        key = (entry.timestamp, index)
+        if not self._timeline or key >= self._timeline[-1]:
+            self._timeline.append(key)
+        else:
+            bisect.insort(self._timeline, key)
+
+        self.aggregates.add(entry)
+
+    def _load(self):
+        """Liest alle Segmente (und migriert ggf. die alte JSON-Datei)"""
+        self._migrate_legacy_file()
+        for segment in sorted(self.segment_dir.glob('*.jsonl')):
+            for entry in self._read_segment(segment):
+                self._index(entry)
+        if self.entries:
+            logger.info(f"📔 {len(self.entries)} Soul-Journal-Einträge geladen")
+
+    def _read_segment(self, segment: Path) -> Iterable:
+        try:
+            with open(segment, 'r', encoding='utf-8') as f:
+                for line_number, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield self._entry_factory(json.loads(line))
+                    except (ValueError, KeyError) as e:
+                        # Abgeschnittene letzte Zeile nach Absturz o.ä.
+                        logger.warning(f"Ungültige Zeile {segment.name}:{line_number} übersprungen: {e}")
+        except OSError as e:
+            logger.error(f"Segment {segment.name} nicht lesbar: {e}")
+
+    def _migrate_legacy_file(self):
+        """
+        Übernimmt einmalig die alte soul_entries.json. Alle Einträge landen
+        atomar (Temp-Datei + os.replace) in einem eigenen Segment; existiert
+        es schon, ist nur das Umbenennen der alten Datei liegen geblieben -
+        ein Abbruch führt so nie zu doppelten Einträgen.
+        """
+        legacy_file = self.data_dir / 'soul_entries.json'
+        if not legacy_file.exists():
+            return
+        legacy_segment = self.segment_dir / self.LEGACY_SEGMENT
+        try:
+            if not legacy_segment.exists():
+                with open(legacy_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                lines = [json.dumps(self._entry_factory(entry_data).to_dict(), ensure_ascii=False,
+                                    separators=(',', ':')) for entry_data in data]
+                tmp_segment = legacy_segment.with_name(legacy_segment.name + '.tmp')
+                with open(tmp_segment, 'w', encoding='utf-8') as f:
+                    f.write(''.join(line + '\n' for line in lines))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_segment, legacy_segment)
+                logger.info(f"📔 {len(lines)} Einträge aus soul_entries.json übernommen")
+            os.replace(legacy_file, legacy_file.with_suffix('.json.migrated'))
+        except Exception as e:
+            logger.error(f"Migration von soul_entries.json fehlgeschlagen: {e}")
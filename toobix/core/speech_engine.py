@@ -2,27 +2,113 @@
 Toobix Speech Engine
 Spracherkennung, Wake-Word Detection und Text-to-Speech
 """
-import speech_recognition as sr
-import pyttsx3
 import threading
 import time
 import queue
+from array import array
+from collections import deque
 from typing import Callable, Optional
 
+from .startup_profiler import lazy_import
+
+try:
+    sr = lazy_import('speech_recognition')
+    SPEECH_RECOGNITION_AVAILABLE = True
+except ImportError:
+    sr = None
+    SPEECH_RECOGNITION_AVAILABLE = False
+
+try:
+    pyttsx3 = lazy_import('pyttsx3')
+    TTS_AVAILABLE = True
+except ImportError:
+    pyttsx3 = None
+    TTS_AVAILABLE = False
+
+
+def rms_energy(frame_data: bytes, sample_width: int) -> float:
+    """RMS-Energie eines PCM-Blocks (gleiche Skala wie recognizer.energy_threshold)"""
+    if not frame_data:
+        return 0.0
+    if sample_width == 2:
+        samples = array('h', frame_data[:len(frame_data) // 2 * 2])
+    else:
+        samples = [
+            int.from_bytes(frame_data[i:i + sample_width], 'little', signed=True)
+            for i in range(0, len(frame_data) - sample_width + 1, sample_width)
+        ]
+    if not samples:
+        return 0.0
+    return (sum(s * s for s in samples) / len(samples)) ** 0.5
+
+
+class NoiseFloorTracker:
+    """
+    Rollierender Geräuschpegel aus kurzen Umgebungsmessungen.
+
+    Der Boden ist das 20%-Perzentil der letzten Messungen - einzelne laute
+    Momente (Sprache, Türknall) verschieben ihn nicht. Die Erkennungs-
+    schwelle liegt mit Sicherheitsabstand darüber.
+    """
+
+    def __init__(self, window: int = 30, margin: float = 1.5, minimum: float = 50.0):
+        self.samples = deque(maxlen=window)
+        self.margin = margin
+        self.minimum = minimum
+        self.last_sample_time = 0.0
+
+    def add(self, energy: float):
+        self.samples.append(energy)
+        self.last_sample_time = time.time()
+
+    @property
+    def floor(self) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[int(len(ordered) * 0.2)]
+
+    def threshold(self) -> Optional[float]:
+        floor = self.floor
+        return None if floor is None else max(self.minimum, floor * self.margin)
+
+
 class SpeechEngine:
-    """Verwaltet Sprach-Ein- und Ausgabe für Toobix"""
+    """
+    Verwaltet Sprach-Ein- und Ausgabe für Toobix.
+
+    Mikrofon und TTS werden erst bei der ersten Sprachnutzung geöffnet;
+    danach hält ein Hintergrund-Thread den Geräuschpegel aktuell. Ohne
+    Audio-Hardware (oder mit audio_mode='headless') läuft die Engine
+    stumm weiter: speak() protokolliert nur, Zuhören liefert None.
+    Für Tests können audio_source_factory (z.B. sr.AudioFile mit einer
+    Aufnahme) und recognize (Audio -> Text) injiziert werden.
+    """
     
-    def __init__(self, settings):
+    CALIBRATION_INTERVAL = 5.0   # Sekunden zwischen Umgebungsmessungen
+    CALIBRATION_SAMPLE = 0.25    # Sekunden pro Messung
+    
+    def __init__(self, settings, audio_source_factory: Optional[Callable] = None,
+                 recognize: Optional[Callable] = None):
         self.settings = settings
         self.speech_config = settings.get_speech_config()
+        self.headless = (self.speech_config.get('audio_mode') == 'headless'
+                         or (audio_source_factory is None and not SPEECH_RECOGNITION_AVAILABLE))
+        self.tts_disabled = self.speech_config.get('audio_mode') == 'headless' or not TTS_AVAILABLE
         
-        # Speech Recognition Setup
-        self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
+        # Audio-Geräte (lazy)
+        self._audio_source_factory = audio_source_factory
+        self._recognize = recognize
+        self._recognizer = None
+        self._microphone = None
+        self._tts_engine = None
+        self._device_lock = threading.Lock()   # Mikrofon kann nur einmal gleichzeitig offen sein
+        self._init_lock = threading.Lock()
         
-        # Text-to-Speech Setup
-        self.tts_engine = pyttsx3.init()
-        self._setup_tts()
+        # Rollierende Kalibrierung
+        self.noise_floor = NoiseFloorTracker()
+        self._calibration_thread = None
+        self._stop_event = threading.Event()
         
         # Threading und Kontrolle
         self.listening = False
@@ -33,46 +119,129 @@ class SpeechEngine:
         self.on_command_received = None
         self.on_wake_word_detected = None
         
-        print("🎤 Speech Engine initialisiert")
-        self._calibrate_microphone()
+        mode = "headless (ohne Audio-Geräte)" if self.headless else "Audio-Geräte bei Bedarf"
+        print(f"🎤 Speech Engine initialisiert - {mode}")
+    
+    # === AUDIO-GERÄTE (LAZY) ===
+    
+    @property
+    def recognizer(self):
+        """Speech Recognizer (beim ersten Zugriff erstellt)"""
+        if self._recognizer is None and sr is not None:
+            with self._init_lock:
+                if self._recognizer is None:
+                    self._recognizer = sr.Recognizer()
+        return self._recognizer
+    
+    @property
+    def microphone(self):
+        """Audio-Quelle; None im Headless-Modus oder ohne Gerät"""
+        if self.headless:
+            return None
+        if self._microphone is None:
+            with self._init_lock:
+                if self._microphone is None and not self.headless:
+                    try:
+                        if self._audio_source_factory:
+                            self._microphone = self._audio_source_factory()
+                        else:
+                            self._microphone = sr.Microphone()
+                        print("🎤 Mikrofon geöffnet")
+                    except Exception as e:
+                        print(f"⚠️ Kein Mikrofon verfügbar - Headless-Modus: {e}")
+                        self.headless = True
+                        return None
+            self._start_calibration()
+        return self._microphone
+    
+    @property
+    def tts_engine(self):
+        """TTS-Engine; None wenn nicht verfügbar"""
+        if self.tts_disabled:
+            return None
+        if self._tts_engine is None:
+            with self._init_lock:
+                if self._tts_engine is None and not self.tts_disabled:
+                    try:
+                        self._tts_engine = pyttsx3.init()
+                        self._setup_tts()
+                    except Exception as e:
+                        print(f"⚠️ TTS nicht verfügbar - stumme Ausgabe: {e}")
+                        self.tts_disabled = True
+                        return None
+        return self._tts_engine
     
     def _setup_tts(self):
         """Konfiguriert Text-to-Speech Engine"""
         try:
             # Stimme einstellen
-            voices = self.tts_engine.getProperty('voices')
+            voices = self._tts_engine.getProperty('voices')
             for voice in voices:
                 if self.speech_config['tts_voice'] in voice.id.lower():
-                    self.tts_engine.setProperty('voice', voice.id)
+                    self._tts_engine.setProperty('voice', voice.id)
                     break
             
             # Geschwindigkeit und Lautstärke
-            self.tts_engine.setProperty('rate', self.speech_config['tts_rate'])
-            self.tts_engine.setProperty('volume', 0.8)
+            self._tts_engine.setProperty('rate', self.speech_config['tts_rate'])
+            self._tts_engine.setProperty('volume', 0.8)
             
             print(f"🔊 TTS konfiguriert - Stimme: {self.speech_config['tts_voice']}")
             
         except Exception as e:
             print(f"⚠️ TTS Setup Fehler: {e}")
     
-    def _calibrate_microphone(self):
-        """Kalibriert Mikrofon für Umgebungsgeräusche"""
-        try:
-            print("🎯 Kalibriere Mikrofon...")
-            with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
-            print("✅ Mikrofon kalibriert")
-        except Exception as e:
-            print(f"⚠️ Mikrofon-Kalibrierung fehlgeschlagen: {e}")
+    # === ROLLIERENDE KALIBRIERUNG ===
+    
+    def _start_calibration(self):
+        """Startet die Hintergrund-Kalibrierung (einmalig nach dem Öffnen des Mikrofons)"""
+        if self._calibration_thread is None:
+            self._calibration_thread = threading.Thread(target=self._calibration_loop, daemon=True)
+            self._calibration_thread.start()
+    
+    def _calibration_loop(self):
+        """Misst regelmäßig den Umgebungspegel, solange das Mikrofon frei ist"""
+        while not self._stop_event.is_set():
+            if self._device_lock.acquire(blocking=False):
+                try:
+                    with self._microphone as source:
+                        self._sample_noise(source)
+                except Exception as e:
+                    print(f"⚠️ Mikrofon-Kalibrierung fehlgeschlagen: {e}")
+                finally:
+                    self._device_lock.release()
+            self._stop_event.wait(self.CALIBRATION_INTERVAL)
+    
+    def _sample_noise(self, source):
+        """Liest eine kurze Umgebungsprobe und passt die Erkennungsschwelle an"""
+        chunks = max(1, int(source.SAMPLE_RATE * self.CALIBRATION_SAMPLE / source.CHUNK))
+        frames = b''.join(source.stream.read(source.CHUNK) for _ in range(chunks))
+        self.noise_floor.add(rms_energy(frames, source.SAMPLE_WIDTH))
+        threshold = self.noise_floor.threshold()
+        if threshold is not None and self.recognizer is not None:
+            self.recognizer.energy_threshold = threshold
+    
+    def _maybe_sample_noise(self, source):
+        """Im Dauer-Zuhören: Probe nehmen, wenn die letzte zu alt ist"""
+        if time.time() - self.noise_floor.last_sample_time >= self.CALIBRATION_INTERVAL:
+            try:
+                self._sample_noise(source)
+            except Exception as e:
+                print(f"⚠️ Mikrofon-Kalibrierung fehlgeschlagen: {e}")
+    
+    # === ZUHÖREN ===
     
     def start_listening(self):
         """Startet kontinuierliche Spracherkennung"""
+        if self.microphone is None:
+            print("🔇 Kein Mikrofon - kontinuierliche Spracherkennung nicht möglich")
+            return
         self.listening = True
         print(f"👂 Höre auf Wake-Word: '{self.speech_config['wake_word']}'")
         
         while self.listening:
             try:
-                with self.microphone as source:
+                with self._device_lock, self.microphone as source:
+                    self._maybe_sample_noise(source)
                     # Kurzes Timeout für responsive UI
                     audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=5)
                     
@@ -93,14 +262,17 @@ class SpeechEngine:
                 print(f"❌ Listening Fehler: {e}")
                 time.sleep(1)
     
+    def _transcribe(self, audio) -> str:
+        """Audio -> Text (injizierbar für Tests)"""
+        if self._recognize:
+            return self._recognize(audio)
+        return self.recognizer.recognize_google(audio, language=self.speech_config['language'])
+    
     def _process_audio(self, audio):
         """Verarbeitet aufgenommenes Audio"""
         try:
             # Sprache zu Text
-            text = self.recognizer.recognize_google(
-                audio, 
-                language=self.speech_config['language']
-            ).lower()
+            text = self._transcribe(audio).lower()
             
             print(f"👂 Gehört: '{text}'")
             
@@ -176,6 +348,8 @@ class SpeechEngine:
     
     def _speak_sync(self, text: str):
         """Synchrone TTS mit Runtime-Error-Handling"""
+        if self.tts_engine is None:
+            return  # Headless: Text wurde bereits protokolliert
         try:
             self.tts_engine.say(text)
             self.tts_engine.runAndWait()
@@ -184,7 +358,6 @@ class SpeechEngine:
                 # Engine bereits aktiv - stoppe und versuche erneut
                 try:
                     self.tts_engine.stop()
-                    import time
                     time.sleep(0.1)
                     self.tts_engine.say(text)
                     self.tts_engine.runAndWait()
@@ -206,11 +379,14 @@ class SpeechEngine:
         """Stoppt Speech Engine"""
         print("🔇 Speech Engine wird gestoppt...")
         self.listening = False
+        self._stop_event.set()
         
-        try:
-            self.tts_engine.stop()
-        except:
-            pass
+        # Nur stoppen, was auch geöffnet wurde
+        if self._tts_engine is not None:
+            try:
+                self._tts_engine.stop()
+            except:
+                pass
     
     def set_callbacks(self, on_command: Callable = None, on_wake_word: Callable = None):
         """Setzt Callback-Funktionen"""
@@ -219,15 +395,15 @@ class SpeechEngine:
     
     def manual_listen(self) -> Optional[str]:
         """Einmalige Spracherkennung (für Button-Aktivierung)"""
+        if self.microphone is None:
+            print("🔇 Kein Mikrofon verfügbar")
+            return None
         try:
             print("🎤 Sprechen Sie jetzt...")
-            with self.microphone as source:
+            with self._device_lock, self.microphone as source:
                 audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=10)
             
-            text = self.recognizer.recognize_google(
-                audio, 
-                language=self.speech_config['language']
-            )
+            text = self._transcribe(audio)
             
             print(f"👂 Verstanden: '{text}'")
             return text
@@ -252,3 +428,15 @@ class SpeechEngine:
         status = "an" if self.wake_word_active else "aus"
         print(f"🎛️ Wake-Word {status}")
         return self.wake_word_active
+    
+    def get_status(self) -> dict:
+        """Zustand der Audio-Geräte und der Kalibrierung"""
+        return {
+            'headless': self.headless,
+            'microphone_open': self._microphone is not None,
+            'tts_ready': self._tts_engine is not None,
+            'tts_disabled': self.tts_disabled,
+            'noise_floor': self.noise_floor.floor,
+            'energy_threshold': self._recognizer.energy_threshold if self._recognizer else None,
+            'calibration_samples': len(self.noise_floor.samples)
+        }
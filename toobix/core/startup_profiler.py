@@ -0,0 +1,226 @@
+"""
+Toobix Startup Profiler
+Import-Zeiten pro Modul, verzögerte Importe schwerer Bibliotheken und Startup-Budget
+"""
+import sys
+import json
+import time
+import threading
+import importlib.util
+import logging
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .startup_trace import StartupTrace
+
+logger = logging.getLogger(__name__)
+
+
+def lazy_import(name: str):
+    """
+    Importiert ein Top-Level-Modul verzögert (importlib.util.LazyLoader).
+
+    Das Modulobjekt steht sofort bereit, ausgeführt wird es erst beim
+    ersten Attributzugriff. Ist das Paket nicht installiert, kommt der
+    ImportError wie bisher sofort - nur die Ladezeit verschiebt sich.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+@dataclass
+class ImportRecord:
+    """Gemessener Import eines Moduls"""
+    name: str
+    start_ms: float
+    self_ms: float
+    cumulative_ms: float
+    deferred: bool   # erst nach dem ersten interaktiven Fenster geladen
+
+
+class _TimedLoader:
+    """Loader-Hülle, die exec_module misst und alles andere durchreicht"""
+
+    def __init__(self, loader, profiler: 'ImportProfiler', name: str):
+        self._loader = loader
+        self._profiler = profiler
+        self._name = name
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._enter()
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit(self._name, start)
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+
+class ImportProfiler:
+    """
+    Meta-Path-Finder, der jeden erstmaligen Import misst (wie -X importtime,
+    aber im Prozess und auswertbar). Eigenzeit = Gesamtzeit minus Zeit
+    verschachtelter Importe. Verzögerte Importe (lazy_import) werden beim
+    tatsächlichen Laden gemessen und als 'deferred' markiert.
+    """
+
+    def __init__(self, trace: StartupTrace):
+        self.trace = trace
+        self.records: List[ImportRecord] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._finding = set()
+
+    def install(self) -> 'ImportProfiler':
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+        return self
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    # === META PATH FINDER ===
+
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname in self._finding:
+            return None
+        self._finding.add(fullname)
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._finding.discard(fullname)
+
+        if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+            spec.loader = _TimedLoader(spec.loader, self, fullname)
+        return spec
+
+    # === MESSUNG ===
+
+    def _stack(self) -> List[float]:
+        if not hasattr(self._local, 'children'):
+            self._local.children = []
+        return self._local.children
+
+    def _enter(self):
+        self._stack().append(0.0)
+
+    def _exit(self, name: str, start: float):
+        cumulative = (time.perf_counter() - start) * 1000
+        stack = self._stack()
+        children = stack.pop()
+        if stack:
+            stack[-1] += cumulative
+        record = ImportRecord(
+            name=name,
+            start_ms=round((start - self.trace.t0) * 1000, 1),
+            self_ms=round(cumulative - children, 2),
+            cumulative_ms=round(cumulative, 2),
+            deferred=self.trace.interactive_ms is not None
+        )
+        with self._lock:
+            self.records.append(record)
+
+    # === AUSWERTUNG ===
+
+    def by_package(self, deferred: bool = False) -> Dict[str, float]:
+        """Eigenzeit summiert pro Top-Level-Paket"""
+        totals: Dict[str, float] = {}
+        with self._lock:
+            for record in self.records:
+                if record.deferred == deferred:
+                    package = record.name.split('.')[0]
+                    totals[package] = totals.get(package, 0.0) + record.self_ms
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def total_ms(self, deferred: bool = False) -> float:
+        with self._lock:
+            return sum(r.self_ms for r in self.records if r.deferred == deferred)
+
+
+def build_startup_report(trace: StartupTrace, profiler: Optional[ImportProfiler] = None,
+                         budget_ms: Optional[float] = None, top: int = 25) -> Dict:
+    """Fasst Trace und Import-Messung zu einem Bericht zusammen"""
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'interactive_ms': trace.interactive_ms,
+        'components': [asdict(span) for span in sorted(trace.spans, key=lambda s: s.duration_ms, reverse=True)],
+        'budget_ms': budget_ms,
+        'within_budget': None
+    }
+    if profiler:
+        with profiler._lock:
+            records = list(profiler.records)
+        startup_records = [r for r in records if not r.deferred]
+        report['imports'] = {
+            'count': len(startup_records),
+            'total_ms': round(profiler.total_ms(), 1),
+            'top_modules': [asdict(r) for r in sorted(startup_records, key=lambda r: r.self_ms, reverse=True)[:top]],
+            'top_packages': dict(list(profiler.by_package().items())[:top]),
+            'deferred_packages': profiler.by_package(deferred=True)
+        }
+    if budget_ms is not None and trace.interactive_ms is not None:
+        report['within_budget'] = trace.interactive_ms <= budget_ms
+    return report
+
+
+def format_startup_report(report: Dict) -> str:
+    """Textfassung des Startup-Berichts"""
+    lines = ["=" * 60, "⏱️ TOOBIX STARTUP PROFIL", "=" * 60]
+    if report.get('interactive_ms') is not None:
+        lines.append(f"Zeit bis interaktiv: {report['interactive_ms']:.0f} ms")
+    if report.get('budget_ms') is not None:
+        verdict = '✅ im Budget' if report['within_budget'] else '❌ über Budget'
+        lines.append(f"Budget: {report['budget_ms']:.0f} ms -> {verdict}")
+
+    imports = report.get('imports')
+    if imports:
+        lines.append(f"\n📦 IMPORTS ({imports['count']} Module, {imports['total_ms']:.0f} ms):")
+        for package, ms in list(imports['top_packages'].items())[:15]:
+            lines.append(f"  {ms:8.1f} ms  {package}")
+        lines.append("\n📄 TEUERSTE MODULE (Eigenzeit):")
+        for record in imports['top_modules'][:15]:
+            lines.append(f"  {record['self_ms']:8.1f} ms  {record['name']} (gesamt {record['cumulative_ms']:.0f} ms)")
+        if imports['deferred_packages']:
+            lines.append("\n💤 VERZÖGERT GELADEN (nach Start):")
+            for package, ms in imports['deferred_packages'].items():
+                lines.append(f"  {ms:8.1f} ms  {package}")
+
+    lines.append("\n🧩 KOMPONENTEN:")
+    for span in report['components'][:20]:
+        lazy = ' (bei Bedarf)' if span['phase'] == 'lazy' else ''
+        lines.append(f"  {span['duration_ms']:8.1f} ms  {span['name']}{lazy}")
+    return "\n".join(lines)
+
+
+def write_startup_report(report: Dict, directory: Path = Path('toobix_metrics')) -> Path:
+    """Speichert den Bericht als JSON"""
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"startup_profile_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return path
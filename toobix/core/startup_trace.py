@@ -0,0 +1,156 @@
+"""
+Toobix Startup Trace
+Misst die Startzeit pro Komponente und die Zeit bis zum ersten interaktiven Fenster
+"""
+import json
+import time
+import threading
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TraceSpan:
+    """Gemessene Initialisierung einer Komponente"""
+    name: str
+    start_ms: float       # relativ zum Prozessstart des Trace
+    duration_ms: float
+    phase: str            # 'startup' (vor dem ersten Frame) oder 'lazy' (bei Bedarf)
+    thread: str
+
+
+class StartupTrace:
+    """
+    Sammelt Zeitmessungen während des Starts.
+
+    - span(name) misst einen Block (Import, Engine, Tab ...)
+    - mark_interactive() hält die Zeit bis zum ersten interaktiven
+      Fenster fest und hängt sie an die Historie (JSONL) an, damit sich
+      die Kennzahl über Versionen verfolgen lässt
+    - Alles, was danach gemessen wird, zählt als 'lazy'
+    """
+
+    def __init__(self, history_file: Path = Path('toobix_metrics') / 'startup_history.jsonl'):
+        self.t0 = time.perf_counter()
+        self.history_file = history_file
+        self.spans: List[TraceSpan] = []
+        self.marks: Dict[str, float] = {}
+        self.interactive_ms: Optional[float] = None
+        self._interactive_callbacks: List[Callable[[float], None]] = []
+        self._lock = threading.Lock()
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.t0) * 1000
+
+    @contextmanager
+    def span(self, name: str):
+        """Misst die Dauer eines Blocks"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            span = TraceSpan(
+                name=name,
+                start_ms=round((start - self.t0) * 1000, 1),
+                duration_ms=round((end - start) * 1000, 1),
+                phase='startup' if self.interactive_ms is None else 'lazy',
+                thread=threading.current_thread().name
+            )
+            with self._lock:
+                self.spans.append(span)
+            logger.debug(f"⏱️ {name}: {span.duration_ms:.1f} ms")
+
+    def mark(self, name: str) -> float:
+        """Setzt einen Zeitpunkt (ms seit Start)"""
+        elapsed = round(self.elapsed_ms(), 1)
+        with self._lock:
+            self.marks[name] = elapsed
+        return elapsed
+
+    def mark_interactive(self, window: str = 'main') -> float:
+        """Erstes interaktives Fenster: Kennzahl festhalten und protokollieren"""
+        if self.interactive_ms is not None:
+            return self.interactive_ms
+        self.interactive_ms = self.mark('first_interactive')
+        self._append_history(window)
+        logger.info(self.report())
+        for callback in self._interactive_callbacks:
+            try:
+                callback(self.interactive_ms)
+            except Exception as e:
+                logger.error(f"Startup-Callback Fehler: {e}")
+        return self.interactive_ms
+
+    def on_interactive(self, callback: Callable[[float], None]):
+        """Registriert einen Callback für das erste interaktive Fenster"""
+        if self.interactive_ms is not None:
+            callback(self.interactive_ms)
+        else:
+            self._interactive_callbacks.append(callback)
+
+    def startup_spans(self) -> List[TraceSpan]:
+        with self._lock:
+            return [span for span in self.spans if span.phase == 'startup']
+
+    def report(self, top: int = 15) -> str:
+        """Lesbare Übersicht der teuersten Komponenten"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.duration_ms, reverse=True)[:top]
+        lines = ["⏱️ STARTUP TRACE"]
+        if self.interactive_ms is not None:
+            lines.append(f"  Zeit bis interaktiv: {self.interactive_ms:.0f} ms")
+        for span in spans:
+            lazy = ' (bei Bedarf)' if span.phase == 'lazy' else ''
+            lines.append(f"  {span.duration_ms:8.1f} ms  {span.name}{lazy}")
+        return "\n".join(lines)
+
+    def history(self, limit: int = 20) -> List[Dict]:
+        """Letzte gemessene Starts"""
+        try:
+            with open(self.history_file, 'r', encoding='utf-8') as f:
+                lines = f.readlines()[-limit:]
+            return [json.loads(line) for line in lines if line.strip()]
+        except (OSError, ValueError):
+            return []
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                'interactive_ms': self.interactive_ms,
+                'marks': dict(self.marks),
+                'spans': [asdict(span) for span in self.spans]
+            }
+
+    def _append_history(self, window: str):
+        record = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'window': window,
+            'interactive_ms': self.interactive_ms,
+            'components': {span.name: span.duration_ms for span in self.startup_spans()}
+        }
+        try:
+            self.history_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.history_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        except OSError as e:
+            logger.warning(f"Startup-Historie konnte nicht geschrieben werden: {e}")
+
+
+_startup_trace: Optional[StartupTrace] = None
+_startup_trace_lock = threading.Lock()
+
+
+def get_startup_trace() -> StartupTrace:
+    """Globaler Startup-Trace (Startzeitpunkt = erster Aufruf)"""
+    global _startup_trace
+    with _startup_trace_lock:
+        if _startup_trace is None:
+            _startup_trace = StartupTrace()
+        return _startup_trace
@@ -12,6 +12,8 @@ from datetime import datetime, timedelta
 import random
 import logging
 
+from .persistence import get_persistence_service
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -99,6 +101,8 @@ class StoryUniverseEngine:
     
     def __init__(self):
         self.save_file = Path("toobix_story_save.json")
+        self.persistence = get_persistence_service()
+        self._save_store = self.persistence.register(self.save_file, self._serialize_data)
         self.character: Optional[StoryCharacter] = None
         self.items_database: Dict[str, StoryItem] = {}
         self.quests_database: Dict[str, StoryQuest] = {}
@@ -324,26 +328,23 @@ class StoryUniverseEngine:
         logger.info("Neuer Story-Character erstellt")
     
     def _save_data(self):
-        """Speichert Story-Daten"""
-        try:
-            data = {
-                'character': asdict(self.character),
-                'quest_progress': {
-                    quest_id: {'completed': quest.is_completed}
-                    for quest_id, quest in self.quests_database.items()
-                },
-                'chapter_progress': {
-                    chapter_id: chapter.is_unlocked
-                    for chapter_id, chapter in self.chapters_database.items()
-                },
-                'last_save': datetime.now().isoformat()
-            }
-            
-            with open(self.save_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                
-        except Exception as e:
-            logger.error(f"Fehler beim Speichern der Story-Daten: {e}")
+        """Speichert Story-Daten (asynchron über den Persistenz-Service)"""
+        self.persistence.mark_dirty(self._save_store)
+    
+    def _serialize_data(self) -> Dict[str, Any]:
+        """Bereitet Story-Daten für die Speicherung vor"""
+        return {
+            'character': asdict(self.character),
+            'quest_progress': {
+                quest_id: {'completed': quest.is_completed}
+                for quest_id, quest in self.quests_database.items()
+            },
+            'chapter_progress': {
+                chapter_id: chapter.is_unlocked
+                for chapter_id, chapter in self.chapters_database.items()
+            },
+            'last_save': datetime.now().isoformat()
+        }
     
     def register_story_callback(self, action: str, callback: Callable):
         """Registriert Callbacks für Story-Aktionen"""
@@ -672,10 +673,7 @@ class StoryUniverseEngine:
     
     def _save_to_file(self):
         """Speichert Charakter-Daten"""
-        try:
-            if self.character:
-                # Verwende das bestehende save_file
-                with open(self.save_file, 'w', encoding='utf-8') as f:
-                    json.dump(asdict(self.character), f, indent=2, default=str)
-        except Exception as e:
-            logger.error(f"Save error: {e}")
+        # Gleiches Format wie _save_data - sonst überschreibt ein reiner
+        # Charakter-Dump Quest- und Kapitel-Fortschritt im save_file
+        if self.character:
+            self._save_data()
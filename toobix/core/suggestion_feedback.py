@@ -0,0 +1,216 @@
+"""
+Toobix Suggestion Feedback
+Persistentes Online-Lernen aus Klicks und ignorierten Vorschlägen (zeitlich gewichtet)
+"""
+import json
+import math
+import time
+import random
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from .persistence import get_persistence_service
+
+logger = logging.getLogger(__name__)
+
+# Feedback verliert nach 30 Tagen die Hälfte seines Gewichts
+DEFAULT_HALF_LIFE_S = 30 * 24 * 3600
+
+# Ereignis -> (Erfolg, Misserfolg); Anzeigen zählen als schwaches "nein",
+# das ein Klick leicht überstimmt
+EVENT_WEIGHTS = {
+    'shown': (0.0, 0.1),
+    'clicked': (1.0, 0.0),
+    'ignored': (0.0, 0.3),
+    'dismissed': (0.0, 1.0)
+}
+
+RANKING_MODES = ('mean', 'ucb', 'thompson')
+
+GLOBAL_CONTEXT = '*'
+MIN_CONTEXT_WEIGHT = 3.0     # darunter gilt der kontextfreie Zähler
+PRUNE_WEIGHT = 0.05          # fast vergessene Zähler werden nicht mehr gespeichert
+MAX_ENTRIES = 5000
+UCB_EXPLORATION = 0.3
+
+
+class FeedbackCounter:
+    """
+    Beta-Zähler (Erfolge/Misserfolge) mit exponentiellem Zerfall. Wie
+    DecayedStats wird beim Hinzufügen zuerst das vorhandene Gewicht mit
+    0.5 ** (Δt / Halbwertszeit) skaliert - O(1) und ohne Ereignisliste.
+    """
+
+    __slots__ = ('success', 'failure', 'last_ts')
+
+    def __init__(self, success: float = 0.0, failure: float = 0.0, last_ts: float = 0.0):
+        self.success = success
+        self.failure = failure
+        self.last_ts = last_ts
+
+    def add(self, success: float, failure: float, ts: float, half_life_s: float):
+        factor = self._factor(ts, half_life_s)
+        self.success = self.success * factor + success
+        self.failure = self.failure * factor + failure
+        self.last_ts = max(self.last_ts, ts)
+
+    def at(self, ts: float, half_life_s: float) -> Tuple[float, float]:
+        """Zerfallene (Erfolge, Misserfolge) zum Zeitpunkt ts, ohne Zustand zu ändern"""
+        factor = self._factor(ts, half_life_s)
+        return self.success * factor, self.failure * factor
+
+    def weight_at(self, ts: float, half_life_s: float) -> float:
+        return sum(self.at(ts, half_life_s))
+
+    def _factor(self, ts: float, half_life_s: float) -> float:
+        elapsed = ts - self.last_ts
+        return 0.5 ** (elapsed / half_life_s) if elapsed > 0 and self.last_ts else 1.0
+
+    def to_list(self) -> List[float]:
+        return [round(self.success, 4), round(self.failure, 4), round(self.last_ts, 1)]
+
+    @classmethod
+    def from_list(cls, values: List[float]) -> 'FeedbackCounter':
+        return cls(*values)
+
+
+class SuggestionFeedbackStore:
+    """
+    Feedback-Modell für Smart Suggestions.
+
+    - Pro (Vorschlag, Kontext) ein FeedbackCounter; jedes Ereignis zählt
+      zusätzlich im kontextfreien Zähler, der greift, solange der Kontext
+      noch zu wenig Daten hat
+    - score(): 'mean' (Erwartungswert der Beta-Verteilung), 'ucb'
+      (Erwartungswert + Explorationsbonus für selten gezeigte Vorschläge)
+      oder 'thompson' (Stichprobe aus der Beta-Verteilung)
+    - Gespeichert wird gebündelt über den PersistenceService; beim Schreiben
+      fallen fast vergessene Zähler weg, sodass Datei und Speicher nicht mit
+      der Nutzungsdauer wachsen
+    """
+
+    def __init__(self, path: Union[str, Path] = Path('toobix_suggestion_feedback.json'),
+                 half_life_s: float = DEFAULT_HALF_LIFE_S):
+        self.path = Path(path)
+        self.half_life_s = half_life_s
+        self._counters: Dict[Tuple[str, str], FeedbackCounter] = {}
+        self._total = FeedbackCounter()
+        self._lock = threading.Lock()
+        self._load()
+        self.persistence = get_persistence_service()
+        self._store_key = self.persistence.register(self.path, self._serialize, lock=self._lock)
+
+    # === LERNEN ===
+
+    def record(self, suggestion_id: str, context: str, event: str, ts: Optional[float] = None):
+        """Verbucht ein Ereignis ('shown', 'clicked', 'ignored', 'dismissed')"""
+        if event not in EVENT_WEIGHTS:
+            logger.warning(f"Unbekanntes Suggestion-Feedback: {event}")
+            return
+        self.record_many([suggestion_id], context, event, ts)
+
+    def record_many(self, suggestion_ids: List[str], context: str, event: str, ts: Optional[float] = None):
+        """Verbucht dasselbe Ereignis für mehrere Vorschläge (z.B. alle angezeigten)"""
+        success, failure = EVENT_WEIGHTS[event]
+        ts = ts or time.time()
+        with self._lock:
+            for suggestion_id in suggestion_ids:
+                for key in ((suggestion_id, context), (suggestion_id, GLOBAL_CONTEXT)):
+                    counter = self._counters.get(key)
+                    if counter is None:
+                        counter = self._counters[key] = FeedbackCounter()
+                    counter.add(success, failure, ts, self.half_life_s)
+                self._total.add(success, failure, ts, self.half_life_s)
+        self.persistence.mark_dirty(self._store_key)
+
+    # === BEWERTUNG ===
+
+    def score(self, suggestion_id: str, context: str, mode: str = 'mean', now: Optional[float] = None) -> float:
+        """Bewertung 0.0-1.0 (UCB kann darüber liegen); ohne Daten 0.5"""
+        now = now or time.time()
+        with self._lock:
+            success, failure = self._counts(suggestion_id, context, now)
+            total = self._total.weight_at(now, self.half_life_s)
+        alpha, beta = 1.0 + success, 1.0 + failure
+        if mode == 'thompson':
+            return random.betavariate(alpha, beta)
+        mean = alpha / (alpha + beta)
+        if mode == 'ucb':
+            return mean + UCB_EXPLORATION * math.sqrt(math.log(total + 1.0) / (success + failure + 1.0))
+        return mean
+
+    def _counts(self, suggestion_id: str, context: str, now: float) -> Tuple[float, float]:
+        counter = self._counters.get((suggestion_id, context))
+        if counter is not None:
+            counts = counter.at(now, self.half_life_s)
+            if sum(counts) >= MIN_CONTEXT_WEIGHT:
+                return counts
+        counter = self._counters.get((suggestion_id, GLOBAL_CONTEXT))
+        return counter.at(now, self.half_life_s) if counter is not None else (0.0, 0.0)
+
+    def preferences(self, now: Optional[float] = None) -> Dict[str, float]:
+        """Kontextfreie Erwartungswerte aller bekannten Vorschläge"""
+        now = now or time.time()
+        with self._lock:
+            result = {}
+            for (suggestion_id, context), counter in self._counters.items():
+                if context == GLOBAL_CONTEXT:
+                    success, failure = counter.at(now, self.half_life_s)
+                    result[suggestion_id] = round((1.0 + success) / (2.0 + success + failure), 3)
+        return result
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._counters),
+                'weight': round(self._total.weight_at(time.time(), self.half_life_s), 2),
+                'half_life_days': round(self.half_life_s / 86400, 1)
+            }
+
+    # === PERSISTENZ ===
+
+    def _serialize(self) -> Dict:
+        """Läuft unter self._lock auf dem Persistenz-Thread; entfernt vergessene Zähler"""
+        now = time.time()
+        weights = {key: counter.weight_at(now, self.half_life_s) for key, counter in self._counters.items()}
+        for key, weight in weights.items():
+            if weight < PRUNE_WEIGHT:
+                del self._counters[key]
+        if len(self._counters) > MAX_ENTRIES:
+            for key in sorted(self._counters, key=weights.get)[:len(self._counters) - MAX_ENTRIES]:
+                del self._counters[key]
+        return {
+            'version': 1,
+            'total': self._total.to_list(),
+            'counters': {f"{suggestion_id}|{context}": counter.to_list()
+                         for (suggestion_id, context), counter in self._counters.items()}
+        }
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._total = FeedbackCounter.from_list(data.get('total', [0.0, 0.0, 0.0]))
+            for key, values in data.get('counters', {}).items():
+                suggestion_id, _, context = key.rpartition('|')
+                self._counters[(suggestion_id, context)] = FeedbackCounter.from_list(values)
+        except Exception as e:
+            logger.error(f"❌ Suggestion-Feedback konnte nicht geladen werden: {e}")
+
+
+# Globale Instanz
+_suggestion_feedback: Optional[SuggestionFeedbackStore] = None
+_suggestion_feedback_lock = threading.Lock()
+
+
+def get_suggestion_feedback() -> SuggestionFeedbackStore:
+    """Gibt das gemeinsame Feedback-Modell zurück"""
+    global _suggestion_feedback
+    with _suggestion_feedback_lock:
+        if _suggestion_feedback is None:
+            _suggestion_feedback = SuggestionFeedbackStore()
+        return _suggestion_feedback
@@ -9,6 +9,8 @@ from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, asdict
 import logging
 
+from .global_search import SearchDocument, get_global_search
+
 # Konfiguriere Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -58,6 +60,7 @@ class SystemDocumentationEngine:
         self._initialize_system_components()
         self._initialize_function_documentation()
         self._initialize_tutorials()
+        get_global_search().register_source('documentation', self._search_documents, label='📖 Dokumentation')
         
         logger.info("📚 System Documentation Engine initialisiert")
     
@@ -627,17 +630,23 @@ class SystemDocumentationEngine:
             'tutorial_count': len(self.tutorials)
         }
     
-    def search_functions(self, query: str) -> Dict[str, Any]:
-        """Sucht Funktionen basierend auf Query"""
-        query_lower = query.lower()
-        matching_functions = {}
-        
+    def _search_documents(self):
+        """Funktions-Dokumentation als Dokumente für die globale Suche"""
         for name, func in self.function_docs.items():
-            if (query_lower in name.lower() or 
-                query_lower in func.description.lower() or
-                query_lower in func.category.lower() or
-                any(query_lower in example.lower() for example in func.examples)):
-                matching_functions[name] = func
+            yield SearchDocument(
+                source='documentation',
+                doc_id=name,
+                title=name,
+                description=func.description,
+                keywords=[func.category],
+                content=f"{func.usage} {' '.join(func.examples)}",
+                payload=func
+            )
+    
+    def search_functions(self, query: str) -> Dict[str, Any]:
+        """Sucht Funktionen basierend auf Query (globaler Suchindex, nach Relevanz sortiert)"""
+        hits = get_global_search().search(query, sources=['documentation'], limit=len(self.function_docs))
+        matching_functions = {hit.doc_id: hit.payload for hit in hits}
         
         return {
             'query': query,
@@ -9,6 +9,7 @@ import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 from pathlib import Path
+from .process_table import get_process_table
 
 class SystemMonitor:
     """Erweiterte System-Überwachung und Performance-Monitoring"""
@@ -147,19 +148,17 @@ class SystemMonitor:
     def _get_top_processes(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Top-Prozesse nach CPU/Memory-Verbrauch"""
         try:
-            processes = []
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent', 'memory_info']):
-                try:
-                    proc_info = proc.info
-                    proc_info['memory_mb'] = round(proc_info['memory_info'].rss / (1024**2), 1) if proc_info['memory_info'] else 0
-                    processes.append(proc_info)
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-            
-            # Sortiere nach CPU-Verbrauch
-            processes.sort(key=lambda x: x['cpu_percent'] or 0, reverse=True)
-            
-            return processes[:limit]
+            # Sortiert nach CPU-Verbrauch
+            return [
+                {
+                    'pid': proc_info.pid,
+                    'name': proc_info.name,
+                    'cpu_percent': proc_info.cpu_percent,
+                    'memory_percent': proc_info.memory_percent,
+                    'memory_mb': round(proc_info.memory_mb, 1)
+                }
+                for proc_info in get_process_table().top_by_cpu(limit)
+            ]
             
         except Exception as e:
             return [{'error': f'Prozess-Liste nicht verfügbar: {e}'}]
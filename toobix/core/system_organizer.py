@@ -8,6 +8,9 @@ import datetime
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 import json
+from toobix.core.duplicate_finder import get_duplicate_finder
+from toobix.core.cleanup_executor import get_cleanup_executor, CleanupOperation, OP_MOVE, OP_DELETE
+from toobix.core.backup_engine import BackupEngine
 
 class SystemOrganizer:
     """Sichere System-Organisation und Aufräumung"""
@@ -50,6 +53,15 @@ class SystemOrganizer:
             'Tabellen': ['.xlsx', '.xls', '.csv', '.ods']
         }
         
+        # Verzeichnisse für die inhaltsbasierte Duplikatsuche
+        self.duplicate_scan_dirs = [
+            os.path.expanduser("~/Downloads"),
+            os.path.expanduser("~/Desktop"),
+            os.path.expanduser("~/Documents")
+        ]
+        self.duplicate_finder = get_duplicate_finder()
+        self.cleanup_executor = get_cleanup_executor()
+        
         print("🧹 System Organizer initialisiert")
     
     def analyze_system_mess(self) -> Dict[str, any]:
@@ -88,6 +100,9 @@ class SystemOrganizer:
         # Große Dateien finden
         analysis['large_files'] = self._find_large_files()
         
+        # Inhaltsgleiche Dateien finden
+        analysis['duplicate_candidates'] = self._find_duplicate_files()
+        
         # Festplatten-Nutzung
         analysis['disk_usage'] = self._get_disk_usage()
         
@@ -173,6 +188,16 @@ class SystemOrganizer:
         
         return sorted(large_files, key=lambda x: x['size_mb'], reverse=True)[:20]
     
+    def _find_duplicate_files(self) -> List[Dict]:
+        """Findet inhaltsgleiche Dateien (Hash-basiert, gecacht)"""
+        try:
+            existing_dirs = [d for d in self.duplicate_scan_dirs if os.path.exists(d)]
+            groups = self.duplicate_finder.find_duplicates(existing_dirs)
+            return self.duplicate_finder.to_cleanup_entries(groups, preferred_dirs=self.protected_dirs)[:100]
+        except Exception as e:
+            print(f"⚠️ Fehler bei der Duplikatsuche: {e}")
+            return []
+    
     def _get_disk_usage(self) -> Dict:
         """Ermittelt Festplatten-Nutzung"""
         import psutil
@@ -216,6 +241,15 @@ class SystemOrganizer:
         
         return True
     
+    def _is_protected(self, path: str) -> bool:
+        """Prüft ob ein Pfad in einem geschützten Verzeichnis liegt"""
+        normalized = os.path.normcase(os.path.abspath(path))
+        for protected_dir in self.protected_dirs:
+            protected = os.path.join(os.path.normcase(os.path.abspath(protected_dir)), '')
+            if normalized.startswith(protected):
+                return True
+        return False
+    
     def _generate_recommendations(self, analysis: Dict) -> List[str]:
         """Generiert Aufräum-Empfehlungen"""
         recommendations = []
@@ -231,6 +265,10 @@ class SystemOrganizer:
         if analysis['messy_directories']:
             recommendations.append("🖥️ Desktop aufräumen - viele Dateien gefunden")
         
+        if analysis['duplicate_candidates']:
+            wasted_mb = sum(g['wasted_mb'] for g in analysis['duplicate_candidates'])
+            recommendations.append(f"🔁 {len(analysis['duplicate_candidates'])} Duplikat-Gruppen gefunden - {wasted_mb:.1f} MB doppelt belegt")
+        
         if analysis['large_files']:
             large_size = sum(f['size_gb'] for f in analysis['large_files'])
             recommendations.append(f"📊 {large_size:.1f} GB in großen Dateien - überprüfen empfohlen")
@@ -276,6 +314,30 @@ class SystemOrganizer:
                     'reversible': True
                 })
         
+        # Duplikate entfernen (Original bleibt erhalten) - nach dem Commit
+        # nicht mehr rückgängig zu machen, daher nur nach ausdrücklicher Prüfung
+        duplicate_files = []
+        for group in analysis.get('duplicate_candidates', []):
+            for duplicate in group['duplicates']:
+                if self._is_safe_to_move(Path(duplicate)) and not self._is_protected(duplicate):
+                    duplicate_files.append({
+                        'path': duplicate,
+                        'size_mb': group['size_mb'],
+                        'digest': group['digest'],
+                        'duplicate_of': group['keep']
+                    })
+        if duplicate_files:
+            duplicate_size_gb = sum(f['size_mb'] for f in duplicate_files) / 1024
+            plan['actions'].append({
+                'type': 'delete_duplicates',
+                'description': 'Doppelte Dateien löschen (älteste Kopie bleibt)',
+                'files': duplicate_files,
+                'space_saved_gb': round(duplicate_size_gb, 2),
+                'safety': 'review_needed',
+                'reversible': False
+            })
+            plan['estimated_space_gb'] += duplicate_size_gb
+        
         # Desktop organisieren
         if analysis['messy_directories']:
             plan['actions'].append({
@@ -287,11 +349,15 @@ class SystemOrganizer:
         
         return plan
     
-    def execute_safe_cleanup(self, plan: Dict, dry_run: bool = True) -> Dict:
-        """Führt sicheren Aufräumplan aus"""
+    def execute_safe_cleanup(self, plan: Dict, dry_run: bool = True, include_review: bool = False) -> Dict:
+        """
+        Führt sicheren Aufräumplan aus. Aktionen mit safety 'review_needed'
+        (z.B. Duplikate löschen) laufen nur mit include_review=True.
+        """
         results = {
             'completed_actions': [],
             'failed_actions': [],
+            'skipped_actions': [],
             'space_freed_gb': 0,
             'dry_run': dry_run
         }
@@ -300,6 +366,12 @@ class SystemOrganizer:
             print("🧪 Trockenlauf - keine Dateien werden tatsächlich verändert")
         
         for action in plan['actions']:
+            if action.get('safety') == 'review_needed' and not include_review:
+                results['skipped_actions'].append({
+                    'action': action['type'],
+                    'reason': 'Nicht rückgängig machbar - ausdrückliche Bestätigung nötig'
+                })
+                continue
             try:
                 if action['type'] == 'delete_temp_files':
                     result = self._execute_temp_cleanup(action, dry_run)
@@ -307,6 +379,8 @@ class SystemOrganizer:
                     result = self._execute_downloads_organization(action, dry_run)
                 elif action['type'] == 'organize_desktop':
                     result = self._execute_desktop_organization(action, dry_run)
+                elif action['type'] == 'delete_duplicates':
+                    result = self._execute_duplicate_cleanup(action, dry_run)
                 else:
                     continue
                 
@@ -327,61 +401,75 @@ class SystemOrganizer:
     
     def _execute_temp_cleanup(self, action: Dict, dry_run: bool) -> Dict:
         """Führt Temp-Dateien Aufräumung aus"""
-        deleted_count = 0
-        space_freed = 0
-        
-        for temp_file in action['files']:
-            try:
-                if not dry_run:
-                    file_path = Path(temp_file['path'])
-                    if file_path.exists():
-                        file_path.unlink()
-                
-                deleted_count += 1
-                space_freed += temp_file['size_mb']
-                
-            except Exception as e:
-                print(f"⚠️ Fehler beim Löschen {temp_file['path']}: {e}")
+        operations = [
+            CleanupOperation(op_type=OP_DELETE, source=temp_file['path'])
+            for temp_file in action['files']
+        ]
+        report = self.cleanup_executor.run('delete_temp_files', operations, dry_run=dry_run)
+        self._print_cleanup_errors(report)
         
         return {
             'success': True,
             'action': 'delete_temp_files',
-            'deleted_files': deleted_count,
-            'space_freed': space_freed / 1024  # GB
+            'deleted_files': report['completed'],
+            'space_freed': report['bytes_reclaimed'] / (1024**3),  # GB
+            'transaction_id': report.get('transaction_id'),
+            'throughput': self._throughput(report)
+        }
+    
+    def _execute_duplicate_cleanup(self, action: Dict, dry_run: bool) -> Dict:
+        """Löscht Duplikate, nachdem Original und Kopie erneut geprüft wurden"""
+        operations = []
+        for duplicate in action['files']:
+            # Original muss noch existieren und beide müssen unverändert sein
+            if not self.duplicate_finder.verify_unchanged(duplicate['duplicate_of'], duplicate['digest']):
+                continue
+            if not self.duplicate_finder.verify_unchanged(duplicate['path'], duplicate['digest']):
+                continue
+            operations.append(CleanupOperation(
+                op_type=OP_DELETE,
+                source=duplicate['path'],
+                meta={'duplicate_of': duplicate['duplicate_of']}
+            ))
+        
+        report = self.cleanup_executor.run('delete_duplicates', operations, dry_run=dry_run)
+        self._print_cleanup_errors(report)
+        
+        return {
+            'success': True,
+            'action': 'delete_duplicates',
+            'deleted_files': report['completed'],
+            'space_freed': report['bytes_reclaimed'] / (1024**3),  # GB
+            'transaction_id': report.get('transaction_id'),
+            'throughput': self._throughput(report)
         }
     
     def _execute_downloads_organization(self, action: Dict, dry_run: bool) -> Dict:
         """Organisiert Downloads-Ordner"""
         archive_dir = os.path.expanduser("~/Downloads/Archiv")
-        moved_count = 0
-        
-        if not dry_run:
-            os.makedirs(archive_dir, exist_ok=True)
-        
-        for download_file in action['files']:
-            try:
-                if not dry_run:
-                    source = Path(download_file['path'])
-                    if source.exists():
-                        destination = Path(archive_dir) / source.name
-                        shutil.move(str(source), str(destination))
-                
-                moved_count += 1
-                
-            except Exception as e:
-                print(f"⚠️ Fehler beim Verschieben {download_file['path']}: {e}")
+        operations = [
+            CleanupOperation(
+                op_type=OP_MOVE,
+                source=download_file['path'],
+                target=os.path.join(archive_dir, Path(download_file['path']).name)
+            )
+            for download_file in action['files']
+        ]
+        report = self.cleanup_executor.run('organize_downloads', operations, dry_run=dry_run)
+        self._print_cleanup_errors(report)
         
         return {
             'success': True,
             'action': 'organize_downloads',
-            'moved_files': moved_count,
-            'archive_location': archive_dir
+            'moved_files': report['completed'],
+            'archive_location': archive_dir,
+            'transaction_id': report.get('transaction_id'),
+            'throughput': self._throughput(report)
         }
     
     def _execute_desktop_organization(self, action: Dict, dry_run: bool) -> Dict:
         """Organisiert Desktop nach Dateitypen"""
         desktop_dir = Path(os.path.expanduser("~/Desktop"))
-        organized_count = 0
         
         if not desktop_dir.exists():
             return {'success': False, 'error': 'Desktop-Ordner nicht gefunden'}
@@ -393,41 +481,60 @@ class SystemOrganizer:
                 category_dir.mkdir(exist_ok=True)
         
         # Sortiere Dateien
+        operations = []
         for file_path in desktop_dir.iterdir():
             if file_path.is_file():
                 file_ext = file_path.suffix.lower()
                 
                 # Finde passende Kategorie
-                target_category = None
                 for category, extensions in self.file_categories.items():
                     if file_ext in extensions:
-                        target_category = category
+                        operations.append(CleanupOperation(
+                            op_type=OP_MOVE,
+                            source=str(file_path),
+                            target=str(desktop_dir / category / file_path.name),
+                            meta={'category': category}
+                        ))
                         break
-                
-                if target_category:
-                    try:
-                        if not dry_run:
-                            destination = desktop_dir / target_category / file_path.name
-                            shutil.move(str(file_path), str(destination))
-                        
-                        organized_count += 1
-                        
-                    except Exception as e:
-                        print(f"⚠️ Fehler beim Organisieren {file_path}: {e}")
+        
+        report = self.cleanup_executor.run('organize_desktop', operations, dry_run=dry_run)
+        self._print_cleanup_errors(report)
         
         return {
             'success': True,
             'action': 'organize_desktop',
-            'organized_files': organized_count
+            'organized_files': report['completed'],
+            'transaction_id': report.get('transaction_id'),
+            'throughput': self._throughput(report)
+        }
+    
+    def _print_cleanup_errors(self, report: Dict):
+        """Gibt Fehler eines Cleanup-Laufs aus"""
+        for error in report['errors'][:10]:
+            print(f"⚠️ {error}")
+        if len(report['errors']) > 10:
+            print(f"⚠️ ... und {len(report['errors']) - 10} weitere Fehler")
+    
+    def _throughput(self, report: Dict) -> Dict:
+        """Extrahiert Durchsatz-Statistiken aus einem Cleanup-Bericht"""
+        return {
+            'duration_s': report['duration_s'],
+            'ops_per_s': report['ops_per_s'],
+            'mb_per_s': report['mb_per_s'],
+            'failed': report['failed']
         }
     
+    def resume_interrupted_cleanup(self) -> List[Dict]:
+        """Setzt nach einem Absturz unterbrochene Aufräum-Transaktionen fort"""
+        return self.cleanup_executor.resume_all()
+    
+    def rollback_cleanup(self, transaction_id: str) -> Dict:
+        """Macht eine unterbrochene Aufräum-Transaktion rückgängig"""
+        return self.cleanup_executor.rollback(transaction_id)
+    
     def create_backup_important_files(self, backup_location: Optional[str] = None) -> Dict:
-        """Erstellt Backup wichtiger Dateien vor Aufräumung"""
-        if not backup_location:
-            backup_location = os.path.expanduser("~/Toobix_Backup")
-        
-        backup_dir = Path(backup_location)
-        backup_dir.mkdir(exist_ok=True)
+        """Erstellt inkrementelles, dedupliziertes Backup wichtiger Dateien vor Aufräumung"""
+        engine = self._get_backup_engine(backup_location)
         
         important_dirs = [
             os.path.expanduser("~/Documents"),
@@ -435,34 +542,52 @@ class SystemOrganizer:
             os.path.expanduser("~/Pictures")
         ]
         
+        print("💾 Erstelle Sicherheitskopie wichtiger Dateien...")
+        
+        result = engine.backup([d for d in important_dirs if os.path.exists(d)])
+        for error in result['errors'][:10]:
+            print(f"⚠️ Fehler beim Backup: {error}")
+        
         backup_info = {
-            'backup_location': str(backup_dir),
+            'backup_location': str(engine.repository),
+            'snapshot_id': result['snapshot_id'],
             'backed_up_dirs': [],
-            'total_size_gb': 0
+            'total_size_gb': result['bytes_total'] / (1024**3),
+            'new_data_gb': result['bytes_written'] / (1024**3),
+            'unchanged_files': result['unchanged_files'],
+            'new_chunks': result['chunks_new'],
+            'duration_s': result['duration_s'],
+            'errors': len(result['errors'])
         }
         
-        print("💾 Erstelle Sicherheitskopie wichtiger Dateien...")
-        
-        for source_dir in important_dirs:
-            if os.path.exists(source_dir):
-                dir_name = os.path.basename(source_dir)
-                backup_target = backup_dir / f"{dir_name}_{datetime.datetime.now().strftime('%Y%m%d')}"
-                
-                try:
-                    shutil.copytree(source_dir, backup_target, dirs_exist_ok=True)
-                    
-                    # Größe berechnen
-                    size = sum(f.stat().st_size for f in backup_target.rglob('*') if f.is_file())
-                    size_gb = size / (1024**3)
-                    
-                    backup_info['backed_up_dirs'].append({
-                        'source': source_dir,
-                        'backup': str(backup_target),
-                        'size_gb': round(size_gb, 2)
-                    })
-                    backup_info['total_size_gb'] += size_gb
-                    
-                except Exception as e:
-                    print(f"⚠️ Fehler beim Backup von {source_dir}: {e}")
+        for source in result['sources']:
+            backup_info['backed_up_dirs'].append({
+                'source': source['path'],
+                'backup': f"{engine.repository} @ {result['snapshot_id']}",
+                'files': source['files'],
+                'size_gb': round(source['bytes'] / (1024**3), 2)
+            })
         
         return backup_info
+    
+    def restore_backup(self, target_dir: Optional[str] = None, snapshot_id: Optional[str] = None,
+                       backup_location: Optional[str] = None) -> Dict:
+        """Stellt einen Backup-Snapshot wieder her (Standard: neuester)"""
+        engine = self._get_backup_engine(backup_location)
+        if not target_dir:
+            target_dir = os.path.expanduser(f"~/Toobix_Restore/{snapshot_id or 'latest'}")
+        return engine.restore(target_dir, snapshot_id)
+    
+    def verify_backup(self, snapshot_id: Optional[str] = None, backup_location: Optional[str] = None) -> Dict:
+        """Prüft einen Backup-Snapshot auf fehlende oder beschädigte Chunks"""
+        return self._get_backup_engine(backup_location).verify(snapshot_id)
+    
+    def list_backups(self, backup_location: Optional[str] = None) -> List[Dict]:
+        """Listet alle Backup-Snapshots"""
+        return self._get_backup_engine(backup_location).list_snapshots()
+    
+    def _get_backup_engine(self, backup_location: Optional[str] = None) -> BackupEngine:
+        """Backup-Engine für das Repository am Backup-Ort"""
+        if not backup_location:
+            backup_location = os.path.expanduser("~/Toobix_Backup")
+        return BackupEngine(os.path.join(backup_location, 'repository'))
@@ -5,12 +5,15 @@ Intelligente Automatisierung und geplante Aufgaben
 import json
 import threading
 import time
-import schedule
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Callable
 from pathlib import Path
 import os
 
+from .startup_profiler import lazy_import
+
+schedule = lazy_import('schedule')
+
 class TaskScheduler:
     """Intelligenter Task-Scheduler mit Automation-Engine"""
     
@@ -0,0 +1,148 @@
+"""
+Toobix Thought Log
+Append-only Ablage des KI-Gedankenstroms mit Zeitraum-Abfragen
+"""
+import os
+import json
+import datetime
+import threading
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from .persistence import repair_torn_tail
+
+logger = logging.getLogger(__name__)
+
+
+class ThoughtLog:
+    """
+    Append-only Gedanken-Log in Tages-Segmenten (thoughts/YYYY-MM-DD.jsonl).
+
+    Jeder Gedanke ist genau eine angehängte Zeile. Anders als beim Soul
+    Journal wird nichts vollständig in den Speicher geladen: Der Strom
+    erzeugt alle paar Sekunden einen Eintrag, deshalb lesen tail() und
+    between() nur die Segmente, die sie wirklich brauchen - die Startzeit
+    hängt nicht von der Länge der Historie ab. tail() liest das neueste
+    Segment rückwärts vom Dateiende, sodass ein langer Tag den Start nicht
+    verlangsamt.
+    """
+
+    READ_BLOCK = 64 * 1024
+
+    def __init__(self, data_dir: Path, entry_factory: Callable[[Dict], object]):
+        self.segment_dir = Path(data_dir) / 'thoughts'
+        self.segment_dir.mkdir(parents=True, exist_ok=True)
+        self._entry_factory = entry_factory
+        self._lock = threading.Lock()
+        self._repaired_segments: Set[Path] = set()
+        self.appended = 0
+
+    def append(self, data: Dict):
+        """Hängt einen serialisierten Gedanken (mit ISO-Zeitstempel) an sein Tages-Segment an"""
+        line = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        day = data['timestamp'][:10]
+        segment = self.segment_dir / f"{day}.jsonl"
+        with self._lock:
+            try:
+                if segment not in self._repaired_segments:
+                    # Bruchstück eines Absturzes abschneiden, bevor angehängt wird
+                    repair_torn_tail(segment)
+                    self._repaired_segments.add(segment)
+                with open(segment, 'a', encoding='utf-8') as f:
+                    f.write(line + '\n')
+                self.appended += 1
+            except OSError as e:
+                logger.error(f"Gedanke konnte nicht gespeichert werden: {e}")
+
+    def tail(self, limit: int) -> List:
+        """Die letzten limit Gedanken in zeitlicher Reihenfolge (liest Segmente rückwärts)"""
+        collected: List = []
+        if limit <= 0:
+            return collected
+        for segment in reversed(self._segments()):
+            for entry in self._read_segment_reversed(segment):
+                collected.append(entry)
+                if len(collected) >= limit:
+                    collected.reverse()
+                    return collected
+        collected.reverse()
+        return collected
+
+    def between(self, start: datetime.datetime, end: datetime.datetime,
+                thought_type: Optional[str] = None) -> List:
+        """Gedanken im Zeitraum [start, end), optional eines Typs"""
+        results = []
+        for segment in self._segments(start.date(), end.date()):
+            for entry in self._read_segment(segment):
+                if start <= entry.timestamp < end and (thought_type is None or entry.thought_type == thought_type):
+                    results.append(entry)
+        results.sort(key=lambda entry: entry.timestamp)
+        return results
+
+    def get_stats(self) -> Dict:
+        segments = self._segments()
+        return {
+            'segments': len(segments),
+            'bytes': sum(segment.stat().st_size for segment in segments),
+            'appended': self.appended,
+            'first_day': segments[0].stem if segments else None
+        }
+
+    # === INTERN ===
+
+    def _segments(self, first: Optional[datetime.date] = None, last: Optional[datetime.date] = None) -> List[Path]:
+        """Segmente sortiert nach Tag, optional auf [first, last] begrenzt"""
+        segments = sorted(self.segment_dir.glob('*.jsonl'))
+        if first is not None:
+            segments = [s for s in segments if s.stem >= first.isoformat()]
+        if last is not None:
+            segments = [s for s in segments if s.stem <= last.isoformat()]
+        return segments
+
+    def _read_segment(self, segment: Path) -> Iterable:
+        try:
+            with open(segment, 'r', encoding='utf-8') as f:
+                for line_number, line in enumerate(f, 1):
+                    entry = self._parse_line(segment, line, line_number)
+                    if entry is not None:
+                        yield entry
+        except OSError as e:
+            logger.error(f"Segment {segment.name} nicht lesbar: {e}")
+
+    def _read_segment_reversed(self, segment: Path) -> Iterator:
+        """Einträge eines Segments vom Dateiende her, blockweise gelesen"""
+        try:
+            with open(segment, 'rb') as f:
+                position = f.seek(0, os.SEEK_END)
+                remainder = b''
+                while position > 0:
+                    step = min(self.READ_BLOCK, position)
+                    position -= step
+                    f.seek(position)
+                    lines = (f.read(step) + remainder).split(b'\n')
+                    # Die erste Zeile des Blocks kann unvollständig sein
+                    remainder = lines.pop(0)
+                    for line in reversed(lines):
+                        entry = self._parse_line(segment, line)
+                        if entry is not None:
+                            yield entry
+                entry = self._parse_line(segment, remainder)
+                if entry is not None:
+                    yield entry
+        except OSError as e:
+            logger.error(f"Segment {segment.name} nicht lesbar: {e}")
+
+    def _parse_line(self, segment: Path, line, line_number: Optional[int] = None):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            return self._entry_factory(json.loads(line))
+        except (ValueError, KeyError, TypeError) as e:
+            # Abgeschnittene letzte Zeile nach Absturz o.ä.
+            where = f"{segment.name}:{line_number}" if line_number else segment.name
+            logger.warning(f"Ungültige Zeile {where} übersprungen: {e}")
+            return None
@@ -0,0 +1,236 @@
+"""
+Toobix UI Update Bus
+Publish/Subscribe zwischen Core-Engines und GUI-Panels mit Frame-Coalescing
+"""
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Topic, das der Bus selbst einmal pro Minute veröffentlicht (zeitabhängige Anzeigen)
+CLOCK_TOPIC = 'clock'
+
+
+@dataclass
+class Subscription:
+    """Ein Panel-Abonnement auf ein oder mehrere Topics"""
+    topics: Tuple[str, ...]
+    callback: Callable[[Any], None]
+    widget: Any = None
+    dirty: bool = False
+    payload: Any = None
+    delivered: int = 0
+
+
+class UIUpdateBus:
+    """
+    Engines rufen publish() auf (aus beliebigen Threads), Panels abonnieren
+    mit subscribe(). Der Bus merkt sich pro Abonnement nur den letzten
+    Payload und stellt einmal pro Frame (~16 ms) auf dem Tk-Hauptthread zu:
+
+    - Viele publish() innerhalb eines Frames -> genau ein Callback pro Panel
+    - Panels, deren Widget gerade nicht sichtbar ist (winfo_viewable, also
+      auch in einem verborgenen Tab), bleiben markiert und werden beim
+      <Map>-Event des Widgets oder eines seiner Container nachgeholt
+    - Zerstörte Widgets werden automatisch abgemeldet
+
+    Statt eigener Polling-Threads pro Panel gibt es nur noch einen
+    Minuten-Takt (CLOCK_TOPIC) für rein zeitabhängige Anzeigen.
+    """
+
+    FRAME_MS = 16
+    CLOCK_MS = 60000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions: List[Subscription] = []
+        self._root = None
+        self._dispatch_scheduled = False
+        self._clock_running = False
+        self.stats = {'published': 0, 'dispatches': 0, 'delivered': 0,
+                      'coalesced': 0, 'deferred_hidden': 0}
+
+    # === EINRICHTUNG ===
+
+    def attach(self, root):
+        """Bindet den Bus an ein Tk-Fenster (Zustellung auf dessen Hauptthread)"""
+        with self._lock:
+            if self._root is not None and self._widget_alive(self._root):
+                return
+            self._root = root
+            self._dispatch_scheduled = False
+            self._clock_running = False
+        self._start_clock()
+        self._schedule_dispatch()
+
+    def subscribe(self, topics, callback: Callable[[Any], None], widget=None) -> Subscription:
+        """
+        Abonniert ein Topic (oder ein Tupel von Topics). callback(payload)
+        erhält den zuletzt veröffentlichten Payload; mit widget wird nur
+        zugestellt, solange dieses Widget sichtbar ist.
+        """
+        if isinstance(topics, str):
+            topics = (topics,)
+        subscription = Subscription(tuple(topics), callback, widget)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        if widget is not None:
+            # Beim Tab-Wechsel wird nur der Container (Tab-Frame, Fenster)
+            # ge-/entmappt, nicht das Widget selbst: <Map> auf allen Ebenen binden
+            for target in self._map_targets(widget):
+                try:
+                    target.bind('<Map>', lambda event, s=subscription, t=target:
+                                self._on_map(s) if event.widget is t else None, add='+')
+                except Exception:
+                    pass
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    # === VERÖFFENTLICHEN ===
+
+    def publish(self, topic: str, payload: Any = None):
+        """Meldet eine Zustandsänderung; thread-sicher und O(Abonnenten)"""
+        with self._lock:
+            self.stats['published'] += 1
+            for subscription in self._subscriptions:
+                if topic in subscription.topics:
+                    if subscription.dirty:
+                        self.stats['coalesced'] += 1
+                    subscription.dirty = True
+                    subscription.payload = payload
+        self._schedule_dispatch()
+
+    def request_update(self, subscription: Subscription, payload: Any = None):
+        """Markiert ein einzelnes Abonnement (z.B. für die Erstanzeige)"""
+        with self._lock:
+            subscription.dirty = True
+            subscription.payload = payload
+        self._schedule_dispatch()
+
+    # === ZUSTELLUNG ===
+
+    def dispatch(self):
+        """Stellt alle markierten, sichtbaren Abonnements genau einmal zu"""
+        with self._lock:
+            self._dispatch_scheduled = False
+            due = []
+            for subscription in list(self._subscriptions):
+                if not subscription.dirty:
+                    continue
+                if subscription.widget is not None:
+                    if not self._widget_alive(subscription.widget):
+                        self._subscriptions.remove(subscription)
+                        continue
+                    if not self._widget_visible(subscription.widget):
+                        self.stats['deferred_hidden'] += 1
+                        continue
+                subscription.dirty = False
+                due.append((subscription, subscription.payload))
+            self.stats['dispatches'] += 1
+
+        for subscription, payload in due:
+            self._deliver(subscription, payload)
+
+    def _deliver(self, subscription: Subscription, payload: Any):
+        try:
+            subscription.callback(payload)
+            subscription.delivered += 1
+            self.stats['delivered'] += 1
+        except Exception as e:
+            logger.error(f"UI-Update für {subscription.topics} fehlgeschlagen: {e}")
+
+    def _on_map(self, subscription: Subscription):
+        """Panel wurde sichtbar: verpasste Updates nachholen"""
+        if not self._widget_visible(subscription.widget):
+            return
+        with self._lock:
+            if not subscription.dirty or subscription not in self._subscriptions:
+                return
+            subscription.dirty = False
+            payload = subscription.payload
+        self._deliver(subscription, payload)
+
+    def _schedule_dispatch(self):
+        with self._lock:
+            root = self._root
+            if root is None or self._dispatch_scheduled:
+                return
+            self._dispatch_scheduled = True
+        try:
+            root.after(self.FRAME_MS, self.dispatch)
+        except Exception as e:
+            # Fenster geschlossen oder Tcl ohne Thread-Support; der
+            # Minuten-Takt stellt ausstehende Updates dann zu
+            logger.debug(f"UI-Dispatch konnte nicht geplant werden: {e}")
+            with self._lock:
+                self._dispatch_scheduled = False
+
+    def _start_clock(self):
+        with self._lock:
+            if self._clock_running or self._root is None:
+                return
+            self._clock_running = True
+            root = self._root
+
+        def tick():
+            if self._root is not root or not self._widget_alive(root):
+                self._clock_running = False
+                return
+            self.publish(CLOCK_TOPIC, time.time())
+            root.after(self.CLOCK_MS, tick)
+
+        root.after(self.CLOCK_MS, tick)
+
+    @staticmethod
+    def _widget_alive(widget) -> bool:
+        try:
+            return bool(widget.winfo_exists())
+        except Exception:
+            return False
+
+    @staticmethod
+    def _widget_visible(widget) -> bool:
+        """winfo_ismapped bleibt in einem verborgenen Tab 1, winfo_viewable nicht"""
+        try:
+            return bool(widget.winfo_viewable())
+        except Exception:
+            return True
+
+    @staticmethod
+    def _map_targets(widget) -> List[Any]:
+        """Das Widget und alle Container bis einschließlich seines Fensters"""
+        targets = []
+        try:
+            toplevel = widget.winfo_toplevel()
+        except Exception:
+            return [widget]
+        while widget is not None:
+            targets.append(widget)
+            if widget is toplevel:
+                break
+            widget = getattr(widget, 'master', None)
+        return targets
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self.stats, 'subscriptions': len(self._subscriptions)}
+
+
+_ui_bus: Optional[UIUpdateBus] = None
+_ui_bus_lock = threading.Lock()
+
+
+def get_ui_bus() -> UIUpdateBus:
+    """Globale UI-Bus Instanz"""
+    global _ui_bus
+    with _ui_bus_lock:
+        if _ui_bus is None:
+            _ui_bus = UIUpdateBus()
+        return _ui_bus
@@ -0,0 +1,445 @@
+"""
+Toobix Vector Index
+Lokaler Vektorindex (NumPy) mit memory-mapped Speicher und optionalem IVF-Modus
+"""
+import os
+import json
+import math
+import time
+import heapq
+import threading
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .startup_profiler import lazy_import
+
+# NumPy erst beim ersten Index laden - nicht schon beim Import des Chat-Pfads
+try:
+    np = lazy_import('numpy')
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SearchHit:
+    """Ein Treffer der Ähnlichkeitssuche"""
+    doc_id: str
+    kind: str
+    text: str
+    score: float
+    timestamp: float
+
+
+class VectorIndex:
+    """
+    Ähnlichkeitssuche über L2-normierte float32-Vektoren (Skalarprodukt = Kosinus).
+
+    - Vektoren liegen in vectors.f32 als np.memmap; die Kapazität wächst
+      per Verdopplung, das Betriebssystem lädt nur benötigte Seiten
+    - Metadaten stehen append-only in meta.jsonl: ein Update ist eine neue
+      Zeile für dieselbe ID (gleiche Zeile im Array), beim Laden gewinnt
+      die letzte
+    - 'flat': ein Matrix-Vektor-Produkt über alle Zeilen + argpartition
+    - 'ivf': sphärisches k-Means teilt den Raum in ~sqrt(n) Listen, gesucht
+      wird nur in den nprobe nächsten; 'auto' schaltet ab ivf_min Vektoren um
+    """
+
+    INITIAL_CAPACITY = 1024
+    MAX_TEXT_CHARS = 500
+
+    def __init__(self, path: Union[str, Path], dim: int, mode: str = 'auto',
+                 ivf_min: int = 20_000, nprobe: int = 8):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self.mode = mode
+        self.ivf_min = ivf_min
+        self.nprobe = nprobe
+        self._lock = threading.RLock()
+
+        self._rows = 0
+        self._capacity = 0
+        self._vectors: Optional['np.memmap'] = None
+        self._alive = np.zeros(0, dtype=bool)
+        self._kind_codes = np.zeros(0, dtype=np.int16)
+        self._timestamps = np.zeros(0, dtype=np.float64)
+        self._row_ids: List[Optional[str]] = []
+        self._texts: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self.kinds: List[str] = []
+        self._kind_lookup: Dict[str, int] = {}
+
+        # IVF
+        self._centroids: Optional['np.ndarray'] = None
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._trained_rows = 0
+
+        self.stats = {'searches': 0, 'ivf_searches': 0, 'upserts': 0, 'removed': 0,
+                      'last_search_ms': 0.0, 'trainings': 0}
+        self._open()
+
+    # === DATEIEN ===
+
+    @property
+    def _vector_file(self) -> Path:
+        return self.path / 'vectors.f32'
+
+    @property
+    def _meta_file(self) -> Path:
+        return self.path / 'meta.jsonl'
+
+    @property
+    def _ivf_file(self) -> Path:
+        return self.path / 'ivf.npz'
+
+    def _open(self):
+        records = self._read_meta()
+        rows = max((record['row'] for record in records.values()), default=-1) + 1
+        expected = rows * self.dim * 4
+        if self._vector_file.exists() and self._vector_file.stat().st_size < expected:
+            logger.warning(f"⚠️ Vektordatei {self._vector_file} unvollständig - Index wird neu aufgebaut")
+            records, rows = {}, 0
+            self._meta_file.unlink()
+            self._vector_file.unlink()
+
+        existing = self._vector_file.stat().st_size // (self.dim * 4) if self._vector_file.exists() else 0
+        self._ensure_capacity(max(rows, existing, 1))
+        self._rows = rows
+        self._row_ids = [None] * rows
+        self._texts = [''] * rows
+        for doc_id, record in records.items():
+            row = record['row']
+            self._ids[doc_id] = row
+            self._row_ids[row] = doc_id
+            if record.get('deleted'):
+                continue
+            self._texts[row] = record.get('text', '')
+            self._kind_codes[row] = self._kind_code(record.get('kind', ''))
+            self._timestamps[row] = record.get('ts', 0.0)
+            self._alive[row] = True
+        self._load_ivf()
+        if rows:
+            logger.info(f"🧭 Vektorindex {self.path.name}: {len(self)} Einträge geladen")
+
+    def _read_meta(self) -> Dict[str, Dict]:
+        records: Dict[str, Dict] = {}
+        if not self._meta_file.exists():
+            return records
+        with open(self._meta_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # abgebrochene letzte Zeile
+                records[record['id']] = record
+        return records
+
+    def _ensure_capacity(self, rows: int):
+        if rows <= self._capacity:
+            return
+        capacity = max(rows, self._capacity * 2, self.INITIAL_CAPACITY)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None  # Mapping schließen, bevor die Datei wächst
+        with open(self._vector_file, 'ab') as f:
+            if f.tell() < capacity * self.dim * 4:
+                f.truncate(capacity * self.dim * 4)
+        self._vectors = np.memmap(self._vector_file, dtype=np.float32, mode='r+',
+                                  shape=(capacity, self.dim))
+        self._alive = np.concatenate([self._alive, np.zeros(capacity - self._capacity, dtype=bool)])
+        self._kind_codes = np.concatenate([self._kind_codes, np.zeros(capacity - self._capacity, dtype=np.int16)])
+        self._timestamps = np.concatenate([self._timestamps, np.zeros(capacity - self._capacity)])
+        self._assign = np.concatenate([self._assign, np.full(capacity - self._capacity, -1, dtype=np.int32)])
+        self._capacity = capacity
+
+    def _kind_code(self, kind: str) -> int:
+        code = self._kind_lookup.get(kind)
+        if code is None:
+            code = len(self.kinds)
+            self.kinds.append(kind)
+            self._kind_lookup[kind] = code
+        return code
+
+    # === SCHREIBEN ===
+
+    def upsert(self, items: Iterable[Tuple[str, str, str, float]], vectors: 'np.ndarray'):
+        """
+        Fügt Einträge (doc_id, kind, text, timestamp) mit ihren Vektoren ein;
+        vorhandene IDs werden an ihrer Zeile überschrieben.
+        """
+        items = list(items)
+        if not items:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(items), self.dim)
+        lines = []
+        with self._lock:
+            new_rows = sum(1 for doc_id, *_ in items if doc_id not in self._ids)
+            self._ensure_capacity(self._rows + new_rows)
+            for (doc_id, kind, text, timestamp), vector in zip(items, vectors):
+                row = self._ids.get(doc_id)
+                if row is None:
+                    row = self._rows
+                    self._rows += 1
+                    self._ids[doc_id] = row
+                    self._row_ids.append(doc_id)
+                    self._texts.append('')
+                text = text[:self.MAX_TEXT_CHARS]
+                self._vectors[row] = vector
+                self._texts[row] = text
+                self._kind_codes[row] = self._kind_code(kind)
+                self._timestamps[row] = timestamp
+                self._alive[row] = True
+                if self._centroids is not None:
+                    self._assign[row] = int(np.argmax(self._centroids @ vector))
+                lines.append(json.dumps({'id': doc_id, 'row': row, 'kind': kind, 'ts': timestamp,
+                                         'text': text}, ensure_ascii=False))
+            # Erst die Vektoren, dann die Metadaten - eine Meta-Zeile zeigt nie auf leere Vektoren
+            self._vectors.flush()
+            with open(self._meta_file, 'a', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+            self.stats['upserts'] += len(items)
+
+    def remove(self, doc_id: str) -> bool:
+        with self._lock:
+            row = self._ids.get(doc_id)
+            if row is None or not self._alive[row]:
+                return False
+            self._alive[row] = False
+            with open(self._meta_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'id': doc_id, 'row': row, 'deleted': True}) + '\n')
+            self.stats['removed'] += 1
+            return True
+
+    def contains(self, doc_id: str) -> bool:
+        with self._lock:
+            row = self._ids.get(doc_id)
+            return row is not None and bool(self._alive[row])
+
+    def __len__(self) -> int:
+        return int(self._alive[:self._rows].sum())
+
+    # === SUCHE ===
+
+    def search(self, query: 'np.ndarray', k: int = 5, kinds: Optional[Iterable[str]] = None,
+               min_score: float = -1.0) -> List[SearchHit]:
+        """Die k ähnlichsten Einträge (optional nur bestimmter Arten)"""
+        start = time.perf_counter()
+        query = np.asarray(query, dtype=np.float32).reshape(self.dim)
+        with self._lock:
+            n = self._rows
+            if not n or k <= 0:
+                return []
+            mask = self._alive[:n]
+            if kinds is not None:
+                codes = [self._kind_lookup[kind] for kind in kinds if kind in self._kind_lookup]
+                mask = mask & np.isin(self._kind_codes[:n], codes)
+
+            rows = None
+            if self._use_ivf(n):
+                probes = self._nearest_lists(query)
+                candidates = np.flatnonzero(mask & np.isin(self._assign[:n], probes))
+                if len(candidates) >= k:
+                    rows = candidates
+                    scores = np.asarray(self._vectors[rows]) @ query
+                    self.stats['ivf_searches'] += 1
+            if rows is None:
+                scores = np.asarray(self._vectors[:n]) @ query
+                scores[~mask] = -np.inf
+
+            count = min(k, len(scores))
+            top = np.argpartition(-scores, count - 1)[:count]
+            top = top[np.argsort(-scores[top])]
+            hits = []
+            for index in top:
+                score = float(scores[index])
+                if score == -np.inf or score < min_score:
+                    break
+                row = int(rows[index]) if rows is not None else int(index)
+                hits.append(SearchHit(self._row_ids[row], self.kinds[self._kind_codes[row]],
+                                      self._texts[row], score, float(self._timestamps[row])))
+            self.stats['searches'] += 1
+            self.stats['last_search_ms'] = round((time.perf_counter() - start) * 1000, 3)
+            return hits
+
+    # === IVF ===
+
+    def _use_ivf(self, n: int) -> bool:
+        return self.mode != 'flat' and self._centroids is not None and (self.mode == 'ivf' or n >= self.ivf_min)
+
+    def _nearest_lists(self, query: 'np.ndarray') -> 'np.ndarray':
+        scores = self._centroids @ query
+        nprobe = min(self.nprobe, len(scores))
+        return np.argpartition(-scores, nprobe - 1)[:nprobe]
+
+    def needs_training(self) -> bool:
+        """IVF-Zentren fehlen oder der Index ist seit dem Training stark gewachsen"""
+        if self.mode == 'flat':
+            return False
+        n = len(self)
+        if n < (self.ivf_min if self.mode == 'auto' else 256):
+            return False
+        return self._centroids is None or n > 4 * self._trained_rows
+
+    def train_ivf(self, nlist: Optional[int] = None, sample_size: int = 20_000, iterations: int = 8):
+        """
+        Sphärisches k-Means auf einer Stichprobe, danach Zuordnung aller Zeilen.
+        Rechnet außerhalb des Locks; Suchen laufen währenddessen flach weiter.
+        """
+        with self._lock:
+            n = self._rows
+            alive = np.flatnonzero(self._alive[:n])
+            if not len(alive):
+                return
+            rng = np.random.default_rng(0)
+            sample_rows = np.sort(rng.choice(alive, min(sample_size, len(alive)), replace=False))
+            sample = np.array(self._vectors[sample_rows])
+        nlist = nlist or max(1, int(math.sqrt(len(alive))))
+        nlist = min(nlist, len(sample))
+
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            centroids = np.where(empty[:, None], centroids, sums / np.where(norms == 0, 1, norms))
+
+        assign = np.empty(n, dtype=np.int32)
+        for start in range(0, n, 16_384):
+            chunk = np.asarray(self._vectors[start:min(n, start + 16_384)])
+            assign[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+
+        with self._lock:
+            # Zeilen, die während des Trainings dazukamen oder ersetzt wurden
+            for start in range(n, self._rows, 16_384):
+                chunk = np.asarray(self._vectors[start:min(self._rows, start + 16_384)])
+                self._assign[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+            self._assign[:n] = assign
+            self._centroids = centroids.astype(np.float32)
+            self._trained_rows = len(alive)
+            self.stats['trainings'] += 1
+            self._save_ivf()
+        logger.info(f"🧭 IVF für {self.path.name}: {nlist} Listen über {len(alive)} Vektoren")
+
+    def _save_ivf(self):
+        tmp = self._ivf_file.with_suffix('.tmp.npz')
+        np.savez(tmp, centroids=self._centroids, assign=self._assign[:self._rows],
+                 trained_rows=self._trained_rows)
+        os.replace(tmp, self._ivf_file)
+
+    def _load_ivf(self):
+        if not self._ivf_file.exists():
+            return
+        try:
+            with np.load(self._ivf_file) as data:
+                centroids = data['centroids']
+                assign = data['assign']
+                trained_rows = int(data['trained_rows'])
+        except Exception as e:
+            logger.warning(f"⚠️ IVF-Daten nicht lesbar: {e}")
+            return
+        if centroids.shape[1] != self.dim:
+            return
+        self._centroids = centroids.astype(np.float32)
+        self._trained_rows = trained_rows
+        known = min(len(assign), self._rows)
+        self._assign[:known] = assign[:known]
+        # Nach dem letzten Speichern hinzugekommene Zeilen zuordnen
+        if known < self._rows:
+            chunk = np.asarray(self._vectors[known:self._rows])
+            self._assign[known:self._rows] = np.argmax(chunk @ self._centroids.T, axis=1)
+
+    # === PERSISTENZ ===
+
+    def save(self):
+        """Vektoren und IVF-Zuordnung auf die Platte bringen"""
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+            if self._centroids is not None:
+                self._save_ivf()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            n = self._rows
+            counts = np.bincount(self._kind_codes[:n][self._alive[:n]], minlength=len(self.kinds))
+            return {
+                **self.stats,
+                'entries': len(self),
+                'rows': n,
+                'dim': self.dim,
+                'mode': 'ivf' if self._use_ivf(n) else 'flat',
+                'ivf_lists': 0 if self._centroids is None else len(self._centroids),
+                'by_kind': {kind: int(counts[code]) for code, kind in enumerate(self.kinds)},
+                'size_mb': round(self._capacity * self.dim * 4 / 1e6, 1)
+            }
+
+
+class SparseVectorIndex:
+    """
+    Ersatz für VectorIndex ohne NumPy: Vektoren als {Dimension: Gewicht}
+    im Speicher, Suche linear per Skalarprodukt. Nicht persistent - die
+    Quellen des MemoryIndex füllen ihn beim Start über den Nachindex.
+    """
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self._entries: Dict[str, Tuple[str, str, float, Dict[int, float]]] = {}
+        self._lock = threading.Lock()
+        self.stats = {'searches': 0, 'upserts': 0, 'removed': 0, 'last_search_ms': 0.0}
+
+    def upsert(self, items: Iterable[Tuple[str, str, str, float]], vectors: List[Dict[int, float]]):
+        with self._lock:
+            for (doc_id, kind, text, timestamp), vector in zip(items, vectors):
+                self._entries[doc_id] = (kind, text[:VectorIndex.MAX_TEXT_CHARS], timestamp, vector)
+                self.stats['upserts'] += 1
+
+    def remove(self, doc_id: str) -> bool:
+        with self._lock:
+            removed = self._entries.pop(doc_id, None) is not None
+            self.stats['removed'] += int(removed)
+            return removed
+
+    def contains(self, doc_id: str) -> bool:
+        return doc_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def search(self, query: Dict[int, float], k: int = 5, kinds: Optional[Iterable[str]] = None,
+               min_score: float = -1.0) -> List[SearchHit]:
+        start = time.perf_counter()
+        kinds = set(kinds) if kinds is not None else None
+        with self._lock:
+            entries = list(self._entries.items())
+        scored = []
+        for doc_id, (kind, text, timestamp, vector) in entries:
+            if kinds is not None and kind not in kinds:
+                continue
+            score = sum(weight * vector.get(dim, 0.0) for dim, weight in query.items())
+            if score >= min_score:
+                scored.append((score, doc_id, kind, text, timestamp))
+        hits = [SearchHit(doc_id, kind, text, score, timestamp)
+                for score, doc_id, kind, text, timestamp in heapq.nlargest(k, scored)]
+        self.stats['searches'] += 1
+        self.stats['last_search_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        return hits
+
+    def needs_training(self) -> bool:
+        return False
+
+    def train_ivf(self, *args, **kwargs):
+        pass
+
+    def save(self):
+        pass
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, 'entries': len(self), 'dim': self.dim, 'mode': 'sparse'}
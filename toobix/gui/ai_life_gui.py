@@ -10,10 +10,10 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext
 import customtkinter as ctk
 from typing import Dict, Any, List, Optional
-import threading
 import datetime
 
 from ..core.ai_life_foundation import AILifeFoundation, get_ai_life, initialize_ai_life
+from ..core.ui_bus import get_ui_bus, CLOCK_TOPIC
 
 class AILifeGUI:
     """
@@ -30,8 +30,7 @@ class AILifeGUI:
         self.parent = parent
         self.window = None
         self.ai_life = None
-        self.update_thread = None
-        self.running = False
+        self.subscription = None
         
     def show(self, parent=None):
         """Zeigt das AI Life Dashboard"""
@@ -563,29 +562,22 @@ class AILifeGUI:
         self.personality_evolution.insert("1.0", personality_text)
     
     def start_updates(self):
-        """Startet regelmäßige Updates"""
-        self.running = True
+        """Abonniert AI-Life-Änderungen (plus Minuten-Takt für den Tageszyklus)"""
         self.update_all_displays()
         
-        def update_loop():
-            while self.running:
-                if self.window and self.window.winfo_exists():
-                    try:
-                        self.window.after(0, self.update_all_displays)
-                    except:
-                        break
-                
-                # Update alle 30 Sekunden
-                threading.Event().wait(30)
-        
-        self.update_thread = threading.Thread(target=update_loop, daemon=True)
-        self.update_thread.start()
+        bus = get_ui_bus()
+        bus.attach(self.parent or self.window)
+        self.subscription = bus.subscribe(
+            ('ai_life', CLOCK_TOPIC),
+            lambda payload: self.update_all_displays(),
+            widget=self.window
+        )
     
     def on_closing(self):
         """Cleanup beim Schließen"""
-        self.running = False
-        if self.update_thread and self.update_thread.is_alive():
-            self.update_thread.join(timeout=1)
+        if self.subscription:
+            get_ui_bus().unsubscribe(self.subscription)
+            self.subscription = None
         
         if self.window:
             self.window.destroy()
@@ -24,6 +24,7 @@ except ImportError:
     CTK_AVAILABLE = False
 
 from .artefakt_system import ArtefaktSystem, get_artefakt_system, initialize_artefakt_system
+from ..core.ui_bus import get_ui_bus
 
 class ArtefaktSystemGUI:
     """
@@ -42,6 +43,7 @@ class ArtefaktSystemGUI:
         self.ai_handler = ai_handler
         self.window = None
         self.artefakt_system = None
+        self.subscription = None
         
     def show(self, parent=None):
         """Zeigt das Artefakt System Interface"""
@@ -67,6 +69,11 @@ class ArtefaktSystemGUI:
         
         self.setup_gui()
         
+        # Nachgereichte KI-Titel kommen über den UI-Bus
+        bus = get_ui_bus()
+        bus.attach(self.parent or self.window)
+        self.subscription = bus.subscribe('artefakts', self.on_artefakt_updated, widget=self.window)
+        
         # Cleanup beim Schließen
         self.window.protocol("WM_DELETE_WINDOW", self.on_closing)
     
@@ -857,8 +864,18 @@ class ArtefaktSystemGUI:
         stats_text = f"📊 {stats['total_artefakts']} Artefakte | 📚 {stats['total_collections']} Collections | ⚡ Ø Spiritual: {stats['average_energies'].get('spiritual', 0):.2f}"
         self.stats_label.configure(text=stats_text)
     
+    def on_artefakt_updated(self, artefakt):
+        """Aktualisiert die Anzeige, wenn ein Artefakt nachträglich geändert wurde"""
+        if artefakt is not None and artefakt is self.current_artefakt:
+            self.display_artefakt(artefakt)
+        self.refresh_gallery_display()
+    
     def on_closing(self):
         """Cleanup beim Schließen"""
+        if self.subscription:
+            get_ui_bus().unsubscribe(self.subscription)
+            self.subscription = None
+        
         if self.window:
             self.window.destroy()
             self.window = None
@@ -0,0 +1,241 @@
+"""
+Toobix Chat View
+Gebündelte, speicherbegrenzte Chat-Anzeige mit Transkript auf der Platte
+"""
+import json
+import time
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ChatTranscript:
+    """
+    Append-only Transkript einer Chat-Sitzung (JSONL).
+
+    Pro Nachricht wird nur der Byte-Offset im Speicher gehalten; ältere
+    Nachrichten werden bei Bedarf gezielt von der Platte gelesen.
+    """
+
+    def __init__(self, data_dir: str = 'toobix_chat'):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(exist_ok=True)
+        self.path = self.data_dir / f"transcript_{datetime.now():%Y%m%d_%H%M%S}.jsonl"
+        self._offsets: List[int] = []
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def append_many(self, messages: List[Dict]) -> int:
+        """Schreibt mehrere Nachrichten in einem Zug; gibt den Index der ersten zurück"""
+        first_index = len(self._offsets)
+        lines = []
+        for message in messages:
+            line = (json.dumps(message, ensure_ascii=False) + '\n').encode('utf-8')
+            self._offsets.append(self._size)
+            self._size += len(line)
+            lines.append(line)
+        try:
+            with open(self.path, 'ab') as f:
+                f.write(b''.join(lines))
+        except OSError as e:
+            logger.error(f"Chat-Transkript konnte nicht geschrieben werden: {e}")
+        return first_index
+
+    def read(self, start: int, end: int) -> List[Dict]:
+        """Liest die Nachrichten [start, end) von der Platte"""
+        start = max(0, start)
+        end = min(end, len(self._offsets))
+        if start >= end:
+            return []
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self._offsets[start])
+                stop = self._offsets[end] if end < len(self._offsets) else self._size
+                chunk = f.read(stop - self._offsets[start])
+            return [json.loads(line) for line in chunk.decode('utf-8').splitlines() if line]
+        except (OSError, ValueError) as e:
+            logger.error(f"Chat-Transkript konnte nicht gelesen werden: {e}")
+            return []
+
+
+class BatchedChatView:
+    """
+    Chat-Anzeige für ein Text-Widget (tk.Text/ScrolledText oder CTkTextbox).
+
+    - add() reiht Nachrichten nur ein (auch aus Worker-Threads); pro Frame
+      (~16 ms) gibt es genau ein insert() und ein see("end") für alle
+      wartenden Nachrichten.
+    - Im Widget bleiben höchstens max_visible Nachrichten. Abgeschnitten
+      wird immer am Ende, das der Nutzer gerade nicht sieht: unten
+      angekommen oben, hochgescrollt unten. Alles steht im Transkript.
+    - Scrollt der Nutzer an den Anfang oder das Ende, werden ältere bzw.
+      neuere Nachrichten blockweise aus dem Transkript nachgeladen.
+    - Ist der Nutzer hochgescrollt, springt die Ansicht nicht ans Ende.
+    """
+
+    FRAME_MS = 16
+
+    def __init__(self, widget, formatter, max_visible: int = 300,
+                 transcript: Optional[ChatTranscript] = None):
+        self.widget = widget
+        self.formatter = formatter
+        self.max_visible = max_visible
+        self.transcript = transcript or ChatTranscript()
+        self._pending: List[Dict] = []
+        self._pending_lock = threading.Lock()
+        self._flush_scheduled = False
+        # (Transkript-Index, Zeilenanzahl) der sichtbaren Nachrichten, oben -> unten
+        self._visible: Deque[Tuple[int, int]] = deque()
+        self.stats = {'messages': 0, 'flushes': 0, 'last_flush_ms': 0.0, 'max_flush_ms': 0.0}
+
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            try:
+                self.widget.bind(sequence, self._on_scroll, add='+')
+            except Exception:
+                pass
+
+    # === ÖFFENTLICHE API ===
+
+    @staticmethod
+    def make_entry(sender: str, message: str) -> Dict:
+        return {'timestamp': time.strftime("%H:%M:%S"), 'sender': sender, 'message': message}
+
+    def add(self, sender: str, message: str) -> Dict:
+        """Reiht eine Nachricht ein; angezeigt wird sie mit dem nächsten Frame"""
+        entry = self.make_entry(sender, message)
+        with self._pending_lock:
+            self._pending.append(entry)
+            self.stats['messages'] += 1
+            schedule = not self._flush_scheduled
+            self._flush_scheduled = True
+        if schedule:
+            try:
+                self.widget.after(self.FRAME_MS, self.flush)
+            except Exception as e:
+                # Widget bereits zerstört - Nachricht wenigstens ins Transkript
+                logger.debug(f"Chat-Flush konnte nicht geplant werden: {e}")
+                with self._pending_lock:
+                    pending, self._pending = self._pending, []
+                    self._flush_scheduled = False
+                self.transcript.append_many(pending)
+        return entry
+
+    def flush(self):
+        """Schreibt alle wartenden Nachrichten in einem Update ins Widget"""
+        with self._pending_lock:
+            self._flush_scheduled = False
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        start_time = time.perf_counter()
+
+        first_index = self.transcript.append_many(pending)
+        at_bottom = self._is_at_bottom()
+
+        if self._visible and self._visible[-1][0] != first_index - 1:
+            # Unten wurde bereits abgeschnitten; die neuen Nachrichten liegen
+            # nur im Transkript. Steht der Nutzer unten, springt die Ansicht
+            # direkt zu den neuesten Nachrichten
+            if at_bottom:
+                self.widget.delete("1.0", "end")
+                self._visible.clear()
+                self.show_latest(self.max_visible)
+        else:
+            texts = [self.formatter(entry) for entry in pending]
+            self.widget.insert("end", ''.join(texts))
+            for offset, text in enumerate(texts):
+                self._visible.append((first_index + offset, text.count('\n')))
+
+            if at_bottom:
+                self._trim_top(len(self._visible) - self.max_visible)
+                self.widget.see("end")
+            else:
+                self._trim_bottom(len(self._visible) - self.max_visible)
+
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        self.stats['flushes'] += 1
+        self.stats['last_flush_ms'] = round(elapsed_ms, 2)
+        self.stats['max_flush_ms'] = round(max(self.stats['max_flush_ms'], elapsed_ms), 2)
+
+    def load_older(self, count: int = 50) -> int:
+        """Lädt ältere Nachrichten aus dem Transkript oben ins Widget"""
+        if not self._visible:
+            return 0
+        oldest_index = self._visible[0][0]
+        if oldest_index == 0:
+            return 0
+        entries = self.transcript.read(oldest_index - count, oldest_index)
+        if not entries:
+            return 0
+        texts = [self.formatter(entry) for entry in entries]
+        self.widget.insert("1.0", ''.join(texts))
+        first_index = oldest_index - len(entries)
+        for offset in range(len(texts) - 1, -1, -1):
+            self._visible.appendleft((first_index + offset, texts[offset].count('\n')))
+        self._trim_bottom(len(self._visible) - self.max_visible)
+        return len(entries)
+
+    def load_newer(self, count: int = 50) -> int:
+        """Lädt neuere (unten abgeschnittene) Nachrichten aus dem Transkript nach"""
+        start = self._visible[-1][0] + 1 if self._visible else max(0, len(self.transcript) - count)
+        entries = self.transcript.read(start, start + count)
+        if not entries:
+            return 0
+        texts = [self.formatter(entry) for entry in entries]
+        self.widget.insert("end", ''.join(texts))
+        for offset, text in enumerate(texts):
+            self._visible.append((start + offset, text.count('\n')))
+        self._trim_top(len(self._visible) - self.max_visible)
+        return len(entries)
+
+    def show_latest(self, count: int = 50) -> int:
+        """Zeigt in einem leeren Widget die letzten count Nachrichten des Transkripts"""
+        if self._visible:
+            return 0
+        shown = self.load_newer(count)
+        self.widget.see("end")
+        return shown
+
+    # === INTERN ===
+
+    def _trim_top(self, count: int):
+        """Entfernt die obersten count Nachrichten aus dem Widget"""
+        if count <= 0:
+            return
+        lines = 0
+        for _ in range(count):
+            lines += self._visible.popleft()[1]
+        self.widget.delete("1.0", f"{lines + 1}.0")
+
+    def _trim_bottom(self, count: int):
+        """Entfernt die untersten count Nachrichten aus dem Widget"""
+        if count <= 0:
+            return
+        for _ in range(count):
+            self._visible.pop()
+        remaining_lines = sum(lines for _, lines in self._visible)
+        self.widget.delete(f"{remaining_lines + 1}.0", "end")
+
+    def _is_at_bottom(self) -> bool:
+        try:
+            return self.widget.yview()[1] >= 0.999
+        except Exception:
+            return True
+
+    def _on_scroll(self, event=None):
+        """Lädt beim Scrollen an Anfang oder Ende ältere bzw. neuere Nachrichten nach"""
+        try:
+            top, bottom = self.widget.yview()
+            if top <= 0.0:
+                self.load_older()
+            elif bottom >= 0.999 and self._visible and self._visible[-1][0] < len(self.transcript) - 1:
+                self.load_newer()
+        except Exception as e:
+            logger.debug(f"Scroll-Back fehlgeschlagen: {e}")
@@ -10,6 +10,9 @@ import time
 import os
 from typing import Optional
 from pathlib import Path
+from collections import deque
+
+from toobix.gui.chat_view import BatchedChatView
 
 try:
     import customtkinter as ctk
@@ -38,8 +41,9 @@ class EnhancedToobixGUI:
         self.file_tree = None
         self.system_info = None
         
-        # Chat-Historie
-        self.chat_history = []
+        # Chat-Historie (begrenzt; vollständiger Verlauf im Transkript der Chat-Ansicht)
+        self.chat_history = deque(maxlen=200)
+        self.chat_view = None
         
         # File Explorer state
         self.current_directory = str(Path.home())
@@ -146,6 +150,10 @@ class EnhancedToobixGUI:
             fg="white" if self.gui_config['theme'] == "dark" else "black"
         )
         self.chat_display.pack(fill="both", expand=True, padx=10, pady=(10, 5))
+        self.chat_view = BatchedChatView(
+            self.chat_display,
+            lambda entry: f"[{entry['timestamp']}] {entry['sender']}: {entry['message']}\n\n"
+        )
         
         # Input-Frame
         input_frame = tk.Frame(chat_frame)
@@ -1136,21 +1144,11 @@ class EnhancedToobixGUI:
     # Standard GUI-Methods (übernommen von der alten GUI)
     def _add_message(self, sender: str, message: str):
         """Fügt Nachricht zum Chat hinzu"""
-        if not self.chat_display:
+        if not self.chat_view:
             return
-            
-        timestamp = time.strftime("%H:%M:%S")
-        formatted_message = f"[{timestamp}] {sender}: {message}\n\n"
-        
-        self.chat_display.insert(tk.END, formatted_message)
-        self.chat_display.see(tk.END)
-        
-        # Zu Historie hinzufügen
-        self.chat_history.append({
-            'timestamp': timestamp,
-            'sender': sender,
-            'message': message
-        })
+        
+        # Anzeige gebündelt pro Frame; Eintrag (mit Zeitstempel) in die Historie
+        self.chat_history.append(self.chat_view.add(sender, message))
     
     def _on_send_message(self):
         """Sendet Nachricht"""
@@ -1192,20 +1190,17 @@ class EnhancedToobixGUI:
                 self.root.after(0, lambda: self._update_status("Bereit"))
                 return
             
-            # KI-Antwort
-            user_context = self.ai_handler.knowledge_base.create_user_context()
-            enhanced_prompt = f"[Benutzer-Kontext: {user_context}]\n\nFrage: {message}"
-            
+            # KI-Antwort (Benutzer-Kontext liefert der Prompt-Builder)
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
             response = loop.run_until_complete(
-                self.ai_handler.get_response(enhanced_prompt)
+                self.ai_handler.get_response(message)
             )
             
             # Logge Interaktion
             self.ai_handler.knowledge_base.log_interaction(message, response, {
                 'type': 'ai_chat',
-                'user_context': user_context
+                'user_context': self.ai_handler.prompt_builder.fragment_text('user_context')
             })
             
             self.root.after(0, lambda: self._add_message("Toobix", response))
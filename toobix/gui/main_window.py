@@ -13,6 +13,11 @@ from datetime import datetime
 import psutil
 import logging
 from typing import Optional
+from collections import deque
+
+from toobix.gui.chat_view import BatchedChatView
+from toobix.core.ui_bus import get_ui_bus, CLOCK_TOPIC
+from toobix.core.startup_trace import get_startup_trace
 
 # Konfiguriere Logging
 logging.basicConfig(level=logging.INFO)
@@ -24,14 +29,32 @@ try:
 except ImportError:
     CTK_AVAILABLE = False
 
+def _lazy_component(name: str):
+    """Property, die eine Engine erst beim ersten Zugriff erstellt"""
+    return property(lambda self: self._component(name))
+
+
 class ToobixGUI:
     """Hauptfenster für Toobix AI Assistant"""
     
+    # Phase 4/5/6 Engines - werden erst bei Bedarf importiert und erstellt
+    documentation_engine = _lazy_component('documentation_engine')
+    thought_stream_engine = _lazy_component('thought_stream_engine')
+    extended_settings = _lazy_component('extended_settings')
+    tutorial_system = _lazy_component('tutorial_system')
+    suggestion_engine = _lazy_component('suggestion_engine')
+    knowledge_engine = _lazy_component('knowledge_engine')
+    story_engine = _lazy_component('story_engine')
+    ai_life = _lazy_component('ai_life')
+    
     def __init__(self, ai_handler, speech_engine, desktop, settings):
         self.ai_handler = ai_handler
         self.speech_engine = speech_engine
         self.desktop = desktop
         self.settings = settings
+        self.startup_trace = get_startup_trace()
+        # Chat-Verlauf für Folgefragen (Ollama-Kontext, Zusammenfassung)
+        self.conversation = ai_handler.create_session()
         
         self.gui_config = settings.get_gui_config()
         self.root = None
@@ -39,100 +62,116 @@ class ToobixGUI:
         self.input_field = None
         self.listening_status = None
         
-        # Chat-Historie
-        self.chat_history = []
+        # Chat-Historie (begrenzt; vollständiger Verlauf im Transkript der Chat-Ansicht)
+        self.chat_history = deque(maxlen=200)
+        self.chat_view = None
         
-        # === PHASE 4 & 5 COMPONENTS ===
-        self._initialize_phase4_components()
-        self._initialize_phase5_components()
+        # === PHASE 4 & 5 COMPONENTS (lazy) ===
+        self._components = {}
+        self._components_lock = threading.RLock()
+        self._tab_builders = {}
+        self.knowledge_center = None
+        self.story_universe_gui = None
+        self.ai_life_gui = None
+        self.self_modification_active = False
+        self._register_story_callbacks()
         
         print("🎨 GUI wird initialisiert...")
-        self._setup_gui()
+        with self.startup_trace.span('gui.setup'):
+            self._setup_gui()
         self._setup_callbacks()
     
-    def _initialize_phase4_components(self):
-        """Initialisiert alle Phase 4 Engines"""
-        try:
-            # System Documentation Engine
-            from toobix.core.system_documentation_engine import SystemDocumentationEngine
-            self.documentation_engine = SystemDocumentationEngine()
-            print("✅ Documentation Engine initialisiert")
-            
-            # KI Thought Stream Engine
-            from toobix.core.ki_thought_stream_engine import KIThoughtStreamEngine
-            self.thought_stream_engine = KIThoughtStreamEngine()
-            # Set callback für neue Gedanken
-            self.thought_stream_engine.set_callback(self._on_new_thought)
-            print("✅ Thought Stream Engine initialisiert")
-            
-            # Extended Settings Engine
-            from toobix.core.extended_settings_engine import ExtendedSettingsEngine
-            self.extended_settings = ExtendedSettingsEngine()
-            print("✅ Extended Settings Engine initialisiert")
-            
-            # Interactive Tutorial System
-            from toobix.core.interactive_tutorial_system import InteractiveTutorialSystem
-            self.tutorial_system = InteractiveTutorialSystem()
-            print("✅ Tutorial System initialisiert")
-            
-            # Wellness Engine (falls verfügbar)
-            try:
-                from toobix.core.wellness_engine import WellnessEngine
-                self.wellness_engine = WellnessEngine()
-                print("✅ Wellness Engine initialisiert")
-            except ImportError:
-                print("⚠️ Wellness Engine nicht verfügbar")
-                
-        except Exception as e:
-            print(f"❌ Phase 4 Initialisierung Fehler: {e}")
-            logger.error(f"Phase 4 Init Error: {e}")
+    # === LAZY COMPONENTS ===
+    
+    def _component(self, name: str):
+        """Liefert eine Engine und erstellt sie beim ersten Zugriff (thread-sicher)"""
+        with self._components_lock:
+            if name not in self._components:
+                factory = getattr(self, f'_create_{name}')
+                with self.startup_trace.span(f'engine.{name}'):
+                    try:
+                        self._components[name] = factory()
+                        print(f"✅ {name} initialisiert")
+                    except Exception as e:
+                        logger.error(f"{name} konnte nicht initialisiert werden: {e}")
+                        self._components[name] = None
+            return self._components[name]
+    
+    def _component_loaded(self, name: str) -> bool:
+        """True, wenn die Engine bereits erstellt wurde (ohne sie zu erzeugen)"""
+        return self._components.get(name) is not None
+    
+    def _create_documentation_engine(self):
+        from toobix.core.system_documentation_engine import SystemDocumentationEngine
+        return SystemDocumentationEngine()
+    
+    def _create_thought_stream_engine(self):
+        from toobix.core.ki_thought_stream_engine import KIThoughtStreamEngine
+        engine = KIThoughtStreamEngine()
+        engine.start_thought_stream()
+        # Registriere GUI Callbacks für Thought Stream
+        engine.register_thought_callback(self._on_new_thought)
+        return engine
+    
+    def _create_extended_settings(self):
+        from toobix.core.extended_settings_engine import ExtendedSettingsEngine
+        return ExtendedSettingsEngine()
+    
+    def _create_tutorial_system(self):
+        from toobix.core.interactive_tutorial_system import InteractiveTutorialSystem
+        return InteractiveTutorialSystem()
+    
+    def _create_suggestion_engine(self):
+        from toobix.core.smart_suggestion_engine import SmartSuggestionEngine
+        return SmartSuggestionEngine()
+    
+    def _create_knowledge_engine(self):
+        from toobix.core.knowledge_discovery_engine import KnowledgeDiscoveryEngine
+        return KnowledgeDiscoveryEngine()
+    
+    def _create_story_engine(self):
+        from toobix.core.story_universe_engine import StoryUniverseEngine
+        return StoryUniverseEngine()
+    
+    def _create_ai_life(self):
+        from toobix.core.ai_life_foundation import initialize_ai_life
+        return initialize_ai_life()
+    
+    def _start_deferred_components(self):
+        """Nach dem ersten Frame: Gedankenstrom und Vorschläge im Hintergrund nachladen"""
+        threading.Thread(target=lambda: self.thought_stream_engine, daemon=True).start()
+        self.root.after(200, self._create_suggestion_panel)
+    
+    # === LAZY TABS ===
+    
+    def _add_lazy_tab(self, title: str, builder):
+        """Legt einen leeren Tab an; der Inhalt wird beim ersten Anzeigen gebaut"""
+        if CTK_AVAILABLE:
+            frame = self.main_notebook.add(title)
+        else:
+            frame = ttk.Frame(self.main_notebook)
+            self.main_notebook.add(frame, text=title)
+        self._tab_builders[title] = (frame, builder)
+        return frame
     
-    def _initialize_phase5_components(self):
-        """Initialisiert alle Phase 5 Smart Features"""
+    def _on_tab_changed(self, event=None):
+        """Baut den gerade gewählten Tab, falls noch nicht geschehen"""
         try:
-            # Smart Suggestion Engine
-            from toobix.core.smart_suggestion_engine import SmartSuggestionEngine
-            self.suggestion_engine = SmartSuggestionEngine()
-            print("🎯 Smart Suggestion Engine initialisiert")
-            
-            # Knowledge Discovery Engine
-            from toobix.core.knowledge_discovery_engine import KnowledgeDiscoveryEngine
-            self.knowledge_engine = KnowledgeDiscoveryEngine()
-            print("📚 Knowledge Discovery Engine initialisiert")
-            
-            # Knowledge Discovery Center GUI (wird bei Bedarf erstellt)
-            self.knowledge_center = None
-            print("📚 Knowledge Discovery Center bereit")
-            
-            # Story Universe Engine
-            from toobix.core.story_universe_engine import StoryUniverseEngine
-            self.story_engine = StoryUniverseEngine()
-            print("🎮 Story Universe Engine initialisiert")
-            
-            # Story Universe GUI (wird bei Bedarf erstellt)
-            self.story_universe_gui = None
-            print("🎮 Story Universe GUI bereit")
-            
-            # Registriere Story Event Callbacks für reale Aktionen
-            self._register_story_callbacks()
-            print("🎮 Story Universe Callbacks registriert")
-            
-            # Self-Modification Engine placeholder
-            self.self_modification_active = False
-            print("✅ Self-Modification Framework bereit")
-            
-            # Phase 6: AI Life Foundation
-            from toobix.core.ai_life_foundation import initialize_ai_life
-            self.ai_life = initialize_ai_life()
-            print("🌟 AI Life Foundation initialisiert")
-            
-            # AI Life GUI (wird bei Bedarf erstellt)
-            self.ai_life_gui = None
-            print("🌟 AI Life Dashboard bereit")
-            
-        except Exception as e:
-            print(f"❌ Phase 5 Initialisierung Fehler: {e}")
-            logger.error(f"Phase 5 Init Error: {e}")
+            if CTK_AVAILABLE:
+                title = self.main_notebook.get()
+            else:
+                title = self.main_notebook.tab(self.main_notebook.select(), 'text')
+        except Exception:
+            return
+        self._ensure_tab(title)
+    
+    def _ensure_tab(self, title: str):
+        """Stellt sicher, dass der Inhalt eines Tabs existiert"""
+        entry = self._tab_builders.pop(title, None)
+        if entry:
+            frame, builder = entry
+            with self.startup_trace.span(f'tab.{title}'):
+                builder(frame)
     
     def _setup_gui(self):
         """Erstellt die GUI-Komponenten"""
@@ -161,12 +200,17 @@ class ToobixGUI:
     def _create_suggestion_panel(self):
         """Erstellt das Smart Suggestion Panel (Phase 5)"""
         try:
-            from toobix.gui.smart_suggestion_panel import SmartSuggestionPanel
-            self.suggestion_panel = SmartSuggestionPanel(
-                parent=self.root,
-                suggestion_engine=self.suggestion_engine,
-                action_callback=self._handle_suggestion_action
-            )
+            if not self.suggestion_engine:
+                return
+            with self.startup_trace.span('panel.suggestions'):
+                from toobix.gui.smart_suggestion_panel import SmartSuggestionPanel
+                self.suggestion_panel = SmartSuggestionPanel(
+                    parent=self.root,
+                    suggestion_engine=self.suggestion_engine,
+                    action_callback=self._handle_suggestion_action
+                )
+                # Gleiche Position wie beim früheren Aufbau: direkt unter dem Eingabebereich
+                self.suggestion_panel.suggestion_frame.pack_configure(after=self.input_frame)
             print("✅ Smart Suggestion Panel erstellt")
         except Exception as e:
             print(f"⚠️ Suggestion Panel Fehler: {e}")
@@ -404,7 +448,7 @@ class ToobixGUI:
         # === MAIN CONTENT AREA MIT TABS ===
         # Erstelle Notebook für Tabs
         if CTK_AVAILABLE:
-            self.main_notebook = ctk.CTkTabview(self.root)
+            self.main_notebook = ctk.CTkTabview(self.root, command=self._on_tab_changed)
         else:
             self.main_notebook = ttk.Notebook(self.root)
         
@@ -433,27 +477,98 @@ class ToobixGUI:
             )
         
         self.chat_display.pack(fill="both", expand=True, pady=(10, 10), padx=10)
+        self.chat_view = BatchedChatView(self.chat_display, self._format_chat_message)
         
-        # === THOUGHT STREAM TAB ===
+        self._add_message("Toobix", "Hallo! Ich bin Toobix, dein AI-Assistent. Du kannst mit mir sprechen oder hier tippen. 🚀")
+        
+        # === WEITERE TABS (Inhalt wird beim ersten Anzeigen gebaut) ===
+        self._add_lazy_tab("🧠 Gedankenstrom", self._build_thought_tab)
+        self._add_lazy_tab("📊 System", self._build_status_tab)
+        self._add_lazy_tab("🎵 Wellness", self._build_wellness_tab)
         if CTK_AVAILABLE:
-            thought_frame = self.main_notebook.add("🧠 Gedankenstrom")
+            self.main_notebook.set("💬 Chat")
         else:
-            thought_frame = ttk.Frame(self.main_notebook)
-            self.main_notebook.add(thought_frame, text="🧠 Gedankenstrom")
+            self.main_notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
         
+        # === INPUT BEREICH ===
+        input_frame = self._create_frame(self.root, height=80)
+        input_frame.pack(fill="x", padx=10, pady=(0, 10))
+        self.input_frame = input_frame
+        
+        # Smart Suggestion Panel (Phase 5) wird nach dem ersten Frame erstellt
+        
+        # Eingabefeld
+        if CTK_AVAILABLE:
+            self.input_field = ctk.CTkEntry(
+                input_frame,
+                placeholder_text="Schreibe deine Nachricht hier oder drücke F1 für Spracheingabe...",
+                font=("Arial", 12)
+            )
+        else:
+            self.input_field = tk.Entry(
+                input_frame,
+                font=("Arial", 12)
+            )
+        
+        self.input_field.pack(side="left", fill="x", expand=True, padx=(0, 10))
+        # Nach längerer Pause das Ollama-Modell schon beim Fokussieren laden
+        self.input_field.bind("<FocusIn>", lambda event: self.ai_handler.ollama_available and self.ai_handler.ollama_models.ensure_warm(), add="+")
+        
+        # Buttons
+        button_frame = self._create_frame(input_frame, width=200)
+        button_frame.pack(side="right", fill="y")
+        
+        # Send Button
+        self.send_button = self._create_button(
+            button_frame,
+            "Senden",
+            self._on_send_message
+        )
+        self.send_button.pack(side="top", fill="x", pady=(0, 5))
+        
+        # Voice Button
+        self.voice_button = self._create_button(
+            button_frame,
+            "🎤 Sprechen",
+            self._on_voice_input
+        )
+        self.voice_button.pack(side="top", fill="x")
+        
+        # === BOTTOM STATUS ===
+        status_frame = self._create_frame(self.root, height=30)
+        status_frame.pack(fill="x", padx=10, pady=(0, 5))
+        
+        self.status_label = self._create_label(
+            status_frame,
+            f"Bereit - Ollama: {self.ai_handler.ollama_available}, Groq: {self.ai_handler.groq_available}",
+            font=("Arial", 9)
+        )
+        self.status_label.pack(side="left")
+        
+        # AI Status Button
+        self.ai_status_button = self._create_button(
+            status_frame,
+            "AI Status",
+            self._show_ai_status,
+            width=80
+        )
+        self.ai_status_button.pack(side="right")
+    
+    def _build_thought_tab(self, frame):
+        """Gedankenstrom-Tab (lazy)"""
         # Thought Stream Display
-        thought_label = self._create_label(thought_frame, "KI-Gedankenstrom (Live)", font=("Arial", 12, "bold"))
+        thought_label = self._create_label(frame, "KI-Gedankenstrom (Live)", font=("Arial", 12, "bold"))
         thought_label.pack(pady=10)
         
         if CTK_AVAILABLE:
             self.thought_display = ctk.CTkTextbox(
-                thought_frame,
+                frame,
                 height=350,
                 font=("Arial", 10)
             )
         else:
             self.thought_display = scrolledtext.ScrolledText(
-                thought_frame,
+                frame,
                 height=18,
                 font=("Arial", 10),
                 wrap=tk.WORD
@@ -461,26 +576,29 @@ class ToobixGUI:
         
         self.thought_display.pack(fill="both", expand=True, pady=(0, 10), padx=10)
         
-        # === SYSTEM STATUS TAB ===
-        if CTK_AVAILABLE:
-            status_frame = self.main_notebook.add("📊 System")
-        else:
-            status_frame = ttk.Frame(self.main_notebook)
-            self.main_notebook.add(status_frame, text="📊 System")
-        
+        # Bisherige Gedanken nachtragen
+        engine = self.thought_stream_engine
+        if engine:
+            for thought in engine.get_thought_stream(20):
+                self._add_thought_to_display(
+                    f"[{thought['timestamp']}] {thought['thought_type'].upper()}: {thought['content']}\n\n"
+                )
+    
+    def _build_status_tab(self, frame):
+        """System-Status-Tab (lazy)"""
         # System Status Display
-        status_label = self._create_label(status_frame, "System Status & Analytics", font=("Arial", 12, "bold"))
+        status_label = self._create_label(frame, "System Status & Analytics", font=("Arial", 12, "bold"))
         status_label.pack(pady=10)
         
         if CTK_AVAILABLE:
             self.status_display = ctk.CTkTextbox(
-                status_frame,
+                frame,
                 height=350,
                 font=("Arial", 10)
             )
         else:
             self.status_display = scrolledtext.ScrolledText(
-                status_frame,
+                frame,
                 height=18,
                 font=("Arial", 10),
                 wrap=tk.WORD
@@ -488,18 +606,21 @@ class ToobixGUI:
         
         self.status_display.pack(fill="both", expand=True, pady=(0, 10), padx=10)
         
-        # === WELLNESS TAB ===
-        if CTK_AVAILABLE:
-            wellness_frame = self.main_notebook.add("🎵 Wellness")
-        else:
-            wellness_frame = ttk.Frame(self.main_notebook)
-            self.main_notebook.add(wellness_frame, text="🎵 Wellness")
-        
+        bus = get_ui_bus()
+        subscription = bus.subscribe(
+            ('system_status', CLOCK_TOPIC),
+            lambda payload: self._update_system_status(),
+            widget=self.status_display
+        )
+        bus.request_update(subscription)
+    
+    def _build_wellness_tab(self, frame):
+        """Wellness-Tab (lazy)"""
         # Wellness Controls
-        wellness_label = self._create_label(wellness_frame, "Creative Wellness Engine", font=("Arial", 12, "bold"))
+        wellness_label = self._create_label(frame, "Creative Wellness Engine", font=("Arial", 12, "bold"))
         wellness_label.pack(pady=10)
         
-        wellness_controls = self._create_frame(wellness_frame)
+        wellness_controls = self._create_frame(frame)
         wellness_controls.pack(pady=10)
         
         # Wellness Buttons
@@ -519,83 +640,19 @@ class ToobixGUI:
         # Wellness Display
         if CTK_AVAILABLE:
             self.wellness_display = ctk.CTkTextbox(
-                wellness_frame,
+                frame,
                 height=280,
                 font=("Arial", 10)
             )
         else:
             self.wellness_display = scrolledtext.ScrolledText(
-                wellness_frame,
+                frame,
                 height=14,
                 font=("Arial", 10),
                 wrap=tk.WORD
             )
         
         self.wellness_display.pack(fill="both", expand=True, pady=(10, 10), padx=10)
-        self._add_message("Toobix", "Hallo! Ich bin Toobix, dein AI-Assistent. Du kannst mit mir sprechen oder hier tippen. 🚀")
-        
-        # === INPUT BEREICH ===
-        input_frame = self._create_frame(self.root, height=80)
-        input_frame.pack(fill="x", padx=10, pady=(0, 10))
-        
-        # === SMART SUGGESTION PANEL (PHASE 5) - Über Input ===
-        if hasattr(self, 'suggestion_engine'):
-            self._create_suggestion_panel()
-        
-        # Eingabefeld
-        if CTK_AVAILABLE:
-            self.input_field = ctk.CTkEntry(
-                input_frame,
-                placeholder_text="Schreibe deine Nachricht hier oder drücke F1 für Spracheingabe...",
-                font=("Arial", 12)
-            )
-        else:
-            self.input_field = tk.Entry(
-                input_frame,
-                font=("Arial", 12)
-            )
-        
-        self.input_field.pack(side="left", fill="x", expand=True, padx=(0, 10))
-        
-        # Buttons
-        button_frame = self._create_frame(input_frame, width=200)
-        button_frame.pack(side="right", fill="y")
-        
-        # Send Button
-        self.send_button = self._create_button(
-            button_frame,
-            "Senden",
-            self._on_send_message
-        )
-        self.send_button.pack(side="top", fill="x", pady=(0, 5))
-        
-        # Voice Button
-        self.voice_button = self._create_button(
-            button_frame,
-            "🎤 Sprechen",
-            self._on_voice_input
-        )
-        self.voice_button.pack(side="top", fill="x")
-        
-        # === BOTTOM STATUS ===
-        status_frame = self._create_frame(self.root, height=30)
-        status_frame.pack(fill="x", padx=10, pady=(0, 5))
-        
-        self.status_label = self._create_label(
-            status_frame,
-            f"Bereit - Ollama: {self.ai_handler.ollama_available}, Groq: {self.ai_handler.groq_available}",
-            font=("Arial", 9)
-        )
-        self.status_label.pack(side="left")
-        
-        # AI Status Button
-        self.ai_status_button = self._create_button(
-            status_frame,
-            "AI Status",
-            self._show_ai_status,
-            width=80
-        )
-        self.ai_status_button.pack(side="right")
     
     def _create_frame(self, parent, **kwargs):
         """Erstellt Frame-Widget je nach verfügbarer Bibliothek"""
@@ -629,9 +686,77 @@ class ToobixGUI:
         # ESC für Fokus zurücksetzen
         self.root.bind('<Escape>', lambda e: self.input_field.focus())
         
+        # Strg+K für die globale Suche
+        self.root.bind('<Control-k>', lambda e: self._open_search_palette())
+        
         # Fenster schließen
         self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
     
+    def _open_search_palette(self):
+        """Globale Suche über Befehle, Dokumentation, Tutorials und Wissen (beim Tippen)"""
+        from toobix.core.command_reference import ToobixCommands
+        from toobix.core.global_search import get_global_search
+        
+        # Quellen anmelden; die Engines werden bei Bedarf erstellt
+        ToobixCommands()
+        for name in ('documentation_engine', 'tutorial_system', 'knowledge_engine'):
+            self._component(name)
+        search = get_global_search()
+        
+        palette = tk.Toplevel(self.root)
+        palette.title("🔍 Toobix Suche")
+        palette.geometry("640x420")
+        palette.transient(self.root)
+        
+        query_var = tk.StringVar()
+        entry = ttk.Entry(palette, textvariable=query_var, font=("Arial", 12))
+        entry.pack(fill="x", padx=10, pady=(10, 5))
+        results_list = tk.Listbox(palette, font=("Arial", 10), activestyle="none")
+        results_list.pack(fill="both", expand=True, padx=10, pady=5)
+        status_label = ttk.Label(palette, text="Befehle, Dokumentation, Tutorials und Wissen durchsuchen")
+        status_label.pack(fill="x", padx=10, pady=(0, 10))
+        hits = []
+        
+        def update(*args):
+            hits[:] = search.search(query_var.get(), limit=30)
+            results_list.delete(0, tk.END)
+            for hit in hits:
+                results_list.insert(tk.END, f"{hit.label}   {hit.title} - {hit.description}")
+            if hits:
+                results_list.selection_set(0)
+            status_label.configure(text=f"{len(hits)} Treffer ({search.stats['last_query_ms']:.2f} ms)")
+        
+        def move(step):
+            if not hits:
+                return
+            selection = results_list.curselection()
+            index = min(len(hits) - 1, max(0, (selection[0] if selection else -1) + step))
+            results_list.selection_clear(0, tk.END)
+            results_list.selection_set(index)
+            results_list.see(index)
+        
+        def choose(event=None):
+            selection = results_list.curselection()
+            if not selection:
+                return
+            hit = hits[selection[0]]
+            palette.destroy()
+            if hit.source == 'command':
+                # Befehl zum Ausführen ins Eingabefeld übernehmen
+                self.input_field.delete(0, tk.END)
+                self.input_field.insert(0, hit.doc_id)
+                self.input_field.focus()
+            else:
+                self._add_message("Suche", f"{hit.label}: {hit.title}\n{hit.description}")
+        
+        query_var.trace_add('write', update)
+        entry.bind('<Down>', lambda e: move(1))
+        entry.bind('<Up>', lambda e: move(-1))
+        entry.bind('<Return>', choose)
+        results_list.bind('<Double-Button-1>', choose)
+        palette.bind('<Escape>', lambda e: palette.destroy())
+        entry.focus_set()
+    
     def _setup_callbacks(self):
         """Setzt Speech Engine Callbacks"""
         self.speech_engine.set_callbacks(
@@ -646,25 +771,14 @@ class ToobixGUI:
         """Fügt Nachricht zum Chat hinzu"""
         self.chat_history.append((sender, message))
         
-        # Formatierung je nach Sender
-        if sender == "Toobix":
-            prefix = "🤖 "
-            color = "blue" if not CTK_AVAILABLE else None
-        else:
-            prefix = "👤 "
-            color = "green" if not CTK_AVAILABLE else None
-        
-        # Nachricht anzeigen
-        if CTK_AVAILABLE:
-            self.chat_display.insert("end", f"{prefix}{sender}: {message}\n\n")
-        else:
-            self.chat_display.insert("end", f"{prefix}{sender}: {message}\n\n")
-            if color:
-                # Farb-Tags für Tkinter (vereinfacht)
-                pass
-        
-        # Auto-scroll
-        self.chat_display.see("end")
+        # Anzeige gebündelt pro Frame (ein insert + see für alle wartenden Nachrichten)
+        self.chat_view.add(sender, message)
+    
+    @staticmethod
+    def _format_chat_message(entry: dict) -> str:
+        """Formatiert eine Chat-Nachricht für die Anzeige"""
+        prefix = "🤖 " if entry['sender'] == "Toobix" else "👤 "
+        return f"{prefix}{entry['sender']}: {entry['message']}\n\n"
     
     def _on_send_message(self):
         """Behandelt gesendete Text-Nachricht"""
@@ -748,24 +862,19 @@ class ToobixGUI:
                 self.root.after(0, lambda: self._update_status("Bereit"))
                 return
             
-            # Erstelle personalisierten Kontext für AI
-            user_context = self.ai_handler.knowledge_base.create_user_context()
-            
-            # Async AI-Antwort holen mit Kontext
+            # Async AI-Antwort holen; der Benutzer-Kontext steckt (gecacht)
+            # im stabilen Prompt-Präfix des Prompt-Builders
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
             
-            # Erweitere Prompt mit persönlichem Kontext
-            enhanced_prompt = f"[Benutzer-Kontext: {user_context}]\n\nFrage: {message}"
-            
             response = loop.run_until_complete(
-                self.ai_handler.get_response(enhanced_prompt)
+                self.ai_handler.get_response(message, session=self.conversation)
             )
             
             # Logge AI-Interaktion
             self.ai_handler.knowledge_base.log_interaction(message, response, {
                 'type': 'ai_chat',
-                'user_context': user_context,
+                'user_context': self.ai_handler.prompt_builder.fragment_text('user_context'),
                 'model_used': self.ai_handler.get_status().get('current_model', 'unknown')
             })
             
@@ -800,7 +909,7 @@ class ToobixGUI:
                 context = SuggestionContext(
                     last_message=user_message,
                     ai_response=ai_response,
-                    user_history=self.chat_history[-5:] if len(self.chat_history) >= 5 else self.chat_history,
+                    user_history=list(self.chat_history)[-5:],
                     current_activity="chat",
                     time_of_day=datetime.now().strftime("%H:%M"),
                     system_state={
@@ -1727,6 +1836,14 @@ class ToobixGUI:
         if any(word in message_lower for word in ['aufräumplan', 'aufräumen plan', 'cleanup plan']):
             return self.desktop.create_cleanup_plan()
         
+        # Backup verwalten (vor dem allgemeinen 'backup'-Befehl prüfen)
+        if any(word in message_lower for word in ['backups anzeigen', 'backup liste', 'backups']):
+            return self.desktop.list_backups()
+        if any(word in message_lower for word in ['backup prüfen', 'backup verifizieren']):
+            return self.desktop.verify_backup()
+        if any(word in message_lower for word in ['backup wiederherstellen', 'wiederherstellen']):
+            return self.desktop.restore_backup()
+        
         # Backup erstellen
         if any(word in message_lower for word in ['backup erstellen', 'sicherung', 'backup']):
             return self.desktop.create_backup()
@@ -1734,7 +1851,7 @@ class ToobixGUI:
         # Aufräumung starten
         if any(word in message_lower for word in ['aufräumen starten', 'cleanup', 'aufräumen']):
             confirm = 'bestätigt' in message_lower or 'bestätige' in message_lower
-            return self.desktop.execute_cleanup(confirm)
+            return self.desktop.execute_cleanup(confirm, include_duplicates='duplikate' in message_lower)
         
         # Programm öffnen
         if message_lower.startswith('öffne '):
@@ -2043,36 +2160,16 @@ Aktuelles Modell: {status['current_model']}
 Letzte Antwortzeit: {status['last_response_time']:.1f}s
 Fehler hintereinander: {status['consecutive_failures']}
         """
+        for model, usage in status.get('ollama_models', {}).items():
+            status_text += (f"\n{model} ({usage['role']}): {'🔥 geladen' if usage['warm'] else '💤 kalt'}, "
+                            f"Laden Ø {usage['avg_load_ms']:.0f} ms ({usage['cold_loads']}x), "
+                            f"Generierung Ø {usage['avg_generation_ms']:.0f} ms")
+        for name, backend in status.get('router', {}).get('backends', {}).items():
+            if backend['samples']:
+                status_text += f"\n{name}: {backend['state']}, p50 {backend['p50_ms']} ms, p95 {backend['p95_ms']} ms, Fehlerquote {backend['error_rate']:.0%}"
         
         messagebox.showinfo("Toobix AI Status", status_text)
     
-    def _initialize_phase4_components(self):
-        """Initialisiert Phase 4 Components für System-Transparenz"""
-        try:
-            from toobix.core.system_documentation_engine import SystemDocumentationEngine
-            from toobix.core.ki_thought_stream_engine import KIThoughtStreamEngine
-            from toobix.core.extended_settings_engine import ExtendedSettingsEngine
-            from toobix.core.interactive_tutorial_system import InteractiveTutorialSystem
-            
-            self.documentation_engine = SystemDocumentationEngine()
-            self.thought_stream_engine = KIThoughtStreamEngine()
-            self.extended_settings = ExtendedSettingsEngine()
-            self.tutorial_system = InteractiveTutorialSystem()
-            
-            # Starte KI Thought Stream
-            self.thought_stream_engine.start_thought_stream()
-            
-            # Registriere GUI Callbacks für Thought Stream
-            self.thought_stream_engine.register_thought_callback(self._on_new_thought)
-            
-            logger.info("📚 Phase 4 Components initialisiert - System Transparenz aktiv")
-        except Exception as e:
-            logger.error(f"Phase 4 Component Fehler: {e}")
-            self.documentation_engine = None
-            self.thought_stream_engine = None
-            self.extended_settings = None
-            self.tutorial_system = None
-    
     def _on_new_thought(self, thought):
         """Callback für neue KI-Gedanken"""
         try:
@@ -2362,36 +2459,35 @@ Fehler hintereinander: {status['consecutive_failures']}
             self._add_message("Fehler", f"Story action failed: {e}")
     
     def _register_story_callbacks(self):
-        """Registriert Story Events für reale Toobix-Aktionen"""
-        if hasattr(self, 'story_engine'):
-            # Produktivitäts-Events
-            def on_task_completed():
-                self.story_engine.trigger_event('task_completed')
-                
-            def on_code_written():
-                self.story_engine.trigger_event('code_written')
-                
-            def on_ai_query():
-                self.story_engine.trigger_event('ai_query')
-                
-            def on_system_monitored():
-                self.story_engine.trigger_event('system_monitored')
-                
-            def on_git_action():
-                self.story_engine.trigger_event('git_action')
-                
-            def on_wellness_activity():
-                self.story_engine.trigger_event('wellness_activity')
+        """Registriert Story Events für reale Toobix-Aktionen (Engine wird erst beim ersten Event erstellt)"""
+        # Produktivitäts-Events
+        def on_task_completed():
+            self.story_engine.trigger_event('task_completed')
             
-            # Speichere callbacks für später
-            self.story_callbacks = {
-                'task_completed': on_task_completed,
-                'code_written': on_code_written,
-                'ai_query': on_ai_query,
-                'system_monitored': on_system_monitored,
-                'git_action': on_git_action,
-                'wellness_activity': on_wellness_activity
-            }
+        def on_code_written():
+            self.story_engine.trigger_event('code_written')
+            
+        def on_ai_query():
+            self.story_engine.trigger_event('ai_query')
+            
+        def on_system_monitored():
+            self.story_engine.trigger_event('system_monitored')
+            
+        def on_git_action():
+            self.story_engine.trigger_event('git_action')
+            
+        def on_wellness_activity():
+            self.story_engine.trigger_event('wellness_activity')
+        
+        # Speichere callbacks für später
+        self.story_callbacks = {
+            'task_completed': on_task_completed,
+            'code_written': on_code_written,
+            'ai_query': on_ai_query,
+            'system_monitored': on_system_monitored,
+            'git_action': on_git_action,
+            'wellness_activity': on_wellness_activity
+        }
     
     def _start_meditation(self):
         """Startet Meditation"""
@@ -2446,6 +2542,7 @@ Fehler hintereinander: {status['consecutive_failures']}
     def _add_wellness_message(self, text):
         """Fügt Nachricht zum Wellness Display hinzu"""
         try:
+            self._ensure_tab("🎵 Wellness")
             timestamp = datetime.now().strftime('%H:%M:%S')
             wellness_text = f"[{timestamp}] {text}\n"
             
@@ -2474,10 +2571,23 @@ Fehler hintereinander: {status['consecutive_failures']}
                 
                 # Phase 4 Components
                 status_text += f"📚 PHASE 4 COMPONENTS:\n"
-                status_text += f"  Documentation: {'✅' if hasattr(self, 'documentation_engine') else '❌'}\n"
-                status_text += f"  Thought Stream: {'✅' if hasattr(self, 'thought_stream_engine') else '❌'}\n"
-                status_text += f"  Settings: {'✅' if hasattr(self, 'extended_settings') else '❌'}\n"
-                status_text += f"  Tutorials: {'✅' if hasattr(self, 'tutorial_system') else '❌'}\n\n"
+                for label, name in (('Documentation', 'documentation_engine'),
+                                    ('Thought Stream', 'thought_stream_engine'),
+                                    ('Settings', 'extended_settings'),
+                                    ('Tutorials', 'tutorial_system')):
+                    loaded = self._component_loaded(name)
+                    status_text += f"  {label}: {'✅' if loaded else '💤 wird bei Bedarf geladen'}\n"
+                status_text += "\n"
+                
+                # Startzeit
+                trace = self.startup_trace
+                if trace.interactive_ms is not None:
+                    status_text += f"⏱️ STARTUP:\n"
+                    status_text += f"  Zeit bis interaktiv: {trace.interactive_ms:.0f} ms\n"
+                    for span in sorted(trace.spans, key=lambda s: s.duration_ms, reverse=True)[:5]:
+                        lazy = ' (bei Bedarf)' if span.phase == 'lazy' else ''
+                        status_text += f"  {span.name}: {span.duration_ms:.0f} ms{lazy}\n"
+                    status_text += "\n"
                 
                 # System Health
                 status_text += f"💻 SYSTEM HEALTH:\n"
@@ -2495,19 +2605,13 @@ Fehler hintereinander: {status['consecutive_failures']}
             logger.error(f"Status Update Fehler: {e}")
     
     def _setup_phase4_updates(self):
-        """Setzt regelmäßige Updates für Phase 4 Features"""
-        def update_loop():
-            self._update_system_status()
-            # Schedule next update
-            self.root.after(10000, update_loop)  # Alle 10 Sekunden
-        
-        # Starte Update-Loop
-        self.root.after(1000, update_loop)  # Erste Update nach 1 Sekunde
+        """Bindet den UI-Bus an das Fenster (Tabs abonnieren beim Aufbau)"""
+        get_ui_bus().attach(self.root)
     
     def _on_closing(self):
         """Behandelt Fenster schließen"""
-        # Stoppe Phase 4 Components
-        if hasattr(self, 'thought_stream_engine') and self.thought_stream_engine:
+        # Stoppe Phase 4 Components (nur wenn sie überhaupt geladen wurden)
+        if self._component_loaded('thought_stream_engine'):
             self.thought_stream_engine.stop_thought_stream()
             
         self.speech_engine.stop()
@@ -2516,4 +2620,11 @@ Fehler hintereinander: {status['consecutive_failures']}
     def run(self):
         """Startet die GUI"""
         print("🎨 GUI gestartet - Toobix ist bereit!")
+        self.root.after_idle(self._on_first_interactive)
         self.root.mainloop()
+    
+    def _on_first_interactive(self):
+        """Erster Frame ist gezeichnet: Kennzahl festhalten, Rest nachladen"""
+        interactive_ms = self.startup_trace.mark_interactive('main_window')
+        print(f"⏱️ Fenster interaktiv nach {interactive_ms:.0f} ms")
+        self._start_deferred_components()
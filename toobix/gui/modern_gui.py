@@ -11,9 +11,12 @@ from tkinter import ttk
 import customtkinter as ctk
 from typing import Dict, Any, Optional, Callable
 import threading
-import datetime
 from pathlib import Path
 
+from ..core.ui_bus import get_ui_bus, CLOCK_TOPIC
+from ..core.startup_trace import get_startup_trace
+from .chat_view import BatchedChatView, ChatTranscript
+
 class ToobixModernGUI:
     """
     🎨 REVOLUTIONÄRE GUI ARCHITEKTUR
@@ -39,6 +42,10 @@ class ToobixModernGUI:
         self.main_content = None
         self.current_view = "ai_companion"
         
+        # Chat: Transkript bleibt über Ansichtswechsel erhalten
+        self.chat_view = None
+        self.chat_transcript = None
+        
         # Content Views
         self.content_views = {}
         self.sidebar_buttons = {}
@@ -323,6 +330,7 @@ class ToobixModernGUI:
         """Lädt eine spezifische Ansicht in den Content Bereich"""
         
         # Clear current content
+        self.chat_view = None
         for widget in self.content_container.winfo_children():
             widget.destroy()
         
@@ -400,6 +408,14 @@ class ToobixModernGUI:
         )
         self.chat_display.pack(fill="both", expand=True, padx=15, pady=15)
         
+        if self.chat_transcript is None:
+            self.chat_transcript = ChatTranscript()
+        self.chat_view = BatchedChatView(
+            self.chat_display,
+            self._format_chat_message,
+            transcript=self.chat_transcript
+        )
+        
         # Quick Actions
         quick_actions = ctk.CTkFrame(self.content_container, fg_color="transparent")
         quick_actions.pack(fill="x")
@@ -437,8 +453,11 @@ class ToobixModernGUI:
         actions_frame.grid_columnconfigure(0, weight=1)
         actions_frame.grid_columnconfigure(1, weight=1)
         
-        # Welcome Message
-        self._add_welcome_message()
+        # Welcome Message (beim erneuten Öffnen der bisherige Verlauf)
+        if len(self.chat_transcript):
+            self.chat_view.show_latest()
+        else:
+            self._add_welcome_message()
     
     def _add_welcome_message(self):
         """Fügt Willkommensnachricht hinzu"""
@@ -455,7 +474,7 @@ Ich bin dein bewusster AI-Begleiter auf dem Weg zu mehr Frieden, Liebe und Trans
 
 🎤 Sprich einfach mit mir oder nutze die Schnellaktionen oben!"""
         
-        self.chat_display.insert("end", welcome_msg)
+        self.chat_view.add("Toobix", welcome_msg)
     
     def _process_voice_input(self, event=None):
         """Verarbeitet Voice/Text Input"""
@@ -481,7 +500,7 @@ Ich bin dein bewusster AI-Begleiter auf dem Weg zu mehr Frieden, Liebe und Trans
         """Verarbeitet AI Response"""
         try:
             # Show thinking
-            self._add_message("Toobix", "🤔 Denke nach...", "#66bb6a")
+            self._set_thinking(True)
             
             # Process with AI handler using correct async method
             import asyncio
@@ -492,8 +511,7 @@ Ich bin dein bewusster AI-Begleiter auf dem Weg zu mehr Frieden, Liebe und Trans
             )
             loop.close()
             
-            # Remove thinking message
-            self._remove_last_message()
+            self._set_thinking(False)
             
             # Add real response
             self._add_message("Toobix", response, "#66bb6a")
@@ -503,28 +521,29 @@ Ich bin dein bewusster AI-Begleiter auf dem Weg zu mehr Frieden, Liebe und Trans
                 self.speech_engine.speak(response, wait=False)
                 
         except Exception as e:
-            self._remove_last_message()
+            self._set_thinking(False)
             self._add_message("Fehler", f"Verarbeitungsfehler: {e}", "#f44336")
     
     def _add_message(self, sender, message, color):
-        """Fügt Nachricht zum Chat hinzu"""
-        timestamp = datetime.datetime.now().strftime("%H:%M")
-        
-        formatted_message = f"\n[{timestamp}] {sender}:\n{message}\n"
-        
-        self.chat_display.insert("end", formatted_message)
-        self.chat_display.see("end")
+        """Fügt Nachricht zum Chat hinzu (thread-sicher, gebündelt pro Frame)"""
+        chat_view = self.chat_view
+        if chat_view:
+            chat_view.add(sender, message)
+        elif self.chat_transcript is not None:
+            # Chat gerade nicht geöffnet - erscheint beim nächsten Öffnen
+            self.chat_transcript.append_many([BatchedChatView.make_entry(sender, message)])
     
-    def _remove_last_message(self):
-        """Entfernt letzte Nachricht (für thinking indicator)"""
-        content = self.chat_display.get("1.0", "end")
-        lines = content.strip().split('\n')
-        
-        if len(lines) >= 3:
-            # Remove last 3 lines (timestamp, message, empty line)
-            new_content = '\n'.join(lines[:-3]) + '\n'
-            self.chat_display.delete("1.0", "end")
-            self.chat_display.insert("1.0", new_content)
+    @staticmethod
+    def _format_chat_message(entry):
+        return f"\n[{entry['timestamp'][:5]}] {entry['sender']}:\n{entry['message']}\n"
+    
+    def _set_thinking(self, thinking):
+        """Zeigt den Denk-Status in der Statusleiste (statt als Chat-Nachricht)"""
+        text = "🤔 Denke nach..." if thinking else "🌐 Connected"
+        try:
+            self.root.after(0, lambda: self.connection_status.configure(text=text))
+        except Exception:
+            pass
     
     # === QUICK ACTIONS ===
     
@@ -715,37 +734,34 @@ Ich bin dein bewusster AI-Begleiter auf dem Weg zu mehr Frieden, Liebe und Trans
     
     def run(self):
         """Startet die GUI"""
-        self.create_application()
+        startup_trace = get_startup_trace()
+        with startup_trace.span('gui.modern.create_application'):
+            self.create_application()
         
         # Start update loop
         self._start_update_loop()
         
         print("🌟 Toobix Modern GUI gestartet!")
+        self.root.after_idle(lambda: startup_trace.mark_interactive('modern_gui'))
         self.root.mainloop()
     
     def _start_update_loop(self):
-        """Startet Update Loop für AI State"""
-        def update():
-            try:
-                # Update AI state from AI Life Foundation
-                if hasattr(self.ai_handler, 'ai_life') and self.ai_handler.ai_life:
-                    ai_state = self.ai_handler.ai_life.get_current_ai_state()
-                    
-                    self.update_ai_state(
-                        energy=ai_state['energy_level'],
-                        mood=ai_state['mood'],
-                        activity=ai_state['current_room']
-                    )
+        """Abonniert AI-State-Änderungen über den UI-Bus"""
+        def update(payload=None):
+            # Update AI state from AI Life Foundation
+            if hasattr(self.ai_handler, 'ai_life') and self.ai_handler.ai_life:
+                ai_state = self.ai_handler.ai_life.get_current_ai_state()
                 
-                # Schedule next update
-                self.root.after(30000, update)  # Every 30 seconds
-                
-            except Exception as e:
-                print(f"Update loop error: {e}")
-                self.root.after(30000, update)
+                self.update_ai_state(
+                    energy=ai_state['energy_level'],
+                    mood=ai_state['mood'],
+                    activity=ai_state['current_room']
+                )
         
-        # Start first update
-        self.root.after(1000, update)
+        bus = get_ui_bus()
+        bus.attach(self.root)
+        subscription = bus.subscribe(('ai_life', CLOCK_TOPIC), update, widget=self.ai_state_label)
+        bus.request_update(subscription)
     
     def _load_artefakt_system_view(self):
         """Lädt das Artefakt System"""
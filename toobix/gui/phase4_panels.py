@@ -7,10 +7,10 @@ from tkinter import ttk, scrolledtext, messagebox
 import json
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-import threading
-import time
 from pathlib import Path
 
+from ..core.ui_bus import get_ui_bus
+
 try:
     import customtkinter as ctk
     CTK_AVAILABLE = True
@@ -147,8 +147,8 @@ class DocumentationPanel:
             try:
                 results = self.documentation_engine.search_functions(query)
                 content = f"Suchergebnisse für '{query}':\n\n"
-                for result in results[:10]:  # Top 10 Ergebnisse
-                    content += f"• {result['name']}: {result['description']}\n"
+                for name, result in list(results['matches'].items())[:10]:  # Top 10 Ergebnisse
+                    content += f"• {name}: {result['description']}\n"
                     content += f"  Kategorie: {result['category']}\n\n"
                 self._display_content(f"Suche: {query}", content)
             except Exception as e:
@@ -177,6 +177,8 @@ class ThoughtStreamPanel:
         self.thoughts_display = None
         self.filter_var = None
         self.auto_scroll = tk.BooleanVar(value=True)
+        self.subscription = None
+        self._last_shown = None
         
         self._create_panel()
         self._start_update_loop()
@@ -258,23 +260,19 @@ class ThoughtStreamPanel:
             return ttk.Label(parent, text=text, **kwargs)
     
     def _start_update_loop(self):
-        """Startet Update-Loop für Gedanken"""
-        def update_thoughts():
-            while True:
-                try:
-                    # Hole neue Gedanken
-                    thoughts = self.thought_stream_engine.get_thought_stream(5)
-                    
-                    # Update GUI im Main Thread
-                    self.parent.after(0, lambda: self._update_thoughts_display(thoughts))
-                    
-                    time.sleep(10)  # Update alle 10 Sekunden
-                except Exception as e:
-                    print(f"Thought Update Fehler: {e}")
-                    time.sleep(30)
-        
-        update_thread = threading.Thread(target=update_thoughts, daemon=True)
-        update_thread.start()
+        """Abonniert neue Gedanken über den UI-Bus (statt eigenem Polling-Thread)"""
+        bus = get_ui_bus()
+        bus.attach(self.parent.winfo_toplevel())
+        self.subscription = bus.subscribe('thoughts', self._on_new_thoughts, widget=self.panel)
+        bus.request_update(self.subscription)
+    
+    def _on_new_thoughts(self, payload=None):
+        """Zeigt alle Gedanken an, die seit dem letzten Frame hinzugekommen sind"""
+        thoughts = self.thought_stream_engine.get_thought_stream(20)
+        new_thoughts = [t for t in thoughts if self._last_shown is None or t['timestamp'] > self._last_shown]
+        if new_thoughts:
+            self._last_shown = new_thoughts[-1]['timestamp']
+            self._update_thoughts_display(new_thoughts)
     
     def _update_thoughts_display(self, thoughts):
         """Update Gedanken-Display"""
@@ -316,6 +314,8 @@ class ThoughtStreamPanel:
             # Formatiere Nachricht
             if isinstance(timestamp, str):
                 time_str = timestamp[:19] if len(timestamp) > 19 else timestamp
+            elif isinstance(timestamp, datetime):
+                time_str = timestamp.strftime('%Y-%m-%d %H:%M:%S')
             else:
                 time_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             
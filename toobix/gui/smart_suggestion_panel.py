@@ -30,6 +30,7 @@ class SmartSuggestionPanel:
         
         self.suggestion_groups = []
         self.button_widgets = {}
+        self.displayed_ids = []  # tatsächlich sichtbare Vorschläge der aktuellen Anzeige
         self.current_context = None
         
         self._create_panel()
@@ -223,7 +224,8 @@ class SmartSuggestionPanel:
             
             # Status aktualisieren
             total_suggestions = sum(len(group.suggestions) for group in self.suggestion_groups)
-            self.status_label.configure(text=f"{total_suggestions} Vorschläge in {len(self.suggestion_groups)} Kategorien")
+            analysis_ms = self.suggestion_engine.stats['last_ms']
+            self.status_label.configure(text=f"{total_suggestions} Vorschläge in {len(self.suggestion_groups)} Kategorien ({analysis_ms:.1f} ms)")
             
         except Exception as e:
             logger.error(f"Suggestion Update Fehler: {e}")
@@ -236,6 +238,7 @@ class SmartSuggestionPanel:
             widget.destroy()
         
         self.button_widgets.clear()
+        self.displayed_ids = []
         
         if not self.suggestion_groups:
             self._show_placeholder()
@@ -244,6 +247,14 @@ class SmartSuggestionPanel:
         # Render each group
         for i, group in enumerate(self.suggestion_groups):
             self._render_group(group, i)
+        
+        # Nur wirklich angezeigte Vorschläge als 'shown' verbuchen
+        self._report_shown(self.displayed_ids)
+    
+    def _report_shown(self, suggestion_ids):
+        """Meldet angezeigte Vorschläge an die Engine (Feedback-Lernen)"""
+        if suggestion_ids:
+            self.suggestion_engine.record_shown(suggestion_ids)
     
     def _render_group(self, group: SuggestionGroup, index: int):
         """Rendert eine einzelne Suggestion Group"""
@@ -333,6 +344,7 @@ class SmartSuggestionPanel:
         
         # Store for later reference
         self.button_widgets[suggestion.id] = button
+        self.displayed_ids.append(suggestion.id)
     
     def _render_dropdown(self, group: SuggestionGroup, parent):
         """Rendert Suggestions als Dropdown"""
@@ -374,6 +386,16 @@ class SmartSuggestionPanel:
         
         if options:
             dropdown.set("Wähle eine Aktion...")
+        
+        # Die Optionen sind erst nach dem Aufklappen sichtbar
+        opened = []
+        
+        def on_open(event):
+            if not opened:
+                opened.append(True)
+                self._report_shown([s.id for s in group.suggestions])
+        
+        dropdown.bind("<Button-1>", on_open, add="+")
     
     def _render_grid(self, group: SuggestionGroup, parent):
         """Rendert Suggestions als Grid"""
@@ -406,6 +428,7 @@ class SmartSuggestionPanel:
                 )
             
             button.grid(row=row, column=col, padx=2, pady=2, sticky="ew")
+            self.displayed_ids.append(suggestion.id)
             
             # Configure grid weights
             grid_frame.grid_columnconfigure(col, weight=1)
@@ -523,6 +546,7 @@ class SmartSuggestionPanel:
         more_window = tk.Toplevel(self.parent)
         more_window.title(f"Alle {group.name} Vorschläge")
         more_window.geometry("400x300")
+        self._report_shown([s.id for s in group.suggestions[group.max_visible:]])
         
         # Scrollable list
         canvas = tk.Canvas(more_window)
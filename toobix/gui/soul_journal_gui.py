@@ -519,10 +519,7 @@ class SoulJournalGUI:
         
         # Heutige Dankbarkeiten anzeigen
         today = datetime.date.today()
-        today_entries = [
-            entry for entry in self.soul_journal.entries
-            if entry.category == "gratitude" and entry.timestamp.date() == today
-        ]
+        today_entries = self.soul_journal.store.entries_on(today, category="gratitude")
         
         today_text = "🙏 HEUTIGE DANKBARKEITEN:\n\n"
         
@@ -563,19 +560,14 @@ class SoulJournalGUI:
         
         filter_category = self.filter_var.get()
         
-        # Einträge filtern
-        if filter_category == "all":
-            entries = self.soul_journal.entries
-        else:
-            entries = [e for e in self.soul_journal.entries if e.category == filter_category]
-        
-        # Sortiere nach Datum (neueste zuerst)
-        entries = sorted(entries, key=lambda e: e.timestamp, reverse=True)
+        # Einträge filtern (Index statt Durchlauf über alle Einträge)
+        category = None if filter_category == "all" else filter_category
+        entries = self.soul_journal.store.recent(limit=20, category=category)  # Neueste zuerst
         
         # Historie-Text erstellen
-        history_text = f"📚 JOURNAL HISTORIE ({len(entries)} Einträge)\n\n"
+        history_text = f"📚 JOURNAL HISTORIE ({self.soul_journal.store.count(category)} Einträge)\n\n"
         
-        for entry in entries[:20]:  # Zeige nur die letzten 20
+        for entry in entries:  # Zeige nur die letzten 20
             date_str = entry.timestamp.strftime("%d.%m.%Y %H:%M")
             category_emoji = {
                 'gratitude': '🙏',